@@ -1,4 +1,5 @@
 import os
+from contextvars import ContextVar
 from pathlib import Path
 from contextlib import asynccontextmanager
 import asyncpg
@@ -17,6 +18,9 @@ queries = aiosql.from_path(
 # Global connection pool
 _pool = None
 
+# Connection of the transaction the current task is in (see get_transaction)
+_transaction_conn: ContextVar = ContextVar("transaction_conn", default=None)
+
 
 async def _init_connection(conn):
     """Initialize each connection with search_path (works with Supavisor)."""
@@ -45,7 +49,15 @@ async def init_db():
 
 @asynccontextmanager
 async def get_conn():
-    """Get connection from pool (recommended pattern from asyncpg docs)."""
+    """Get connection from pool (recommended pattern from asyncpg docs).
+
+    Inside get_transaction() this is the transaction's connection, so
+    repo functions called in the block are part of the transaction.
+    """
+    conn = _transaction_conn.get()
+    if conn is not None:
+        yield conn
+        return
     pool = await init_db()
     async with pool.acquire() as conn:
         yield conn
@@ -53,11 +65,26 @@ async def get_conn():
 
 @asynccontextmanager
 async def get_transaction():
-    """Get connection with transaction context."""
+    """Get connection with transaction context.
+
+    Until the block exits, get_conn() in the same task returns this
+    connection, so several repo calls commit or roll back together. Run
+    them one at a time: an asyncpg connection can't be shared by
+    concurrent queries. Nested calls become savepoints.
+    """
+    outer = _transaction_conn.get()
+    if outer is not None:
+        async with outer.transaction():
+            yield outer
+        return
     pool = await init_db()
     async with pool.acquire() as conn:
         async with conn.transaction():
-            yield conn
+            token = _transaction_conn.set(conn)
+            try:
+                yield conn
+            finally:
+                _transaction_conn.reset(token)
 
 
 async def close_db():
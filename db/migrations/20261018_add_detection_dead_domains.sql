@@ -0,0 +1,15 @@
+-- Negative cache for dead/unreachable website domains
+-- Domains whose precheck failed with a connection error, DNS error, timeout
+-- or HTTP 5xx are skipped until next_check_at. Each further failure doubles
+-- the wait (capped); a successful visit removes the row.
+
+CREATE TABLE IF NOT EXISTS sadie_gtm.detection_dead_domains (
+    domain TEXT PRIMARY KEY,               -- extract_domain(website), e.g. "example.com"
+    last_error TEXT NOT NULL,              -- precheck error, e.g. "connection_refused", "HTTP 503"
+    failure_count INTEGER NOT NULL DEFAULT 1,
+    first_failed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_failed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    next_check_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_detection_dead_domains_next_check_at ON sadie_gtm.detection_dead_domains(next_check_at);
@@ -0,0 +1,21 @@
+-- Domain-level detection cache
+-- Hotels sharing a website domain (management companies, franchise pages)
+-- reuse one detection result instead of each running a full browser visit.
+
+CREATE TABLE IF NOT EXISTS sadie_gtm.detection_domain_cache (
+    domain TEXT PRIMARY KEY,               -- extract_domain(website), e.g. "example.com"
+    booking_engine TEXT NOT NULL DEFAULT '',  -- '' = no engine found
+    booking_engine_domain TEXT,
+    booking_url TEXT,
+    detection_method TEXT,
+    phone_website TEXT,
+    email TEXT,
+    room_count TEXT,
+    detected_location TEXT,
+    source_hotel_id INTEGER REFERENCES sadie_gtm.hotels(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_detection_domain_cache_expires_at ON sadie_gtm.detection_domain_cache(expires_at);
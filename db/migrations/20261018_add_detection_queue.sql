@@ -0,0 +1,18 @@
+-- Postgres-backed detection queue (alternative to SQS)
+-- Each row is one message: a batch of hotel IDs in the same JSON body the
+-- SQS queue carries. Workers claim rows with FOR UPDATE SKIP LOCKED, which
+-- hides them until visible_at (the lease); a heartbeat moves visible_at
+-- forward while the batch runs, and an expired lease makes the row
+-- claimable again. claim_token plays the SQS receipt handle: only the
+-- current claimant can extend or delete the row.
+
+CREATE TABLE IF NOT EXISTS sadie_gtm.detection_queue (
+    id BIGSERIAL PRIMARY KEY,
+    body JSONB NOT NULL,                              -- {"hotel_ids": [...], "attempts": {...}}
+    receive_count INTEGER NOT NULL DEFAULT 0,         -- Claims so far
+    claim_token TEXT,                                 -- Set on each claim
+    visible_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_detection_queue_visible_at ON sadie_gtm.detection_queue(visible_at);
@@ -0,0 +1,47 @@
+-- Versioned booking engine patterns
+-- Every change to booking_engines (new engine, edited domains, engine
+-- (de)activated) bumps one version counter. Detection workers poll it and
+-- reload their compiled pattern index when it moves, and each detection
+-- records the version it ran with, so "no engine" results from before a
+-- pattern change can be found and re-run.
+
+SET search_path TO sadie_gtm;
+
+CREATE TABLE IF NOT EXISTS booking_engine_pattern_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),  -- Single row
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO booking_engine_pattern_version (id, version) VALUES (TRUE, 1)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_booking_engine_pattern_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE sadie_gtm.booking_engine_pattern_version
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Row-level so that insert_booking_engine's ON CONFLICT upsert of an
+-- unchanged engine does not count as a change
+DROP TRIGGER IF EXISTS booking_engines_pattern_version_insert_delete ON booking_engines;
+CREATE TRIGGER booking_engines_pattern_version_insert_delete
+    AFTER INSERT OR DELETE ON booking_engines
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_booking_engine_pattern_version();
+
+DROP TRIGGER IF EXISTS booking_engines_pattern_version_update ON booking_engines;
+CREATE TRIGGER booking_engines_pattern_version_update
+    AFTER UPDATE ON booking_engines
+    FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name
+          OR OLD.domains IS DISTINCT FROM NEW.domains
+          OR OLD.is_active IS DISTINCT FROM NEW.is_active)
+    EXECUTE FUNCTION bump_booking_engine_pattern_version();
+
+-- Pattern version each detection ran with (NULL = before versioning)
+ALTER TABLE hotel_booking_engines ADD COLUMN IF NOT EXISTS pattern_version BIGINT;
+ALTER TABLE detection_domain_cache ADD COLUMN IF NOT EXISTS pattern_version BIGINT;
@@ -5,6 +5,9 @@ from db.models.hotel_booking_engine import HotelBookingEngine
 from db.models.hotel_room_count import HotelRoomCount
 from db.models.hotel_customer_proximity import HotelCustomerProximity
 from db.models.job import Job
+from db.models.detection_domain_cache import DetectionDomainCache
+from db.models.detection_dead_domain import DetectionDeadDomain
+from db.models.detection_queue_message import DetectionQueueMessage
 
 __all__ = [
     "Hotel",
@@ -14,4 +17,7 @@ __all__ = [
     "HotelRoomCount",
     "HotelCustomerProximity",
     "Job",
+    "DetectionDomainCache",
+    "DetectionDeadDomain",
+    "DetectionQueueMessage",
 ]
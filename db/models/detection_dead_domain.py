@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
+
+
+class DetectionDeadDomain(BaseModel):
+    """Unreachable website domain with its re-check schedule, matching the database schema."""
+
+    domain: str
+    last_error: str
+    failure_count: int = 1
+    first_failed_at: Optional[datetime] = None
+    last_failed_at: Optional[datetime] = None
+    next_check_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
+
+
+class DetectionDomainCache(BaseModel):
+    """Cached detection result for a website domain, matching the database schema."""
+
+    domain: str
+    booking_engine: str = ""
+    booking_engine_domain: Optional[str] = None
+    booking_url: Optional[str] = None
+    detection_method: Optional[str] = None
+    phone_website: Optional[str] = None
+    email: Optional[str] = None
+    room_count: Optional[str] = None
+    detected_location: Optional[str] = None
+    pattern_version: Optional[int] = None
+    source_hotel_id: Optional[int] = None
+    updated_at: Optional[datetime] = None
+    expires_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, ConfigDict
+
+
+class DetectionQueueMessage(BaseModel):
+    """Claimed detection queue message, matching the database schema."""
+
+    id: int
+    body: Dict[str, Any]
+    receive_count: int = 0
+    claim_token: Optional[str] = None
+    visible_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -4,6 +4,10 @@ SELECT id, name, domains, tier, is_active
 FROM sadie_gtm.booking_engines
 WHERE name = :name;
 
+-- name: get_booking_engine_pattern_version$
+-- Current version of the engine patterns (bumped on every booking_engines change)
+SELECT version FROM sadie_gtm.booking_engine_pattern_version;
+
 -- name: get_all_booking_engines
 -- Get all active booking engines with their domain patterns
 SELECT id, name, domains, tier
@@ -0,0 +1,30 @@
+-- Queries for detection_dead_domains table
+
+-- name: get_detection_dead_domains
+-- Get domains that are still considered dead (next re-check not due yet)
+SELECT domain, last_error, failure_count, first_failed_at, last_failed_at, next_check_at
+FROM sadie_gtm.detection_dead_domains
+WHERE domain = ANY(:domains)
+  AND next_check_at > CURRENT_TIMESTAMP;
+
+-- name: record_detection_dead_domain!
+-- Record a failed precheck; the re-check delay doubles with each failure up to max_hours
+INSERT INTO sadie_gtm.detection_dead_domains (
+    domain, last_error, failure_count, first_failed_at, last_failed_at, next_check_at
+) VALUES (
+    :domain, :last_error, 1, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP,
+    CURRENT_TIMESTAMP + LEAST(:base_hours::float, :max_hours::float) * INTERVAL '1 hour'
+)
+ON CONFLICT (domain) DO UPDATE SET
+    last_error = EXCLUDED.last_error,
+    failure_count = detection_dead_domains.failure_count + 1,
+    last_failed_at = CURRENT_TIMESTAMP,
+    next_check_at = CURRENT_TIMESTAMP + LEAST(
+        :base_hours::float * POWER(2, detection_dead_domains.failure_count),
+        :max_hours::float
+    ) * INTERVAL '1 hour';
+
+-- name: delete_detection_dead_domain!
+-- Forget a domain once its site was reachable again
+DELETE FROM sadie_gtm.detection_dead_domains
+WHERE domain = :domain;
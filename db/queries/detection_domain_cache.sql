@@ -0,0 +1,40 @@
+-- Queries for detection_domain_cache table
+
+-- name: get_detection_domain_cache
+-- Get unexpired cache entries for a list of domains
+SELECT domain, booking_engine, booking_engine_domain, booking_url, detection_method,
+       phone_website, email, room_count, detected_location, pattern_version, source_hotel_id,
+       updated_at, expires_at
+FROM sadie_gtm.detection_domain_cache
+WHERE domain = ANY(:domains)
+  AND expires_at > CURRENT_TIMESTAMP;
+
+-- name: upsert_detection_domain_cache!
+-- Insert or refresh a domain's cached detection result
+INSERT INTO sadie_gtm.detection_domain_cache (
+    domain, booking_engine, booking_engine_domain, booking_url, detection_method,
+    phone_website, email, room_count, detected_location, pattern_version, source_hotel_id,
+    created_at, updated_at, expires_at
+) VALUES (
+    :domain, :booking_engine, :booking_engine_domain, :booking_url, :detection_method,
+    :phone_website, :email, :room_count, :detected_location, :pattern_version, :source_hotel_id,
+    CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP + (:ttl_days * INTERVAL '1 day')
+)
+ON CONFLICT (domain) DO UPDATE SET
+    booking_engine = EXCLUDED.booking_engine,
+    booking_engine_domain = EXCLUDED.booking_engine_domain,
+    booking_url = EXCLUDED.booking_url,
+    detection_method = EXCLUDED.detection_method,
+    phone_website = EXCLUDED.phone_website,
+    email = EXCLUDED.email,
+    room_count = EXCLUDED.room_count,
+    detected_location = EXCLUDED.detected_location,
+    pattern_version = EXCLUDED.pattern_version,
+    source_hotel_id = EXCLUDED.source_hotel_id,
+    updated_at = CURRENT_TIMESTAMP,
+    expires_at = EXCLUDED.expires_at;
+
+-- name: delete_expired_detection_domain_cache!
+-- Remove expired cache entries
+DELETE FROM sadie_gtm.detection_domain_cache
+WHERE expires_at <= CURRENT_TIMESTAMP;
@@ -0,0 +1,56 @@
+-- Queries for detection_queue table (Postgres-backed detection queue)
+
+-- name: enqueue_detection_messages$
+-- Add messages (JSON strings) to the queue, visible immediately; returns count
+WITH inserted AS (
+    INSERT INTO sadie_gtm.detection_queue (body)
+    SELECT b::jsonb FROM unnest(:bodies::text[]) AS b
+    RETURNING 1
+)
+SELECT COUNT(*) FROM inserted;
+
+-- name: claim_detection_messages
+-- Atomically claim up to :limit visible messages (multi-worker safe)
+-- Uses FOR UPDATE SKIP LOCKED so concurrent workers never claim the same row;
+-- claimed rows stay hidden for :visibility_timeout seconds unless extended
+WITH claimable AS (
+    SELECT id
+    FROM sadie_gtm.detection_queue
+    WHERE visible_at <= CURRENT_TIMESTAMP
+    ORDER BY id
+    FOR UPDATE SKIP LOCKED
+    LIMIT :limit
+)
+UPDATE sadie_gtm.detection_queue q
+SET visible_at = CURRENT_TIMESTAMP + (:visibility_timeout * INTERVAL '1 second'),
+    receive_count = q.receive_count + 1,
+    claim_token = gen_random_uuid()::text
+FROM claimable c
+WHERE q.id = c.id
+RETURNING q.id, q.body::text AS body, q.receive_count, q.claim_token;
+
+-- name: extend_detection_message$
+-- Move a claimed message's lease (0 = release now); false if the claim was lost
+WITH extended AS (
+    UPDATE sadie_gtm.detection_queue
+    SET visible_at = CURRENT_TIMESTAMP + (:visibility_timeout * INTERVAL '1 second')
+    WHERE id = :message_id AND claim_token = :claim_token
+    RETURNING 1
+)
+SELECT EXISTS (SELECT 1 FROM extended);
+
+-- name: delete_detection_message$
+-- Acknowledge a claimed message; false if the claim was lost
+WITH deleted AS (
+    DELETE FROM sadie_gtm.detection_queue
+    WHERE id = :message_id AND claim_token = :claim_token
+    RETURNING 1
+)
+SELECT EXISTS (SELECT 1 FROM deleted);
+
+-- name: get_detection_queue_counts^
+-- Visible (pending) and claimed (in flight) message counts
+SELECT
+    COUNT(*) FILTER (WHERE visible_at <= CURRENT_TIMESTAMP) AS pending,
+    COUNT(*) FILTER (WHERE visible_at > CURRENT_TIMESTAMP) AS in_flight
+FROM sadie_gtm.detection_queue;
@@ -7,6 +7,7 @@ INSERT INTO sadie_gtm.hotel_booking_engines (
     booking_url,
     detection_method,
     status,
+    pattern_version,
     detected_at,
     updated_at
 ) VALUES (
@@ -15,6 +16,7 @@ INSERT INTO sadie_gtm.hotel_booking_engines (
     :booking_url,
     :detection_method,
     :status,
+    :pattern_version,
     CURRENT_TIMESTAMP,
     CURRENT_TIMESTAMP
 )
@@ -23,4 +25,27 @@ ON CONFLICT (hotel_id) DO UPDATE SET
     booking_url = COALESCE(EXCLUDED.booking_url, hotel_booking_engines.booking_url),
     detection_method = COALESCE(EXCLUDED.detection_method, hotel_booking_engines.detection_method),
     status = EXCLUDED.status,
+    pattern_version = COALESCE(EXCLUDED.pattern_version, hotel_booking_engines.pattern_version),
     updated_at = CURRENT_TIMESTAMP;
+
+-- name: insert_hotel_booking_engine_dead_letter!
+-- Mark a hotel that kept failing as non-retriable (status=-1)
+-- Never downgrades a successful (status=1) detection
+INSERT INTO sadie_gtm.hotel_booking_engines (
+    hotel_id,
+    detection_method,
+    status,
+    detected_at,
+    updated_at
+) VALUES (
+    :hotel_id,
+    :detection_method,
+    -1,
+    CURRENT_TIMESTAMP,
+    CURRENT_TIMESTAMP
+)
+ON CONFLICT (hotel_id) DO UPDATE SET
+    detection_method = EXCLUDED.detection_method,
+    status = -1,
+    updated_at = CURRENT_TIMESTAMP
+WHERE hotel_booking_engines.status <> 1;
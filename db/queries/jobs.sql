@@ -0,0 +1,29 @@
+-- name: insert_job<!
+-- Record a finished job execution (input_params/output_data are JSON strings)
+INSERT INTO sadie_gtm.jobs (
+    job_type, queue_name, message_id, attempt_number, worker_id,
+    started_at, completed_at, duration_ms, status, error_message,
+    input_params, output_data
+)
+VALUES (
+    :job_type, :queue_name, :message_id, :attempt_number, :worker_id,
+    :started_at, :completed_at, :duration_ms, :status, :error_message,
+    :input_params::jsonb, :output_data::jsonb
+)
+RETURNING id;
+
+-- name: get_job_stage_summary
+-- Sum per-stage timings (output_data->'stages') across jobs of a type since a time
+SELECT
+    s.key AS stage,
+    SUM((s.value->>'count')::bigint) AS samples,
+    SUM((s.value->>'total_ms')::bigint) AS total_ms,
+    MAX((s.value->>'max_ms')::bigint) AS max_ms,
+    COUNT(DISTINCT j.id) AS jobs
+FROM sadie_gtm.jobs j
+CROSS JOIN LATERAL jsonb_each(j.output_data->'stages') s
+WHERE j.job_type = :job_type
+  AND j.started_at >= :since
+  AND j.output_data ? 'stages'
+GROUP BY s.key
+ORDER BY total_ms DESC;
@@ -99,6 +99,17 @@ CREATE TABLE IF NOT EXISTS booking_engines (
     is_active BOOLEAN DEFAULT TRUE
 );
 
+-- Bumped on every change to booking_engines (see triggers below); detection
+-- workers reload their patterns when it moves
+CREATE TABLE IF NOT EXISTS booking_engine_pattern_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),  -- Single row
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO booking_engine_pattern_version (id, version) VALUES (TRUE, 1)
+ON CONFLICT (id) DO NOTHING;
+
 -- ============================================================================
 -- EXISTING CUSTOMERS: Existing Sadie customers (must be created before hotel_customer_proximity)
 -- ============================================================================
@@ -135,6 +146,7 @@ CREATE TABLE IF NOT EXISTS hotel_booking_engines (
     -- Detection metadata
     booking_url TEXT,
     detection_method TEXT,  -- playwright, regex, manual
+    pattern_version BIGINT,  -- booking_engine_pattern_version.version used (NULL = before versioning)
 
     -- Timestamps
     detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -249,6 +261,30 @@ CREATE TRIGGER hotel_booking_engines_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at();
 
+-- Engine pattern version bump. Row-level so that upserting an unchanged
+-- engine does not count as a change.
+CREATE OR REPLACE FUNCTION bump_booking_engine_pattern_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE sadie_gtm.booking_engine_pattern_version
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER booking_engines_pattern_version_insert_delete
+    AFTER INSERT OR DELETE ON booking_engines
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_booking_engine_pattern_version();
+
+CREATE TRIGGER booking_engines_pattern_version_update
+    AFTER UPDATE ON booking_engines
+    FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name
+          OR OLD.domains IS DISTINCT FROM NEW.domains
+          OR OLD.is_active IS DISTINCT FROM NEW.is_active)
+    EXECUTE FUNCTION bump_booking_engine_pattern_version();
+
 -- ============================================================================
 -- DETECTION_ERRORS: Track detection failures for debugging
 -- ============================================================================
@@ -265,6 +301,66 @@ CREATE INDEX IF NOT EXISTS idx_detection_errors_hotel_id ON detection_errors(hot
 CREATE INDEX IF NOT EXISTS idx_detection_errors_error_type ON detection_errors(error_type);
 CREATE INDEX IF NOT EXISTS idx_detection_errors_created_at ON detection_errors(created_at);
 
+-- ============================================================================
+-- DETECTION_DOMAIN_CACHE: Detection results shared by hotels on one domain
+-- ============================================================================
+-- Keyed by extract_domain(website). Multi-property sites and franchise
+-- landing pages are detected once; other hotels on the domain reuse the
+-- result until expires_at.
+CREATE TABLE IF NOT EXISTS detection_domain_cache (
+    domain TEXT PRIMARY KEY,               -- extract_domain(website), e.g. "example.com"
+    booking_engine TEXT NOT NULL DEFAULT '',  -- '' = no engine found
+    booking_engine_domain TEXT,
+    booking_url TEXT,
+    detection_method TEXT,
+    phone_website TEXT,
+    email TEXT,
+    room_count TEXT,
+    detected_location TEXT,
+    pattern_version BIGINT,                -- Engine pattern version the result was detected with
+    source_hotel_id INTEGER REFERENCES hotels(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_detection_domain_cache_expires_at ON detection_domain_cache(expires_at);
+
+-- ============================================================================
+-- DETECTION_DEAD_DOMAINS: Negative cache of unreachable website domains
+-- ============================================================================
+-- Domains whose precheck failed (connection/DNS error, timeout, HTTP 5xx)
+-- are not probed again until next_check_at, which backs off exponentially
+-- with failure_count. Hotels on them get a "precheck_cached" error.
+CREATE TABLE IF NOT EXISTS detection_dead_domains (
+    domain TEXT PRIMARY KEY,               -- extract_domain(website), e.g. "example.com"
+    last_error TEXT NOT NULL,              -- precheck error, e.g. "connection_refused", "HTTP 503"
+    failure_count INTEGER NOT NULL DEFAULT 1,
+    first_failed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_failed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    next_check_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_detection_dead_domains_next_check_at ON detection_dead_domains(next_check_at);
+
+-- ============================================================================
+-- DETECTION_QUEUE: Postgres-backed detection queue (alternative to SQS)
+-- ============================================================================
+-- One row per message (same JSON body as the SQS queue). Claimed with
+-- FOR UPDATE SKIP LOCKED and hidden until visible_at; a heartbeat extends
+-- the lease, an expired lease makes the row claimable again. claim_token
+-- acts as the receipt handle.
+CREATE TABLE IF NOT EXISTS detection_queue (
+    id BIGSERIAL PRIMARY KEY,
+    body JSONB NOT NULL,                              -- {"hotel_ids": [...], "attempts": {...}}
+    receive_count INTEGER NOT NULL DEFAULT 0,         -- Claims so far
+    claim_token TEXT,                                 -- Set on each claim
+    visible_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_detection_queue_visible_at ON detection_queue(visible_at);
+
 -- ============================================================================
 -- SCRAPE_TARGET_CITIES: Cities to scrape for hotels
 -- ============================================================================
@@ -0,0 +1,231 @@
+"""Adaptive (AIMD) concurrency limiter.
+
+A drop-in replacement for asyncio.Semaphore whose limit follows observed
+load instead of a preset constant. Every `window` completed slots it looks
+at what happened in that window and moves the limit:
+
+- decrease (limit * backoff) when the timeout rate is above max_timeout_rate,
+  the median slot latency is more than latency_tolerance x the baseline, or
+  the instance has less than min_available_pct memory left
+- increase (+1) when none of the above and the limit was actually reached
+  during the window (no point growing an idle limit)
+- hold otherwise
+
+The latency baseline is the best median seen so far, drifting slowly upward
+so one lucky window doesn't pin it. Every change is logged with the numbers
+that caused it, and the last decisions are kept in `decisions` so presets
+can be tuned from data.
+
+Usage:
+    limiter = AdaptiveLimiter(5, max_limit=20, name="detection")
+    async with limiter:          # like a semaphore; slot time is measured
+        await work()
+    limiter.record_timeout()     # for timeouts the caller handled itself
+"""
+
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Type
+
+from loguru import logger
+
+from infra.memory import MemorySnapshot, read_memory
+
+
+class AdaptiveLimiter:
+    """Semaphore with an AIMD-controlled limit."""
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+        name: str = "limiter",
+        window: int = 20,
+        backoff: float = 0.7,
+        latency_tolerance: float = 2.0,
+        max_timeout_rate: float = 0.1,
+        min_available_pct: float = 15.0,
+        memory_probe: Optional[Callable[[], MemorySnapshot]] = read_memory,
+        timeout_exceptions: Tuple[Type[BaseException], ...] = (asyncio.TimeoutError,),
+    ):
+        """
+        Args:
+            initial: Starting limit
+            min_limit: Never go below this
+            max_limit: Never go above this (default: 2 x initial)
+            name: Shown in log lines
+            window: Completed slots per decision
+            backoff: Multiplier applied on decrease
+            latency_tolerance: Decrease when median latency exceeds baseline x this
+            max_timeout_rate: Decrease when more than this fraction of slots timed out
+            min_available_pct: Decrease when available memory drops below this
+            memory_probe: Memory reading per decision (None = ignore memory)
+            timeout_exceptions: Exceptions leaving a slot that count as timeouts
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit if max_limit is not None else initial * 2)
+        self._limit = max(self.min_limit, min(self.max_limit, initial))
+        self.name = name
+        self.window = window
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.max_timeout_rate = max_timeout_rate
+        self.min_available_pct = min_available_pct
+        self.memory_probe = memory_probe
+        self.timeout_exceptions = timeout_exceptions
+
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._entered: Dict[int, List[float]] = {}
+
+        # Current window
+        self._latencies: List[float] = []
+        self._timeouts = 0
+        self._peak = 0
+        self._baseline: Optional[float] = None
+
+        self.decisions: Deque[Dict] = deque(maxlen=100)
+        self.stats = {"completed": 0, "timeouts": 0, "increases": 0, "decreases": 0}
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def locked(self) -> bool:
+        return self._in_flight >= self._limit
+
+    # -------------------------------------------------------------------------
+    # Semaphore interface
+    # -------------------------------------------------------------------------
+
+    async def acquire(self) -> bool:
+        loop = asyncio.get_running_loop()
+        while self._in_flight >= self._limit:
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    self._wake()  # Pass the wake-up on
+                raise
+        self._in_flight += 1
+        self._peak = max(self._peak, self._in_flight)
+        return True
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+        self._entered.setdefault(id(asyncio.current_task()), []).append(time.perf_counter())
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        key = id(asyncio.current_task())
+        starts = self._entered.get(key)
+        started = starts.pop() if starts else time.perf_counter()
+        if not starts:
+            self._entered.pop(key, None)
+        timed_out = exc_type is not None and issubclass(exc_type, self.timeout_exceptions)
+        self.release()
+        self.record(time.perf_counter() - started, timed_out)
+
+    def _wake(self) -> None:
+        free = self._limit - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    # -------------------------------------------------------------------------
+    # Control loop
+    # -------------------------------------------------------------------------
+
+    def record_timeout(self) -> None:
+        """Count a timeout the caller caught itself (the slot still completes normally)."""
+        self._timeouts += 1
+        self.stats["timeouts"] += 1
+
+    def record(self, latency_s: float, timed_out: bool = False) -> None:
+        """Record one completed slot; decides once a window is full."""
+        self._latencies.append(latency_s)
+        self.stats["completed"] += 1
+        if timed_out:
+            self.record_timeout()
+        if len(self._latencies) >= self.window:
+            self._decide()
+
+    def _decide(self) -> None:
+        p50 = statistics.median(self._latencies)
+        timeout_rate = min(1.0, self._timeouts / len(self._latencies))
+        saturated = self._peak >= self._limit
+        available_pct = None
+        if self.memory_probe is not None:
+            snap = self.memory_probe()
+            if snap.total_mb:
+                available_pct = snap.available_pct
+
+        reasons = []
+        if timeout_rate > self.max_timeout_rate:
+            reasons.append(f"timeouts {timeout_rate:.0%} > {self.max_timeout_rate:.0%}")
+        if self._baseline and p50 > self._baseline * self.latency_tolerance:
+            reasons.append(f"p50 {p50:.2f}s > {self.latency_tolerance:g}x baseline {self._baseline:.2f}s")
+        if available_pct is not None and available_pct < self.min_available_pct:
+            reasons.append(f"memory {available_pct:.0f}% available < {self.min_available_pct:.0f}%")
+
+        old = self._limit
+        if reasons:
+            self._limit = max(self.min_limit, int(old * self.backoff))
+            action = "decrease"
+        elif saturated and old < self.max_limit:
+            self._limit = old + 1
+            action = "increase"
+            reasons.append("healthy and saturated")
+        else:
+            action = "hold"
+            reasons.append("healthy" if not saturated else "at max")
+
+        # Baseline follows improvements immediately, degradations slowly;
+        # windows judged slow don't move it
+        if self._baseline is None or p50 < self._baseline:
+            self._baseline = p50
+        elif action != "decrease":
+            self._baseline += (p50 - self._baseline) * 0.1
+
+        decision = {
+            "at": time.time(),
+            "action": action,
+            "limit": old,
+            "new_limit": self._limit,
+            "p50_s": round(p50, 3),
+            "timeout_rate": round(timeout_rate, 3),
+            "available_pct": round(available_pct, 1) if available_pct is not None else None,
+            "peak_in_flight": self._peak,
+            "reason": "; ".join(reasons),
+        }
+        self.decisions.append(decision)
+        if self._limit != old:
+            self.stats["increases" if self._limit > old else "decreases"] += 1
+            logger.info(
+                f"[{self.name}] concurrency {old} -> {self._limit} ({decision['reason']}) | "
+                f"p50={p50:.2f}s timeouts={timeout_rate:.0%} peak={self._peak} "
+                f"mem={'n/a' if available_pct is None else f'{available_pct:.0f}%'}"
+            )
+            self._wake()
+        else:
+            logger.debug(f"[{self.name}] concurrency {old} held ({decision['reason']}) | p50={p50:.2f}s")
+
+        self._latencies = []
+        self._timeouts = 0
+        self._peak = self._in_flight
@@ -0,0 +1,116 @@
+"""Unit tests for the adaptive concurrency limiter."""
+
+import asyncio
+
+import pytest
+
+from infra.concurrency import AdaptiveLimiter
+from infra.memory import MemorySnapshot
+
+
+def _limiter(initial: int = 4, **kwargs) -> AdaptiveLimiter:
+    return AdaptiveLimiter(initial, window=4, memory_probe=None, **kwargs)
+
+
+@pytest.mark.no_db
+class TestAdaptiveLimiter:
+    """Unit tests for AdaptiveLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_blocks_at_limit(self):
+        limiter = _limiter(2)
+        await limiter.acquire()
+        await limiter.acquire()
+        assert limiter.locked()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        limiter.release()
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        limiter = _limiter(1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        limiter.release()
+        assert limiter.in_flight == 0
+        await asyncio.wait_for(limiter.acquire(), 1)
+
+    @pytest.mark.asyncio
+    async def test_increases_when_saturated_and_healthy(self):
+        limiter = _limiter(2, max_limit=3)
+
+        async def work():
+            async with limiter:
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(work() for _ in range(4)))
+        assert limiter.limit == 3
+        assert limiter.decisions[-1]["action"] == "increase"
+
+        # At max: holds
+        await asyncio.gather(*(work() for _ in range(4)))
+        assert limiter.limit == 3
+        assert limiter.decisions[-1]["action"] == "hold"
+
+    def test_holds_when_not_saturated(self):
+        limiter = _limiter(4)
+        for _ in range(4):
+            limiter.record(0.1)
+        assert limiter.limit == 4
+        assert limiter.decisions[-1]["reason"] == "healthy"
+
+    def test_decreases_on_timeouts(self):
+        limiter = _limiter(10, min_limit=4, max_limit=10)
+        for i in range(4):
+            limiter.record(0.1, timed_out=i < 2)
+        assert limiter.limit == 7
+        assert "timeouts 50%" in limiter.decisions[-1]["reason"]
+
+        for _ in range(2):
+            for _ in range(4):
+                limiter.record(0.1, timed_out=True)
+        assert limiter.limit == 4  # Floor
+        assert limiter.stats["decreases"] == 2
+
+    def test_decreases_on_latency_vs_baseline(self):
+        limiter = _limiter(10)
+        for _ in range(4):
+            limiter.record(1.0)
+        assert limiter.limit == 10
+
+        for _ in range(4):
+            limiter.record(3.0)
+        assert limiter.limit == 7
+        assert "baseline 1.00s" in limiter.decisions[-1]["reason"]
+
+    def test_decreases_on_low_memory(self):
+        limiter = AdaptiveLimiter(
+            10, window=4,
+            memory_probe=lambda: MemorySnapshot(available_mb=500, total_mb=8000),
+        )
+        for _ in range(4):
+            limiter.record(0.1)
+        assert limiter.limit == 7
+        assert limiter.decisions[-1]["available_pct"] == 6.2
+
+    @pytest.mark.asyncio
+    async def test_timeout_exception_counts(self):
+        limiter = _limiter(4, max_timeout_rate=0.0)
+        with pytest.raises(asyncio.TimeoutError):
+            async with limiter:
+                raise asyncio.TimeoutError()
+        with pytest.raises(ValueError):
+            async with limiter:
+                raise ValueError()
+        assert limiter.stats == {"completed": 2, "timeouts": 1, "increases": 0, "decreases": 0}
+        assert limiter.in_flight == 0
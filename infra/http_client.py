@@ -0,0 +1,305 @@
+"""Pooled httpx client with a DNS resolution cache.
+
+Batch HTTP work (reachability prechecks, static homepage fetches) hits
+hundreds of hosts per run. Creating an AsyncClient per URL throws away the
+connection pool and re-resolves DNS every time; this module builds one
+shared client whose connections are pooled and whose hostname lookups are
+cached in-process.
+"""
+
+import asyncio
+import contextlib
+import importlib.util
+import ipaddress
+import socket
+import time
+from typing import AsyncIterable, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple, Type
+
+import httpcore
+import httpx
+from loguru import logger
+
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class DNSCache:
+    """In-process cache of hostname -> IP addresses lookups.
+
+    Every address getaddrinfo returns is kept, so a connect can fall back
+    to the next one when the first is unreachable (dual-stack hosts with
+    broken IPv6, round-robin records with a dead member). Concurrent
+    lookups for the same host share one getaddrinfo call. Failed lookups
+    are cached for a shorter time so dead domains don't re-resolve on
+    every retry.
+    """
+
+    def __init__(self, ttl: float = 300.0, negative_ttl: float = 60.0):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # (host, port) -> (ips, () for failure, expires_at)
+        self._entries: Dict[Tuple[str, int], Tuple[Tuple[str, ...], float]] = {}
+        self._pending: Dict[Tuple[str, int], asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def resolve(self, host: str, port: int, timeout: Optional[float] = None) -> str:
+        """Return the preferred IP address for host, raising httpcore.ConnectError on failure."""
+        return (await self.resolve_all(host, port, timeout=timeout))[0]
+
+    async def resolve_all(self, host: str, port: int, timeout: Optional[float] = None) -> Tuple[str, ...]:
+        """Return every IP address for host in preference order, raising httpcore.ConnectError on failure."""
+        if _is_ip(host):
+            return (host,)
+
+        key = (host, port)
+        entry = self._entries.get(key)
+        if entry and entry[1] > time.monotonic():
+            self.hits += 1
+            if not entry[0]:
+                raise httpcore.ConnectError(f"DNS lookup failed for {host} (cached)")
+            return entry[0]
+
+        task = self._pending.get(key)
+        if task is None:
+            self.misses += 1
+            # Own task so a cancelled caller doesn't abort a shared lookup
+            task = asyncio.ensure_future(self._lookup(host, port, timeout))
+            self._pending[key] = task
+        else:
+            self.hits += 1
+
+        ips = await asyncio.shield(task)
+        if not ips:
+            raise httpcore.ConnectError(f"DNS lookup failed for {host}")
+        return ips
+
+    def demote(self, host: str, port: int, ip: str) -> None:
+        """Move an address that failed to connect to the back of host's list."""
+        entry = self._entries.get((host, port))
+        if entry and ip in entry[0] and len(entry[0]) > 1:
+            ips = tuple(a for a in entry[0] if a != ip) + (ip,)
+            self._entries[(host, port)] = (ips, entry[1])
+
+    async def _lookup(self, host: str, port: int, timeout: Optional[float]) -> Tuple[str, ...]:
+        key = (host, port)
+        ips: Tuple[str, ...] = ()
+        try:
+            infos = await asyncio.wait_for(
+                asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM),
+                timeout=timeout,
+            )
+            # Keep getaddrinfo's (RFC 6724) order, dropping duplicates
+            ips = tuple(dict.fromkeys(info[4][0] for info in infos))
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.debug(f"DNS lookup failed for {host}: {e}")
+        finally:
+            self._pending.pop(key, None)
+
+        ttl = self.ttl if ips else self.negative_ttl
+        self._entries[key] = (ips, time.monotonic() + ttl)
+        return ips
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+class _CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """httpcore network backend that resolves hosts through a DNSCache.
+
+    Addresses are tried in turn until one accepts the connection; one that
+    fails is moved to the back of the cached list. TLS still uses the
+    original hostname for SNI and certificate checks; only the TCP connect
+    goes to the cached IP.
+    """
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, dns_cache: DNSCache):
+        self._backend = backend
+        self._dns_cache = dns_cache
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        ips = await self._dns_cache.resolve_all(host, port, timeout=timeout)
+        for i, ip in enumerate(ips):
+            try:
+                return await self._backend.connect_tcp(
+                    ip, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                self._dns_cache.demote(host, port, ip)
+                if i == len(ips) - 1:
+                    raise
+                logger.debug(f"Connect to {host} at {ip} failed ({e!r}), trying {ips[i + 1]}")
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+# httpcore exception -> httpx exception, most specific first by MRO lookup
+_HTTPCORE_EXCEPTIONS: Dict[Type[Exception], Type[httpx.TransportError]] = {
+    httpcore.TimeoutException: httpx.TimeoutException,
+    httpcore.ConnectTimeout: httpx.ConnectTimeout,
+    httpcore.ReadTimeout: httpx.ReadTimeout,
+    httpcore.WriteTimeout: httpx.WriteTimeout,
+    httpcore.PoolTimeout: httpx.PoolTimeout,
+    httpcore.NetworkError: httpx.NetworkError,
+    httpcore.ConnectError: httpx.ConnectError,
+    httpcore.ReadError: httpx.ReadError,
+    httpcore.WriteError: httpx.WriteError,
+    httpcore.ProxyError: httpx.ProxyError,
+    httpcore.UnsupportedProtocol: httpx.UnsupportedProtocol,
+    httpcore.ProtocolError: httpx.ProtocolError,
+    httpcore.LocalProtocolError: httpx.LocalProtocolError,
+    httpcore.RemoteProtocolError: httpx.RemoteProtocolError,
+}
+
+
+@contextlib.contextmanager
+def _map_httpcore_exceptions() -> Iterator[None]:
+    try:
+        yield
+    except Exception as exc:
+        for cls in type(exc).__mro__:
+            mapped = _HTTPCORE_EXCEPTIONS.get(cls)
+            if mapped is not None:
+                raise mapped(str(exc)) from exc
+        raise
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: AsyncIterable[bytes]):
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _map_httpcore_exceptions():
+            async for chunk in self._stream:
+                yield chunk
+
+    async def aclose(self) -> None:
+        if hasattr(self._stream, "aclose"):
+            with _map_httpcore_exceptions():
+                await self._stream.aclose()
+
+
+class CachingDNSTransport(httpx.AsyncBaseTransport):
+    """httpx transport over an httpcore connection pool that connects via a DNSCache.
+
+    httpx.AsyncHTTPTransport has no way to pass httpcore a network backend,
+    so this builds the pool itself through httpcore's public
+    AsyncConnectionPool(network_backend=...) instead of patching httpx
+    internals, which change between releases.
+    """
+
+    def __init__(
+        self,
+        dns_cache: DNSCache,
+        verify: bool = True,
+        http2: bool = False,
+        limits: httpx.Limits = httpx.Limits(),
+    ):
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(verify=verify),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            network_backend=_CachingNetworkBackend(httpcore.AnyIOBackend(), dns_cache),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _map_httpcore_exceptions():
+            core_response = await self._pool.handle_async_request(core_request)
+        return httpx.Response(
+            status_code=core_response.status,
+            headers=core_response.headers,
+            stream=_ResponseStream(core_response.stream),
+            extensions=core_response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+
+# Shared across batches so consecutive batches (e.g. SQS messages) reuse lookups
+_default_dns_cache = DNSCache()
+
+# Wraps the transport of every pooled client (offline record/replay, see
+# services/leadgen/replay.py). None in production.
+TransportWrapper = Callable[[httpx.AsyncBaseTransport], httpx.AsyncBaseTransport]
+_transport_wrapper: Optional[TransportWrapper] = None
+
+
+def get_dns_cache() -> DNSCache:
+    """Get the process-wide DNS cache."""
+    return _default_dns_cache
+
+
+def set_transport_wrapper(wrapper: Optional[TransportWrapper]) -> None:
+    """Wrap the transport of pooled clients created from now on (None to reset)."""
+    global _transport_wrapper
+    _transport_wrapper = wrapper
+
+
+def create_pooled_client(
+    max_connections: int = 30,
+    timeout: float = 5.0,
+    headers: Optional[Dict[str, str]] = None,
+    verify: bool = False,
+    follow_redirects: bool = True,
+    dns_cache: Optional[DNSCache] = None,
+) -> httpx.AsyncClient:
+    """Create an AsyncClient with pooled keep-alive connections and cached DNS.
+
+    HTTP/2 is negotiated when the h2 package is installed.
+
+    Args:
+        max_connections: Total connection pool size
+        timeout: Default request timeout in seconds
+        headers: Default request headers
+        verify: Verify TLS certificates
+        follow_redirects: Follow redirects
+        dns_cache: DNS cache to use (default: process-wide cache)
+    """
+    transport = CachingDNSTransport(
+        dns_cache if dns_cache is not None else _default_dns_cache,
+        verify=verify,
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+    )
+
+    return httpx.AsyncClient(
+        transport=_transport_wrapper(transport) if _transport_wrapper is not None else transport,
+        timeout=timeout,
+        headers=headers,
+        follow_redirects=follow_redirects,
+    )
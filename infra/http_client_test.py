@@ -0,0 +1,209 @@
+"""Unit tests for the pooled HTTP client and DNS cache."""
+
+import asyncio
+import socket
+
+import httpcore
+import httpx
+import pytest
+
+from infra.http_client import DNSCache, _CachingNetworkBackend, create_pooled_client
+
+
+def _fake_getaddrinfo(calls, ip="10.0.0.7", fail_hosts=()):
+    ips = ip if isinstance(ip, (list, tuple)) else [ip]
+
+    async def getaddrinfo(host, port, type=0, **kwargs):
+        calls.append(host)
+        await asyncio.sleep(0.01)
+        if host in fail_hosts:
+            raise socket.gaierror("Name or service not known")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (a, port)) for a in ips]
+    return getaddrinfo
+
+
+class _RefusingBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that refuses connects to some addresses and records every attempt."""
+
+    def __init__(self, refused):
+        self.refused = set(refused)
+        self.attempts = []
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.attempts.append(host)
+        if host in self.refused:
+            raise httpcore.ConnectError(f"refused: {host}")
+        return host
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        raise NotImplementedError
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+
+async def _start_ok_server(host="127.0.0.1"):
+    connections = []
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        while True:
+            try:
+                await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                break
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+
+    server = await asyncio.start_server(handle, host, 0)
+    return server, server.sockets[0].getsockname()[1], connections
+
+
+@pytest.mark.no_db
+class TestDNSCache:
+    """Unit tests for DNSCache."""
+
+    async def test_caches_lookup(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", _fake_getaddrinfo(calls))
+        cache = DNSCache()
+        assert await cache.resolve("hotel.com", 443) == "10.0.0.7"
+        assert await cache.resolve("hotel.com", 443) == "10.0.0.7"
+        assert calls == ["hotel.com"]
+        assert cache.hits == 1 and cache.misses == 1
+
+    async def test_concurrent_lookups_share_one_call(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", _fake_getaddrinfo(calls))
+        cache = DNSCache()
+        ips = await asyncio.gather(*(cache.resolve("hotel.com", 443) for _ in range(10)))
+        assert set(ips) == {"10.0.0.7"}
+        assert calls == ["hotel.com"]
+
+    async def test_failure_is_negatively_cached(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            asyncio.get_running_loop(), "getaddrinfo", _fake_getaddrinfo(calls, fail_hosts=("dead.com",))
+        )
+        cache = DNSCache()
+        for _ in range(3):
+            with pytest.raises(httpcore.ConnectError):
+                await cache.resolve("dead.com", 443)
+        assert calls == ["dead.com"]
+
+    async def test_ttl_expiry(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", _fake_getaddrinfo(calls))
+        cache = DNSCache(ttl=0)
+        await cache.resolve("hotel.com", 443)
+        await cache.resolve("hotel.com", 443)
+        assert calls == ["hotel.com", "hotel.com"]
+
+    async def test_keeps_every_address(self, monkeypatch):
+        calls = []
+        ips = ["10.0.0.7", "10.0.0.8", "10.0.0.7"]
+        monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", _fake_getaddrinfo(calls, ip=ips))
+        cache = DNSCache()
+        assert await cache.resolve_all("hotel.com", 443) == ("10.0.0.7", "10.0.0.8")
+        assert await cache.resolve("hotel.com", 443) == "10.0.0.7"
+        cache.demote("hotel.com", 443, "10.0.0.7")
+        assert await cache.resolve_all("hotel.com", 443) == ("10.0.0.8", "10.0.0.7")
+        assert calls == ["hotel.com"]
+
+    async def test_ip_literal_skips_lookup(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", _fake_getaddrinfo(calls))
+        cache = DNSCache()
+        assert await cache.resolve("127.0.0.1", 80) == "127.0.0.1"
+        assert calls == []
+
+
+@pytest.mark.no_db
+class TestPooledClient:
+    """Unit tests for create_pooled_client against a local server."""
+
+    async def test_requests_reuse_connection(self):
+        server, port, connections = await _start_ok_server()
+        cache = DNSCache()
+        try:
+            async with create_pooled_client(max_connections=1, dns_cache=cache) as client:
+                for _ in range(5):
+                    resp = await client.get(f"http://localhost:{port}/")
+                    assert resp.text == "ok"
+        finally:
+            server.close()
+        assert len(connections) == 1
+        assert cache.misses == 1
+
+    async def test_falls_back_to_next_address(self, monkeypatch):
+        # First address refuses (nothing listens on 127.0.0.2), second serves
+        server, port, connections = await _start_ok_server("127.0.0.1")
+        calls = []
+        monkeypatch.setattr(
+            asyncio.get_running_loop(), "getaddrinfo", _fake_getaddrinfo(calls, ip=["127.0.0.2", "127.0.0.1"])
+        )
+        cache = DNSCache()
+        try:
+            async with create_pooled_client(dns_cache=cache) as client:
+                resp = await client.get(f"http://hotel.test:{port}/")
+                assert resp.text == "ok"
+        finally:
+            server.close()
+        assert len(connections) == 1
+        assert await cache.resolve_all("hotel.test", port) == ("127.0.0.1", "127.0.0.2")
+
+    async def test_every_address_refused_is_connect_error(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            asyncio.get_running_loop(), "getaddrinfo", _fake_getaddrinfo(calls, ip=["127.0.0.2", "127.0.0.3"])
+        )
+        async with create_pooled_client(dns_cache=DNSCache()) as client:
+            with pytest.raises(httpx.ConnectError):
+                await client.get("http://hotel.test:9/")
+
+    async def test_does_not_depend_on_httpx_transport_internals(self, monkeypatch):
+        # The DNS hook goes through httpcore's public network_backend argument;
+        # httpx.AsyncHTTPTransport (and its private _pool) is never touched
+        def unavailable(*args, **kwargs):
+            raise AssertionError("httpx.AsyncHTTPTransport used")
+
+        monkeypatch.setattr(httpx, "AsyncHTTPTransport", unavailable)
+        server, port, _ = await _start_ok_server()
+        cache = DNSCache()
+        try:
+            async with create_pooled_client(dns_cache=cache) as client:
+                assert (await client.get(f"http://localhost:{port}/")).text == "ok"
+        finally:
+            server.close()
+        assert cache.misses == 1
+
+
+@pytest.mark.no_db
+class TestCachingNetworkBackend:
+    """Unit tests for address fallback in the network backend."""
+
+    async def test_tries_addresses_in_turn(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            asyncio.get_running_loop(), "getaddrinfo", _fake_getaddrinfo(calls, ip=["10.0.0.1", "10.0.0.2"])
+        )
+        cache = DNSCache()
+        inner = _RefusingBackend(refused={"10.0.0.1"})
+        backend = _CachingNetworkBackend(inner, cache)
+
+        assert await backend.connect_tcp("hotel.com", 443) == "10.0.0.2"
+        assert await backend.connect_tcp("hotel.com", 443) == "10.0.0.2"
+        # The dead address moved to the back, so it isn't retried first
+        assert inner.attempts == ["10.0.0.1", "10.0.0.2", "10.0.0.2"]
+
+    async def test_raises_last_error_when_all_fail(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            asyncio.get_running_loop(), "getaddrinfo", _fake_getaddrinfo(calls, ip=["10.0.0.1", "10.0.0.2"])
+        )
+        inner = _RefusingBackend(refused={"10.0.0.1", "10.0.0.2"})
+        backend = _CachingNetworkBackend(inner, DNSCache())
+
+        with pytest.raises(httpcore.ConnectError, match="10.0.0.2"):
+            await backend.connect_tcp("hotel.com", 443)
+        assert inner.attempts == ["10.0.0.1", "10.0.0.2"]
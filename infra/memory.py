@@ -0,0 +1,120 @@
+"""Process and system memory readings (Linux /proc and cgroups).
+
+The detection consumer runs Chromium as descendants of the Python process,
+so "our" memory is the RSS of the whole process tree. Available memory is
+the smaller of the host's MemAvailable and the container's cgroup headroom,
+whichever limit the instance would OOM on first.
+
+On platforms without /proc every reading is 0, which callers treat as
+"no pressure".
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_MB = 1024 * 1024
+
+
+@dataclass
+class MemorySnapshot:
+    """One reading, in MB."""
+    python_mb: float = 0.0      # This process
+    children_mb: float = 0.0    # All descendants (Playwright driver, Chromium)
+    available_mb: float = 0.0   # Memory the instance can still hand out
+    total_mb: float = 0.0       # Host or cgroup limit, whichever is smaller
+
+    @property
+    def tree_mb(self) -> float:
+        return self.python_mb + self.children_mb
+
+    @property
+    def available_pct(self) -> float:
+        return self.available_mb / self.total_mb * 100 if self.total_mb else 100.0
+
+
+def _process_table() -> Dict[int, tuple]:
+    """pid -> (ppid, rss_bytes) for every process in /proc."""
+    table = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            table[int(entry)] = (int(fields[1]), int(fields[21]) * _PAGE_SIZE)
+        except (OSError, IndexError, ValueError):
+            continue
+    return table
+
+
+def descendants(pid: int, table: Optional[Dict[int, tuple]] = None) -> Set[int]:
+    """All descendant pids of pid."""
+    table = table if table is not None else _process_table()
+    found: Set[int] = set()
+    frontier = {pid}
+    while frontier:
+        frontier = {p for p, (ppid, _) in table.items() if ppid in frontier} - found
+        found |= frontier
+    return found
+
+
+def parse_meminfo(text: str) -> Dict[str, int]:
+    """Parse /proc/meminfo into {field: bytes}."""
+    values = {}
+    for line in text.splitlines():
+        name, _, rest = line.partition(":")
+        parts = rest.split()
+        if parts and parts[0].isdigit():
+            values[name] = int(parts[0]) * (1024 if len(parts) > 1 and parts[1] == "kB" else 1)
+    return values
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _cgroup_limit() -> Optional[tuple]:
+    """(limit_bytes, usage_bytes) for a memory-limited cgroup (v2 or v1), else None."""
+    for limit_path, usage_path in (
+        ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+        ("/sys/fs/cgroup/memory/memory.limit_in_bytes", "/sys/fs/cgroup/memory/memory.usage_in_bytes"),
+    ):
+        limit, usage = _read(limit_path), _read(usage_path)
+        if limit.isdigit() and usage.isdigit():
+            # v1 reports "no limit" as a huge number
+            if int(limit) < 1 << 60:
+                return (int(limit), int(usage))
+    return None
+
+
+def read_memory() -> MemorySnapshot:
+    """Read this process tree's RSS and the memory still available to it."""
+    if not os.path.isdir("/proc"):
+        return MemorySnapshot()
+
+    table = _process_table()
+    pid = os.getpid()
+    python = table.get(pid, (0, 0))[1]
+    children = sum(table[p][1] for p in descendants(pid, table))
+
+    meminfo = parse_meminfo(_read("/proc/meminfo"))
+    total = meminfo.get("MemTotal", 0)
+    available = meminfo.get("MemAvailable", meminfo.get("MemFree", 0))
+    cgroup = _cgroup_limit()
+    if cgroup is not None and cgroup[0] < total:
+        total = cgroup[0]
+        available = min(available, max(0, cgroup[0] - cgroup[1]))
+
+    return MemorySnapshot(
+        python_mb=python / _MB,
+        children_mb=children / _MB,
+        available_mb=available / _MB,
+        total_mb=total / _MB,
+    )
@@ -0,0 +1,38 @@
+"""Unit tests for process/system memory readings."""
+
+import os
+import sys
+
+import pytest
+
+from infra.memory import MemorySnapshot, descendants, parse_meminfo, read_memory
+
+
+@pytest.mark.no_db
+class TestMemory:
+    """Unit tests for infra.memory."""
+
+    def test_parse_meminfo(self):
+        info = parse_meminfo("MemTotal:       16314648 kB\nMemAvailable:    8157324 kB\nHugePages_Total:       0\n")
+        assert info["MemTotal"] == 16314648 * 1024
+        assert info["MemAvailable"] == 8157324 * 1024
+        assert info["HugePages_Total"] == 0
+
+    def test_descendants(self):
+        # pid -> (ppid, rss)
+        table = {1: (0, 0), 10: (1, 0), 11: (10, 0), 12: (11, 0), 20: (1, 0)}
+        assert descendants(10, table) == {11, 12}
+        assert descendants(12, table) == set()
+
+    def test_snapshot_percentages(self):
+        snap = MemorySnapshot(python_mb=300, children_mb=700, available_mb=2000, total_mb=8000)
+        assert snap.tree_mb == 1000
+        assert snap.available_pct == 25
+        assert MemorySnapshot().available_pct == 100
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+    def test_read_memory(self):
+        snap = read_memory()
+        assert snap.python_mb > 0
+        assert 0 < snap.available_mb <= snap.total_mb
+        assert os.getpid() not in descendants(os.getpid())
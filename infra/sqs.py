@@ -1,19 +1,73 @@
-"""SQS client for message queue operations."""
+"""SQS client for message queue operations.
 
+All calls share one cached boto3 client (clients are thread-safe; building
+one per call re-reads credentials and opens a new connection pool). The
+async variants (`*_async`) run the same calls on a small dedicated thread
+pool so a 20s long poll never blocks the event loop - and never occupies
+the default executor that DNS lookups and shard queues use.
+
+SQS_ENDPOINT_URL points the client at an SQS-compatible stand-in such as
+ElasticMQ (see docker-compose.yml) for local runs and integration tests.
+"""
+
+import asyncio
 import json
 import os
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 import boto3
+from botocore.config import Config
 from loguru import logger
 
 
+# Threads for the async variants: one long poll plus deletes/heartbeats
+# from concurrently finishing messages
+SQS_MAX_WORKERS = int(os.getenv("SQS_MAX_WORKERS", "8"))
+
+_client = None
+_client_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
 def get_sqs_client():
-    """Get SQS client using environment credentials."""
-    return boto3.client(
-        "sqs",
-        region_name=os.getenv("AWS_REGION", "us-east-1"),
-    )
+    """Get the shared SQS client (created on first use from environment credentials)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = boto3.client(
+                    "sqs",
+                    region_name=os.getenv("AWS_REGION", "us-east-1"),
+                    endpoint_url=os.getenv("SQS_ENDPOINT_URL") or None,
+                    config=Config(max_pool_connections=SQS_MAX_WORKERS),
+                )
+    return _client
+
+
+def reset_sqs_client() -> None:
+    """Drop the cached client (e.g. after changing credentials or endpoint)."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _client_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=SQS_MAX_WORKERS, thread_name_prefix="sqs")
+    return _executor
+
+
+async def _run(func, *args, **kwargs):
+    """Run a blocking SQS call on the SQS thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(func, *args, **kwargs))
 
 
 def get_queue_url() -> str:
@@ -90,7 +144,8 @@ def receive_messages(
         visibility_timeout: How long message is hidden after receive
 
     Returns:
-        List of messages with 'body' (parsed JSON) and 'receipt_handle'.
+        List of messages with 'body' (parsed JSON), 'receipt_handle',
+        'message_id' and 'receive_count' (deliveries so far, including this one).
     """
     client = get_sqs_client()
 
@@ -99,6 +154,7 @@ def receive_messages(
         MaxNumberOfMessages=min(max_messages, 10),
         WaitTimeSeconds=wait_time_seconds,
         VisibilityTimeout=visibility_timeout,
+        MessageSystemAttributeNames=["ApproximateReceiveCount"],
     )
 
     messages = []
@@ -107,6 +163,7 @@ def receive_messages(
             "body": json.loads(msg["Body"]),
             "receipt_handle": msg["ReceiptHandle"],
             "message_id": msg["MessageId"],
+            "receive_count": int(msg.get("Attributes", {}).get("ApproximateReceiveCount", 1)),
         })
 
     return messages
@@ -121,6 +178,16 @@ def delete_message(queue_url: str, receipt_handle: str) -> None:
     )
 
 
+def change_message_visibility(queue_url: str, receipt_handle: str, visibility_timeout: int) -> None:
+    """Hide a received message for visibility_timeout more seconds (0 = release now)."""
+    client = get_sqs_client()
+    client.change_message_visibility(
+        QueueUrl=queue_url,
+        ReceiptHandle=receipt_handle,
+        VisibilityTimeout=visibility_timeout,
+    )
+
+
 def get_queue_attributes(queue_url: str) -> Dict[str, str]:
     """Get queue attributes like message count."""
     client = get_sqs_client()
@@ -129,3 +196,126 @@ def get_queue_attributes(queue_url: str) -> Dict[str, str]:
         AttributeNames=["ApproximateNumberOfMessages", "ApproximateNumberOfMessagesNotVisible"],
     )
     return response.get("Attributes", {})
+
+
+# -----------------------------------------------------------------------------
+# Async variants (same semantics, off the event loop)
+# -----------------------------------------------------------------------------
+
+async def send_message_async(queue_url: str, body: Dict[str, Any]) -> str:
+    """Async send_message."""
+    return await _run(send_message, queue_url, body)
+
+
+async def send_messages_batch_async(queue_url: str, messages: List[Dict[str, Any]]) -> int:
+    """Async send_messages_batch."""
+    return await _run(send_messages_batch, queue_url, messages)
+
+
+async def receive_messages_async(
+    queue_url: str,
+    max_messages: int = 1,
+    wait_time_seconds: int = 20,
+    visibility_timeout: int = 7200,
+) -> List[Dict[str, Any]]:
+    """Async receive_messages; the long poll waits on an SQS thread, not the loop."""
+    return await _run(
+        receive_messages,
+        queue_url,
+        max_messages=max_messages,
+        wait_time_seconds=wait_time_seconds,
+        visibility_timeout=visibility_timeout,
+    )
+
+
+async def delete_message_async(queue_url: str, receipt_handle: str) -> None:
+    """Async delete_message."""
+    await _run(delete_message, queue_url, receipt_handle)
+
+
+async def change_message_visibility_async(queue_url: str, receipt_handle: str, visibility_timeout: int) -> None:
+    """Async change_message_visibility."""
+    await _run(change_message_visibility, queue_url, receipt_handle, visibility_timeout)
+
+
+async def get_queue_attributes_async(queue_url: str) -> Dict[str, str]:
+    """Async get_queue_attributes."""
+    return await _run(get_queue_attributes, queue_url)
+
+
+class VisibilityHeartbeat:
+    """Keep a received message hidden only while it is being worked on.
+
+    Messages are received with a short visibility timeout; while the block
+    runs, this re-extends it every `interval` seconds (default: a third of
+    the timeout). If the worker dies the heartbeat stops with it and the
+    message reappears within one timeout instead of after a long fixed
+    lease. Extensions stop after max_lease seconds so a hung batch is
+    eventually retried elsewhere.
+
+    Usage:
+        async with VisibilityHeartbeat(queue_url, msg["receipt_handle"], 300):
+            await process(msg)
+
+    Other queues with leases pass extend(receipt_handle, visibility_timeout)
+    in place of the SQS call.
+    """
+
+    def __init__(
+        self,
+        queue_url: str,
+        receipt_handle: str,
+        visibility_timeout: int = 300,
+        interval: Optional[float] = None,
+        max_lease: Optional[float] = 7200,
+        extend: Optional[Callable[[str, int], Awaitable[Any]]] = None,
+    ):
+        self.queue_url = queue_url
+        self.extend = extend or partial(change_message_visibility_async, queue_url)
+        self.receipt_handle = receipt_handle
+        self.visibility_timeout = visibility_timeout
+        self.interval = interval if interval is not None else max(1.0, visibility_timeout / 3)
+        self.max_lease = max_lease
+        self.extensions = 0
+        self.failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> "VisibilityHeartbeat":
+        """Start extending (for leases that outlive one block, e.g. prefetched messages)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._beat())
+        return self
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def __aenter__(self) -> "VisibilityHeartbeat":
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
+
+    async def _beat(self) -> None:
+        started = time.monotonic()
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.max_lease is not None and time.monotonic() - started + self.visibility_timeout > self.max_lease:
+                logger.warning(
+                    f"Message held for {time.monotonic() - started:.0f}s, not extending past "
+                    f"max lease {self.max_lease:.0f}s"
+                )
+                return
+            try:
+                await self.extend(self.receipt_handle, self.visibility_timeout)
+                self.extensions += 1
+            except Exception as e:
+                # Missed beats are retried next interval; the timeout is 3x the interval
+                self.failures += 1
+                logger.warning(f"Visibility heartbeat failed ({self.failures}): {e}")
@@ -0,0 +1,132 @@
+"""Unit tests for the SQS wrappers (no AWS calls)."""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+
+import pytest
+
+from infra import sqs
+from infra.sqs import VisibilityHeartbeat
+
+
+class FakeSQSClient:
+    """Blocking stand-in for a boto3 SQS client."""
+
+    def __init__(self, poll_s: float = 0.0):
+        self.poll_s = poll_s
+        self.calls = []
+
+    def receive_message(self, **kwargs):
+        self.calls.append(("receive_message", kwargs))
+        time.sleep(self.poll_s)  # Long poll
+        return {"Messages": [{"Body": json.dumps({"hotel_ids": [1, 2]}), "ReceiptHandle": "rh-1", "MessageId": "m-1",
+                              "Attributes": {"ApproximateReceiveCount": "2"}}]}
+
+    def delete_message(self, **kwargs):
+        self.calls.append(("delete_message", kwargs))
+
+    def change_message_visibility(self, **kwargs):
+        self.calls.append(("change_message_visibility", kwargs))
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = FakeSQSClient(poll_s=0.3)
+    monkeypatch.setattr(sqs, "_client", client)
+    return client
+
+
+@pytest.mark.no_db
+class TestSQS:
+    """Unit tests for infra.sqs."""
+
+    def test_client_is_cached(self, monkeypatch):
+        monkeypatch.setattr(sqs, "_client", None)
+        created = []
+        monkeypatch.setattr(sqs.boto3, "client", lambda *a, **kw: created.append(kw) or object())
+        assert sqs.get_sqs_client() is sqs.get_sqs_client()
+        assert len(created) == 1
+        sqs.reset_sqs_client()
+        sqs.get_sqs_client()
+        assert len(created) == 2
+        sqs.reset_sqs_client()
+
+    @pytest.mark.asyncio
+    async def test_long_poll_does_not_block_loop(self, fake_client):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        messages = await sqs.receive_messages_async("q", max_messages=20, wait_time_seconds=20, visibility_timeout=60)
+        task.cancel()
+
+        assert ticks >= 10  # The loop kept running during the 0.3s poll
+        assert messages == [
+            {"body": {"hotel_ids": [1, 2]}, "receipt_handle": "rh-1", "message_id": "m-1", "receive_count": 2},
+        ]
+        name, kwargs = fake_client.calls[0]
+        assert kwargs == {
+            "QueueUrl": "q", "MaxNumberOfMessages": 10, "WaitTimeSeconds": 20, "VisibilityTimeout": 60,
+            "MessageSystemAttributeNames": ["ApproximateReceiveCount"],
+        }
+
+    @pytest.mark.asyncio
+    async def test_delete_async(self, fake_client):
+        await sqs.delete_message_async("q", "rh-1")
+        assert fake_client.calls == [("delete_message", {"QueueUrl": "q", "ReceiptHandle": "rh-1"})]
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_extends_while_running(self, fake_client):
+        async with VisibilityHeartbeat("q", "rh-1", visibility_timeout=30, interval=0.05) as heartbeat:
+            await asyncio.sleep(0.18)
+        extended = len(fake_client.calls)
+        await asyncio.sleep(0.1)
+
+        assert extended == heartbeat.extensions >= 2
+        assert len(fake_client.calls) == extended  # Stopped on exit
+        assert fake_client.calls[0] == (
+            "change_message_visibility", {"QueueUrl": "q", "ReceiptHandle": "rh-1", "VisibilityTimeout": 30},
+        )
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_respects_max_lease(self, fake_client):
+        async with VisibilityHeartbeat("q", "rh-1", visibility_timeout=1, interval=0.05, max_lease=1.1):
+            await asyncio.sleep(0.3)
+        assert 0 < len(fake_client.calls) <= 2
+
+
+@pytest.mark.no_db
+@pytest.mark.integration
+@pytest.mark.skipif(not os.getenv("SQS_ENDPOINT_URL"), reason="needs SQS_ENDPOINT_URL (e.g. local ElasticMQ)")
+class TestSQSLocal:
+    """Visibility semantics against an SQS-compatible endpoint."""
+
+    @pytest.fixture
+    def queue_url(self):
+        sqs.reset_sqs_client()
+        client = sqs.get_sqs_client()
+        url = client.create_queue(QueueName=f"test-{uuid.uuid4().hex[:12]}")["QueueUrl"]
+        yield url
+        client.delete_queue(QueueUrl=url)
+        sqs.reset_sqs_client()
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_hides_then_releases(self, queue_url):
+        await sqs.send_message_async(queue_url, {"hotel_ids": [1]})
+        [msg] = await sqs.receive_messages_async(queue_url, wait_time_seconds=1, visibility_timeout=2)
+
+        async with VisibilityHeartbeat(queue_url, msg["receipt_handle"], visibility_timeout=2, interval=0.5):
+            await asyncio.sleep(3)  # Longer than the initial visibility
+            assert await sqs.receive_messages_async(queue_url, wait_time_seconds=0, visibility_timeout=2) == []
+
+        # Heartbeat stopped (worker gone): the message comes back within one timeout
+        again = await sqs.receive_messages_async(queue_url, wait_time_seconds=5, visibility_timeout=2)
+        assert [m["body"] for m in again] == [{"hotel_ids": [1]}]
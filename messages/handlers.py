@@ -169,7 +169,7 @@ async def consume(
             break
 
         # Poll for messages
-        messages = sqs.receive_messages(
+        messages = await sqs.receive_messages_async(
             queue_url=queue_url,
             max_messages=10,
             wait_time_seconds=wait_time_seconds,
@@ -178,7 +178,7 @@ async def consume(
 
         if not messages:
             # Check if queue is empty
-            attrs = sqs.get_queue_attributes(queue_url)
+            attrs = await sqs.get_queue_attributes_async(queue_url)
             pending = int(attrs.get("ApproximateNumberOfMessages", 0))
             in_flight = int(attrs.get("ApproximateNumberOfMessagesNotVisible", 0))
 
@@ -192,7 +192,7 @@ async def consume(
         for msg in messages:
             try:
                 await dispatch(msg["body"])
-                sqs.delete_message(queue_url, msg["receipt_handle"])
+                await sqs.delete_message_async(queue_url, msg["receipt_handle"])
                 processed += 1
                 logger.info(f"Processed message {msg['message_id']}")
 
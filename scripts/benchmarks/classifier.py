@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark non-hotel / junk-domain filtering: keyword loops vs compiled classifier.
+
+Runs every stage's rules (detector, scraper, cleanup) over a hotels table
+export with both the original `for kw in LIST: if kw in s` loops and the
+shared compiled classifiers, checks that both flag the same rows with the
+same keyword, and prints the rules that fire most often.
+
+Export the table with:
+    psql "$DATABASE_URL" -c "\\copy (SELECT name, website FROM sadie_gtm.hotels) TO 'hotels.csv' CSV HEADER"
+
+Usage:
+    uv run python scripts/benchmarks/classifier.py --csv hotels.csv
+    uv run python scripts/benchmarks/classifier.py --from-db --repeat 5
+"""
+
+import csv
+import sys
+import time
+import asyncio
+import argparse
+from collections import Counter
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.leadgen.classifier import (
+    CLEANUP_NAME_CLASSIFIER,
+    NON_HOTEL_KEYWORDS,
+    SCRAPER_DOMAIN_CLASSIFIER,
+    SCRAPER_NAME_CLASSIFIER,
+    SKIP_CHAINS,
+    SKIP_DOMAINS,
+    SKIP_JUNK_DOMAINS,
+    SKIP_NON_HOTEL_DOMAINS,
+    SKIP_NON_HOTEL_NAMES,
+    SKIP_NON_HOTELS,
+    classify_hotel,
+)
+
+Row = Tuple[str, str]  # (name, website)
+
+
+def load_csv(path: str) -> List[Row]:
+    with open(path, newline="") as f:
+        return [(r.get("name") or "", r.get("website") or "") for r in csv.DictReader(f)]
+
+
+async def load_db() -> List[Row]:
+    from db.client import init_db, close_db
+
+    pool = await init_db()
+    try:
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("SELECT name, website FROM sadie_gtm.hotels")
+    finally:
+        await close_db()
+    return [(r["name"] or "", r["website"] or "") for r in rows]
+
+
+def _first(keywords: List[str], text: str) -> Optional[str]:
+    for kw in keywords:
+        if kw in text:
+            return kw
+    return None
+
+
+def legacy_detector(name: str, website: str) -> Optional[str]:
+    """Original detector filter: name, non-hotel domain, junk domain."""
+    name_lower, website_lower = name.lower(), website.lower()
+    return (
+        _first(SKIP_NON_HOTEL_NAMES, name_lower)
+        or _first(SKIP_NON_HOTEL_DOMAINS, website_lower)
+        or ("" if not website else _first(SKIP_JUNK_DOMAINS, website_lower))
+    )
+
+
+def legacy_scraper(name: str, website: str) -> Optional[str]:
+    """Original GridScraper._process_place loops."""
+    name_lower = name.lower()
+    return (
+        _first(SKIP_CHAINS, name_lower)
+        or _first(SKIP_NON_HOTELS, name_lower)
+        or _first(SKIP_DOMAINS, website.lower())
+    )
+
+
+def legacy_cleanup(name: str, website: str) -> Optional[str]:
+    """Original clean_non_hotels LIKE conditions."""
+    return _first(NON_HOTEL_KEYWORDS, name.lower())
+
+
+def _keyword(match) -> Optional[str]:
+    return match.keyword if match else None
+
+
+def compiled_detector(name: str, website: str) -> Optional[str]:
+    return _keyword(classify_hotel(name, website))
+
+
+def compiled_scraper(name: str, website: str) -> Optional[str]:
+    return _keyword(SCRAPER_NAME_CLASSIFIER.classify(name) or SCRAPER_DOMAIN_CLASSIFIER.classify(website))
+
+
+def compiled_cleanup(name: str, website: str) -> Optional[str]:
+    return _keyword(CLEANUP_NAME_CLASSIFIER.classify(name))
+
+
+STAGES = [
+    ("detector", legacy_detector, compiled_detector),
+    ("scraper", legacy_scraper, compiled_scraper),
+    ("cleanup", legacy_cleanup, compiled_cleanup),
+]
+
+
+def run(fn: Callable[[str, str], Optional[str]], rows: List[Row], repeat: int) -> Tuple[float, List[Optional[str]]]:
+    """Best-of-repeat wall time in ms, plus the per-row results."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = [fn(name, website) for name, website in rows]
+        best = min(best, (time.perf_counter() - t0) * 1000)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the non-hotel / junk-domain classifier")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="Hotels export with name and website columns")
+    source.add_argument("--from-db", action="store_true", help="Read sadie_gtm.hotels directly")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant, best is reported (default: 3)")
+    parser.add_argument("--limit", type=int, default=0, help="Only use the first N rows")
+    parser.add_argument("--top", type=int, default=10, help="Most frequent rules to show per stage")
+    args = parser.parse_args()
+
+    rows = load_csv(args.csv) if args.csv else asyncio.run(load_db())
+    if args.limit:
+        rows = rows[:args.limit]
+    if not rows:
+        print("No rows")
+        return
+    per_1k = 1000 / len(rows)
+
+    print(f"Rows: {len(rows)}, repeat: {args.repeat}")
+    print(f"{'stage':<10} {'loops ms/1k':>12} {'compiled ms/1k':>15} {'speedup':>8} {'flagged':>8} {'mismatch':>9}")
+    tops = {}
+    for stage, legacy, compiled in STAGES:
+        legacy_ms, expected = run(legacy, rows, args.repeat)
+        compiled_ms, actual = run(compiled, rows, args.repeat)
+        mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+        flagged = sum(1 for a in actual if a is not None)
+        print(
+            f"{stage:<10} {legacy_ms * per_1k:12.2f} {compiled_ms * per_1k:15.2f} "
+            f"{legacy_ms / max(compiled_ms, 1e-9):7.1f}x {flagged:8d} {mismatches:9d}"
+        )
+        tops[stage] = Counter(a for a in actual if a is not None).most_common(args.top)
+
+    for stage, top in tops.items():
+        print(f"\nTop {stage} rules:")
+        for keyword, count in top:
+            print(f"  {keyword or '(empty website)':<30} {count:8d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark contact/room-count/location extraction over saved hotel pages.
+
+Compares the previous per-field extraction (regexes re-run over the whole
+document, quadratic email dedup, location over text+HTML concatenation)
+with ContactExtractor.extract_all, and checks both return the same values.
+
+The corpus is a directory of saved homepages (*.html). Build one with --fetch.
+
+Usage:
+    uv run python scripts/benchmarks/contact_extraction.py --fetch urls.txt --corpus pages/
+    uv run python scripts/benchmarks/contact_extraction.py --corpus pages/ --repeat 20
+"""
+
+import re
+import sys
+import time
+import asyncio
+import argparse
+import hashlib
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from infra.http_client import create_pooled_client
+from services.leadgen.detector import HTTP_HEADERS, ContactExtractor, html_to_text, normalize_url
+from services.leadgen.location import LocationExtractor
+
+
+def legacy_extract(text: str, html: str) -> Tuple[List[str], List[str], str, str]:
+    """The extraction as it was before extract_all, kept for comparison."""
+    phones = []
+    for pattern in ContactExtractor.PHONE_PATTERNS:
+        phones.extend(re.findall(pattern, text))
+    seen = set()
+    cleaned = []
+    for p in phones:
+        p = re.sub(r'[^\d+]', '', p)
+        if len(p) >= 10 and p not in seen:
+            seen.add(p)
+            cleaned.append(p)
+
+    filtered = []
+    for email in re.findall(ContactExtractor.EMAIL_PATTERN, text):
+        email_lower = email.lower()
+        if not any(skip in email_lower for skip in ContactExtractor.SKIP_EMAIL_PATTERNS):
+            if email_lower not in [e.lower() for e in filtered]:
+                filtered.append(email)
+
+    room_count = ""
+    text_lower = text.lower()
+    for pattern in ContactExtractor.ROOM_COUNT_PATTERNS:
+        for match in re.findall(pattern, text_lower, re.IGNORECASE):
+            if 1 <= int(match) <= 2000:
+                room_count = str(int(match))
+                break
+        if room_count:
+            break
+
+    combined = text_lower + " " + html.lower()
+    city_counts = {c: combined.count(c) for c in LocationExtractor.KNOWN_CITIES if c in combined}
+    if city_counts:
+        location = max(city_counts, key=city_counts.get).title()
+    else:
+        location = next((c.title() for c in LocationExtractor.KNOWN_COUNTRIES if c in combined), "")
+
+    return cleaned[:3], filtered[:3], room_count, location
+
+
+async def fetch_corpus(urls_file: str, corpus: Path) -> None:
+    urls = [normalize_url(u.strip()) for u in Path(urls_file).read_text().splitlines() if u.strip()]
+    corpus.mkdir(parents=True, exist_ok=True)
+    semaphore = asyncio.Semaphore(20)
+
+    async with create_pooled_client(timeout=15.0, headers=HTTP_HEADERS) as client:
+        async def fetch(url: str) -> bool:
+            async with semaphore:
+                try:
+                    resp = await client.get(url)
+                except Exception as e:
+                    print(f"  {url}: {type(e).__name__}")
+                    return False
+            if resp.status_code >= 400 or "html" not in resp.headers.get("content-type", "html"):
+                return False
+            name = hashlib.sha1(url.encode()).hexdigest()[:16] + ".html"
+            (corpus / name).write_text(resp.text)
+            return True
+
+        saved = sum(await asyncio.gather(*(fetch(u) for u in urls)))
+    print(f"Saved {saved}/{len(urls)} pages to {corpus}")
+
+
+def bench(corpus: Path, repeat: int) -> None:
+    pages = [p.read_text(errors="replace") for p in sorted(corpus.glob("*.html"))]
+    if not pages:
+        sys.exit(f"No *.html pages in {corpus}")
+    docs = [(html_to_text(html), html) for html in pages]
+    total_mb = sum(len(t) + len(h) for t, h in docs) / 1e6
+    print(f"{len(docs)} pages, {total_mb:.1f} MB of text+HTML")
+
+    mismatches = 0
+    for text, html in docs:
+        info = ContactExtractor.extract_all(text, html)
+        if legacy_extract(text, html) != (info.phones, info.emails, info.room_count, info.location):
+            mismatches += 1
+
+    timings = {}
+    for label, run in (
+        ("legacy", lambda t, h: legacy_extract(t, h)),
+        ("extract_all", lambda t, h: ContactExtractor.extract_all(t, h)),
+    ):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            for text, html in docs:
+                run(text, html)
+        timings[label] = (time.perf_counter() - t0) / (repeat * len(docs)) * 1000
+        print(f"{label:12s} {timings[label]:7.2f} ms/page")
+
+    print(f"Speedup: {timings['legacy'] / timings['extract_all']:.1f}x, "
+          f"result mismatches: {mismatches}/{len(docs)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark contact extraction")
+    parser.add_argument("--corpus", required=True, help="Directory of saved *.html pages")
+    parser.add_argument("--fetch", help="Fetch URLs from this file into the corpus first")
+    parser.add_argument("--repeat", type=int, default=10, help="Passes over the corpus (default: 10)")
+    args = parser.parse_args()
+
+    corpus = Path(args.corpus)
+    if args.fetch:
+        asyncio.run(fetch_corpus(args.fetch, corpus))
+    bench(corpus, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
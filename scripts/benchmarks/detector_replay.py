@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Record a sample of hotel sites once, then benchmark the detector offline.
+
+record: runs BatchDetector against the live sites of a hotel sample with
+        the static tier off (so every reachable homepage goes through the
+        browser and ends up in the archive), recording browser traffic per
+        context and httpx traffic (precheck, static fetches) into a
+        recording directory:
+
+            hotels.json    the sample
+            patterns.json  engine patterns used
+            live.json      live detection results (for comparison)
+            browser.har    merged Playwright HAR
+            http.har       httpx exchanges, incl. timeouts/connect errors
+
+bench:  replays the recording for one or more DetectionConfigs and reports
+        hotels/minute, p50/p95 per-hotel latency (sum of static and browser
+        stages, excluding slot waits), peak RSS of this process plus
+        Chromium, and how many results differ from the live run. Requests
+        not in the archive fail (httpx) or are aborted (browser), so
+        results are deterministic.
+
+Usage:
+    uv run python scripts/benchmarks/detector_replay.py record rec/ --from-db --limit 200
+    uv run python scripts/benchmarks/detector_replay.py record rec/ --csv hotels.csv
+    uv run python scripts/benchmarks/detector_replay.py bench rec/
+    uv run python scripts/benchmarks/detector_replay.py bench rec/ \\
+        --config default={} --config blocked='{"block_resources": true}' \\
+        --config nostatic='{"static_tier": false, "concurrency": 10}'
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import glob
+import shutil
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.benchmarks.engine_matcher import load_seed_patterns
+from scripts.benchmarks.resource_blocking import children_rss_mb
+from services.leadgen.browser_pool import BrowserPool
+from services.leadgen.detector import BatchDetector, DetectionConfig, DetectionResult, set_engine_patterns
+from services.leadgen.replay import HarArchive, merge_hars, recording_http, replaying_http, save_har
+
+# Stages that make up a hotel's service time (slot_wait is queueing, and the
+# browser sub-stages are inside browser_total)
+LATENCY_STAGES = ("static_fetch", "static_analyze", "context_acquire", "browser_total")
+
+
+def _pool(config: DetectionConfig, **kwargs) -> BrowserPool:
+    return BrowserPool(
+        size=config.concurrency,
+        headless=config.headless,
+        max_pages_per_context=config.context_max_pages,
+        block_resources=config.block_resources,
+        **kwargs,
+    )
+
+
+# =============================================================================
+# RECORD
+# =============================================================================
+
+async def load_sample(args) -> Tuple[List[Dict], Dict[str, List[str]]]:
+    """Hotels (id, name, website, city) and engine patterns from a CSV or the DB."""
+    if args.csv:
+        with open(args.csv, newline="") as f:
+            hotels = [
+                {"id": int(r.get("id") or i), "name": r.get("name") or "",
+                 "website": r.get("website") or "", "city": r.get("city") or ""}
+                for i, r in enumerate(csv.DictReader(f), 1)
+            ]
+        hotels = hotels[:args.limit] if args.limit else hotels
+        return hotels, load_seed_patterns()
+
+    from db.client import init_db, close_db
+    from services.leadgen.service import Service
+
+    await init_db()
+    try:
+        service = Service()
+        patterns = await service.get_engine_patterns()
+        hotels = [
+            {"id": h.id, "name": h.name, "website": h.website or "", "city": h.city or ""}
+            for h in await service.get_hotels_pending_detection(limit=args.limit or 100)
+        ]
+    finally:
+        await close_db()
+    return hotels, patterns
+
+
+async def record(args) -> None:
+    out = Path(args.dir)
+    har_dir = out / "har"
+    har_dir.mkdir(parents=True, exist_ok=True)
+
+    hotels, patterns = await load_sample(args)
+    if not hotels:
+        print("No hotels to record")
+        return
+    set_engine_patterns(patterns)
+    config = DetectionConfig(**{"static_tier": False, **json.loads(args.config)})
+
+    print(f"Recording {len(hotels)} hotels into {out}/ ...")
+    http_entries: List[Dict] = []
+    t0 = time.perf_counter()
+    with recording_http(http_entries):
+        async with _pool(config, record_har_dir=str(har_dir)) as pool:
+            results = await BatchDetector(config, pool).detect_batch(hotels)
+    elapsed = time.perf_counter() - t0
+
+    # Context HARs are written when the pool closes its contexts
+    har_files = sorted(glob.glob(str(har_dir / "*.har")))
+    n_browser = merge_hars(har_files, str(out / "browser.har"))
+    shutil.rmtree(har_dir)
+    save_har(http_entries, str(out / "http.har"))
+    (out / "hotels.json").write_text(json.dumps(hotels, indent=1))
+    (out / "patterns.json").write_text(json.dumps(patterns))
+    (out / "live.json").write_text(json.dumps([r.model_dump() for r in results], indent=1))
+
+    found = sum(1 for r in results if r.booking_engine)
+    print(f"Recorded in {elapsed:.0f}s: {n_browser} browser + {len(http_entries)} http entries, "
+          f"{found}/{len(results)} engines found live")
+
+
+# =============================================================================
+# BENCH
+# =============================================================================
+
+def _latency_ms(result: DetectionResult) -> int:
+    return sum(result.stage_timings.get(stage, 0) for stage in LATENCY_STAGES)
+
+
+def _percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+
+def _rss_mb() -> float:
+    """RSS of this process (MB)."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+async def _sample_rss(peak: List[float], interval: float = 0.25) -> None:
+    while True:
+        peak[0] = max(peak[0], _rss_mb() + children_rss_mb())
+        await asyncio.sleep(interval)
+
+
+async def bench_config(
+    name: str,
+    config: DetectionConfig,
+    hotels: List[Dict],
+    archive: HarArchive,
+    browser_har: str,
+) -> Tuple[Dict[str, float], List[DetectionResult]]:
+    peak = [0.0]
+    sampler = asyncio.create_task(_sample_rss(peak))
+    try:
+        t0 = time.perf_counter()
+        with replaying_http(archive) as transport:
+            async with _pool(config, replay_har=browser_har) as pool:
+                results = await BatchDetector(config, pool).detect_batch(hotels)
+        elapsed = time.perf_counter() - t0
+    finally:
+        sampler.cancel()
+
+    latencies = [_latency_ms(r) for r in results if _latency_ms(r)]
+    return {
+        "hotels_per_min": len(hotels) / elapsed * 60,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p95_ms": _percentile(latencies, 0.95),
+        "peak_rss_mb": peak[0],
+        "http_misses": transport.misses,
+        "elapsed_s": elapsed,
+    }, results
+
+
+def _outcome(r: Dict) -> Tuple[str, str]:
+    return (r.get("booking_engine", ""), r.get("error", "").split(":")[0])
+
+
+async def bench(args) -> None:
+    rec = Path(args.dir)
+    hotels = json.loads((rec / "hotels.json").read_text())
+    set_engine_patterns(json.loads((rec / "patterns.json").read_text()))
+    live = {r["hotel_id"]: _outcome(r) for r in json.loads((rec / "live.json").read_text())}
+    archive = HarArchive.load(str(rec / "http.har"), str(rec / "browser.har"))
+
+    configs = args.config or ["default={}"]
+    print(f"Replaying {len(hotels)} hotels ({len(archive)} archived requests), {len(configs)} config(s)\n")
+    print(f"{'config':<14} {'hotels/min':>10} {'p50 ms':>8} {'p95 ms':>8} {'peak RSS':>9} "
+          f"{'engines':>8} {'vs live':>8} {'misses':>7}")
+    for spec in configs:
+        name, _, overrides = spec.partition("=")
+        config = DetectionConfig(**json.loads(overrides or "{}"))
+        for _ in range(args.warmup):
+            await bench_config(name, config, hotels, archive, str(rec / "browser.har"))
+        stats, results = await bench_config(name, config, hotels, archive, str(rec / "browser.har"))
+        engines = sum(1 for r in results if r.booking_engine)
+        changed = sum(1 for r in results if live.get(r.hotel_id) != _outcome(r.model_dump()))
+        print(f"{name:<14} {stats['hotels_per_min']:10.1f} {stats['p50_ms']:8.0f} {stats['p95_ms']:8.0f} "
+              f"{stats['peak_rss_mb']:7.0f}MB {engines:8d} {changed:8d} {stats['http_misses']:7d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay detector benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Record live traffic for a hotel sample")
+    rec.add_argument("dir", help="Recording directory")
+    source = rec.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="Hotels CSV (id, name, website, city); uses seed engine patterns")
+    source.add_argument("--from-db", action="store_true", help="Sample hotels pending detection from the DB")
+    rec.add_argument("--limit", type=int, default=0, help="Max hotels (DB default: 100)")
+    rec.add_argument("--config", default="{}", help="DetectionConfig overrides as JSON")
+
+    run = sub.add_parser("bench", help="Benchmark DetectionConfigs against a recording")
+    run.add_argument("dir", help="Recording directory")
+    run.add_argument("--config", action="append", help="name=JSON DetectionConfig overrides (repeatable)")
+    run.add_argument("--warmup", type=int, default=0, help="Untimed runs per config first")
+
+    args = parser.parse_args()
+    asyncio.run(record(args) if args.command == "record" else bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark booking-engine pattern matching: nested loops vs compiled matcher.
+
+Simulates the per-page matching work done by the detector (network hosts,
+HTML-extracted domains, frame/booking URLs and the HTML keyword scan) using
+the real engine patterns from the seed migration.
+
+Usage:
+    uv run python scripts/benchmarks/engine_matcher.py
+    uv run python scripts/benchmarks/engine_matcher.py --hosts 500 --pages 200
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from services.leadgen.detector import HTML_KEYWORD_PATTERNS, _HTML_KEYWORD_MATCHER
+from services.leadgen.matcher import build_engine_matcher
+
+SEED_SQL = Path(__file__).parent.parent.parent / "db/migrations/20260114_132618_seed_booking_engines.sql"
+
+
+def load_seed_patterns() -> Dict[str, List[str]]:
+    """Parse engine name -> domains from the seed migration."""
+    patterns = {}
+    for m in re.finditer(r"\('([^']+)',\s*ARRAY\[([^\]]*)\]", SEED_SQL.read_text()):
+        patterns[m.group(1)] = re.findall(r"'([^']+)'", m.group(2))
+    return patterns
+
+
+def make_page(n_hosts: int, rng: random.Random) -> Dict[str, object]:
+    """Build a synthetic page: third-party hosts, URLs and HTML (no engine)."""
+    words = ["cdn", "static", "img", "api", "track", "pixel", "ads", "fonts", "media", "widget"]
+    tlds = ["com", "net", "io", "co", "org"]
+    hosts = [
+        f"{rng.choice(words)}{i}.{rng.choice(words)}-{rng.randint(0, 9999)}.{rng.choice(tlds)}"
+        for i in range(n_hosts)
+    ]
+    urls = [f"https://{h}/assets/{rng.randint(0, 99999)}.js?v={i}" for i, h in enumerate(hosts)]
+    html = "<html><body>" + "".join(
+        f'<script src="{u}"></script><p>Lorem ipsum dolor sit amet {i}</p>' for i, u in enumerate(urls)
+    ) + "</body></html>"
+    return {"hosts": hosts, "urls": urls, "html": html.lower()}
+
+
+def legacy_page(patterns: Dict[str, List[str]], page: Dict[str, object]) -> None:
+    """Original nested-loop matching for one page."""
+    def from_domain(domain):
+        for engine_name, pats in patterns.items():
+            for pat in pats:
+                if pat in domain:
+                    return (engine_name, pat)
+        return ("", "")
+
+    for host in page["hosts"]:           # from_network
+        from_domain(host)
+    for url in page["urls"]:             # from_url
+        from_domain(url.lower())
+    for domain in page["hosts"]:         # _scan_html_for_engines domain loop
+        for engine_name, pats in patterns.items():
+            for pat in pats:
+                if pat.lower() in domain:
+                    break
+    for keyword, _, _ in HTML_KEYWORD_PATTERNS:  # keyword scan
+        if re.search(rf'{re.escape(keyword)}[\./\-]', page["html"]):
+            break
+
+
+def compiled_page(matcher, page: Dict[str, object]) -> None:
+    """Compiled matching for one page (same work as legacy_page)."""
+    for host in page["hosts"]:
+        matcher.search(host)
+    for url in page["urls"]:
+        matcher.search(url)
+    matcher.search("\n".join(page["hosts"]))
+    _HTML_KEYWORD_MATCHER.search(page["html"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark engine pattern matching")
+    parser.add_argument("--hosts", type=int, default=300, help="Third-party hosts per page (default: 300)")
+    parser.add_argument("--pages", type=int, default=50, help="Pages to simulate (default: 50)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    patterns = load_seed_patterns()
+    n_patterns = sum(len(p) for p in patterns.values())
+    rng = random.Random(args.seed)
+    pages = [make_page(args.hosts, rng) for _ in range(args.pages)]
+
+    t0 = time.perf_counter()
+    matcher = build_engine_matcher(patterns)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    for page in pages:
+        legacy_page(patterns, page)
+    legacy_ms = (time.perf_counter() - t0) * 1000 / len(pages)
+
+    t0 = time.perf_counter()
+    for page in pages:
+        compiled_page(matcher, page)
+    compiled_ms = (time.perf_counter() - t0) * 1000 / len(pages)
+
+    print(f"Engines: {len(patterns)} ({n_patterns} patterns), hosts/page: {args.hosts}, pages: {args.pages}")
+    print(f"Matcher build:      {build_ms:8.2f} ms (once per set_engine_patterns)")
+    print(f"Nested loops:       {legacy_ms:8.2f} ms/page")
+    print(f"Compiled matcher:   {compiled_ms:8.2f} ms/page")
+    print(f"Speedup:            {legacy_ms / compiled_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark reachability precheck throughput against local stub servers.
+
+Starts keep-alive HTTP stub servers in a child process (HEAD answers 405
+on some paths to exercise the HEAD->GET fallback) and prechecks a few
+thousand URLs on "localhost" two ways:
+
+- per-URL client: the old http_precheck, one AsyncClient per URL
+- pooled:         batch_precheck, one pooled client with cached DNS
+
+Usage:
+    uv run python scripts/benchmarks/precheck_throughput.py
+    uv run python scripts/benchmarks/precheck_throughput.py --urls 5000 --hosts 20 --concurrency 30
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from infra.http_client import get_dns_cache
+from services.leadgen.detector import batch_precheck, http_precheck
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    while True:
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            break
+        method, path = request.split(b" ")[:2]
+        if method == b"HEAD" and path.endswith(b"/0"):
+            writer.write(b"HTTP/1.1 405 Method Not Allowed\r\nContent-Length: 0\r\n\r\n")
+        elif method == b"HEAD":
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: 0\r\n\r\n")
+        else:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: 2\r\n\r\nok")
+        await writer.drain()
+    writer.close()
+
+
+def _serve(ports_out, n_hosts: int) -> None:
+    async def main():
+        servers = [await asyncio.start_server(_handle, "127.0.0.1", 0, backlog=1024) for _ in range(n_hosts)]
+        ports_out.put([s.sockets[0].getsockname()[1] for s in servers])
+        await asyncio.Event().wait()
+    asyncio.run(main())
+
+
+async def run_per_url(urls: List[Tuple[int, str]], concurrency: int) -> int:
+    """Legacy behaviour: a fresh AsyncClient for each URL."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def check(url: str) -> bool:
+        async with semaphore:
+            ok, _ = await http_precheck(url)
+            return ok
+
+    results = await asyncio.gather(*(check(u) for _, u in urls))
+    return sum(results)
+
+
+async def run_pooled(urls: List[Tuple[int, str]], concurrency: int) -> int:
+    results = await batch_precheck(urls, concurrency=concurrency)
+    return sum(1 for ok, _ in results.values() if ok)
+
+
+async def bench(args, ports: List[int]) -> None:
+    urls = [
+        (i, f"http://localhost:{ports[i % len(ports)]}/hotel/{i % 7}")
+        for i in range(args.urls)
+    ]
+
+    for label, runner in (("per-URL client", run_per_url), ("pooled client", run_pooled)):
+        get_dns_cache().clear()
+        t0 = time.perf_counter()
+        ok = await runner(urls, args.concurrency)
+        elapsed = time.perf_counter() - t0
+        print(f"{label:15s} {elapsed:6.2f}s  {len(urls) / elapsed:7.0f} URLs/s  ({ok}/{len(urls)} reachable)")
+
+    cache = get_dns_cache()
+    print(f"DNS cache (pooled run): {cache.misses} lookups, {cache.hits} hits")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark precheck throughput")
+    parser.add_argument("--urls", type=int, default=3000, help="URLs to check (default: 3000)")
+    parser.add_argument("--hosts", type=int, default=50, help="Distinct stub hosts/ports (default: 50)")
+    parser.add_argument("--concurrency", type=int, default=30, help="Concurrent checks (default: 30)")
+    args = parser.parse_args()
+
+    ports_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=_serve, args=(ports_queue, args.hosts), daemon=True)
+    server.start()
+    ports = ports_queue.get(timeout=30)
+
+    try:
+        asyncio.run(bench(args, ports))
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
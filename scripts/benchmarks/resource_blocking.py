@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Measure page-load time and browser memory with and without resource blocking.
+
+Loads each URL the way HotelProcessor does (goto domcontentloaded + 0.5s
+settle) once with a normal context and once with block_resources=True, and
+reports per-hotel load time, Chromium RSS, requests aborted, and whether the
+set of request hostnames seen by EngineDetector.from_network is unchanged.
+
+Usage:
+    uv run python scripts/benchmarks/resource_blocking.py https://hotel-a.com https://hotel-b.com
+    uv run python scripts/benchmarks/resource_blocking.py --file urls.txt --limit 20
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, List, Set
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from playwright.async_api import TimeoutError as PWTimeoutError
+
+from services.leadgen.browser_pool import BrowserPool
+from services.leadgen.detector import extract_domain, normalize_url
+
+
+def children_rss_mb() -> float:
+    """Sum RSS (MB) of all descendant processes of this process (Linux /proc)."""
+    parents: Dict[int, int] = {}
+    rss: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            parents[int(entry)] = int(fields[1])
+            rss[int(entry)] = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, IndexError, ValueError):
+            continue
+
+    descendants = set()
+    frontier = {os.getpid()}
+    while frontier:
+        frontier = {pid for pid, ppid in parents.items() if ppid in frontier} - descendants
+        descendants |= frontier
+    return sum(rss.get(pid, 0) for pid in descendants) / (1024 * 1024)
+
+
+async def load_all(urls: List[str], block_resources: bool, timeout: int) -> Dict[str, object]:
+    """Load every URL in one pooled context, collecting timings and hosts."""
+    load_times: List[float] = []
+    rss_samples: List[float] = []
+    hosts: Dict[str, Set[str]] = {}
+    aborted = 0
+
+    async with BrowserPool(size=1, block_resources=block_resources, max_pages_per_context=0) as pool:
+        for url in urls:
+            async with pool.acquire() as context:
+                page = await context.new_page()
+                seen: Set[str] = set()
+
+                def on_request(request, seen=seen):
+                    host = extract_domain(request.url)
+                    if host:
+                        seen.add(host)
+
+                def on_failed(request):
+                    nonlocal aborted
+                    if request.failure and "ERR_FAILED" in request.failure:
+                        aborted += 1
+
+                page.on("request", on_request)
+                page.on("requestfailed", on_failed)
+
+                t0 = time.perf_counter()
+                try:
+                    await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+                except PWTimeoutError:
+                    pass
+                except Exception as e:
+                    print(f"  {url}: {str(e)[:80]}")
+                await asyncio.sleep(0.5)
+                load_times.append(time.perf_counter() - t0)
+                rss_samples.append(children_rss_mb())
+                hosts[url] = seen
+                await page.close()
+
+    return {"load_times": load_times, "rss": rss_samples, "hosts": hosts, "aborted": aborted}
+
+
+def summarize(label: str, run: Dict[str, object]) -> None:
+    times = run["load_times"]
+    rss = run["rss"]
+    print(f"{label:10s} load p50 {statistics.median(times):5.2f}s  mean {statistics.mean(times):5.2f}s  "
+          f"| browser RSS mean {statistics.mean(rss):6.0f} MB  peak {max(rss):6.0f} MB  "
+          f"| aborted requests {run['aborted']}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Measure resource blocking savings")
+    parser.add_argument("urls", nargs="*", help="Hotel website URLs")
+    parser.add_argument("--file", "-f", help="File with one URL per line")
+    parser.add_argument("--limit", "-l", type=int, default=0, help="Max URLs (0 = all)")
+    parser.add_argument("--timeout", type=int, default=15000, help="Page load timeout ms (default: 15000)")
+    args = parser.parse_args()
+
+    urls = list(args.urls)
+    if args.file:
+        urls += [line.strip() for line in Path(args.file).read_text().splitlines() if line.strip()]
+    urls = [normalize_url(u) for u in urls if u]
+    if args.limit:
+        urls = urls[:args.limit]
+    if not urls:
+        parser.error("no URLs given")
+
+    print(f"Loading {len(urls)} URLs per mode...")
+    full = await load_all(urls, block_resources=False, timeout=args.timeout)
+    blocked = await load_all(urls, block_resources=True, timeout=args.timeout)
+
+    summarize("full", full)
+    summarize("blocked", blocked)
+
+    saved_s = statistics.mean(full["load_times"]) - statistics.mean(blocked["load_times"])
+    saved_mb = statistics.mean(full["rss"]) - statistics.mean(blocked["rss"])
+    print(f"Saved per hotel: {saved_s:.2f}s load, {saved_mb:.0f} MB browser RSS")
+
+    # Aborted requests still emit request events, so hostnames should match
+    # (modulo hosts only referenced from CSS, e.g. web fonts).
+    missing = {url: full["hosts"][url] - blocked["hosts"][url] for url in urls}
+    missing = {url: hosts for url, hosts in missing.items() if hosts}
+    print(f"URLs with hosts missing in blocked mode: {len(missing)}/{len(urls)}")
+    for url, hosts in list(missing.items())[:10]:
+        print(f"  {url}: {', '.join(sorted(hosts)[:5])}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -16,6 +16,8 @@ from urllib.parse import urljoin, urlparse
 import httpx
 from dotenv import load_dotenv
 
+from infra.concurrency import AdaptiveLimiter
+
 # Load environment variables
 load_dotenv()
 
@@ -57,8 +59,8 @@ def log(msg: str) -> None:
     print(f"[{ts}] {msg}")
 
 
-async def fetch_page_raw(client: httpx.AsyncClient, url: str) -> str:
-    """Fetch raw HTML from a page."""
+async def fetch_page_raw(client: httpx.AsyncClient, url: str, limiter: Optional[AdaptiveLimiter] = None) -> str:
+    """Fetch raw HTML from a page. Timeouts are reported to limiter, if given."""
     try:
         headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -75,6 +77,8 @@ async def fetch_page_raw(client: httpx.AsyncClient, url: str) -> str:
         return ""
     except httpx.TimeoutException:
         log(f"    Timeout: {url}")
+        if limiter is not None:
+            limiter.record_timeout()
         return ""
     except Exception as e:
         log(f"    Fetch error: {url} - {type(e).__name__}: {str(e)[:50]}")
@@ -181,7 +185,9 @@ async def fetch_sitemap_links(client: httpx.AsyncClient, base_url: str) -> List[
     return links
 
 
-async def fetch_and_extract_room_count(client: httpx.AsyncClient, website: str) -> Tuple[Optional[int], str]:
+async def fetch_and_extract_room_count(
+    client: httpx.AsyncClient, website: str, limiter: Optional[AdaptiveLimiter] = None,
+) -> Tuple[Optional[int], str]:
     """
     Fetch hotel website pages and try to extract room count.
     Returns (room_count, all_text) - room_count is None if not found via regex.
@@ -196,7 +202,7 @@ async def fetch_and_extract_room_count(client: httpx.AsyncClient, website: str)
     all_links = []
 
     # 1. Try homepage first
-    homepage_html = await fetch_page_raw(client, website)
+    homepage_html = await fetch_page_raw(client, website, limiter)
     if homepage_html:
         all_html.append(homepage_html)
         checked_urls.add(base_url)
@@ -234,7 +240,7 @@ async def fetch_and_extract_room_count(client: httpx.AsyncClient, website: str)
         checked_urls.add(normalized)
         pages_checked += 1
 
-        page_html = await fetch_page_raw(client, link_url)
+        page_html = await fetch_page_raw(client, link_url, limiter)
         if page_html and len(page_html) > 500:
             all_html.append(page_html)
             count = extract_room_count_regex(page_html)
@@ -301,8 +307,14 @@ def extract_room_relevant_content(text: str) -> str:
     return "\n".join(unique[:20])  # Max 20 relevant excerpts
 
 
-async def extract_room_count_llm(client: httpx.AsyncClient, hotel_name: str, text: str) -> Optional[int]:
-    """Use Groq LLM to estimate room count from website text."""
+async def extract_room_count_llm(
+    client: httpx.AsyncClient, hotel_name: str, text: str, limiter: Optional[AdaptiveLimiter] = None,
+) -> Optional[int]:
+    """Use Groq LLM to estimate room count from website text.
+
+    Rate limits (429) and timeouts are reported to limiter, if given, so the
+    enrichment concurrency backs off instead of only sleeping them out.
+    """
     if not text or len(text) < 50:
         return None
 
@@ -350,6 +362,8 @@ Return ONLY a number (e.g., "12"). You MUST estimate even if unsure:"""
         )
 
         if resp.status_code == 429:
+            if limiter is not None:
+                limiter.record_timeout()
             # Rate limited - wait and retry up to 3 times
             for retry in range(3):
                 wait_time = (retry + 1) * 5  # 5s, 10s, 15s
@@ -375,6 +389,8 @@ Return ONLY a number (e.g., "12"). You MUST estimate even if unsure:"""
                     break
                 elif retry_resp.status_code != 429:
                     return None
+                if limiter is not None:
+                    limiter.record_timeout()
             else:
                 log("    Rate limit exceeded after 3 retries")
                 return None
@@ -409,6 +425,11 @@ Return ONLY a number (e.g., "12"). You MUST estimate even if unsure:"""
         else:
             return 10  # Generic default
 
+    except httpx.TimeoutException:
+        log("  LLM timeout")
+        if limiter is not None:
+            limiter.record_timeout()
+        return None
     except Exception as e:
         log(f"  LLM error: {e}")
         return None
@@ -419,17 +440,21 @@ async def enrich_hotel_room_count(
     hotel_id: int,
     hotel_name: str,
     website: str,
+    limiter: Optional[AdaptiveLimiter] = None,
 ) -> Tuple[Optional[int], str]:
     """
     Enrich a single hotel with room count.
 
+    limiter (the enrichment concurrency limiter, if adaptive) is told about
+    fetch timeouts and LLM rate limits so it can back off.
+
     Returns (room_count, source) where source is 'regex' or 'groq'.
     Returns (None, '') if no room count could be determined.
     """
     log(f"Processing: {hotel_name}")
 
     # Fetch website and try regex extraction first
-    regex_count, text = await fetch_and_extract_room_count(client, website)
+    regex_count, text = await fetch_and_extract_room_count(client, website, limiter)
 
     if regex_count:
         log(f"  Found via regex: {regex_count} rooms")
@@ -440,7 +465,7 @@ async def enrich_hotel_room_count(
         return None, ""
 
     # Fall back to LLM estimation
-    count = await extract_room_count_llm(client, hotel_name, text)
+    count = await extract_room_count_llm(client, hotel_name, text, limiter)
 
     if count:
         log(f"  LLM estimate: ~{count} rooms")
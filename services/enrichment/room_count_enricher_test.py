@@ -0,0 +1,58 @@
+"""Unit tests for room count enricher backoff signals (mocked HTTP, no network)."""
+
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from infra.concurrency import AdaptiveLimiter
+from services.enrichment import room_count_enricher
+from services.enrichment.room_count_enricher import extract_room_count_llm, fetch_page_raw
+
+
+TEXT = "A cozy lodge in the mountains with a great view of the lake. " * 3
+
+
+def limiter():
+    return AdaptiveLimiter(4, max_limit=4, memory_probe=None)
+
+
+@pytest.mark.no_db
+class TestBackoffSignals:
+    """Timeouts and rate limits reach the enrichment limiter."""
+
+    @pytest.mark.asyncio
+    async def test_fetch_timeout_is_recorded(self):
+        def handler(request):
+            raise httpx.ReadTimeout("slow", request=request)
+
+        lim = limiter()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            assert await fetch_page_raw(client, "https://slow.example", lim) == ""
+        assert lim.stats["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limits_are_recorded(self):
+        responses = iter([429, 429, 200])
+
+        def handler(request):
+            status = next(responses)
+            if status == 429:
+                return httpx.Response(429)
+            return httpx.Response(200, json={"choices": [{"message": {"content": "42"}}]})
+
+        lim = limiter()
+        with patch.object(room_count_enricher.asyncio, "sleep", new_callable=AsyncMock):
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                assert await extract_room_count_llm(client, "Lake Lodge", TEXT, lim) == 42
+        assert lim.stats["timeouts"] == 2
+
+    @pytest.mark.asyncio
+    async def test_llm_timeout_is_recorded(self):
+        def handler(request):
+            raise httpx.ReadTimeout("slow", request=request)
+
+        lim = limiter()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            assert await extract_room_count_llm(client, "Lake Lodge", TEXT, lim) is None
+        assert lim.stats["timeouts"] == 1
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
 from decimal import Decimal
+from typing import Optional
 import asyncio
 
 import httpx
 
+from infra.concurrency import AdaptiveLimiter
 from services.enrichment import repo
 from services.enrichment.room_count_enricher import (
     enrich_hotel_room_count,
@@ -74,6 +76,7 @@ class Service(IService):
         free_tier: bool = False,
         concurrency: int = 15,
         tier: int = None,
+        adaptive: bool = False,
     ) -> int:
         """
         Get room counts for hotels with websites.
@@ -85,6 +88,8 @@ class Service(IService):
             free_tier: If True, use slow sequential mode (30 RPM). Default False (1000 RPM).
             concurrency: Max concurrent requests when not in free_tier mode. Default 15.
             tier: Only process hotels with this booking engine tier (1, 2, or 3). None = all tiers.
+            adaptive: Use an AIMD limiter that starts at concurrency, never goes above it,
+                and backs off on timeouts, 429s, rising latency and low memory.
 
         Returns number of hotels successfully enriched.
         """
@@ -100,14 +105,15 @@ class Service(IService):
             log("No hotels pending enrichment")
             return 0
 
-        mode = "free tier (sequential)" if free_tier else f"paid tier ({concurrency} concurrent)"
+        mode = "free tier (sequential)" if free_tier else f"paid tier ({concurrency} concurrent{', adaptive' if adaptive else ''})"
         log(f"Claimed {len(hotels)} hotels for enrichment ({mode})")
 
-        async def process_hotel(client: httpx.AsyncClient, hotel, semaphore: asyncio.Semaphore = None):
+        async def process_hotel(client: httpx.AsyncClient, hotel, semaphore=None):
             """Process a single hotel, optionally with semaphore."""
             if semaphore:
+                limiter = semaphore if isinstance(semaphore, AdaptiveLimiter) else None
                 async with semaphore:
-                    return await self._enrich_single_hotel(client, hotel)
+                    return await self._enrich_single_hotel(client, hotel, limiter)
             else:
                 result = await self._enrich_single_hotel(client, hotel)
                 # Free tier: add delay between requests
@@ -125,21 +131,35 @@ class Service(IService):
                         enriched_count += 1
             else:
                 # Concurrent processing (1000 RPM)
-                semaphore = asyncio.Semaphore(concurrency)
+                if adaptive:
+                    # Only ever backs off from the configured concurrency, which
+                    # is sized for the Groq rate limit; 429s and timeouts are
+                    # reported by the enricher
+                    semaphore = AdaptiveLimiter(
+                        concurrency, max_limit=concurrency, name="enrichment",
+                        timeout_exceptions=(asyncio.TimeoutError, httpx.TimeoutException),
+                    )
+                else:
+                    semaphore = asyncio.Semaphore(concurrency)
                 tasks = [process_hotel(client, hotel, semaphore) for hotel in hotels]
                 results = await asyncio.gather(*tasks)
                 enriched_count = sum(1 for r in results if r)
+                if adaptive:
+                    log(f"Adaptive concurrency: final {semaphore.limit}, {semaphore.stats}")
 
         log(f"Enrichment complete: {enriched_count}/{len(hotels)} hotels enriched")
         return enriched_count
 
-    async def _enrich_single_hotel(self, client: httpx.AsyncClient, hotel) -> bool:
+    async def _enrich_single_hotel(
+        self, client: httpx.AsyncClient, hotel, limiter: Optional[AdaptiveLimiter] = None,
+    ) -> bool:
         """Enrich a single hotel with room count. Returns True if successful."""
         room_count, source = await enrich_hotel_room_count(
             client=client,
             hotel_id=hotel.id,
             hotel_name=hotel.name,
             website=hotel.website,
+            limiter=limiter,
         )
 
         if room_count:
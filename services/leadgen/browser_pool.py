@@ -0,0 +1,314 @@
+"""Long-lived Playwright browser/context pool.
+
+BatchDetector used to launch Chromium and N contexts for every batch. The pool
+keeps one browser and a fixed number of context slots alive across batches
+(e.g. across SQS messages in the detection consumer):
+
+- Contexts are recycled after max_pages_per_context pages to cap memory growth,
+  and on demand (recycle()) when the memory watchdog sees pressure
+- Pages left open when a context is released (popups, new tabs) are closed
+- The number of slots in circulation can be lowered (set_capacity()) to shed
+  concurrency before the instance runs out of memory
+- A crashed/disconnected browser is relaunched on the next acquire
+- A context whose caller raised is discarded instead of reused
+- Optionally, heavy resources (images, media, fonts, CSS) are aborted at the
+  context level. Request events still fire for aborted requests, so their
+  hostnames remain visible to EngineDetector.from_network.
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+
+from loguru import logger
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright, Route
+
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+
+# Resource types never needed for detection (DOM, links, iframes, request hosts)
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+
+
+async def _block_heavy_resources(route: Route) -> None:
+    """Route handler: abort heavy resource types, let everything else through."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        # Next handler (e.g. HAR replay), or the network if there is none
+        await route.fallback()
+
+
+class BrowserPool:
+    """Pool of reusable browser contexts backed by a single Chromium instance.
+
+    Usage:
+        async with BrowserPool(size=5) as pool:
+            async with pool.acquire() as context:
+                page = await context.new_page()
+    """
+
+    def __init__(
+        self,
+        size: int = 5,
+        headless: bool = True,
+        max_pages_per_context: int = 50,
+        block_resources: bool = False,
+        record_har_dir: Optional[str] = None,
+        replay_har: Optional[str] = None,
+    ):
+        """
+        Args:
+            size: Number of context slots (max concurrent acquires)
+            headless: Launch Chromium headless
+            max_pages_per_context: Recycle a context after this many pages (0 = never)
+            block_resources: Abort image/media/font/stylesheet requests
+            record_har_dir: Save each context's traffic to a HAR file here (written on close)
+            replay_har: Serve every request from this HAR, aborting ones not in it
+        """
+        self.size = size
+        self.headless = headless
+        self.max_pages_per_context = max_pages_per_context
+        self.block_resources = block_resources
+        self.record_har_dir = record_har_dir
+        self.replay_har = replay_har
+
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._browser_generation = 0
+        # Idle slots; None means the slot needs a fresh context
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._page_counts: Dict[BrowserContext, int] = {}
+        self._generations: Dict[BrowserContext, int] = {}
+        # Contexts to discard when they are released (recycle() while in use)
+        self._stale: Set[BrowserContext] = set()
+        # Slots in circulation (idle + in use); excess slots retire on release
+        self._slots = 0
+        self.capacity = size
+        self._launch_lock = asyncio.Lock()
+        self._closed = False
+
+        self.stats = {
+            "launches": 0,
+            "relaunches": 0,
+            "contexts_created": 0,
+            "contexts_recycled": 0,
+            "contexts_recycled_memory": 0,
+            "pages_leaked": 0,
+            "acquires": 0,
+        }
+
+    @property
+    def started(self) -> bool:
+        return self._browser is not None and not self._closed
+
+    @property
+    def in_use(self) -> int:
+        return self._slots - self._idle.qsize()
+
+    async def set_capacity(self, capacity: int) -> int:
+        """Change how many contexts may be checked out at once (1..size).
+
+        Lowering it closes idle contexts right away; contexts in use are
+        closed as they are released. Returns the new capacity.
+        """
+        self.capacity = max(1, min(self.size, capacity))
+        if not self.started:
+            return self.capacity
+        while self._slots < self.capacity:
+            self._idle.put_nowait(None)
+            self._slots += 1
+        while self._slots > self.capacity and not self._idle.empty():
+            ctx = self._idle.get_nowait()
+            self._slots -= 1
+            if ctx is not None:
+                await self._discard(ctx)
+        return self.capacity
+
+    async def recycle(self) -> int:
+        """Close every context now (idle) or on release (in use). Returns how many."""
+        stale = [ctx for ctx in self._page_counts if ctx not in self._stale]
+        self._stale.update(stale)
+        self.stats["contexts_recycled_memory"] += len(stale)
+        for _ in range(self._idle.qsize()):
+            ctx = self._idle.get_nowait()
+            if ctx is not None and ctx in self._stale:
+                await self._discard(ctx)
+                ctx = None
+            self._idle.put_nowait(ctx)
+        return len(stale)
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Start Playwright and launch the browser. Idempotent."""
+        if self._closed:
+            raise RuntimeError("BrowserPool is closed")
+        async with self._launch_lock:
+            if self._browser is not None:
+                return
+            self._playwright = await async_playwright().start()
+            await self._launch()
+            for _ in range(self.capacity):
+                self._idle.put_nowait(None)
+            self._slots = self.capacity
+        logger.info(
+            f"Browser pool started (size={self.size}, max_pages_per_context={self.max_pages_per_context}, "
+            f"block_resources={self.block_resources})"
+        )
+
+    async def close(self) -> None:
+        """Close all idle contexts, the browser and Playwright.
+
+        Contexts still checked out are closed when they are released.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        while not self._idle.empty():
+            ctx = self._idle.get_nowait()
+            if ctx is not None:
+                await self._discard(ctx)
+
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+        self._browser = None
+        self._playwright = None
+        logger.info(f"Browser pool closed: {self.stats}")
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[BrowserContext]:
+        """Check out a healthy context for the duration of the block."""
+        if not self.started:
+            await self.start()
+
+        ctx = await self._idle.get()
+        healthy = True
+        try:
+            await self._ensure_browser()
+            if ctx is None or self._generations.get(ctx) != self._browser_generation:
+                # Empty slot, or context belongs to a browser that died
+                if ctx is not None:
+                    await self._discard(ctx)
+                ctx = None
+                ctx = await self._new_context()
+            self.stats["acquires"] += 1
+            yield ctx
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            await self._release(ctx, healthy)
+
+    async def _launch(self) -> None:
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._browser_generation += 1
+        self.stats["launches"] += 1
+
+    async def _ensure_browser(self) -> None:
+        """Relaunch the browser if it crashed or was disconnected."""
+        if self._browser is not None and self._browser.is_connected():
+            return
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            logger.warning("Browser disconnected, relaunching")
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._page_counts.clear()
+            self._generations.clear()
+            await self._launch()
+            self.stats["relaunches"] += 1
+
+    async def _new_context(self) -> BrowserContext:
+        options = {}
+        if self.record_har_dir:
+            options["record_har_path"] = os.path.join(
+                self.record_har_dir, f"context-{os.getpid()}-{self.stats['contexts_created']}.har"
+            )
+        ctx = await self._browser.new_context(
+            user_agent=USER_AGENT,
+            ignore_https_errors=True,
+            **options,
+        )
+        if self.replay_har:
+            await ctx.route_from_har(self.replay_har, not_found="abort")
+        if self.block_resources:
+            # Registered last so it runs first, falling back to the HAR route
+            await ctx.route("**/*", _block_heavy_resources)
+        self._page_counts[ctx] = 0
+        self._generations[ctx] = self._browser_generation
+        ctx.on("page", lambda _page, c=ctx: self._count_page(c))
+        self.stats["contexts_created"] += 1
+        return ctx
+
+    def _count_page(self, ctx: BrowserContext) -> None:
+        if ctx in self._page_counts:
+            self._page_counts[ctx] += 1
+
+    async def _discard(self, ctx: BrowserContext) -> None:
+        self._page_counts.pop(ctx, None)
+        self._generations.pop(ctx, None)
+        self._stale.discard(ctx)
+        try:
+            await ctx.close()
+        except Exception:
+            pass
+
+    async def _release(self, ctx: Optional[BrowserContext], healthy: bool) -> None:
+        """Return a context to the pool, recycling it if needed."""
+        if self._closed:
+            if ctx is not None:
+                await self._discard(ctx)
+            return
+
+        if self._slots > self.capacity:
+            # Capacity was lowered while this slot was in use: retire it
+            self._slots -= 1
+            if ctx is not None:
+                await self._discard(ctx)
+            return
+
+        if ctx is None:
+            self._idle.put_nowait(None)
+            return
+
+        if ctx in self._stale:
+            await self._discard(ctx)
+            self._idle.put_nowait(None)
+            return
+
+        pages = self._page_counts.get(ctx)
+        expired = self.max_pages_per_context > 0 and (pages or 0) >= self.max_pages_per_context
+        if not healthy or pages is None or expired:
+            await self._discard(ctx)
+            self.stats["contexts_recycled"] += 1
+            self._idle.put_nowait(None)  # Replaced lazily on next acquire
+            return
+
+        # Popups and new tabs the caller didn't close keep their memory
+        for page in list(ctx.pages):
+            self.stats["pages_leaked"] += 1
+            try:
+                await page.close()
+            except Exception:
+                pass
+
+        self._idle.put_nowait(ctx)
@@ -0,0 +1,250 @@
+"""Unit tests for BrowserPool (fake Playwright objects, no real browser)."""
+
+import asyncio
+
+import pytest
+
+from services.leadgen import browser_pool
+from services.leadgen.browser_pool import BrowserPool, _block_heavy_resources
+
+
+class FakePage:
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    async def close(self):
+        self.ctx.pages.remove(self)
+
+
+class FakeContext:
+    def __init__(self, **options):
+        self.options = options
+        self.closed = False
+        self._handlers = []
+        self.routes = []
+        self.pages = []
+
+    async def route(self, url, handler):
+        self.routes.append((url, handler))
+
+    async def route_from_har(self, har, not_found="abort"):
+        self.routes.append(("har", har, not_found))
+
+    def on(self, event, handler):
+        if event == "page":
+            self._handlers.append(handler)
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        for handler in self._handlers:
+            handler(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeRoute:
+    def __init__(self, resource_type):
+        self.request = type("Request", (), {"resource_type": resource_type})()
+        self.action = ""
+
+    async def abort(self):
+        self.action = "abort"
+
+    async def fallback(self):
+        self.action = "fallback"
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        ctx = FakeContext(**kwargs)
+        self.contexts.append(ctx)
+        return ctx
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self):
+        self.browsers = []
+
+    async def launch(self, headless=True):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+        self.stopped = False
+
+    async def stop(self):
+        self.stopped = True
+
+
+class FakePlaywrightManager:
+    def __init__(self, playwright):
+        self.playwright = playwright
+
+    async def start(self):
+        return self.playwright
+
+
+@pytest.fixture
+def fake_playwright(monkeypatch):
+    pw = FakePlaywright()
+    monkeypatch.setattr(browser_pool, "async_playwright", lambda: FakePlaywrightManager(pw))
+    return pw
+
+
+@pytest.mark.no_db
+class TestBrowserPool:
+    """Unit tests for BrowserPool."""
+
+    async def test_contexts_reused_across_acquires(self, fake_playwright):
+        async with BrowserPool(size=1, max_pages_per_context=10) as pool:
+            async with pool.acquire() as ctx1:
+                await ctx1.new_page()
+            async with pool.acquire() as ctx2:
+                await ctx2.new_page()
+        assert ctx1 is ctx2
+        assert len(fake_playwright.chromium.browsers) == 1
+        assert pool.stats["contexts_created"] == 1
+
+    async def test_context_recycled_after_max_pages(self, fake_playwright):
+        async with BrowserPool(size=1, max_pages_per_context=2) as pool:
+            async with pool.acquire() as ctx1:
+                await ctx1.new_page()
+                await ctx1.new_page()
+            async with pool.acquire() as ctx2:
+                pass
+        assert ctx1 is not ctx2
+        assert ctx1.closed
+        assert pool.stats["contexts_recycled"] == 1
+
+    async def test_leaked_pages_closed_on_release(self, fake_playwright):
+        async with BrowserPool(size=1) as pool:
+            async with pool.acquire() as ctx:
+                page = await ctx.new_page()
+                await ctx.new_page()
+                await page.close()
+            assert ctx.pages == []
+            assert pool.stats["pages_leaked"] == 1
+
+    async def test_lower_capacity_limits_acquires(self, fake_playwright):
+        async def use_slot(pool):
+            async with pool.acquire():
+                pass
+
+        async with BrowserPool(size=3) as pool:
+            async with pool.acquire() as a, pool.acquire() as b:
+                assert await pool.set_capacity(1) == 1
+                # Idle slot retired; the remaining two are over capacity
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(use_slot(pool), timeout=0.05)
+            # First slot released (b) retired, the other is back
+            assert b.closed and not a.closed
+            assert pool.in_use == 0
+            await asyncio.wait_for(use_slot(pool), timeout=1)
+
+    async def test_capacity_restored(self, fake_playwright):
+        async with BrowserPool(size=2) as pool:
+            await pool.set_capacity(0)
+            assert pool.capacity == 1
+            assert await pool.set_capacity(5) == 2
+            async with pool.acquire() as a, pool.acquire() as b:
+                assert a is not b
+                assert pool.in_use == 2
+
+    async def test_recycle_closes_idle_now_and_busy_on_release(self, fake_playwright):
+        async with BrowserPool(size=2) as pool:
+            async with pool.acquire() as busy:
+                async with pool.acquire() as idle:
+                    pass
+                assert await pool.recycle() == 2
+                assert idle.closed
+                assert not busy.closed
+            assert busy.closed
+            async with pool.acquire() as a, pool.acquire() as b:
+                assert not {a, b} & {busy, idle}
+            assert pool.stats["contexts_recycled_memory"] == 2
+
+    async def test_context_discarded_on_error(self, fake_playwright):
+        async with BrowserPool(size=1) as pool:
+            with pytest.raises(RuntimeError):
+                async with pool.acquire() as ctx1:
+                    raise RuntimeError("boom")
+            async with pool.acquire() as ctx2:
+                pass
+        assert ctx1.closed
+        assert ctx1 is not ctx2
+
+    async def test_relaunch_on_disconnect(self, fake_playwright):
+        async with BrowserPool(size=1) as pool:
+            async with pool.acquire() as ctx1:
+                pass
+            fake_playwright.chromium.browsers[0].connected = False
+            async with pool.acquire() as ctx2:
+                pass
+        assert len(fake_playwright.chromium.browsers) == 2
+        assert ctx2 in fake_playwright.chromium.browsers[1].contexts
+        assert pool.stats["relaunches"] == 1
+
+    async def test_close_shuts_everything_down(self, fake_playwright):
+        pool = BrowserPool(size=2)
+        async with pool.acquire() as ctx:
+            pass
+        await pool.close()
+        assert ctx.closed
+        assert fake_playwright.stopped
+        assert not fake_playwright.chromium.browsers[0].connected
+        with pytest.raises(RuntimeError):
+            async with pool.acquire():
+                pass
+
+    async def test_block_resources_installs_route(self, fake_playwright):
+        async with BrowserPool(size=1, block_resources=True) as pool:
+            async with pool.acquire() as ctx:
+                pass
+        assert ctx.routes == [("**/*", _block_heavy_resources)]
+
+    async def test_replay_har_runs_after_blocking(self, fake_playwright):
+        async with BrowserPool(size=1, block_resources=True, replay_har="archive.har") as pool:
+            async with pool.acquire() as ctx:
+                pass
+        # Handlers registered later run first
+        assert ctx.routes == [("har", "archive.har", "abort"), ("**/*", _block_heavy_resources)]
+
+    async def test_record_har_per_context(self, fake_playwright, tmp_path):
+        async with BrowserPool(size=2, record_har_dir=str(tmp_path)) as pool:
+            async with pool.acquire() as a, pool.acquire() as b:
+                pass
+        paths = {a.options["record_har_path"], b.options["record_har_path"]}
+        assert len(paths) == 2
+        assert all(p.startswith(str(tmp_path)) and p.endswith(".har") for p in paths)
+
+    async def test_no_route_by_default(self, fake_playwright):
+        async with BrowserPool(size=1) as pool:
+            async with pool.acquire() as ctx:
+                pass
+        assert ctx.routes == []
+
+    async def test_block_heavy_resources_handler(self):
+        for resource_type, action in [
+            ("image", "abort"), ("media", "abort"), ("font", "abort"), ("stylesheet", "abort"),
+            ("document", "fallback"), ("script", "fallback"), ("xhr", "fallback"),
+        ]:
+            route = FakeRoute(resource_type)
+            await _block_heavy_resources(route)
+            assert route.action == action, resource_type
@@ -0,0 +1,439 @@
+"""Compiled non-hotel / junk-domain classifier shared by the pipeline stages.
+
+The scraper (GridScraper._process_place), the detector (BatchDetector and
+HotelProcessor) and the clean_non_hotels workflow each drop businesses that
+are not independent hotels. Their keyword lists differ on purpose and are
+kept as-is below, but each set of lists is compiled once into a
+PatternMatcher instead of being scanned with `any(kw in s)` per call.
+
+A match reports the rule that fired (category + keyword), so filtered rows
+can be audited. Rules are checked in list order: when several keywords
+occur, the first listed wins, exactly like the original loops.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from services.leadgen.matcher import PatternMatcher
+
+
+class ClassifierMatch(NamedTuple):
+    """The rule that classified a name or URL."""
+    category: str  # e.g. "non_hotel_name", "junk_domain", "chain"
+    keyword: str   # The keyword from the rule list that matched
+
+
+class Classifier:
+    """Case-insensitive substring classifier over categorized keyword lists.
+
+    Usage:
+        classifier = Classifier([("chain", ["marriott", "hilton"]), ("non_hotel_name", ["pizza"])])
+        classifier.classify("Hilton Garden Inn")  # ClassifierMatch("chain", "hilton")
+        classifier.matches("Pizza Palace")        # True
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, Iterable[str]]]):
+        """
+        Args:
+            rules: (category, keywords) pairs in priority order
+        """
+        self._matcher: PatternMatcher[str] = PatternMatcher(
+            (keyword, category) for category, keywords in rules for keyword in keywords
+        )
+
+    def __len__(self) -> int:
+        return len(self._matcher)
+
+    def matches(self, text: str) -> bool:
+        """Return True if any rule matches text."""
+        return self._matcher.contains(text)
+
+    def classify(self, text: str) -> Optional[ClassifierMatch]:
+        """Return the highest-priority rule matching text, or None."""
+        match = self._matcher.search(text)
+        if match is None:
+            return None
+        keyword, category = match
+        return ClassifierMatch(category, keyword)
+
+    def classify_many(self, texts: Iterable[str]) -> List[Optional[ClassifierMatch]]:
+        """Batch variant of classify()."""
+        return [self.classify(text) for text in texts]
+
+
+# =============================================================================
+# DETECTOR RULES - BatchDetector / HotelProcessor
+# =============================================================================
+
+# Domains that are never a hotel's own website (social, reviews, OTAs, government)
+SKIP_JUNK_DOMAINS = [
+    # Social media
+    "facebook.com", "instagram.com", "twitter.com", "youtube.com", "tiktok.com",
+    "linkedin.com",
+    # Review sites
+    "yelp.com", "tripadvisor.com", "google.com",
+    # Major OTAs
+    "booking.com", "expedia.com", "hotels.com", "airbnb.com", "vrbo.com",
+    # Meta-search / aggregators (detected via location mismatch analysis)
+    "bluepillow.com", "vio.com", "wowotrip.com", "trivago.com", "kayak.com",
+    "priceline.com", "agoda.com", "hostelworld.com", "hotwire.com",
+    "decolar.com", "despegar.com", "momondo.com", "skyscanner.com",
+    # Government / parks
+    "dnr.", "parks.", "recreation.", ".gov", ".edu", ".mil",
+]
+
+# Non-hotel website domains to skip (retail, food, banks, services, etc.)
+SKIP_NON_HOTEL_DOMAINS = [
+    # Grocery / Retail
+    "publix.com", "walmart.com", "target.com", "costco.com", "kroger.com",
+    "wholefoodsmarket.com", "amazon.com", "safeway.com", "albertsons.com",
+    "warbyparker.com", "lenscrafters.com",
+    # Pharmacy
+    "cvs.com", "walgreens.com", "riteaid.com",
+    # Restaurants (chains)
+    "mcdonalds.com", "starbucks.com", "subway.com", "dominos.com",
+    "pizzahut.com", "burgerking.com", "chipotle.com", "tacobell.com",
+    "wendys.com", "dunkindonuts.com", "chick-fil-a.com", "papajohns.com",
+    "olivegarden.com", "applebees.com", "chilis.com", "ihop.com", "dennys.com",
+    "wafflehouse.com", "crackerbarrel.com", "outback.com", "longhornsteakhouse.com",
+    "redlobster.com", "texasroadhouse.com", "buffalowildwings.com", "hooters.com",
+    "carrabbas.com", "bonefishgrill.com", "thecheesecakefactory.com", "pfchangs.com",
+    "benihana.com", "shakeshack.com", "in-n-out.com", "whataburger.com",
+    "jackinthebox.com", "hardees.com", "carlsjr.com", "krispykreme.com",
+    "baskinrobbins.com", "coldstonecreamery.com", "dairyqueen.com", "culvers.com",
+    "kfc.com", "popeyes.com", "arbys.com", "fiveguys.com", "sonicdrivein.com",
+    "panerabread.com", "jasonsdeli.com", "potbelly.com", "jimmyjohns.com",
+    # Banks
+    "bankofamerica.com", "chase.com", "wellsfargo.com", "citibank.com",
+    "usbank.com", "capitalone.com", "pnc.com", "tdbank.com",
+    "westernunion.com", "moneygram.com",
+    # Home improvement / Electronics
+    "homedepot.com", "lowes.com", "bestbuy.com", "apple.com", "microsoft.com",
+    # Telecom
+    "att.com", "verizon.com", "t-mobile.com", "xfinity.com", "spectrum.com",
+    # Shipping
+    "ups.com", "fedex.com", "usps.com", "dhl.com",
+    # Gas stations
+    "exxon.com", "shell.com", "bp.com", "chevron.com", "mobil.com",
+    "wawa.com", "sheetz.com", "racetrac.com", "quiktrip.com", "circlek.com",
+    "7-eleven.com",
+    # Medical
+    "labcorp.com", "questdiagnostics.com",
+    # Storage
+    "publicstorage.com", "extraspace.com", "cubesmart.com", "lifestorage.com",
+    # Car rental (not hotels)
+    "enterprise.com", "hertz.com", "avis.com", "budget.com", "nationalcar.com",
+    # Fitness
+    "planetfitness.com", "lafitness.com", "24hourfitness.com", "orangetheory.com",
+    "anytimefitness.com", "equinox.com",
+    # Universal/Theme parks (specific pages, not hotels)
+    "universalorlando.com/web/en/us/things-to-do",
+]
+
+# Non-hotel name keywords to skip
+SKIP_NON_HOTEL_NAMES = [
+    # Medical - use specific terms to avoid matching "hospitality"
+    "pharmacy", "hospital ", "clinic", "medical center", "dental", "urgent care",
+    "doctor", "physician", "healthcare", "health center", "laboratory",
+    # Retail
+    "publix", "walmart", "target", "cvs", "walgreens", "kroger", "whole foods",
+    "costco", "safeway", "albertsons", "rite aid", "dollar general", "dollar tree",
+    "warby parker", "eyewear", "optical", "mattress",
+    # Restaurants (generic food terms)
+    "restaurant", "grill", "sushi", "pizza", "taco", "burrito", "bbq", "barbecue",
+    "steakhouse", "seafood", "buffet", "diner", "bakery", "deli", "cafe",
+    "bistro", "eatery", "cantina", "brewery", "bar & grill",
+    "ramen", "noodle", "pho", "wings", "wingstop", "hot pot",
+    "korean bbq", "hibachi", "teriyaki", "shawarma", "falafel", "kebab",
+    # Restaurants (chains)
+    "mcdonald's", "starbucks", "subway", "domino's", "pizza hut", "burger king",
+    "chipotle", "taco bell", "kfc", "wendy's", "dunkin", "chick-fil-a",
+    "papa john's", "sonic drive", "arby's", "popeyes", "five guys",
+    "olive garden", "applebee", "chili's", "ihop", "denny's", "waffle house",
+    "cracker barrel", "outback", "longhorn", "red lobster", "texas roadhouse",
+    "buffalo wild wings", "hooters", "carrabba", "bonefish", "cheesecake factory",
+    "pf chang", "benihana", "shake shack", "in-n-out", "whataburger",
+    "jack in the box", "hardee", "carl's jr", "krispy kreme", "baskin",
+    "cold stone", "dairy queen", "culver's",
+    # Banks
+    "bank of america", "chase bank", "wells fargo", "citibank", "us bank",
+    "credit union", "atm", "pnc bank", "td bank", "capital one",
+    "western union", "moneygram", "payday loan",
+    # Home / Electronics
+    "home depot", "lowe's", "best buy", "apple store", "microsoft store",
+    "ace hardware", "menards", "harbor freight",
+    # Telecom
+    "at&t", "verizon", "t-mobile", "xfinity", "spectrum", "cricket wireless",
+    # Shipping
+    "ups store", "fedex office", "post office", "usps",
+    # Gas / Auto
+    "gas station", "chevron", "exxon", "shell gas", "bp gas", "mobil", "speedway",
+    "wawa", "sheetz", "racetrac", "quiktrip", "circle k", "7-eleven",
+    "autozone", "o'reilly auto", "advance auto", "jiffy lube", "valvoline",
+    # Religious / Educational
+    "church", "temple", "mosque", "synagogue", "chapel",
+    "school", "university", "college", "academy", "seminary",
+    # Fitness / Recreation
+    "gym", "fitness", "planet fitness", "la fitness", "24 hour fitness",
+    "ymca", "ywca", "crossfit", "orangetheory", "equinox", "anytime fitness",
+    # Storage / Services
+    "storage", "self storage", "public storage", "u-haul", "extra space",
+    "laundromat", "dry cleaner", "car wash",
+    # Personal services
+    "salon", "nail", "tattoo", "piercing", "barbershop",
+    # Pet services
+    "pet", "grooming", "doggy", "veterinar", "animal clinic",
+    # Childcare
+    "daycare", "childcare", "preschool", "kindergarten", "learning center",
+    # Real estate (not accommodation) - removed "apartment" (apartment hotels are legit)
+    "condo for sale", "real estate", "realty", "property management",
+    # Entertainment (not accommodation)
+    "museum", "gallery", "library", "zoo", "aquarium", "stadium",
+    "theater", "theatre", "cinema", "concert hall", "arena", "bowling", "arcade",
+    "escape room", "trampoline", "skating rink", "mini golf", "laser tag",
+    # Government
+    "government", "city hall", "courthouse", "police department", "fire station",
+    "dmv", "social security", "irs",
+    # Car rental
+    "enterprise rent", "hertz", "avis", "budget car", "national car",
+    "sixt", "rent a car", "car rental",
+    # Senior Living (not short-term accommodation)
+    "senior living", "assisted living", "nursing home",
+    "retirement community", "memory care", "eldercare",
+    # Construction/Services
+    "exteriors", "roofing", "plumbing", "electric", "hvac", "landscaping",
+    "construction", "contractor", "remodeling", "renovation",
+    # Coffee/Food misc
+    "coffee", "bagel", "donut", "smoothie", "juice bar", "ice cream",
+    "frozen yogurt", "cupcake", "cookie",
+]
+
+
+# =============================================================================
+# SCRAPER RULES - GridScraper._process_place
+# =============================================================================
+
+# Chain filter - names to skip
+SKIP_CHAINS = [
+    "marriott", "hilton", "hyatt", "sheraton", "westin", "w hotel",
+    "intercontinental", "holiday inn", "crowne plaza", "ihg",
+    "best western", "choice hotels", "comfort inn", "quality inn",
+    "radisson", "wyndham", "ramada", "days inn", "super 8", "motel 6",
+    "la quinta", "travelodge", "ibis", "novotel", "mercure", "accor",
+    "four seasons", "ritz-carlton", "st. regis", "fairmont",
+]
+
+# Non-hotel businesses to skip by name keywords
+SKIP_NON_HOTELS = [
+    # Healthcare - use "hospital " with space to avoid matching "hospitality"
+    "pharmacy", "hospital ", "clinic", "medical", "urgent care", "emergency",
+    "dental", "dentist", "doctor", "physician", "health center", "healthcare",
+    "veterinary", "vet clinic", "animal hospital", "laboratory",
+    # Retail
+    "publix", "walmart", "target", "costco", "kroger", "cvs", "walgreens",
+    "home depot", "lowe's", "menards", "staples", "office depot",
+    "dollar general", "dollar tree", "family dollar", "best buy", "apple store",
+    "warby parker", "eyewear", "optical", "mattress",
+    # Restaurants (generic food terms)
+    "restaurant", "grill", "sushi", "pizza", "taco", "burrito", "bbq", "barbecue",
+    "steakhouse", "seafood", "buffet", "diner", "bakery", "deli", "cafe",
+    "bistro", "eatery", "cantina", "brewery", "bar & grill",
+    "ramen", "noodle", "pho", "wings", "wingstop", "wing stop", "hot pot",
+    "korean bbq", "hibachi", "teriyaki", "shawarma", "falafel", "kebab",
+    # Restaurants (chains)
+    "mcdonald", "burger king", "wendy's", "taco bell", "chick-fil-a",
+    "starbucks", "dunkin", "subway", "pizza hut", "domino's", "papa john",
+    "chipotle", "panera", "olive garden", "applebee", "chili's", "ihop",
+    "denny's", "waffle house", "cracker barrel", "outback", "longhorn",
+    "red lobster", "texas roadhouse", "buffalo wild wings", "hooters",
+    "carrabba", "bonefish", "cheesecake factory", "pf chang", "benihana",
+    "sonic drive", "arby's", "popeyes", "five guys", "shake shack",
+    "in-n-out", "whataburger", "jack in the box", "hardee", "carl's jr",
+    "krispy kreme", "baskin", "cold stone", "dairy queen", "culver's",
+    # Banks/Finance
+    "bank of america", "chase bank", "wells fargo", "citibank", "td bank",
+    "credit union", "atm", "western union", "moneygram", "payday loan",
+    # Gas stations - use "shell gas" to avoid matching "Hotel Shelley"
+    "gas station", "shell gas", "chevron", "exxon", "bp ", "speedway", "wawa",
+    "sheetz", "racetrac", "quiktrip", "circle k", "7-eleven", "7 eleven",
+    # Religious/Education
+    "church", "temple", "mosque", "synagogue", "chapel",
+    "school", "university", "college", "library", "academy",
+    # Government/Services
+    "police", "fire station", "post office", "ups store", "fedex", "usps",
+    "dmv", "courthouse", "city hall",
+    # Storage/Moving
+    "storage", "self storage", "u-haul", "public storage", "extra space",
+    # Fitness
+    "gym", "fitness", "planet fitness", "la fitness", "ymca", "crossfit",
+    "anytime fitness", "orangetheory", "equinox",
+    # Personal services
+    "salon", "barber", "nail", "spa ", "tattoo", "piercing",
+    # Pet services
+    "pet", "grooming", "doggy", "veterinar", "animal clinic",
+    # Childcare
+    "daycare", "childcare", "preschool", "kindergarten", "learning center",
+    # Entertainment (not hotels)
+    "cinema", "theater", "theatre", "bowling", "arcade", "laser tag",
+    "escape room", "trampoline", "skating rink", "mini golf",
+    # Car rental
+    "sixt", "hertz", "avis", "enterprise rent", "budget car", "national car",
+    "rent a car", "car rental",
+    # Senior Living - removed "apartment" (apartment hotels are legit)
+    "senior living", "assisted living", "nursing home",
+    "retirement community", "memory care", "eldercare",
+    # Construction/Services
+    "exteriors", "roofing", "plumbing", "electric", "hvac", "landscaping",
+    "construction", "contractor", "remodeling", "renovation",
+    # Coffee/Food misc
+    "coffee", "bagel", "donut", "smoothie", "juice bar", "ice cream",
+    "frozen yogurt", "cupcake", "cookie",
+]
+
+# Website domains to skip (big chains, aggregators, social media, junk)
+SKIP_DOMAINS = [
+    # Big chains
+    "marriott.com", "hilton.com", "hyatt.com", "ihg.com",
+    "wyndham.com", "wyndhamhotels.com", "choicehotels.com", "bestwestern.com",
+    "radissonhotels.com", "accor.com", "fourseasons.com",
+    "ritzcarlton.com", "starwoodhotels.com",
+    # OTAs and aggregators
+    "booking.com", "expedia.com", "hotels.com", "trivago.com",
+    "tripadvisor.com", "kayak.com", "priceline.com", "agoda.com",
+    "airbnb.com", "vrbo.com",
+    # Social media
+    "facebook.com", "instagram.com", "twitter.com", "youtube.com",
+    "tiktok.com", "linkedin.com", "yelp.com",
+    # Other junk
+    "google.com",
+    # Non-hotels (retail, pharmacy, healthcare, restaurants, etc.)
+    "publix.com", "cvs.com", "walgreens.com", "walmart.com", "target.com",
+    "costco.com", "kroger.com", "albertsons.com", "safeway.com",
+    "mcdonalds.com", "starbucks.com", "dunkindonuts.com", "subway.com",
+    "chipotle.com", "tacobell.com", "wendys.com", "burgerking.com",
+    "chick-fil-a.com", "dominos.com", "pizzahut.com", "papajohns.com",
+    "bankofamerica.com", "chase.com", "wellsfargo.com", "citibank.com",
+    "ups.com", "fedex.com", "usps.com",
+    "homedepot.com", "lowes.com", "menards.com",
+    "staples.com", "officedepot.com",
+    # Government/education (not hotels)
+    ".gov", ".edu", ".mil",
+    "dnr.", "parks.", "recreation.",
+]
+
+
+# =============================================================================
+# CLEANUP RULES - workflows/clean_non_hotels.py
+# =============================================================================
+
+# Non-hotel name keywords for re-classifying hotels already in the database
+NON_HOTEL_KEYWORDS = [
+    # Restaurants (generic)
+    "restaurant", "grill", "sushi", "pizza", "taco", "burrito", "bbq", "barbecue",
+    "steakhouse", "seafood", "buffet", "diner", "bakery", "deli", "cafe",
+    "bistro", "eatery", "cantina", "brewery", "bar & grill",
+    "ramen", "noodle", "pho", "wings", "wingstop", "hot pot",
+    "korean bbq", "hibachi", "teriyaki", "shawarma", "falafel", "kebab",
+    # Restaurant chains
+    "mcdonald", "burger king", "wendy", "taco bell", "chick-fil-a",
+    "starbucks", "dunkin", "subway", "pizza hut", "domino", "papa john",
+    "olive garden", "applebee", "chili", "ihop", "denny", "waffle house",
+    "cracker barrel", "outback", "longhorn", "red lobster", "texas roadhouse",
+    "buffalo wild wings", "hooters", "carrabba", "bonefish", "cheesecake factory",
+    "pf chang", "benihana", "shake shack", "in-n-out", "whataburger",
+    "jack in the box", "hardee", "carl's jr", "krispy kreme", "baskin",
+    "cold stone", "dairy queen", "culver", "popeyes", "five guys", "arby",
+    # Medical - use "hospital " with space to avoid matching "hospitality"
+    "pharmacy", "hospital ", "clinic", "medical center", "dental", "urgent care",
+    "doctor", "physician", "healthcare", "laboratory",
+    # Retail
+    "publix", "walmart", "target", "cvs", "walgreens", "kroger", "whole foods",
+    "costco", "safeway", "dollar general", "dollar tree", "best buy",
+    "warby parker", "eyewear", "optical", "mattress",
+    # Banks
+    "bank of america", "chase bank", "wells fargo", "citibank",
+    "credit union", "western union", "moneygram",
+    # Gas stations - use "shell gas" to avoid matching "Hotel Shelley"
+    "gas station", "chevron", "exxon", "shell gas", "speedway",
+    "wawa", "sheetz", "racetrac", "quiktrip", "circle k", "7-eleven",
+    # Auto
+    "autozone", "o'reilly auto", "jiffy lube", "valvoline", "car wash",
+    # Religious/Education
+    "church", "temple", "mosque", "synagogue", "chapel",
+    "school", "university", "college", "academy",
+    # Fitness
+    "gym", "fitness", "planet fitness", "la fitness", "ymca", "crossfit",
+    # Personal services
+    "salon", "nail", "tattoo", "barbershop",
+    # Pet
+    "pet", "grooming", "doggy", "veterinar",
+    # Childcare
+    "daycare", "childcare", "preschool", "kindergarten",
+    # Entertainment
+    "cinema", "theater", "theatre", "bowling", "arcade", "escape room",
+    "trampoline", "skating rink", "mini golf", "laser tag",
+    # Storage
+    "storage", "self storage", "u-haul",
+    # Car rental
+    "sixt", "hertz", "avis", "enterprise rent", "budget car", "national car",
+    "rent a car", "car rental",
+    # Senior Living - removed "apartment" (apartment hotels are legit)
+    "senior living", "assisted living", "nursing home",
+    "retirement community", "memory care", "eldercare",
+    # Construction/Services
+    "exteriors", "roofing", "plumbing", "electric", "hvac", "landscaping",
+    "construction", "contractor", "remodeling", "renovation",
+    # Coffee/Bagel/Food that slipped through
+    "coffee", "bagel", "donut", "smoothie", "juice bar", "ice cream",
+    "frozen yogurt", "cupcake", "cookie",
+]
+
+
+# =============================================================================
+# COMPILED CLASSIFIERS
+# =============================================================================
+
+# Categories match the detector's DetectionResult.error values
+NON_HOTEL_NAME_CLASSIFIER = Classifier([("non_hotel_name", SKIP_NON_HOTEL_NAMES)])
+NON_HOTEL_DOMAIN_CLASSIFIER = Classifier([("non_hotel_domain", SKIP_NON_HOTEL_DOMAINS)])
+JUNK_DOMAIN_CLASSIFIER = Classifier([("junk_domain", SKIP_JUNK_DOMAINS)])
+
+SCRAPER_NAME_CLASSIFIER = Classifier([("chain", SKIP_CHAINS), ("non_hotel", SKIP_NON_HOTELS)])
+SCRAPER_DOMAIN_CLASSIFIER = Classifier([("domain", SKIP_DOMAINS)])
+
+CLEANUP_NAME_CLASSIFIER = Classifier([("non_hotel", NON_HOTEL_KEYWORDS)])
+
+
+def is_non_hotel_name(name: str) -> bool:
+    """Check if name indicates a non-hotel business."""
+    return NON_HOTEL_NAME_CLASSIFIER.matches(name)
+
+
+def is_non_hotel_domain(url: str) -> bool:
+    """Check if URL is a non-hotel business domain."""
+    return NON_HOTEL_DOMAIN_CLASSIFIER.matches(url)
+
+
+def is_junk_domain(url: str) -> bool:
+    """Check if URL is a junk domain that should be skipped (empty URLs are junk)."""
+    if not url:
+        return True
+    return JUNK_DOMAIN_CLASSIFIER.matches(url)
+
+
+def classify_hotel(name: str, website: str) -> Optional[ClassifierMatch]:
+    """The detector's filter for one hotel, in its order: name, non-hotel domain, junk domain.
+
+    Returns None for hotels that should be detected. An empty website is
+    reported as ("junk_domain", "").
+    """
+    match = NON_HOTEL_NAME_CLASSIFIER.classify(name) or NON_HOTEL_DOMAIN_CLASSIFIER.classify(website)
+    if match is not None:
+        return match
+    if not website:
+        return ClassifierMatch("junk_domain", "")
+    return JUNK_DOMAIN_CLASSIFIER.classify(website)
+
+
+def classify_hotels(hotels: Iterable[Dict]) -> List[Optional[ClassifierMatch]]:
+    """Batch variant of classify_hotel() over dicts with 'name' and 'website' keys."""
+    return [classify_hotel(h.get("name") or "", h.get("website") or "") for h in hotels]
@@ -0,0 +1,109 @@
+"""Unit tests for the shared non-hotel / junk-domain classifier."""
+
+import pytest
+
+from services.leadgen.classifier import (
+    CLEANUP_NAME_CLASSIFIER,
+    JUNK_DOMAIN_CLASSIFIER,
+    NON_HOTEL_DOMAIN_CLASSIFIER,
+    NON_HOTEL_KEYWORDS,
+    NON_HOTEL_NAME_CLASSIFIER,
+    SCRAPER_DOMAIN_CLASSIFIER,
+    SCRAPER_NAME_CLASSIFIER,
+    SKIP_CHAINS,
+    SKIP_DOMAINS,
+    SKIP_JUNK_DOMAINS,
+    SKIP_NON_HOTEL_DOMAINS,
+    SKIP_NON_HOTEL_NAMES,
+    SKIP_NON_HOTELS,
+    Classifier,
+    ClassifierMatch,
+    classify_hotel,
+    classify_hotels,
+    is_junk_domain,
+)
+
+
+SAMPLES = [
+    "Hilton Garden Inn", "Pizza Palace", "Hotel Shelley", "Hospitality Suites",
+    "Grand Hospital Center", "https://www.facebook.com/seaview", "https://seaview-inn.com",
+    "https://www.walmart.com/store/1", "Oceanfront Motel & Grill", "https://parks.state.fl.us/lodge",
+    "Best Western Plus", "The Coffee House Inn", "Cozy B&B", "", "CVS Pharmacy #123",
+]
+
+
+def _legacy(keywords, text):
+    """Reference implementation: the original per-keyword loop."""
+    text = text.lower()
+    for kw in keywords:
+        if kw in text:
+            return kw
+    return None
+
+
+@pytest.mark.no_db
+class TestClassifier:
+    """Unit tests for Classifier and the per-stage classifiers."""
+
+    def test_reports_matched_rule(self):
+        classifier = Classifier([("chain", ["hilton"]), ("non_hotel", ["grill"])])
+        assert classifier.classify("HILTON Beach Grill") == ClassifierMatch("chain", "hilton")
+        assert classifier.classify("Beach Grill") == ClassifierMatch("non_hotel", "grill")
+        assert classifier.classify("Beach Inn") is None
+        assert classifier.matches("beach grill")
+        assert len(classifier) == 2
+
+    def test_first_listed_keyword_wins(self):
+        classifier = Classifier([("a", ["inn", "beach inn"])])
+        assert classifier.classify("Beach Inn").keyword == "inn"
+
+    def test_classify_many(self):
+        matches = SCRAPER_NAME_CLASSIFIER.classify_many(["Marriott Downtown", "Seaview Inn", "Joe's Pizza"])
+        assert matches == [ClassifierMatch("chain", "marriott"), None, ClassifierMatch("non_hotel", "pizza")]
+
+    @pytest.mark.parametrize("classifier,keywords", [
+        (NON_HOTEL_NAME_CLASSIFIER, SKIP_NON_HOTEL_NAMES),
+        (NON_HOTEL_DOMAIN_CLASSIFIER, SKIP_NON_HOTEL_DOMAINS),
+        (JUNK_DOMAIN_CLASSIFIER, SKIP_JUNK_DOMAINS),
+        (SCRAPER_NAME_CLASSIFIER, SKIP_CHAINS + SKIP_NON_HOTELS),
+        (SCRAPER_DOMAIN_CLASSIFIER, SKIP_DOMAINS),
+        (CLEANUP_NAME_CLASSIFIER, NON_HOTEL_KEYWORDS),
+    ])
+    def test_matches_legacy_loops(self, classifier, keywords):
+        texts = SAMPLES + list(keywords)
+        for text in texts:
+            match = classifier.classify(text)
+            assert (match.keyword if match else None) == _legacy(keywords, text), text
+
+    def test_hospitality_is_not_a_hospital(self):
+        assert CLEANUP_NAME_CLASSIFIER.classify("Hospitality Suites") is None
+        assert CLEANUP_NAME_CLASSIFIER.classify("Hotel Shelley") is None
+
+
+@pytest.mark.no_db
+class TestClassifyHotel:
+    """Unit tests for the detector's per-hotel filter."""
+
+    def test_checks_name_before_domains(self):
+        match = classify_hotel("Joe's Pizza", "https://www.facebook.com/joes")
+        assert match == ClassifierMatch("non_hotel_name", "pizza")
+
+    def test_non_hotel_domain_before_junk(self):
+        assert classify_hotel("Store 12", "https://walmart.com") == ClassifierMatch("non_hotel_domain", "walmart.com")
+        assert classify_hotel("Seaview", "https://facebook.com/x") == ClassifierMatch("junk_domain", "facebook.com")
+
+    def test_empty_website_is_junk(self):
+        assert classify_hotel("Seaview Inn", "") == ClassifierMatch("junk_domain", "")
+        assert is_junk_domain("")
+
+    def test_classify_hotels(self):
+        hotels = [
+            {"name": "Seaview Inn", "website": "https://seaview-inn.com"},
+            {"name": None, "website": None},
+            {"name": "Dental Care", "website": "https://dental.com"},
+        ]
+        assert classify_hotels(hotels) == [
+            None,
+            ClassifierMatch("junk_domain", ""),
+            ClassifierMatch("non_hotel_name", "dental"),
+        ]
@@ -26,6 +26,16 @@ class HotelStatus:
     LAUNCHED = 1             # Live lead, fully enriched and launched
 
 
+class JobStatus:
+    """jobs.status values (see JOB STATUS ENUM in db/schema.sql)."""
+
+    PENDING = 0
+    RUNNING = 1
+    COMPLETED = 2
+    FAILED = 3
+    RETRYING = 4
+
+
 HOTEL_STATUS_LABELS = {
     HotelStatus.NON_HOTEL: "non_hotel",
     HotelStatus.DUPLICATE: "duplicate",
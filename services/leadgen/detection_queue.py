@@ -0,0 +1,180 @@
+"""Detection queue backends for the detection consumer.
+
+The consumer only needs receive / delete / release / send / counts and a
+lease heartbeat, so the queue behind it is pluggable:
+
+- SQSDetectionQueue: the SQS queue in SQS_DETECTION_QUEUE_URL
+- PostgresDetectionQueue: the detection_queue table, claimed with
+  FOR UPDATE SKIP LOCKED. No SQS round trip, and the whole pipeline runs
+  against just the docker-compose database.
+
+Both hand out messages in the same shape:
+    {"body": {...}, "receipt_handle": str, "message_id": str, "receive_count": int}
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+from loguru import logger
+
+from infra import sqs
+from infra.sqs import VisibilityHeartbeat
+
+
+QUEUE_BACKENDS = ("sqs", "postgres")
+
+
+class DetectionQueue(ABC):
+    """Message queue the detection consumer reads hotel batches from."""
+
+    name: str = ""
+
+    @abstractmethod
+    async def receive(
+        self, max_messages: int = 1, wait_time_seconds: int = 20, visibility_timeout: int = 300,
+    ) -> List[Dict[str, Any]]:
+        """Receive up to max_messages, waiting up to wait_time_seconds for the first one.
+        Received messages are hidden from other workers for visibility_timeout seconds.
+        """
+        pass
+
+    @abstractmethod
+    async def extend(self, receipt_handle: str, visibility_timeout: int) -> None:
+        """Hide a received message for visibility_timeout more seconds (0 = release now)."""
+        pass
+
+    @abstractmethod
+    async def delete(self, receipt_handle: str) -> None:
+        """Acknowledge a processed message."""
+        pass
+
+    @abstractmethod
+    async def send(self, body: Dict[str, Any]) -> None:
+        """Add one message."""
+        pass
+
+    @abstractmethod
+    async def counts(self) -> Dict[str, int]:
+        """Approximate {"pending": visible messages, "in_flight": received but not deleted}."""
+        pass
+
+    async def release(self, receipt_handle: str) -> None:
+        """Make a received message visible again right away."""
+        await self.extend(receipt_handle, 0)
+
+    def heartbeat(self, receipt_handle: str, visibility_timeout: int) -> VisibilityHeartbeat:
+        """Heartbeat that keeps a received message hidden while it is processed."""
+        return VisibilityHeartbeat(self.name, receipt_handle, visibility_timeout, extend=self.extend)
+
+
+class SQSDetectionQueue(DetectionQueue):
+    """Detection queue on SQS."""
+
+    def __init__(self, queue_url: str):
+        self.queue_url = queue_url
+        self.name = queue_url.rsplit("/", 1)[-1]
+
+    async def receive(
+        self, max_messages: int = 1, wait_time_seconds: int = 20, visibility_timeout: int = 300,
+    ) -> List[Dict[str, Any]]:
+        return await sqs.receive_messages_async(
+            self.queue_url,
+            max_messages=min(max_messages, 10),  # SQS max is 10
+            wait_time_seconds=wait_time_seconds,
+            visibility_timeout=visibility_timeout,
+        )
+
+    async def extend(self, receipt_handle: str, visibility_timeout: int) -> None:
+        await sqs.change_message_visibility_async(self.queue_url, receipt_handle, visibility_timeout)
+
+    async def delete(self, receipt_handle: str) -> None:
+        await sqs.delete_message_async(self.queue_url, receipt_handle)
+
+    async def send(self, body: Dict[str, Any]) -> None:
+        await sqs.send_message_async(self.queue_url, body)
+
+    async def counts(self) -> Dict[str, int]:
+        attrs = await sqs.get_queue_attributes_async(self.queue_url)
+        return {
+            "pending": int(attrs.get("ApproximateNumberOfMessages", 0)),
+            "in_flight": int(attrs.get("ApproximateNumberOfMessagesNotVisible", 0)),
+        }
+
+
+class PostgresDetectionQueue(DetectionQueue):
+    """Detection queue on the detection_queue table.
+
+    receive() claims rows with FOR UPDATE SKIP LOCKED and hides them until
+    their lease (visible_at) runs out; the heartbeat extends it. A worker
+    that dies simply stops extending, and the rows become claimable again.
+    Long polling is emulated by re-claiming every poll_interval seconds.
+    The receipt handle is "<id>:<claim_token>", so a worker whose lease
+    expired and was re-claimed elsewhere can no longer extend or delete.
+    """
+
+    name = "detection_queue"
+
+    def __init__(self, service, poll_interval: float = 2.0):
+        """
+        Args:
+            service: leadgen Service (owns the DB access)
+            poll_interval: Seconds between claims while waiting for messages
+        """
+        self.service = service
+        self.poll_interval = poll_interval
+
+    async def receive(
+        self, max_messages: int = 1, wait_time_seconds: int = 20, visibility_timeout: int = 300,
+    ) -> List[Dict[str, Any]]:
+        deadline = time.monotonic() + wait_time_seconds
+        while True:
+            claimed = await self.service.claim_detection_messages(
+                limit=max_messages, visibility_timeout=visibility_timeout,
+            )
+            if claimed or time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+        return [
+            {
+                "body": m.body,
+                "receipt_handle": f"{m.id}:{m.claim_token}",
+                "message_id": str(m.id),
+                "receive_count": m.receive_count,
+            }
+            for m in claimed
+        ]
+
+    async def extend(self, receipt_handle: str, visibility_timeout: int) -> None:
+        message_id, claim_token = _parse_receipt_handle(receipt_handle)
+        if not await self.service.extend_detection_message(message_id, claim_token, visibility_timeout):
+            raise RuntimeError(f"Lease on detection_queue message {message_id} was lost")
+
+    async def delete(self, receipt_handle: str) -> None:
+        message_id, claim_token = _parse_receipt_handle(receipt_handle)
+        if not await self.service.delete_detection_message(message_id, claim_token):
+            # Its results are saved; whoever re-claimed it will redo and delete it
+            logger.warning(f"Lease on detection_queue message {message_id} expired before it was deleted")
+
+    async def send(self, body: Dict[str, Any]) -> None:
+        await self.service.enqueue_detection_messages([body])
+
+    async def counts(self) -> Dict[str, int]:
+        return await self.service.get_detection_queue_counts()
+
+
+def _parse_receipt_handle(receipt_handle: str):
+    message_id, _, claim_token = receipt_handle.partition(":")
+    return int(message_id), claim_token
+
+
+def get_detection_queue(backend: str, service=None) -> DetectionQueue:
+    """Build the queue for a --backend value ("sqs" or "postgres")."""
+    if backend == "sqs":
+        return SQSDetectionQueue(sqs.get_queue_url())
+    if backend == "postgres":
+        if service is None:
+            raise ValueError("The postgres detection queue needs a Service")
+        return PostgresDetectionQueue(service)
+    raise ValueError(f"Unknown detection queue backend: {backend} (expected one of {', '.join(QUEUE_BACKENDS)})")
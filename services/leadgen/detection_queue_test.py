@@ -0,0 +1,116 @@
+"""Unit tests for the detection queue backends (no SQS or database)."""
+
+import asyncio
+
+import pytest
+
+from db.models.detection_queue_message import DetectionQueueMessage
+from services.leadgen.detection_queue import PostgresDetectionQueue, get_detection_queue
+
+
+class FakeQueueService:
+    """In-memory stand-in for the Service's detection_queue methods."""
+
+    def __init__(self):
+        self.rows = {}
+        self.claims = 0
+
+    async def enqueue_detection_messages(self, bodies):
+        for body in bodies:
+            row_id = len(self.rows) + 1
+            self.rows[row_id] = {"body": body, "receive_count": 0, "token": None, "leased": False}
+        return len(bodies)
+
+    async def claim_detection_messages(self, limit, visibility_timeout):
+        self.claims += 1
+        claimed = []
+        for row_id, row in self.rows.items():
+            if not row["leased"] and len(claimed) < limit:
+                row.update(leased=True, receive_count=row["receive_count"] + 1, token=f"t{self.claims}")
+                claimed.append(DetectionQueueMessage(
+                    id=row_id, body=row["body"], receive_count=row["receive_count"], claim_token=row["token"],
+                ))
+        return claimed
+
+    async def extend_detection_message(self, message_id, claim_token, visibility_timeout):
+        row = self.rows.get(message_id)
+        if not row or row["token"] != claim_token:
+            return False
+        row["leased"] = visibility_timeout > 0
+        return True
+
+    async def delete_detection_message(self, message_id, claim_token):
+        row = self.rows.get(message_id)
+        if not row or row["token"] != claim_token:
+            return False
+        del self.rows[message_id]
+        return True
+
+    async def get_detection_queue_counts(self):
+        leased = sum(r["leased"] for r in self.rows.values())
+        return {"pending": len(self.rows) - leased, "in_flight": leased}
+
+
+@pytest.mark.no_db
+class TestPostgresDetectionQueue:
+    """Unit tests for PostgresDetectionQueue."""
+
+    @pytest.mark.asyncio
+    async def test_receive_release_and_delete(self):
+        service = FakeQueueService()
+        queue = PostgresDetectionQueue(service)
+        await queue.send({"hotel_ids": [1, 2]})
+
+        [msg] = await queue.receive(max_messages=5, wait_time_seconds=0)
+        assert msg["body"] == {"hotel_ids": [1, 2]}
+        assert msg["receive_count"] == 1
+        assert await queue.counts() == {"pending": 0, "in_flight": 1}
+
+        # Released messages are claimed again with a new receipt handle
+        await queue.release(msg["receipt_handle"])
+        [again] = await queue.receive(wait_time_seconds=0)
+        assert again["receive_count"] == 2
+        assert again["receipt_handle"] != msg["receipt_handle"]
+
+        # The stale handle can neither extend nor delete
+        with pytest.raises(RuntimeError):
+            await queue.extend(msg["receipt_handle"], 60)
+        await queue.delete(msg["receipt_handle"])
+        assert await queue.counts() == {"pending": 0, "in_flight": 1}
+
+        await queue.delete(again["receipt_handle"])
+        assert await queue.counts() == {"pending": 0, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_receive_waits_for_messages(self):
+        service = FakeQueueService()
+        queue = PostgresDetectionQueue(service, poll_interval=0.05)
+
+        async def send_later():
+            await asyncio.sleep(0.12)
+            await queue.send({"hotel_ids": [3]})
+
+        sender = asyncio.create_task(send_later())
+        messages = await queue.receive(wait_time_seconds=2)
+        await sender
+        assert [m["body"] for m in messages] == [{"hotel_ids": [3]}]
+        assert service.claims >= 3
+        assert await queue.receive(wait_time_seconds=0.1) == []
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_extends_claim(self):
+        service = FakeQueueService()
+        queue = PostgresDetectionQueue(service)
+        await queue.send({"hotel_ids": [4]})
+        [msg] = await queue.receive(wait_time_seconds=0)
+
+        heartbeat = queue.heartbeat(msg["receipt_handle"], 30)
+        heartbeat.interval = 0.02
+        async with heartbeat:
+            await asyncio.sleep(0.07)
+        assert heartbeat.extensions >= 2
+        assert heartbeat.failures == 0
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            get_detection_queue("kafka")
@@ -6,17 +6,32 @@ by analyzing URLs, network requests, and page content.
 """
 
 import re
+import time
 import asyncio
-from typing import Optional, List, Dict, Tuple
+from typing import AsyncIterator, Optional, List, Dict, Set, Tuple, Union
+from html import unescape
 from urllib.parse import urlparse, urljoin
 
 from loguru import logger
-from pydantic import BaseModel, ConfigDict
-from playwright.async_api import async_playwright, Page, BrowserContext, Browser
+from pydantic import BaseModel, ConfigDict, Field
+from playwright.async_api import Page, BrowserContext
 from playwright.async_api import TimeoutError as PWTimeoutError
 import httpx
 
+from infra.concurrency import AdaptiveLimiter
+from infra.http_client import create_pooled_client
+from services.leadgen.browser_pool import BrowserPool
+from services.leadgen.classifier import (  # noqa: F401 - rule lists re-exported
+    SKIP_JUNK_DOMAINS,
+    SKIP_NON_HOTEL_DOMAINS,
+    SKIP_NON_HOTEL_NAMES,
+    classify_hotels,
+    is_junk_domain,
+    is_non_hotel_domain,
+    is_non_hotel_name,
+)
 from services.leadgen.location import LocationExtractor
+from services.leadgen.matcher import PatternMatcher, build_engine_matcher
 
 
 # =============================================================================
@@ -35,29 +50,69 @@ class DetectionConfig(BaseModel):
     headless: bool = True
     debug: bool = False  # Enable debug logging
     fast_mode: bool = True  # Reduce waits for speed
+    context_max_pages: int = 50  # Recycle a pooled browser context after N pages (0 = never)
+    block_resources: bool = False  # Abort image/media/font/stylesheet requests (hosts still recorded)
+    static_tier: bool = True  # Try HTTP-only detection before launching the browser
+    static_concurrency: int = 20  # Concurrent homepage fetches in the static tier
+    timeout_static_fetch: float = 8.0  # Seconds per static homepage fetch
+    hotel_budget_ms: int = 45000  # Wall-clock budget per hotel in the browser (0 = unlimited)
+    budget_reserve_click_ms: int = 5000  # Skip button clicks with less than this left
+    budget_reserve_booking_page_ms: int = 8000  # Skip booking-page analysis with less than this left
+    memory_limit_mb: int = 0  # Python + Chromium RSS budget for the pool's memory watchdog (0 = available memory only)
+    adaptive_concurrency: bool = False  # Consumer: one AIMD limiter per pool instead of a fixed semaphore per batch
+    network_early_exit: bool = True  # Take a conclusive homepage request to a known engine host, skip the engine stages
+    network_definitive_engines: Tuple[str, ...] = ()  # Engines whose asset requests (scripts, XHR) also count as conclusive
+    network_early_abort: bool = False  # ...and stop the homepage load at that request (contacts from the partial page)
 
 
 # =============================================================================
 # ENGINE PATTERNS - Injected at runtime from database
 # =============================================================================
 
-# Module-level cache for engine patterns (set by caller before detection)
-_engine_patterns: Dict[str, List[str]] = {}
+class EnginePatternIndex:
+    """Engine patterns, their compiled matcher and the DB pattern version.
+
+    Never mutated after construction: set_engine_patterns() builds a new
+    index and swaps it in with one assignment, so a running stage sees
+    either the old or the new patterns, never a half-built matcher.
+    """
+
+    __slots__ = ("patterns", "matcher", "version")
+
+    def __init__(self, patterns: Dict[str, List[str]], version: int = 0):
+        self.patterns = patterns
+        self.matcher: PatternMatcher[str] = build_engine_matcher(patterns)
+        self.version = version
+
+
+# Module-level index (set by caller before detection, refreshed by version)
+_engine_index = EnginePatternIndex({})
 
 
-def set_engine_patterns(patterns: Dict[str, List[str]]) -> None:
+def set_engine_patterns(patterns: Dict[str, List[str]], version: int = 0) -> None:
     """Set the engine patterns to use for detection.
 
-    Called by workflow/service after fetching from database.
+    Called by workflow/service after fetching from database. version is
+    booking_engine_pattern_version at fetch time (0 = unversioned).
     """
-    global _engine_patterns
-    _engine_patterns = patterns
-    logger.info(f"Loaded {len(_engine_patterns)} booking engine patterns")
+    global _engine_index
+    _engine_index = EnginePatternIndex(patterns, version)
+    logger.info(f"Loaded {len(patterns)} booking engine patterns (version {version})")
 
 
 def get_engine_patterns() -> Dict[str, List[str]]:
     """Get the current engine patterns."""
-    return _engine_patterns
+    return _engine_index.patterns
+
+
+def get_engine_matcher() -> PatternMatcher[str]:
+    """Get the compiled matcher for the current engine patterns."""
+    return _engine_index.matcher
+
+
+def get_engine_pattern_version() -> int:
+    """Get the version of the current engine patterns."""
+    return _engine_index.version
 
 # Skip big chains and junk domains
 SKIP_CHAIN_DOMAINS = [
@@ -65,171 +120,130 @@ SKIP_CHAIN_DOMAINS = [
     "choicehotels.com", "bestwestern.com", "radissonhotels.com", "accor.com",
 ]
 
-SKIP_JUNK_DOMAINS = [
-    # Social media
-    "facebook.com", "instagram.com", "twitter.com", "youtube.com", "tiktok.com",
-    "linkedin.com",
-    # Review sites
-    "yelp.com", "tripadvisor.com", "google.com",
-    # Major OTAs
-    "booking.com", "expedia.com", "hotels.com", "airbnb.com", "vrbo.com",
-    # Meta-search / aggregators (detected via location mismatch analysis)
-    "bluepillow.com", "vio.com", "wowotrip.com", "trivago.com", "kayak.com",
-    "priceline.com", "agoda.com", "hostelworld.com", "hotwire.com",
-    "decolar.com", "despegar.com", "momondo.com", "skyscanner.com",
-    # Government / parks
-    "dnr.", "parks.", "recreation.", ".gov", ".edu", ".mil",
-]
+# =============================================================================
+# HTML KEYWORD PATTERNS - Static fallbacks when DB patterns don't match
+# =============================================================================
 
-# Non-hotel website domains to skip (retail, food, banks, services, etc.)
-SKIP_NON_HOTEL_DOMAINS = [
-    # Grocery / Retail
-    "publix.com", "walmart.com", "target.com", "costco.com", "kroger.com",
-    "wholefoodsmarket.com", "amazon.com", "safeway.com", "albertsons.com",
-    "warbyparker.com", "lenscrafters.com",
-    # Pharmacy
-    "cvs.com", "walgreens.com", "riteaid.com",
-    # Restaurants (chains)
-    "mcdonalds.com", "starbucks.com", "subway.com", "dominos.com",
-    "pizzahut.com", "burgerking.com", "chipotle.com", "tacobell.com",
-    "wendys.com", "dunkindonuts.com", "chick-fil-a.com", "papajohns.com",
-    "olivegarden.com", "applebees.com", "chilis.com", "ihop.com", "dennys.com",
-    "wafflehouse.com", "crackerbarrel.com", "outback.com", "longhornsteakhouse.com",
-    "redlobster.com", "texasroadhouse.com", "buffalowildwings.com", "hooters.com",
-    "carrabbas.com", "bonefishgrill.com", "thecheesecakefactory.com", "pfchangs.com",
-    "benihana.com", "shakeshack.com", "in-n-out.com", "whataburger.com",
-    "jackinthebox.com", "hardees.com", "carlsjr.com", "krispykreme.com",
-    "baskinrobbins.com", "coldstonecreamery.com", "dairyqueen.com", "culvers.com",
-    "kfc.com", "popeyes.com", "arbys.com", "fiveguys.com", "sonicdrivein.com",
-    "panerabread.com", "jasonsdeli.com", "potbelly.com", "jimmyjohns.com",
-    # Banks
-    "bankofamerica.com", "chase.com", "wellsfargo.com", "citibank.com",
-    "usbank.com", "capitalone.com", "pnc.com", "tdbank.com",
-    "westernunion.com", "moneygram.com",
-    # Home improvement / Electronics
-    "homedepot.com", "lowes.com", "bestbuy.com", "apple.com", "microsoft.com",
-    # Telecom
-    "att.com", "verizon.com", "t-mobile.com", "xfinity.com", "spectrum.com",
-    # Shipping
-    "ups.com", "fedex.com", "usps.com", "dhl.com",
-    # Gas stations
-    "exxon.com", "shell.com", "bp.com", "chevron.com", "mobil.com",
-    "wawa.com", "sheetz.com", "racetrac.com", "quiktrip.com", "circlek.com",
-    "7-eleven.com",
-    # Medical
-    "labcorp.com", "questdiagnostics.com",
-    # Storage
-    "publicstorage.com", "extraspace.com", "cubesmart.com", "lifestorage.com",
-    # Car rental (not hotels)
-    "enterprise.com", "hertz.com", "avis.com", "budget.com", "nationalcar.com",
-    # Fitness
-    "planetfitness.com", "lafitness.com", "24hourfitness.com", "orangetheory.com",
-    "anytimefitness.com", "equinox.com",
-    # Universal/Theme parks (specific pages, not hotels)
-    "universalorlando.com/web/en/us/things-to-do",
+# (keyword, engine_name, engine_domain) - keyword must be followed by . / or -
+HTML_KEYWORD_PATTERNS = [
+    ("resortpro", "Streamline", "streamlinevrs.com"),
+    ("homhero", "HomHero", "homhero.com.au"),
+    ("cloudbeds", "Cloudbeds", "cloudbeds.com"),
+    ("freetobook", "FreeToBook", "freetobook.com"),
+    ("siteminder", "SiteMinder", "siteminder.com"),
+    ("thebookingbutton", "SiteMinder", "thebookingbutton.com"),
+    ("littlehotelier", "Little Hotelier", "littlehotelier.com"),
+    ("webrezpro", "WebRezPro", "webrezpro.com"),
+    ("resnexus", "ResNexus", "resnexus.com"),
+    ("beds24", "Beds24", "beds24.com"),
+    ("checkfront", "Checkfront", "checkfront.com"),
+    ("eviivo", "eviivo", "eviivo.com"),
+    ("lodgify", "Lodgify", "lodgify.com"),
+    ("newbook", "Newbook", "newbook.cloud"),
+    ("rmscloud", "RMS Cloud", "rmscloud.com"),
+    ("ipms247", "JEHS / iPMS", "ipms247.com"),
+    ("synxis", "SynXis / TravelClick", "synxis.com"),
+    ("mews.com", "Mews", "mews.com"),
+    ("triptease", "Triptease", "triptease.io"),
+    ("bookingmood", "BookingMood", "bookingmood.com"),
+    ("seekda", "Seekda / KUBE", "seekda.com"),
+    ("kube", "Seekda / KUBE", "seekda.com"),
+    ("ownerreservations", "OwnerReservations", "ownerreservations.com"),
+    ("guestroomgenie", "GuestRoomGenie", "guestroomgenie.com"),
+    ("beyondpricing", "Beyond Pricing", "beyondpricing.com"),
+    ("hotelkeyapp", "HotelKey", "hotelkeyapp.com"),
+    ("prenohq", "Preno", "prenohq.com"),
+    ("profitroom", "Profitroom", "profitroom.com"),
+    ("avvio", "Avvio", "avvio.com"),
+    ("netaffinity", "Net Affinity", "netaffinity.com"),
+    ("simplotel", "Simplotel", "simplotel.com"),
+    ("cubilis", "Cubilis", "cubilis.com"),
+    ("cendyn", "Cendyn", "cendyn.com"),
+    ("booklogic", "BookLogic", "booklogic.net"),
+    ("ratetiger", "RateTiger", "ratetiger.com"),
+    ("d-edge", "D-Edge", "d-edge.com"),
+    ("availpro", "D-Edge", "availpro.com"),
+    ("bookassist", "BookAssist", "bookassist.com"),
+    ("guestcentric", "GuestCentric", "guestcentric.com"),
+    ("verticalbooking", "Vertical Booking", "verticalbooking.com"),
+    ("busyrooms", "Busy Rooms", "busyrooms.com"),
+    ("myhotel.io", "myHotel.io", "myhotel.io"),
+    ("hotelspider", "HotelSpider", "hotelspider.com"),
+    ("staah", "Staah", "staah.com"),
+    ("axisrooms", "AxisRooms", "axisrooms.com"),
+    ("e4jconnect", "E4jConnect", "e4jconnect.com"),
+    ("vikbooking", "VikBooking", "vikbooking.com"),
+    ("apaleo", "Apaleo", "apaleo.com"),
+    ("clock-software", "Clock PMS", "clock-software.com"),
+    ("clock-pms", "Clock PMS", "clock-pms.com"),
+    ("protel", "Protel", "protel.net"),
+    ("frontdeskanywhere", "Frontdesk Anywhere", "frontdeskanywhere.com"),
+    ("hoteltime", "HotelTime", "hoteltime.com"),
+    ("stayntouch", "StayNTouch", "stayntouch.com"),
+    ("roomcloud", "RoomCloud", "roomcloud.net"),
+    ("oaky", "Oaky", "oaky.com"),
+    ("revinate", "Revinate", "revinate.com"),
+    ("escapia", "Escapia", "escapia.com"),
+    ("liverez", "LiveRez", "liverez.com"),
+    ("barefoot", "Barefoot", "barefoot.com"),
+    ("trackhs", "Track", "trackhs.com"),
+    ("igms", "iGMS", "igms.com"),
+    ("smoobu", "Smoobu", "smoobu.com"),
+    ("tokeet", "Tokeet", "tokeet.com"),
+    ("365villas", "365Villas", "365villas.com"),
+    ("rentalsunited", "Rentals United", "rentalsunited.com"),
+    ("bookingsync", "BookingSync", "bookingsync.com"),
+    ("janiis", "JANIIS", "janiis.com"),
+    ("quibblerm", "Quibble", "quibblerm.com"),
+    ("hirum", "HiRUM", "hirum.com.au"),
+    ("ibooked", "iBooked", "ibooked.net.au"),
+    ("seekom", "Seekom", "seekom.com"),
+    ("respax", "ResPax", "respax.com"),
+    ("bookingcenter", "BookingCenter", "bookingcenter.com"),
+    ("rezexpert", "RezExpert", "rezexpert.com"),
+    ("supercontrol", "SuperControl", "supercontrol.co.uk"),
+    ("anytimebooking", "Anytime Booking", "anytimebooking.eu"),
+    ("elinapms", "Elina PMS", "elinapms.com"),
+    ("guestline", "Guestline", "guestline.com"),
+    ("nonius", "Nonius", "nonius.com"),
+    ("visualmatrix", "Visual Matrix", "visualmatrix.com"),
+    ("autoclerk", "AutoClerk", "autoclerk.com"),
+    ("msisolutions", "MSI", "msisolutions.com"),
+    ("skytouch", "SkyTouch", "skytouch.com"),
+    ("roomkeypms", "RoomKeyPMS", "roomkeypms.com"),
 ]
 
-# Non-hotel name keywords to skip
-SKIP_NON_HOTEL_NAMES = [
-    # Medical - use specific terms to avoid matching "hospitality"
-    "pharmacy", "hospital ", "clinic", "medical center", "dental", "urgent care",
-    "doctor", "physician", "healthcare", "health center", "laboratory",
-    # Retail
-    "publix", "walmart", "target", "cvs", "walgreens", "kroger", "whole foods",
-    "costco", "safeway", "albertsons", "rite aid", "dollar general", "dollar tree",
-    "warby parker", "eyewear", "optical", "mattress",
-    # Restaurants (generic food terms)
-    "restaurant", "grill", "sushi", "pizza", "taco", "burrito", "bbq", "barbecue",
-    "steakhouse", "seafood", "buffet", "diner", "bakery", "deli", "cafe",
-    "bistro", "eatery", "cantina", "brewery", "bar & grill",
-    "ramen", "noodle", "pho", "wings", "wingstop", "hot pot",
-    "korean bbq", "hibachi", "teriyaki", "shawarma", "falafel", "kebab",
-    # Restaurants (chains)
-    "mcdonald's", "starbucks", "subway", "domino's", "pizza hut", "burger king",
-    "chipotle", "taco bell", "kfc", "wendy's", "dunkin", "chick-fil-a",
-    "papa john's", "sonic drive", "arby's", "popeyes", "five guys",
-    "olive garden", "applebee", "chili's", "ihop", "denny's", "waffle house",
-    "cracker barrel", "outback", "longhorn", "red lobster", "texas roadhouse",
-    "buffalo wild wings", "hooters", "carrabba", "bonefish", "cheesecake factory",
-    "pf chang", "benihana", "shake shack", "in-n-out", "whataburger",
-    "jack in the box", "hardee", "carl's jr", "krispy kreme", "baskin",
-    "cold stone", "dairy queen", "culver's",
-    # Banks
-    "bank of america", "chase bank", "wells fargo", "citibank", "us bank",
-    "credit union", "atm", "pnc bank", "td bank", "capital one",
-    "western union", "moneygram", "payday loan",
-    # Home / Electronics
-    "home depot", "lowe's", "best buy", "apple store", "microsoft store",
-    "ace hardware", "menards", "harbor freight",
-    # Telecom
-    "at&t", "verizon", "t-mobile", "xfinity", "spectrum", "cricket wireless",
-    # Shipping
-    "ups store", "fedex office", "post office", "usps",
-    # Gas / Auto
-    "gas station", "chevron", "exxon", "shell gas", "bp gas", "mobil", "speedway",
-    "wawa", "sheetz", "racetrac", "quiktrip", "circle k", "7-eleven",
-    "autozone", "o'reilly auto", "advance auto", "jiffy lube", "valvoline",
-    # Religious / Educational
-    "church", "temple", "mosque", "synagogue", "chapel",
-    "school", "university", "college", "academy", "seminary",
-    # Fitness / Recreation
-    "gym", "fitness", "planet fitness", "la fitness", "24 hour fitness",
-    "ymca", "ywca", "crossfit", "orangetheory", "equinox", "anytime fitness",
-    # Storage / Services
-    "storage", "self storage", "public storage", "u-haul", "extra space",
-    "laundromat", "dry cleaner", "car wash",
-    # Personal services
-    "salon", "nail", "tattoo", "piercing", "barbershop",
-    # Pet services
-    "pet", "grooming", "doggy", "veterinar", "animal clinic",
-    # Childcare
-    "daycare", "childcare", "preschool", "kindergarten", "learning center",
-    # Real estate (not accommodation) - removed "apartment" (apartment hotels are legit)
-    "condo for sale", "real estate", "realty", "property management",
-    # Entertainment (not accommodation)
-    "museum", "gallery", "library", "zoo", "aquarium", "stadium",
-    "theater", "theatre", "cinema", "concert hall", "arena", "bowling", "arcade",
-    "escape room", "trampoline", "skating rink", "mini golf", "laser tag",
-    # Government
-    "government", "city hall", "courthouse", "police department", "fire station",
-    "dmv", "social security", "irs",
-    # Car rental
-    "enterprise rent", "hertz", "avis", "budget car", "national car",
-    "sixt", "rent a car", "car rental",
-    # Senior Living (not short-term accommodation)
-    "senior living", "assisted living", "nursing home",
-    "retirement community", "memory care", "eldercare",
-    # Construction/Services
-    "exteriors", "roofing", "plumbing", "electric", "hvac", "landscaping",
-    "construction", "contractor", "remodeling", "renovation",
-    # Coffee/Food misc
-    "coffee", "bagel", "donut", "smoothie", "juice bar", "ice cream",
-    "frozen yogurt", "cupcake", "cookie",
+# (keyword, engine_name) - plain substring fallback for _detect_from_html
+SIMPLE_HTML_KEYWORDS = [
+    ("cloudbeds", "Cloudbeds"),
+    ("synxis", "SynXis / TravelClick"),
+    ("mews.com", "Mews"),
+    ("siteminder", "SiteMinder"),
+    ("littlehotelier", "Little Hotelier"),
+    ("webrezpro", "WebRezPro"),
+    ("resnexus", "ResNexus"),
+    ("freetobook", "FreeToBook"),
+    ("beds24", "Beds24"),
+    ("checkfront", "Checkfront"),
+    ("lodgify", "Lodgify"),
+    ("eviivo", "eviivo"),
+    ("ipms247", "JEHS / iPMS"),
 ]
 
-
-def is_non_hotel_name(name: str) -> bool:
-    """Check if name indicates a non-hotel business."""
-    if not name:
-        return False
-    name_lower = name.lower()
-    return any(keyword in name_lower for keyword in SKIP_NON_HOTEL_NAMES)
-
-
-def is_non_hotel_domain(url: str) -> bool:
-    """Check if URL is a non-hotel business domain."""
-    if not url:
-        return False
-    url_lower = url.lower()
-    return any(domain in url_lower for domain in SKIP_NON_HOTEL_DOMAINS)
+# Compiled once at import; list order is priority order
+_HTML_KEYWORD_MATCHER = PatternMatcher(
+    ((kw, (engine_name, domain)) for kw, engine_name, domain in HTML_KEYWORD_PATTERNS),
+    suffix=r"[./\-]",
+)
+_SIMPLE_KEYWORD_MATCHER = PatternMatcher(SIMPLE_HTML_KEYWORDS)
 
 
-def is_junk_domain(url: str) -> bool:
-    """Check if URL is a junk domain that should be skipped."""
-    if not url:
-        return True
-    url_lower = url.lower()
-    return any(junk in url_lower for junk in SKIP_JUNK_DOMAINS)
+# Booking URLs on these domains are not booking engines (social, OTAs, search)
+JUNK_BOOKING_DOMAINS = [
+    "facebook.com", "instagram.com", "twitter.com", "youtube.com",
+    "linkedin.com", "yelp.com", "tripadvisor.com", "google.com",
+    "booking.com", "expedia.com", "hotels.com", "airbnb.com", "vrbo.com",
+]
 
 
 # =============================================================================
@@ -250,6 +264,10 @@ class DetectionResult(BaseModel):
     room_count: str = ""
     detected_location: str = ""  # Location extracted from website content
     error: str = ""
+    domain: str = ""  # extract_domain(website), key for the domain cache
+    cutoff_stage: str = ""  # Stage skipped or interrupted by the per-hotel time budget
+    stage_timings: Dict[str, int] = {}  # Stage name -> wall-clock ms spent on this hotel
+    pattern_version: int = Field(default_factory=get_engine_pattern_version)  # Engine patterns used (at creation)
 
 
 # =============================================================================
@@ -268,6 +286,14 @@ def extract_domain(url: str) -> str:
         return ""
 
 
+def is_junk_booking_url(url: str) -> bool:
+    """Check if a booking URL points at social media, an OTA or search."""
+    if not url:
+        return False
+    booking_domain = extract_domain(url)
+    return any(junk in booking_domain for junk in JUNK_BOOKING_DOMAINS)
+
+
 def normalize_url(url: str) -> str:
     """Ensure URL has https:// prefix."""
     url = (url or "").strip()
@@ -278,27 +304,39 @@ def normalize_url(url: str) -> str:
     return url
 
 
-async def http_precheck(url: str, timeout: float = 3.0) -> Tuple[bool, str]:
-    """Quick HTTP check before launching Playwright."""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-    }
-    try:
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+}
+
+
+async def http_precheck(
+    url: str,
+    timeout: float = 3.0,
+    client: Optional[httpx.AsyncClient] = None,
+) -> Tuple[bool, str]:
+    """Quick HTTP check before launching Playwright.
+
+    Pass a shared client (see batch_precheck) to reuse pooled connections.
+    """
+    if client is None:
         async with httpx.AsyncClient(
-            timeout=timeout, follow_redirects=True, verify=False, headers=headers
-        ) as client:
-            try:
-                resp = await client.head(url)
-                # Some servers reject HEAD, fall back to GET
-                if resp.status_code == 405:
-                    resp = await client.get(url)
-            except httpx.HTTPStatusError:
-                resp = await client.get(url)
-            if resp.status_code >= 400:
-                return (False, f"HTTP {resp.status_code}")
-            return (True, "")
+            timeout=timeout, follow_redirects=True, verify=False, headers=HTTP_HEADERS
+        ) as own_client:
+            return await http_precheck(url, timeout, own_client)
+
+    try:
+        try:
+            resp = await client.head(url, timeout=timeout)
+            # Some servers reject HEAD, fall back to GET
+            if resp.status_code == 405:
+                resp = await client.get(url, timeout=timeout)
+        except httpx.HTTPStatusError:
+            resp = await client.get(url, timeout=timeout)
+        if resp.status_code >= 400:
+            return (False, f"HTTP {resp.status_code}")
+        return (True, "")
     except httpx.TimeoutException:
         return (False, "timeout")
     except httpx.ConnectError:
@@ -307,17 +345,44 @@ async def http_precheck(url: str, timeout: float = 3.0) -> Tuple[bool, str]:
         return (False, str(e)[:50])
 
 
-async def batch_precheck(urls: List[Tuple[int, str]], concurrency: int = 20) -> Dict[int, Tuple[bool, str]]:
-    """Check multiple URLs in parallel. Returns dict of hotel_id -> (reachable, error)."""
+def is_dead_domain_error(error: str) -> bool:
+    """Whether a precheck error means the site is down rather than blocking us.
+
+    Connection/DNS errors, timeouts and HTTP 5xx are worth remembering across
+    runs; 4xx responses (bot walls, missing pages) are not.
+    """
+    return error in ("connection_refused", "timeout") or error.startswith("HTTP 5")
+
+
+async def batch_precheck(
+    urls: List[Tuple[int, str]],
+    concurrency: int = 20,
+    per_host_limit: int = 4,
+) -> Dict[int, Tuple[bool, str]]:
+    """Check multiple URLs in parallel. Returns dict of hotel_id -> (reachable, error).
+
+    All checks share one pooled client (keep-alive, cached DNS); per_host_limit
+    caps concurrent requests to any single host.
+    """
     semaphore = asyncio.Semaphore(concurrency)
+    host_semaphores: Dict[str, asyncio.Semaphore] = {}
 
-    async def check_one(hotel_id: int, url: str) -> Tuple[int, bool, str]:
-        async with semaphore:
-            reachable, error = await http_precheck(url)
+    async def check_one(client: httpx.AsyncClient, hotel_id: int, url: str) -> Tuple[int, bool, str]:
+        host = extract_domain(url)
+        host_semaphore = host_semaphores.setdefault(host, asyncio.Semaphore(per_host_limit))
+        async with host_semaphore, semaphore:
+            reachable, error = await http_precheck(url, client=client)
             return (hotel_id, reachable, error)
 
-    tasks = [check_one(hid, url) for hid, url in urls]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Schedule same-host URLs back to back so their keep-alive connections
+    # are reused before the pool evicts them
+    ordered = sorted(urls, key=lambda item: extract_domain(item[1]))
+
+    # Headroom over concurrency keeps idle keep-alive connections from being
+    # evicted while other hosts are in flight
+    async with create_pooled_client(max_connections=concurrency * 2, headers=HTTP_HEADERS) as client:
+        tasks = [check_one(client, hid, url) for hid, url in ordered]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
 
     output = {}
     for r in results:
@@ -341,10 +406,10 @@ class EngineDetector:
         """Check if domain matches a known booking engine."""
         if not domain:
             return ("", "")
-        for engine_name, patterns in get_engine_patterns().items():
-            for pat in patterns:
-                if pat in domain:
-                    return (engine_name, pat)
+        hit = get_engine_matcher().search(domain)
+        if hit:
+            pat, engine_name = hit
+            return (engine_name, pat)
         return ("", "")
 
     @staticmethod
@@ -353,11 +418,10 @@ class EngineDetector:
         if not url:
             return ("unknown", "", "no_url")
 
-        url_lower = url.lower()
-        for engine_name, patterns in get_engine_patterns().items():
-            for pat in patterns:
-                if pat in url_lower:
-                    return (engine_name, pat, "url_pattern_match")
+        hit = get_engine_matcher().search(url)
+        if hit:
+            pat, engine_name = hit
+            return (engine_name, pat, "url_pattern_match")
 
         domain = extract_domain(url)
         if not domain:
@@ -410,6 +474,14 @@ class EngineDetector:
 # CONTACT EXTRACTION
 # =============================================================================
 
+class ContactInfo(BaseModel):
+    """Contacts, room count and location extracted from one page."""
+    phones: List[str] = []
+    emails: List[str] = []
+    room_count: str = ""
+    location: str = ""
+
+
 class ContactExtractor:
     """Extracts phone numbers, emails, and room count from HTML."""
 
@@ -434,51 +506,540 @@ class ContactExtractor:
         'wixpress.com', 'schema.org', '.png', '.jpg', '.gif'
     ]
 
+    # Compiled once. Room patterns run on lowercased text, so no IGNORECASE.
+    _PHONE_RES = [re.compile(p) for p in PHONE_PATTERNS]
+    _EMAIL_RE = re.compile(EMAIL_PATTERN)
+    _SKIP_EMAIL_RE = re.compile("|".join(re.escape(p) for p in SKIP_EMAIL_PATTERNS))
+    _PHONE_CLEAN_RE = re.compile(r'[^\d+]')
+    # (pattern, literal every match contains) - patterns whose literal is
+    # absent from the page are skipped
+    _ROOM_COUNT_RES = [
+        (re.compile(p), "room" if i < 5 else "")
+        for i, p in enumerate(ROOM_COUNT_PATTERNS)
+    ]
+
+    # Phone matches consist only of these characters, so they can only occur
+    # inside a run of them. A number that survives cleaning needs 9+ digits.
+    _PHONE_RUN_RE = re.compile(r'[\d+\-.\s()]{10,}')
+    _PHONE_MIN_DIGITS = 9
+    # Characters an email match can contain (local part, @, domain)
+    _EMAIL_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._%+-@")
+
+    MAX_RESULTS = 3
+
+    @classmethod
+    def extract_all(cls, text: str, html: str = "", html_lower: Optional[str] = None) -> ContactInfo:
+        """Extract phones, emails, room count and location in one call.
+
+        Text is lowercased once and shared by the room count and location
+        scans; pass html_lower if the caller already has it (PageSnapshot).
+        """
+        text = text or ""
+        text_lower = text.lower()
+        if html_lower is None:
+            html_lower = html.lower() if html else ""
+        return ContactInfo(
+            phones=cls.extract_phones(text),
+            emails=cls.extract_emails(text),
+            room_count=cls._room_count_from_lower(text_lower),
+            location=LocationExtractor.extract_location_lower(text_lower, html_lower),
+        )
+
     @classmethod
     def extract_phones(cls, html: str) -> List[str]:
         """Extract phone numbers from HTML."""
-        phones = []
-        for pattern in cls.PHONE_PATTERNS:
-            phones.extend(re.findall(pattern, html))
+        # Same matches, in the same order, as findall over the whole document
+        found: List[List[str]] = [[] for _ in cls._PHONE_RES]
+        for run in cls._PHONE_RUN_RE.finditer(html or ""):
+            chunk = run.group()
+            if sum(ch.isdigit() for ch in chunk) < cls._PHONE_MIN_DIGITS:
+                continue
+            for matches, pattern in zip(found, cls._PHONE_RES):
+                matches.extend(pattern.findall(chunk))
+
         seen = set()
         cleaned = []
-        for p in phones:
-            p = re.sub(r'[^\d+]', '', p)
-            if len(p) >= 10 and p not in seen:
-                seen.add(p)
-                cleaned.append(p)
-        return cleaned[:3]
+        for matches in found:
+            for p in matches:
+                p = cls._PHONE_CLEAN_RE.sub('', p)
+                if len(p) >= 10 and p not in seen:
+                    seen.add(p)
+                    cleaned.append(p)
+                    if len(cleaned) == cls.MAX_RESULTS:
+                        return cleaned
+        return cleaned
 
     @classmethod
     def extract_emails(cls, html: str) -> List[str]:
         """Extract email addresses from HTML."""
-        matches = re.findall(cls.EMAIL_PATTERN, html)
+        seen = set()
         filtered = []
-        for email in matches:
-            email_lower = email.lower()
-            if not any(skip in email_lower for skip in cls.SKIP_EMAIL_PATTERNS):
-                if email_lower not in [e.lower() for e in filtered]:
-                    filtered.append(email)
-        return filtered[:3]
+        for run in cls._email_runs(html or ""):
+            for email in cls._EMAIL_RE.findall(run):
+                email_lower = email.lower()
+                if email_lower in seen or cls._SKIP_EMAIL_RE.search(email_lower):
+                    continue
+                seen.add(email_lower)
+                filtered.append(email)
+                if len(filtered) == cls.MAX_RESULTS:
+                    return filtered
+        return filtered
+
+    @classmethod
+    def _email_runs(cls, text: str):
+        """Yield maximal runs of email characters around each '@'."""
+        chars = cls._EMAIL_CHARS
+        n = len(text)
+        end = 0
+        at = text.find('@')
+        while at != -1:
+            start = at
+            while start > end and text[start - 1] in chars:
+                start -= 1
+            end = at + 1
+            while end < n and text[end] in chars:
+                end += 1
+            yield text[start:end]
+            at = text.find('@', end)
 
     @classmethod
     def extract_room_count(cls, text: str) -> str:
         """Extract number of rooms from text."""
-        text_lower = text.lower()
+        return cls._room_count_from_lower((text or "").lower())
 
-        for pattern in cls.ROOM_COUNT_PATTERNS:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            for match in matches:
-                try:
-                    count = int(match)
-                    # Sanity check: room count should be reasonable (1-2000)
-                    if 1 <= count <= 2000:
-                        return str(count)
-                except ValueError:
-                    continue
+    @classmethod
+    def _room_count_from_lower(cls, text_lower: str) -> str:
+        for pattern, literal in cls._ROOM_COUNT_RES:
+            if literal and literal not in text_lower:
+                continue
+            for match in pattern.finditer(text_lower):
+                count = int(match.group(1))
+                # Sanity check: room count should be reasonable (1-2000)
+                if 1 <= count <= 2000:
+                    return str(count)
         return ""
 
 
+# =============================================================================
+# HTML ANALYSIS - Pure functions shared by the static tier and the browser
+# =============================================================================
+
+_HTML_ATTR_URL_RE = re.compile(r'(?:src|href|data-src|action)=["\']?(https?://[^"\'\s>]+)', re.IGNORECASE)
+_HTML_JS_URL_RE = re.compile(r'["\']?(https?://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}[^"\'\s]*)["\']?')
+_ANCHOR_HREF_RE = re.compile(r'<a\s[^>]*?href\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.IGNORECASE)
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style|noscript)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'[ \t\r\f\v]+')
+
+# Booking-link heuristics for extract_booking_links (static tier and PageSnapshot)
+BOOKING_LINK_PATTERNS = [
+    '/book', '/checkout', '/reserve', '/availability', 'booking=', 'checkin=',
+    '/enquiry', '/inquiry', '/rooms', '/stay', '/accommodation',
+]
+BOOKING_LINK_ENGINES = [
+    'synxis', 'cloudbeds', 'lodgify', 'freetobook', 'mews.', 'siteminder', 'thebookingbutton',
+    'webrezpro', 'resnexus', 'beds24', 'checkfront', 'eviivo', 'ipms247', 'asiwebres', 'thinkreservations',
+    'bookdirect', 'rezstream', 'fareharbor', 'newbook', 'roomraccoon', 'hostaway', 'guesty', 'staydirectly',
+    'rentrax', 'bookingmood', 'seekda', 'profitroom', 'avvio', 'simplotel', 'hotelrunner', 'amenitiz',
+]
+BOOKING_LINK_JUNK = [
+    'terms', 'conditions', 'policy', 'privacy', 'faq', 'about', 'appraisal',
+    'cancellation', 'facebook', 'twitter', 'instagram',
+]
+BOOKING_LINK_FALLBACK = ['/property/', '/listing/', '/unit/', '/rental/']
+# Booking page: link text (incl. aria-label/title) and junk for external booking URLs
+EXTERNAL_BOOKING_TEXT = ['book', 'reserve', 'availability', 'check avail', 'enquire', 'inquire']
+EXTERNAL_BOOKING_JUNK = [
+    'terms', 'conditions', 'policy', 'privacy', 'faq', 'facebook', 'instagram', 'twitter',
+    'sevenrooms', 'opentable', 'resy.com',
+]
+
+
+def extract_html_domains(html: str) -> Set[str]:
+    """Lowercased domains of all absolute URLs embedded in raw HTML."""
+    if not html:
+        return set()
+
+    found_urls = _HTML_ATTR_URL_RE.findall(html)
+    found_urls.extend(_HTML_JS_URL_RE.findall(html))
+
+    domains_found = set()
+    for url in found_urls:
+        domain = extract_domain(url)
+        if domain:
+            domains_found.add(domain.lower())
+    return domains_found
+
+
+def match_html_engines(domains: Set[str], html_lower: str) -> Tuple[str, str]:
+    """Match engine patterns against embedded domains, then static keywords.
+
+    Takes precomputed inputs so a PageSnapshot can reuse them across stages.
+    Returns (engine_name, domain).
+    """
+    # One scan over all extracted domains (newline can't occur in a pattern)
+    hit = get_engine_matcher().search("\n".join(domains))
+    if hit:
+        pat, engine_name = hit
+        return (engine_name, pat)
+
+    kw_hit = _HTML_KEYWORD_MATCHER.search(html_lower)
+    if kw_hit:
+        return kw_hit[1]
+
+    return ("", "")
+
+
+def scan_html_for_engines(html: str) -> Tuple[str, str]:
+    """Scan raw HTML for booking engine patterns.
+
+    Checks domains of URLs embedded in the HTML against the engine patterns,
+    then falls back to static keyword patterns. Returns (engine_name, domain).
+    """
+    if not html:
+        return ("", "")
+    return match_html_engines(extract_html_domains(html), html.lower())
+
+
+def html_to_text(html: str) -> str:
+    """Approximate document.body.innerText for static HTML."""
+    if not html:
+        return ""
+    text = _SCRIPT_STYLE_RE.sub(" ", html)
+    text = _TAG_RE.sub("\n", text)
+    text = unescape(text)
+    return _WHITESPACE_RE.sub(" ", text)
+
+
+def extract_booking_links(html: str, base_url: str, hotel_domain: str) -> List[Dict]:
+    """Find candidate booking links in raw HTML (static tier).
+
+    Returns dicts with href, isExternal and domain keys.
+    """
+    hrefs = []
+    for m in _ANCHOR_HREF_RE.finditer(html or ""):
+        raw = unescape((m.group(1) or m.group(2) or m.group(3) or "").strip())
+        if not raw or raw.startswith(("#", "javascript:", "mailto:", "tel:")):
+            continue
+        hrefs.append(urljoin(base_url, raw))
+    return filter_booking_links(hrefs, hotel_domain)
+
+
+def filter_booking_links(hrefs: List[str], hotel_domain: str) -> List[Dict]:
+    """Keep the absolute URLs that look like booking links.
+
+    Shared by extract_booking_links (raw HTML) and the browser stages, which
+    get hrefs already resolved from a PageSnapshot probe.
+    Returns dicts with href, isExternal and domain keys.
+    """
+    def to_item(href: str) -> Optional[Dict]:
+        link_domain = extract_domain(href)
+        if not link_domain:
+            return None
+        return {"href": href, "isExternal": link_domain != hotel_domain, "domain": link_domain}
+
+    results = []
+    for href in hrefs:
+        href_lower = href.lower()
+        if not href_lower.startswith("http"):
+            continue
+        if any(j in href_lower for j in BOOKING_LINK_JUNK):
+            continue
+        matches_pattern = any(p in href_lower for p in BOOKING_LINK_PATTERNS)
+        is_known_engine = any(e in href_lower for e in BOOKING_LINK_ENGINES)
+        if not matches_pattern and not is_known_engine:
+            continue
+        item = to_item(href)
+        if item:
+            results.append(item)
+
+    # Fallback: property/listing links
+    if not results:
+        for href in hrefs:
+            href_lower = href.lower()
+            if any(p in href_lower for p in BOOKING_LINK_FALLBACK):
+                item = to_item(href)
+                if item:
+                    results.append(item)
+
+    return results
+
+
+def pick_booking_url(candidates: List[Dict]) -> str:
+    """Pick the best booking link: known engine > external > same domain."""
+    best_url = ""
+    best_priority = -1
+    matcher = get_engine_matcher()
+
+    for item in candidates:
+        if matcher.contains(item['domain']):
+            priority = 3
+        elif item['isExternal']:
+            priority = 2
+        else:
+            priority = 1
+
+        if priority > best_priority:
+            best_priority = priority
+            best_url = item['href']
+
+    return best_url
+
+
+# =============================================================================
+# PAGE SNAPSHOT - One DOM capture shared by all stages of a page state
+# =============================================================================
+
+# Collects everything the browser stages read from the DOM in one evaluate:
+# HTML, text, booking button candidates (tagged with data-probe so they can be
+# clicked without re-querying), links with their visible/aria/title text,
+# iframe/script srcs, form actions and tel:/mailto: links. URLs are resolved.
+PAGE_PROBE_SCRIPT = """() => {
+    const bookingTerms = ['book', 'reserve', 'availability', 'check rates', 'rooms', 'stay', 'inquire', 'enquire', 'rates', 'pricing', 'get started', 'plan your'];
+    const excludeTerms = ['facebook', 'twitter', 'instagram', 'spa ', 'conference', 'wedding', 'restaurant', 'careers', 'terms', 'conditions', 'privacy', 'policy', 'contact', 'about', 'faq', 'gallery', 'reviews', 'gift', 'shop', 'store', 'blog', 'news', 'press'];
+    const bookingEngineUrls = ['synxis', 'cloudbeds', 'ipms247', 'windsurfercrs', 'travelclick',
+        'webrezpro', 'resnexus', 'thinkreservations', 'asiwebres', 'book-direct', 'bookdirect',
+        'reservations', 'booking', 'mews.', 'little-hotelier', 'siteminder', 'thebookingbutton',
+        'triptease', 'homhero', 'streamlinevrs', 'freetobook', 'eviivo', 'beds24', 'checkfront',
+        'lodgify', 'hostaway', 'guesty', 'staydirectly', 'rentrax', 'bookingmood', 'seekda',
+        'profitroom', 'avvio', 'simplotel', 'hotelrunner', 'amenitiz', 'newbook', 'roomraccoon',
+        'rezstream', 'fareharbor', 'hirum', 'seekom', 'escapia', 'liverez', 'trackhs'];
+    const resolve = (u) => { try { return new URL(u, location.href).href; } catch (e) { return ''; } };
+    const out = {
+        url: location.href,
+        html: document.documentElement ? document.documentElement.outerHTML : '',
+        text: document.body ? document.body.innerText : '',
+        candidates: [], links: [], iframes: [], scripts: [], forms: [], tel: [], mailto: [],
+    };
+
+    // Booking button candidates, priority-scored
+    document.querySelectorAll('[data-probe]').forEach(el => el.removeAttribute('data-probe'));
+    const currentDomain = location.hostname.replace('www.', '');
+    const elements = document.querySelectorAll('a, button, input[type="submit"], input[type="button"], [role="button"], [onclick], li[onclick], div[onclick], span[onclick], [class*="book"], [class*="reserve"], [class*="btn"], [class*="button"], [class*="cta"]');
+    const candidates = [];
+    for (const el of elements) {
+        const tag = el.tagName.toLowerCase();
+        if (['script', 'style', 'svg', 'path', 'meta', 'link', 'head', 'noscript', 'template'].includes(tag)) continue;
+
+        const text = (el.innerText || el.textContent || el.value || '').toLowerCase().trim();
+        const href = (typeof el.href === 'string' ? el.href : el.getAttribute('href') || '').toLowerCase();
+        const rect = el.getBoundingClientRect();
+
+        if (rect.width === 0 || rect.height === 0) continue;
+        if (rect.width > 600 || rect.height > 150) continue;
+        if (rect.width < 20 || rect.height < 15) continue;
+        if (excludeTerms.some(term => href.includes(term) || text.includes(term))) continue;
+
+        let isExternal = false;
+        let linkDomain = '';
+        if (href.startsWith('http')) {
+            try {
+                linkDomain = new URL(href).hostname.replace('www.', '');
+                isExternal = linkDomain !== currentDomain;
+            } catch(e) {}
+        }
+
+        let priority = bookingEngineUrls.some(url => href.includes(url)) ? 0 : 99;
+        if (priority > 1 && isExternal) {
+            if (text.includes('book') || text.includes('reserve') || text.includes('availability')) {
+                priority = 1;
+            }
+        }
+        if (priority > 2) {
+            if (text.includes('book now') || text.includes('book a stay') || text.includes('reserve now') || text.includes('book direct')) {
+                priority = isExternal ? 1 : 2;
+            } else if ((text.includes('book') || text.includes('reserve')) && text.length < 30) {
+                priority = isExternal ? 2 : 3;
+            } else if (text.includes('availability') || text.includes('check rates') || text.includes('rooms')) {
+                priority = isExternal ? 2 : 4;
+            }
+        }
+
+        if (priority < 99) {
+            const probeId = String(candidates.length);
+            el.setAttribute('data-probe', probeId);
+            candidates.push({
+                probeId: probeId,
+                tag: tag,
+                text: text.substring(0, 40),
+                href: href.substring(0, 200),
+                fullHref: (typeof el.href === 'string' ? el.href : '') || el.getAttribute('href') || '',
+                id: el.id || '',
+                priority: priority + Math.floor(text.length / 15),
+                isExternal: isExternal,
+                linkDomain: linkDomain,
+            });
+        }
+        if (candidates.length >= 20) break;
+    }
+    candidates.sort((a, b) => a.priority - b.priority);
+    out.candidates = candidates.slice(0, 10);
+
+    // Links (document order), tel: and mailto:
+    for (const a of document.querySelectorAll('a[href]')) {
+        const href = a.href;
+        if (typeof href !== 'string') continue;
+        if (href.startsWith('tel:')) {
+            const phone = href.replace('tel:', '').replace(/[^0-9+()-]/g, '');
+            if (phone.length >= 10) out.tel.push(phone);
+        } else if (href.startsWith('mailto:')) {
+            const email = href.replace('mailto:', '').split('?')[0];
+            if (email.includes('@')) out.mailto.push(email);
+        } else if (href.startsWith('http') && out.links.length < 2000) {
+            const text = [a.innerText || a.textContent || '', a.getAttribute('aria-label') || '', a.getAttribute('title') || '']
+                .join(' ').toLowerCase().trim();
+            out.links.push({href: href, text: text.substring(0, 120)});
+        }
+    }
+
+    for (const f of document.querySelectorAll('iframe')) {
+        const src = resolve(f.getAttribute('src') || f.getAttribute('data-src') || f.getAttribute('data-lazy-src') || '');
+        if (src.startsWith('http')) out.iframes.push(src);
+    }
+    for (const s of document.scripts) {
+        if (s.src) out.scripts.push(s.src);
+    }
+    for (const f of document.querySelectorAll('form[action]')) {
+        const action = resolve(f.getAttribute('action'));
+        if (action.startsWith('http')) out.forms.push(action);
+    }
+    return out;
+}"""
+
+_EMPTY_PROBE: Dict = {
+    "url": "", "html": "", "text": "",
+    "candidates": [], "links": [], "iframes": [], "scripts": [], "forms": [], "tel": [], "mailto": [],
+}
+
+
+class PageSnapshot:
+    """Lazily probed DOM of a page, reused until the page navigates.
+
+    One PAGE_PROBE_SCRIPT evaluate returns everything the stages read from
+    the DOM (HTML, text, button candidates, links, frames, scripts, forms,
+    tel/mailto), so a page state costs one CDP round trip however many
+    stages look at it. Derived forms (lowercased HTML, embedded domains) are
+    memoized too. Main-frame navigations invalidate it automatically; call
+    invalidate() after in-place DOM changes (e.g. a click that opens a widget).
+    """
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.captures = 0  # Probe round trips, for debugging/tests
+        self._reset()
+        page.on("framenavigated", self._on_navigated)
+
+    def _reset(self) -> None:
+        self._url: Optional[str] = None
+        self._probe: Optional[Dict] = None
+        self._html_lower: Optional[str] = None
+        self._domains: Optional[Set[str]] = None
+
+    def _on_navigated(self, frame) -> None:
+        if frame == self.page.main_frame:
+            self._reset()
+
+    def invalidate(self) -> None:
+        """Drop cached content; the next access re-reads the DOM."""
+        self._reset()
+
+    def _check_url(self) -> None:
+        # Belt and braces for navigations the event didn't report
+        url = self.page.url
+        if self._url != url:
+            self._reset()
+            self._url = url
+
+    async def probe(self) -> Dict:
+        """The PAGE_PROBE_SCRIPT payload for the current page state."""
+        self._check_url()
+        if self._probe is None:
+            payload = await self.page.evaluate(PAGE_PROBE_SCRIPT) or {}
+            self._probe = {**_EMPTY_PROBE, **{k: v for k, v in payload.items() if v is not None}}
+            self.captures += 1
+        return self._probe
+
+    async def html(self) -> str:
+        return (await self.probe())["html"]
+
+    async def html_lower(self) -> str:
+        html = await self.html()
+        if self._html_lower is None:
+            self._html_lower = html.lower()
+        return self._html_lower
+
+    async def text(self) -> str:
+        return (await self.probe())["text"]
+
+    async def domains(self) -> Set[str]:
+        """Domains of absolute URLs embedded in the HTML."""
+        html = await self.html()
+        if self._domains is None:
+            self._domains = extract_html_domains(html)
+        return self._domains
+
+    async def scan_engines(self) -> Tuple[str, str]:
+        """scan_html_for_engines() over the snapshot."""
+        if not await self.html():
+            return ("", "")
+        return match_html_engines(await self.domains(), await self.html_lower())
+
+
+class EngineRequestWatcher:
+    """Records a page's request hosts and spots known engines as they go out.
+
+    Each new host is matched against the engine index from the request
+    listener itself, so a hotel that frames a Cloudbeds or SynXis booking
+    page is identified while the page is still loading instead of after
+    every HTML/click stage has run.
+
+    Only a conclusive match sets the engine and `found`: a document
+    navigation (the page or an iframe loading the engine), or any request
+    to an engine in definitive_engines. A script or XHR to an engine host
+    can be a shared asset, so on its own it is left to the later stages
+    (it is still in `hosts` for the network fallback). `navigation` tells
+    whether engine_url is a page a guest could book on.
+    """
+
+    NAVIGATION_TYPES = ("document",)  # Playwright resource type of page and iframe loads
+
+    def __init__(self, page: Page, definitive_engines: Tuple[str, ...] = ()):
+        self.hosts: Dict[str, str] = {}  # host -> first URL, for EngineDetector.from_network
+        self.definitive_engines = set(definitive_engines)
+        self.engine = ""
+        self.engine_host = ""
+        self.engine_url = ""
+        self.navigation = False
+        self.found = asyncio.Event()
+        page.on("request", self._on_request)
+
+    def _on_request(self, request) -> None:
+        try:
+            url = request.url
+            host = extract_domain(url)
+            if not host:
+                return
+            navigation = getattr(request, "resource_type", "") in self.NAVIGATION_TYPES
+            seen = host in self.hosts
+            if not seen:
+                self.hosts[host] = url
+            # A navigation to an already-seen engine host still upgrades an asset match
+            if self.navigation or (seen and not navigation):
+                return
+            engine_name, _ = EngineDetector.from_domain(host)
+            if not engine_name:
+                return
+            if navigation:
+                self.engine, self.engine_host, self.engine_url = engine_name, host, url
+                self.navigation = True
+                self.found.set()
+            elif not self.engine and engine_name in self.definitive_engines:
+                self.engine, self.engine_host, self.engine_url = engine_name, host, url
+                self.found.set()
+        except Exception:
+            pass
+
+
 # =============================================================================
 # BOOKING BUTTON FINDER
 # =============================================================================
@@ -494,8 +1055,8 @@ class BookingButtonFinder:
         if self.config.debug:
             logger.debug(msg)
 
-    async def _dismiss_popups(self, page: Page) -> None:
-        """Try to dismiss cookie consent and other popups."""
+    async def _dismiss_popups(self, page: Page) -> bool:
+        """Try to dismiss cookie consent and other popups. Returns True if one was clicked."""
         self._log("    [COOKIES] Trying to dismiss popups...")
 
         dismiss_selectors = [
@@ -534,11 +1095,12 @@ class BookingButtonFinder:
                         self._log(f"    [COOKIES] Clicking: {selector}")
                         await btn.click(timeout=1000)
                         await asyncio.sleep(0.5)
-                        return
+                        return True
             except Exception:
                 continue
 
         self._log("    [COOKIES] No popup found to dismiss")
+        return False
 
     async def _debug_page_elements(self, page: Page) -> None:
         """Log all buttons and prominent links on the page for debugging."""
@@ -575,164 +1137,32 @@ class BookingButtonFinder:
         except Exception as e:
             self._log(f"    [DEBUG] Error getting page elements: {e}")
 
-    async def find_candidates(self, page: Page, max_candidates: int = 5) -> List:
-        """Find booking button candidates using JavaScript with priority scoring."""
-        import time
+    async def find_candidates(self, snapshot: PageSnapshot, max_candidates: int = 5) -> List[Dict]:
+        """Booking button candidates from the page probe, best first.
 
+        Each item is the probe's candidate dict plus a "locator" for the
+        element (tagged data-probe by the probe script, so no re-query).
+        """
         self._log("    [FIND] Searching for booking buttons...")
-        t0 = time.time()
-
-        # Priority-based JS button finder
-        js_result = await page.evaluate("""() => {
-            const bookingTerms = ['book', 'reserve', 'availability', 'check rates', 'rooms', 'stay', 'inquire', 'enquire', 'rates', 'pricing', 'get started', 'plan your'];
-            const excludeTerms = ['facebook', 'twitter', 'instagram', 'spa ', 'conference', 'wedding', 'restaurant', 'careers', 'terms', 'conditions', 'privacy', 'policy', 'contact', 'about', 'faq', 'gallery', 'reviews', 'gift', 'shop', 'store', 'blog', 'news', 'press'];
-            const bookingEngineUrls = ['synxis', 'cloudbeds', 'ipms247', 'windsurfercrs', 'travelclick',
-                'webrezpro', 'resnexus', 'thinkreservations', 'asiwebres', 'book-direct', 'bookdirect',
-                'reservations', 'booking', 'mews.', 'little-hotelier', 'siteminder', 'thebookingbutton',
-                'triptease', 'homhero', 'streamlinevrs', 'freetobook', 'eviivo', 'beds24', 'checkfront',
-                'lodgify', 'hostaway', 'guesty', 'staydirectly', 'rentrax', 'bookingmood', 'seekda',
-                'profitroom', 'avvio', 'simplotel', 'hotelrunner', 'amenitiz', 'newbook', 'roomraccoon',
-                'rezstream', 'fareharbor', 'hirum', 'seekom', 'escapia', 'liverez', 'trackhs'];
-            const results = [];
-            const currentDomain = window.location.hostname.replace('www.', '');
-
-            const elements = document.querySelectorAll('a, button, input[type="submit"], input[type="button"], [role="button"], [onclick], li[onclick], div[onclick], span[onclick], [class*="book"], [class*="reserve"], [class*="btn"], [class*="button"], [class*="cta"]');
-
-            for (const el of elements) {
-                const tag = el.tagName.toLowerCase();
-                if (['script', 'style', 'svg', 'path', 'meta', 'link', 'head', 'noscript', 'template'].includes(tag)) continue;
-
-                const text = (el.innerText || el.textContent || el.value || '').toLowerCase().trim();
-                const href = (typeof el.href === 'string' ? el.href : el.getAttribute('href') || '').toLowerCase();
-                const rect = el.getBoundingClientRect();
-
-                if (rect.width === 0 || rect.height === 0) continue;
-                if (rect.width > 600 || rect.height > 150) continue;
-                if (rect.width < 20 || rect.height < 15) continue;
-
-                let isExcluded = false;
-                for (const term of excludeTerms) {
-                    if (href.includes(term) || text.includes(term)) {
-                        isExcluded = true;
-                        break;
-                    }
-                }
-                if (isExcluded) continue;
-
-                let isExternal = false;
-                let linkDomain = '';
-                if (href.startsWith('http')) {
-                    try {
-                        linkDomain = new URL(href).hostname.replace('www.', '');
-                        isExternal = linkDomain !== currentDomain;
-                    } catch(e) {}
-                }
-
-                // Priority scoring
-                let priority = 99;
-                for (const url of bookingEngineUrls) {
-                    if (href.includes(url)) {
-                        priority = 0;
-                        break;
-                    }
-                }
-
-                if (priority > 1 && isExternal) {
-                    if (text.includes('book') || text.includes('reserve') || text.includes('availability')) {
-                        priority = 1;
-                    }
-                }
-
-                if (priority > 2) {
-                    if (text.includes('book now') || text.includes('book a stay') || text.includes('reserve now') || text.includes('book direct')) {
-                        priority = isExternal ? 1 : 2;
-                    } else if ((text.includes('book') || text.includes('reserve')) && text.length < 30) {
-                        priority = isExternal ? 2 : 3;
-                    } else if (text.includes('availability') || text.includes('check rates') || text.includes('rooms')) {
-                        priority = isExternal ? 2 : 4;
-                    }
-                }
-
-                if (priority < 99) {
-                    const lengthPenalty = Math.floor(text.length / 15);
-                    results.push({
-                        tag: el.tagName.toLowerCase(),
-                        text: text.substring(0, 40),
-                        href: href.substring(0, 200),
-                        fullHref: el.href || el.getAttribute('href') || '',
-                        classes: (el.className || '').substring(0, 100),
-                        id: el.id || '',
-                        priority: priority + lengthPenalty,
-                        isExternal: isExternal,
-                        linkDomain: linkDomain,
-                        x: rect.x,
-                        y: rect.y
-                    });
-                }
-
-                if (results.length >= 20) break;
-            }
-
-            results.sort((a, b) => a.priority - b.priority);
-            return results.slice(0, 10);
-        }""")
-
-        self._log(f"    [FIND] Found {len(js_result)} candidates in {time.time()-t0:.1f}s")
-
+        probe = await snapshot.probe()
         candidates = []
-        for item in js_result:
-            try:
-                loc = None
-
-                # Strategy 1: Find by ID (most reliable)
-                if item.get('id'):
-                    loc = page.locator(f"#{item['id']}").first
-                    if await loc.count() > 0:
-                        candidates.append(loc)
-                        self._log(f"    [FIND] ✓ #{item['id']}: '{item['text'][:25]}'")
-                        continue
-
-                # Strategy 2: Find by href
-                if item.get('href') and item['href'].startswith('http'):
-                    loc = page.locator(f"a[href='{item['href']}']").first
-                    if await loc.count() > 0:
-                        candidates.append(loc)
-                        self._log(f"    [FIND] ✓ href: '{item['text'][:25]}'")
-                        continue
-
-                # Strategy 3: Find by text content
-                text_clean = item['text'][:25].replace("'", "\\'").replace('"', '\\"')
-                if text_clean:
-                    loc = page.locator(f"//*[self::a or self::button or self::div or self::span or self::li or self::input or self::label][contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{text_clean}')]").first
-                    if await loc.count() > 0:
-                        candidates.append(loc)
-                        self._log(f"    [FIND] ✓ text: '{item['text'][:25]}'")
-                        continue
-
-                # Strategy 4: Find by position (last resort)
-                if item.get('x') and item.get('y'):
-                    loc = page.locator(f"{item['tag']}").first
-                    if await loc.count() > 0:
-                        candidates.append(loc)
-                        self._log(f"    [FIND] ✓ tag: {item['tag']} '{item['text'][:25]}'")
-
-            except Exception as e:
-                self._log(f"    [FIND] Error: {e}")
-                continue
-
-            if len(candidates) >= max_candidates:
-                break
+        for item in probe["candidates"][:max_candidates]:
+            item = {**item, "locator": snapshot.page.locator(f"[data-probe='{item['probeId']}']").first}
+            candidates.append(item)
+            self._log(f"    [FIND] ✓ {item['tag']} '{item['text'][:25]}' (priority {item['priority']})")
 
         if not candidates:
             self._log("    [FIND] No booking buttons found")
-            await self._debug_page_elements(page)
-
         return candidates
 
-    async def click_and_navigate(self, context: BrowserContext, page: Page) -> Tuple:
+    async def click_and_navigate(
+        self, context: BrowserContext, page: Page, snapshot: Optional[PageSnapshot] = None
+    ) -> Tuple:
         """Click booking button and return (page, url, method, network_urls)."""
-        await self._dismiss_popups(page)
-        candidates = await self.find_candidates(page)
+        snapshot = snapshot or PageSnapshot(page)
+        if await self._dismiss_popups(page):
+            snapshot.invalidate()
+        candidates = await self.find_candidates(snapshot)
 
         self._log(f"    [CLICK] Found {len(candidates)} candidates")
 
@@ -740,14 +1170,10 @@ class BookingButtonFinder:
             await self._debug_page_elements(page)
             return (None, None, "no_booking_button_found", {})
 
-        el = candidates[0]
-
-        try:
-            el_text = (await asyncio.wait_for(el.text_content(), timeout=2.0) or "").strip()
-            el_href = await asyncio.wait_for(el.get_attribute("href"), timeout=2.0) or ""
-        except asyncio.TimeoutError:
-            el_text = ""
-            el_href = ""
+        best = candidates[0]
+        el = best["locator"]
+        el_text = best["text"]
+        el_href = best["fullHref"]
 
         # Check if external
         is_external = ""
@@ -871,6 +1297,75 @@ class BookingButtonFinder:
         return None
 
 
+# =============================================================================
+# TIME BUDGET - Per-hotel deadline shared by all stages
+# =============================================================================
+
+class BudgetExhausted(Exception):
+    """Raised when a stage runs into the per-hotel deadline."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"budget exhausted during {stage}")
+        self.stage = stage
+
+
+class HotelBudget:
+    """Wall-clock deadline for one hotel, drawn down by each stage.
+
+    Stages cap their own timeouts and sleeps at the time left, and optional
+    fallbacks check can_afford() before starting. budget_ms <= 0 disables
+    the deadline.
+    """
+
+    def __init__(self, budget_ms: int):
+        self.budget_ms = budget_ms
+        self._loop = asyncio.get_running_loop()
+        self._deadline = self._loop.time() + budget_ms / 1000 if budget_ms > 0 else None
+        self.cutoff_stage = ""
+
+    def remaining_ms(self) -> float:
+        if self._deadline is None:
+            return float("inf")
+        return max(0.0, (self._deadline - self._loop.time()) * 1000)
+
+    def expired(self) -> bool:
+        return self.remaining_ms() <= 0
+
+    def can_afford(self, stage: str, reserve_ms: int) -> bool:
+        """True if at least reserve_ms is left; otherwise record stage as cut off."""
+        if self.remaining_ms() >= reserve_ms:
+            return True
+        self.cutoff_stage = self.cutoff_stage or stage
+        return False
+
+    def timeout_ms(self, stage_timeout_ms: int) -> int:
+        """A stage's own timeout, capped at the time left (Playwright ms)."""
+        return max(1, int(min(stage_timeout_ms, self.remaining_ms())))
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(min(seconds, self.remaining_ms() / 1000))
+
+    async def run(self, stage: str, awaitable):
+        """Await a stage, cancelling it at the deadline.
+
+        Raises BudgetExhausted (and records the stage) if the deadline is hit.
+        """
+        if self._deadline is None:
+            return await awaitable
+        if self.expired():
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            self.cutoff_stage = self.cutoff_stage or stage
+            raise BudgetExhausted(stage)
+        try:
+            return await asyncio.wait_for(awaitable, timeout=self.remaining_ms() / 1000)
+        except asyncio.TimeoutError:
+            if not self.expired():
+                raise  # The stage's own timeout, not ours
+            self.cutoff_stage = self.cutoff_stage or stage
+            raise BudgetExhausted(stage)
+
+
 # =============================================================================
 # HOTEL PROCESSOR - Main detection logic
 # =============================================================================
@@ -878,18 +1373,28 @@ class BookingButtonFinder:
 class HotelProcessor:
     """Processes a single hotel: visits site, detects engine, extracts contacts."""
 
-    def __init__(self, config: DetectionConfig, browser: Browser, semaphore: asyncio.Semaphore, context_queue: asyncio.Queue):
+    def __init__(
+        self,
+        config: DetectionConfig,
+        pool: BrowserPool,
+        semaphore: Union[asyncio.Semaphore, AdaptiveLimiter],
+    ):
         self.config = config
-        self.browser = browser
+        self.pool = pool
         self.semaphore = semaphore
         self.button_finder = BookingButtonFinder(config)
-        self.context_queue = context_queue
 
     def _log(self, msg: str) -> None:
         """Log message if debug is enabled."""
         if self.config.debug:
             logger.debug(msg)
 
+    def _stage_done(self, result: DetectionResult, stage: str, t0: float) -> None:
+        """Record a stage's wall-clock time (perf_counter start t0) on the result."""
+        ms = int((time.perf_counter() - t0) * 1000)
+        result.stage_timings[stage] = result.stage_timings.get(stage, 0) + ms
+        self._log(f"  [TIME] {stage}: {ms / 1000:.1f}s")
+
     async def process(
         self,
         hotel_id: int,
@@ -929,8 +1434,7 @@ class HotelProcessor:
 
         # Skip junk domains (unless already checked)
         if not skip_precheck:
-            website_lower = website.lower()
-            if any(junk in website_lower for junk in SKIP_JUNK_DOMAINS):
+            if is_junk_domain(website):
                 result.error = "junk_domain"
                 return result
 
@@ -941,8 +1445,12 @@ class HotelProcessor:
                 result.error = f"precheck_failed: {precheck_error}"
                 return result
 
+        t0 = time.perf_counter()
         async with self.semaphore:
+            self._stage_done(result, "slot_wait", t0)
             result = await self._process_website(website, result, expected_city)
+            if isinstance(self.semaphore, AdaptiveLimiter) and (result.error == "timeout" or result.cutoff_stage):
+                self.semaphore.record_timeout()
 
         return result
 
@@ -953,44 +1461,52 @@ class HotelProcessor:
         expected_city: str = "",
     ) -> DetectionResult:
         """Visit website and extract all data."""
-        import time
+        t0 = time.perf_counter()
+        async with self.pool.acquire() as context:
+            self._stage_done(result, "context_acquire", t0)
+            t0 = time.perf_counter()
+            result = await self._process_in_context(context, website, result, expected_city)
+            self._stage_done(result, "browser_total", t0)
 
-        context = await self.context_queue.get()
-        page = await context.new_page()
+        if self.config.pause_between_hotels > 0:
+            await asyncio.sleep(self.config.pause_between_hotels)
 
-        homepage_network: Dict[str, str] = {}
+        return result
 
-        def capture_homepage_request(request):
-            try:
-                url = request.url
-                host = extract_domain(url)
-                if host and host not in homepage_network:
-                    homepage_network[host] = url
-            except Exception:
-                pass
+    async def _process_in_context(
+        self,
+        context: BrowserContext,
+        website: str,
+        result: DetectionResult,
+        expected_city: str = "",
+    ) -> DetectionResult:
+        """Run all detection stages for one website in a pooled context.
 
-        page.on("request", capture_homepage_request)
+        Every stage draws from one HotelBudget. If the homepage can't be
+        loaded within it the hotel fails with budget_exceeded; later cutoffs
+        keep whatever earlier stages found and set result.cutoff_stage.
+        """
+        budget = HotelBudget(self.config.hotel_budget_ms)
+        page = await context.new_page()
+        snapshot = PageSnapshot(page)
+        network = EngineRequestWatcher(page, self.config.network_definitive_engines)
+        homepage_network = network.hosts
 
         try:
             # 1. Load homepage
-            t0 = time.time()
-            try:
-                await page.goto(website, timeout=self.config.timeout_page_load, wait_until="domcontentloaded")
-            except PWTimeoutError:
-                try:
-                    await page.goto(website, timeout=15000, wait_until="commit")
-                except Exception:
-                    pass
-            self._log(f"  [TIME] goto: {time.time()-t0:.1f}s")
+            t0 = time.perf_counter()
+            aborted = await self._load_homepage(page, website, budget, network)
+            self._stage_done(result, "goto", t0)
 
-            await asyncio.sleep(0.5)  # Reduced from 1.5s
+            if not aborted:
+                await budget.sleep(0.5)  # Reduced from 1.5s
             hotel_domain = extract_domain(page.url)
             self._log(f"  Loaded: {hotel_domain}")
 
             # 2. Extract contacts and location
-            t0 = time.time()
-            result = await self._extract_contacts(page, result)
-            self._log(f"  [TIME] contacts: {time.time()-t0:.1f}s")
+            t0 = time.perf_counter()
+            result = await budget.run("contacts", self._extract_contacts(snapshot, result))
+            self._stage_done(result, "contacts", t0)
 
             # 3. Check location filter - skip engine detection if mismatch
             if expected_city and result.detected_location:
@@ -998,36 +1514,72 @@ class HotelProcessor:
                     self._log(f"  [LOCATION] Mismatch: detected '{result.detected_location}' != expected '{expected_city}' - skipping engine detection")
                     result.error = "location_mismatch"
                     await page.close()
-                    await self.context_queue.put(context)
                     return result
 
-            engine_name = ""
-            engine_domain = ""
-            booking_url = ""
-            click_method = ""
+        except BudgetExhausted as e:
+            result.error = f"budget_exceeded: {e.stage}"
+            result.cutoff_stage = e.stage
+            self._log(f"  [BUDGET] ✗ Out of time during {e.stage}")
+            await page.close()
+            return result
+        except PWTimeoutError:
+            result.error = "timeout"
+            self._log("  ERROR: timeout")
+            await page.close()
+            return result
+        except Exception as e:
+            error_msg = str(e).replace('\n', ' ').replace('\r', '')[:100]
+            result.error = f"exception: {error_msg}"
+            self._log(f"  ERROR: {e}")
+            await page.close()
+            return result
+
+        engine_name = ""
+        engine_domain = ""
+        booking_url = ""
+        click_method = ""
+
+        # A conclusive engine request during the load settles the engine. A
+        # navigation also gives the booking URL and stages 4-9 all skip
+        # themselves; an asset request from a definitive engine doesn't, so
+        # the button click still runs to find one
+        if self.config.network_early_exit and network.engine:
+            self._log(f"  [NETWORK] ✓ Engine request during page load: {network.engine} ({network.engine_host})")
+            engine_name = network.engine
+            engine_domain = network.engine_host
+            if network.navigation:
+                booking_url = network.engine_url
+            click_method = "network_early"
 
+        try:
             # 4. Quick scan homepage HTML for engine patterns
-            t0 = time.time()
-            html_engine, html_domain = await self._scan_html_for_engines(page)
-            self._log(f"  [TIME] homepage_html_scan: {time.time()-t0:.1f}s")
+            if not engine_name:
+                t0 = time.perf_counter()
+                html_engine, html_domain = await budget.run("homepage_html_scan", self._scan_html_for_engines(snapshot))
+                self._stage_done(result, "homepage_html_scan", t0)
 
-            if html_engine:
-                self._log(f"  [STAGE0] ✓ Found engine in homepage HTML: {html_engine}")
-                engine_name = html_engine
-                engine_domain = html_domain
-                click_method = "homepage_html_scan"
+                if html_engine:
+                    self._log(f"  [STAGE0] ✓ Found engine in homepage HTML: {html_engine}")
+                    engine_name = html_engine
+                    engine_domain = html_domain
+                    click_method = "homepage_html_scan"
 
-                # Try to get booking URL
-                booking_url = await self._find_booking_url_from_html(page, hotel_domain)
-                if booking_url:
-                    self._log(f"  [STAGE0] Sample booking URL: {booking_url[:60]}...")
+                    # Try to get booking URL
+                    booking_url = await budget.run("homepage_links", self._find_booking_url_from_html(snapshot, hotel_domain))
+                    if booking_url:
+                        self._log(f"  [STAGE0] Sample booking URL: {booking_url[:60]}...")
 
             # 5. Find booking URL via button click
-            if not engine_name or self._needs_fallback(engine_name) or not booking_url:
+            if (not engine_name or self._needs_fallback(engine_name) or not booking_url) and \
+                    budget.can_afford("button_click", self.config.budget_reserve_click_ms):
                 self._log(f"  [STAGE1] Looking for booking URL via button click...")
-                t0 = time.time()
-                button_url, button_method, click_network_urls = await self._find_booking_url(context, page, hotel_domain)
-                self._log(f"  [TIME] button_find: {time.time()-t0:.1f}s")
+                t0 = time.perf_counter()
+                button_url, button_method, click_network_urls = await budget.run(
+                    "button_click", self._find_booking_url(context, page, hotel_domain, snapshot)
+                )
+                self._stage_done(result, "button_find", t0)
+                # Clicks and popup dismissal can change the DOM without navigating
+                snapshot.invalidate()
 
                 if button_url:
                     booking_url = button_url
@@ -1047,18 +1599,19 @@ class HotelProcessor:
             result.detection_method = click_method
 
             # 6. Analyze booking page
-            if booking_url and self._needs_fallback(engine_name):
-                t0 = time.time()
-                engine_name, engine_domain, result = await self._analyze_booking_page(
-                    context, booking_url, hotel_domain, click_method, result
-                )
-                self._log(f"  [TIME] analyze_booking: {time.time()-t0:.1f}s")
-
-            # 7. FALLBACK: Check homepage network
+            if booking_url and self._needs_fallback(engine_name) and \
+                    budget.can_afford("booking_page", self.config.budget_reserve_booking_page_ms):
+                t0 = time.perf_counter()
+                engine_name, engine_domain, result = await budget.run("booking_page", self._analyze_booking_page(
+                    context, booking_url, hotel_domain, click_method, result, budget
+                ))
+                self._stage_done(result, "analyze_booking", t0)
+
+            # 7. FALLBACK: Check homepage network (in-memory, always affordable)
             if self._needs_fallback(engine_name):
-                t0 = time.time()
+                t0 = time.perf_counter()
                 net_engine, net_domain, _, net_url = EngineDetector.from_network(homepage_network, hotel_domain)
-                self._log(f"  [TIME] network_fallback: {time.time()-t0:.1f}s")
+                self._stage_done(result, "network_fallback", t0)
                 if net_engine and net_engine not in ("unknown_third_party",):
                     engine_name = net_engine
                     engine_domain = net_domain
@@ -1068,9 +1621,9 @@ class HotelProcessor:
 
             # 8. FALLBACK: Scan iframes
             if self._needs_fallback(engine_name):
-                t0 = time.time()
-                frame_engine, frame_domain, frame_url = await self._scan_frames(page)
-                self._log(f"  [TIME] frame_scan: {time.time()-t0:.1f}s")
+                t0 = time.perf_counter()
+                frame_engine, frame_domain, frame_url = await budget.run("frame_scan", self._scan_frames(snapshot))
+                self._stage_done(result, "frame_scan", t0)
                 if frame_engine:
                     engine_name = frame_engine
                     engine_domain = frame_domain
@@ -1080,36 +1633,16 @@ class HotelProcessor:
 
             # 9. FALLBACK: HTML keyword scan
             if self._needs_fallback(engine_name):
-                t0 = time.time()
-                html_engine = await self._detect_from_html(page)
-                self._log(f"  [TIME] html_detect: {time.time()-t0:.1f}s")
+                t0 = time.perf_counter()
+                html_engine = await budget.run("html_keyword", self._detect_from_html(snapshot))
+                self._stage_done(result, "html_detect", t0)
                 if html_engine:
                     engine_name = html_engine
                     result.detection_method += "+html_keyword"
 
-            result.booking_engine = engine_name or ""
-            result.booking_engine_domain = engine_domain
-
-            # Check for junk booking URLs
-            junk_booking_domains = [
-                "facebook.com", "instagram.com", "twitter.com", "youtube.com",
-                "linkedin.com", "yelp.com", "tripadvisor.com", "google.com",
-                "booking.com", "expedia.com", "hotels.com", "airbnb.com", "vrbo.com",
-            ]
-            if result.booking_url:
-                booking_domain = extract_domain(result.booking_url)
-                if any(junk in booking_domain for junk in junk_booking_domains):
-                    self._log(f"  Junk booking URL detected: {booking_domain}")
-                    result.booking_url = ""
-                    result.booking_engine = ""
-                    result.booking_engine_domain = ""
-                    result.error = "junk_booking_url"
-
-            # Note: no_booking_found is not an error - it's a valid outcome
-            # Don't set result.error for this case
-
-            self._log(f"  Engine: {result.booking_engine} ({result.booking_engine_domain or 'n/a'})")
-
+        except BudgetExhausted as e:
+            # Keep what earlier stages found
+            self._log(f"  [BUDGET] Out of time during {e.stage}, using results so far")
         except PWTimeoutError:
             result.error = "timeout"
             self._log("  ERROR: timeout")
@@ -1119,306 +1652,152 @@ class HotelProcessor:
             self._log(f"  ERROR: {e}")
         finally:
             await page.close()
-            await self.context_queue.put(context)
 
-        if self.config.pause_between_hotels > 0:
-            await asyncio.sleep(self.config.pause_between_hotels)
+        if budget.cutoff_stage:
+            result.cutoff_stage = budget.cutoff_stage
+            self._log(f"  [BUDGET] Cut off at {budget.cutoff_stage} ({self.config.hotel_budget_ms}ms budget)")
+        if result.error:
+            return result
+
+        if not result.booking_url and booking_url:
+            result.booking_url = booking_url
+        if not result.detection_method and click_method:
+            result.detection_method = click_method
+
+        result.booking_engine = engine_name or ""
+        result.booking_engine_domain = engine_domain
+
+        # Check for junk booking URLs
+        if is_junk_booking_url(result.booking_url):
+            self._log(f"  Junk booking URL detected: {extract_domain(result.booking_url)}")
+            result.booking_url = ""
+            result.booking_engine = ""
+            result.booking_engine_domain = ""
+            result.error = "junk_booking_url"
+
+        # Note: no_booking_found is not an error - it's a valid outcome
+        # Don't set result.error for this case. A cut-off run that found
+        # nothing is inconclusive though, not "no engine".
+        if result.cutoff_stage and not result.booking_engine and not result.error:
+            result.error = f"budget_exceeded: {result.cutoff_stage}"
 
+        self._log(f"  Engine: {result.booking_engine} ({result.booking_engine_domain or 'n/a'})")
         return result
 
+    async def _goto_homepage(self, page: Page, website: str, budget: HotelBudget) -> None:
+        try:
+            await budget.run("homepage_load", page.goto(
+                website, timeout=budget.timeout_ms(self.config.timeout_page_load), wait_until="domcontentloaded"
+            ))
+        except PWTimeoutError:
+            try:
+                await budget.run("homepage_load", page.goto(
+                    website, timeout=budget.timeout_ms(15000), wait_until="commit"
+                ))
+            except BudgetExhausted:
+                raise
+            except Exception:
+                pass
+
+    async def _load_homepage(
+        self, page: Page, website: str, budget: HotelBudget, network: EngineRequestWatcher
+    ) -> bool:
+        """Load the homepage; returns True if the load was cut short by an engine request.
+
+        Without network_early_abort (or early exit) this is a plain goto.
+        Otherwise the goto races the watcher and, if a conclusive engine request wins,
+        the load is stopped and the page is used as far as it got.
+        """
+        if not (self.config.network_early_exit and self.config.network_early_abort):
+            await self._goto_homepage(page, website, budget)
+            return False
+
+        load = asyncio.ensure_future(self._goto_homepage(page, website, budget))
+        found = asyncio.ensure_future(network.found.wait())
+        try:
+            await asyncio.wait({load, found}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            found.cancel()
+            if not load.done():
+                load.cancel()
+                await asyncio.wait({load})
+        if not load.cancelled():
+            load.result()  # Re-raise BudgetExhausted and friends
+            return False
+
+        self._log(f"  [NETWORK] Stopping homepage load at {network.engine} request")
+        try:
+            await asyncio.wait_for(page.evaluate("window.stop()"), timeout=1.0)
+        except Exception:
+            pass
+        return True
+
     def _needs_fallback(self, engine_name: str) -> bool:
         """Check if we need to try fallback detection."""
         return engine_name in ("", "unknown", "unknown_third_party", "proprietary_or_same_domain")
 
-    async def _extract_contacts(self, page: Page, result: DetectionResult) -> DetectionResult:
+    async def _extract_contacts(self, snapshot: PageSnapshot, result: DetectionResult) -> DetectionResult:
         """Extract phone, email, room count, and location from page."""
         try:
-            text = await page.evaluate("document.body ? document.body.innerText : ''")
-            html = await page.evaluate("document.documentElement.outerHTML")
-            phones = ContactExtractor.extract_phones(text)
-            emails = ContactExtractor.extract_emails(text)
-            room_count = ContactExtractor.extract_room_count(text)
-            location = LocationExtractor.extract_location(text, html)
-
-            if phones:
-                result.phone_website = phones[0]
-            if emails:
-                result.email = emails[0]
-            if room_count:
-                result.room_count = room_count
-            if location:
-                result.detected_location = location
-                self._log(f"  [LOCATION] Detected: {location}")
-
-            # Also extract from tel: and mailto: links
-            if not result.phone_website:
-                try:
-                    tel_links = await page.evaluate("""
-                        () => Array.from(document.querySelectorAll('a[href^="tel:"]'))
-                            .map(a => a.href.replace('tel:', '').replace(/[^0-9+()-]/g, ''))
-                            .filter(p => p.length >= 10)
-                    """)
-                    if tel_links:
-                        result.phone_website = tel_links[0]
-                except Exception:
-                    pass
-
-            if not result.email:
-                try:
-                    mailto_links = await page.evaluate("""
-                        () => Array.from(document.querySelectorAll('a[href^="mailto:"]'))
-                            .map(a => a.href.replace('mailto:', '').split('?')[0])
-                            .filter(e => e.includes('@'))
-                    """)
-                    if mailto_links:
-                        result.email = mailto_links[0]
-                except Exception:
-                    pass
+            text = await snapshot.text()
+            contacts = ContactExtractor.extract_all(text, html_lower=await snapshot.html_lower())
+
+            if contacts.phones:
+                result.phone_website = contacts.phones[0]
+            if contacts.emails:
+                result.email = contacts.emails[0]
+            if contacts.room_count:
+                result.room_count = contacts.room_count
+            if contacts.location:
+                result.detected_location = contacts.location
+                self._log(f"  [LOCATION] Detected: {contacts.location}")
+
+            # Also extract from tel: and mailto: links (same probe, no extra round trip)
+            probe = await snapshot.probe()
+            if not result.phone_website and probe["tel"]:
+                result.phone_website = probe["tel"][0]
+            if not result.email and probe["mailto"]:
+                result.email = probe["mailto"][0]
 
         except Exception:
             pass
         return result
 
-    async def _scan_html_for_engines(self, page: Page) -> Tuple[str, str]:
+    async def _scan_html_for_engines(self, snapshot: PageSnapshot) -> Tuple[str, str]:
         """Scan page HTML for booking engine patterns."""
         try:
-            html = await page.evaluate("document.documentElement.outerHTML")
-            html_lower = html.lower()
-
-            # Extract URLs from HTML
-            url_pattern = r'(?:src|href|data-src|action)=["\']?(https?://[^"\'\s>]+)'
-            found_urls = re.findall(url_pattern, html, re.IGNORECASE)
-
-            js_url_pattern = r'["\']?(https?://[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}[^"\'\s]*)["\']?'
-            found_urls.extend(re.findall(js_url_pattern, html))
-
-            domains_found = set()
-            for url in found_urls:
-                domain = extract_domain(url)
-                if domain:
-                    domains_found.add(domain.lower())
-
-            for domain in domains_found:
-                for engine_name, patterns in get_engine_patterns().items():
-                    for pat in patterns:
-                        if pat.lower() in domain:
-                            self._log(f"    [HTML SCAN] Found domain '{domain}' -> {engine_name}")
-                            return (engine_name, pat)
-
-            # Full keyword patterns from original script
-            keyword_patterns = [
-                ("resortpro", "Streamline", "streamlinevrs.com"),
-                ("homhero", "HomHero", "homhero.com.au"),
-                ("cloudbeds", "Cloudbeds", "cloudbeds.com"),
-                ("freetobook", "FreeToBook", "freetobook.com"),
-                ("siteminder", "SiteMinder", "siteminder.com"),
-                ("thebookingbutton", "SiteMinder", "thebookingbutton.com"),
-                ("littlehotelier", "Little Hotelier", "littlehotelier.com"),
-                ("webrezpro", "WebRezPro", "webrezpro.com"),
-                ("resnexus", "ResNexus", "resnexus.com"),
-                ("beds24", "Beds24", "beds24.com"),
-                ("checkfront", "Checkfront", "checkfront.com"),
-                ("eviivo", "eviivo", "eviivo.com"),
-                ("lodgify", "Lodgify", "lodgify.com"),
-                ("newbook", "Newbook", "newbook.cloud"),
-                ("rmscloud", "RMS Cloud", "rmscloud.com"),
-                ("ipms247", "JEHS / iPMS", "ipms247.com"),
-                ("synxis", "SynXis / TravelClick", "synxis.com"),
-                ("mews.com", "Mews", "mews.com"),
-                ("triptease", "Triptease", "triptease.io"),
-                ("bookingmood", "BookingMood", "bookingmood.com"),
-                ("seekda", "Seekda / KUBE", "seekda.com"),
-                ("kube", "Seekda / KUBE", "seekda.com"),
-                ("ownerreservations", "OwnerReservations", "ownerreservations.com"),
-                ("guestroomgenie", "GuestRoomGenie", "guestroomgenie.com"),
-                ("beyondpricing", "Beyond Pricing", "beyondpricing.com"),
-                ("hotelkeyapp", "HotelKey", "hotelkeyapp.com"),
-                ("prenohq", "Preno", "prenohq.com"),
-                ("profitroom", "Profitroom", "profitroom.com"),
-                ("avvio", "Avvio", "avvio.com"),
-                ("netaffinity", "Net Affinity", "netaffinity.com"),
-                ("simplotel", "Simplotel", "simplotel.com"),
-                ("cubilis", "Cubilis", "cubilis.com"),
-                ("cendyn", "Cendyn", "cendyn.com"),
-                ("booklogic", "BookLogic", "booklogic.net"),
-                ("ratetiger", "RateTiger", "ratetiger.com"),
-                ("d-edge", "D-Edge", "d-edge.com"),
-                ("availpro", "D-Edge", "availpro.com"),
-                ("bookassist", "BookAssist", "bookassist.com"),
-                ("guestcentric", "GuestCentric", "guestcentric.com"),
-                ("verticalbooking", "Vertical Booking", "verticalbooking.com"),
-                ("busyrooms", "Busy Rooms", "busyrooms.com"),
-                ("myhotel.io", "myHotel.io", "myhotel.io"),
-                ("hotelspider", "HotelSpider", "hotelspider.com"),
-                ("staah", "Staah", "staah.com"),
-                ("axisrooms", "AxisRooms", "axisrooms.com"),
-                ("e4jconnect", "E4jConnect", "e4jconnect.com"),
-                ("vikbooking", "VikBooking", "vikbooking.com"),
-                ("apaleo", "Apaleo", "apaleo.com"),
-                ("clock-software", "Clock PMS", "clock-software.com"),
-                ("clock-pms", "Clock PMS", "clock-pms.com"),
-                ("protel", "Protel", "protel.net"),
-                ("frontdeskanywhere", "Frontdesk Anywhere", "frontdeskanywhere.com"),
-                ("hoteltime", "HotelTime", "hoteltime.com"),
-                ("stayntouch", "StayNTouch", "stayntouch.com"),
-                ("roomcloud", "RoomCloud", "roomcloud.net"),
-                ("oaky", "Oaky", "oaky.com"),
-                ("revinate", "Revinate", "revinate.com"),
-                ("escapia", "Escapia", "escapia.com"),
-                ("liverez", "LiveRez", "liverez.com"),
-                ("barefoot", "Barefoot", "barefoot.com"),
-                ("trackhs", "Track", "trackhs.com"),
-                ("igms", "iGMS", "igms.com"),
-                ("smoobu", "Smoobu", "smoobu.com"),
-                ("tokeet", "Tokeet", "tokeet.com"),
-                ("365villas", "365Villas", "365villas.com"),
-                ("rentalsunited", "Rentals United", "rentalsunited.com"),
-                ("bookingsync", "BookingSync", "bookingsync.com"),
-                ("janiis", "JANIIS", "janiis.com"),
-                ("quibblerm", "Quibble", "quibblerm.com"),
-                ("hirum", "HiRUM", "hirum.com.au"),
-                ("ibooked", "iBooked", "ibooked.net.au"),
-                ("seekom", "Seekom", "seekom.com"),
-                ("respax", "ResPax", "respax.com"),
-                ("bookingcenter", "BookingCenter", "bookingcenter.com"),
-                ("rezexpert", "RezExpert", "rezexpert.com"),
-                ("supercontrol", "SuperControl", "supercontrol.co.uk"),
-                ("anytimebooking", "Anytime Booking", "anytimebooking.eu"),
-                ("elinapms", "Elina PMS", "elinapms.com"),
-                ("guestline", "Guestline", "guestline.com"),
-                ("nonius", "Nonius", "nonius.com"),
-                ("visualmatrix", "Visual Matrix", "visualmatrix.com"),
-                ("autoclerk", "AutoClerk", "autoclerk.com"),
-                ("msisolutions", "MSI", "msisolutions.com"),
-                ("skytouch", "SkyTouch", "skytouch.com"),
-                ("roomkeypms", "RoomKeyPMS", "roomkeypms.com"),
-            ]
-
-            for keyword, engine_name, domain in keyword_patterns:
-                pattern = rf'{re.escape(keyword)}[\./\-]'
-                if re.search(pattern, html_lower):
-                    return (engine_name, domain)
-
-            return ("", "")
+            engine_name, pat = await snapshot.scan_engines()
+            if engine_name:
+                self._log(f"    [HTML SCAN] Found pattern '{pat}' -> {engine_name}")
+            return (engine_name, pat)
         except Exception:
             return ("", "")
 
-    async def _detect_from_html(self, page: Page) -> str:
+    async def _detect_from_html(self, snapshot: PageSnapshot) -> str:
         """Detect engine from page HTML keywords (fallback)."""
         try:
-            html = await page.evaluate("document.documentElement.outerHTML")
-            html_lower = html.lower()
-
-            # Simple keyword detection
-            simple_patterns = [
-                ("cloudbeds", "Cloudbeds"),
-                ("synxis", "SynXis / TravelClick"),
-                ("mews.com", "Mews"),
-                ("siteminder", "SiteMinder"),
-                ("littlehotelier", "Little Hotelier"),
-                ("webrezpro", "WebRezPro"),
-                ("resnexus", "ResNexus"),
-                ("freetobook", "FreeToBook"),
-                ("beds24", "Beds24"),
-                ("checkfront", "Checkfront"),
-                ("lodgify", "Lodgify"),
-                ("eviivo", "eviivo"),
-                ("ipms247", "JEHS / iPMS"),
-            ]
-
-            for keyword, engine_name in simple_patterns:
-                if keyword in html_lower:
-                    return engine_name
-
-            return ""
+            html_lower = await snapshot.html_lower()
+            hit = _SIMPLE_KEYWORD_MATCHER.search(html_lower)
+            return hit[1] if hit else ""
         except Exception:
             return ""
 
-    async def _find_booking_url_from_html(self, page: Page, hotel_domain: str) -> str:
-        """Find booking URL from HTML links."""
+    async def _find_booking_url_from_html(self, snapshot: PageSnapshot, hotel_domain: str) -> str:
+        """Find booking URL from the page's links and form actions."""
         try:
-            all_booking_urls = await page.evaluate("""
-                (hotelDomain) => {
-                    const links = document.querySelectorAll('a[href]');
-                    const bookingPatterns = ['/book', '/checkout', '/reserve', '/availability', 'booking=', 'checkin=', '/enquiry', '/inquiry', '/rooms', '/stay', '/accommodation'];
-                    const knownEngines = ['synxis', 'cloudbeds', 'lodgify', 'freetobook', 'mews.', 'siteminder', 'thebookingbutton',
-                        'webrezpro', 'resnexus', 'beds24', 'checkfront', 'eviivo', 'ipms247', 'asiwebres', 'thinkreservations',
-                        'bookdirect', 'rezstream', 'fareharbor', 'newbook', 'roomraccoon', 'hostaway', 'guesty', 'staydirectly',
-                        'rentrax', 'bookingmood', 'seekda', 'profitroom', 'avvio', 'simplotel', 'hotelrunner', 'amenitiz'];
-                    const junk = ['terms', 'conditions', 'policy', 'privacy', 'faq', 'about', 'appraisal', 'cancellation', 'facebook', 'twitter', 'instagram'];
-                    const results = [];
-
-                    for (const a of links) {
-                        const href = a.href;
-                        const hrefLower = href.toLowerCase();
-                        if (!href.startsWith('http')) continue;
-                        if (junk.some(j => hrefLower.includes(j))) continue;
-
-                        const matchesPattern = bookingPatterns.some(p => hrefLower.includes(p));
-                        const isKnownEngine = knownEngines.some(e => hrefLower.includes(e));
-                        if (!matchesPattern && !isKnownEngine) continue;
-
-                        try {
-                            const linkDomain = new URL(href).hostname.replace('www.', '');
-                            const isExternal = linkDomain !== hotelDomain;
-                            results.push({ href, isExternal, domain: linkDomain });
-                        } catch(e) {}
-                    }
-
-                    // Fallback: property/listing links
-                    if (results.length === 0) {
-                        for (const a of links) {
-                            const href = a.href;
-                            const hrefLower = href.toLowerCase();
-                            if (hrefLower.includes('/property/') || hrefLower.includes('/listing/') ||
-                                hrefLower.includes('/unit/') || hrefLower.includes('/rental/')) {
-                                try {
-                                    const linkDomain = new URL(href).hostname.replace('www.', '');
-                                    const isExternal = linkDomain !== hotelDomain;
-                                    results.push({ href, isExternal, domain: linkDomain });
-                                } catch(e) {}
-                            }
-                        }
-                    }
-                    return results;
-                }
-            """, hotel_domain)
-
-            if all_booking_urls:
-                best_url = None
-                best_priority = -1
-
-                for item in all_booking_urls:
-                    href = item['href']
-                    is_external = item['isExternal']
-                    link_domain = item['domain']
-
-                    is_known_engine = False
-                    for eng_name, patterns in get_engine_patterns().items():
-                        if any(pat in link_domain for pat in patterns):
-                            is_known_engine = True
-                            break
-
-                    if is_known_engine:
-                        priority = 3
-                    elif is_external:
-                        priority = 2
-                    else:
-                        priority = 1
-
-                    if priority > best_priority:
-                        best_priority = priority
-                        best_url = href
-
-                return best_url or ""
-
-            return ""
+            probe = await snapshot.probe()
+            hrefs = [link["href"] for link in probe["links"]] + probe["forms"]
+            return pick_booking_url(filter_booking_links(hrefs, hotel_domain))
         except Exception:
             return ""
 
-    async def _find_booking_url(self, context: BrowserContext, page: Page, hotel_domain: str) -> Tuple[str, str, Dict]:
+    async def _find_booking_url(
+        self, context: BrowserContext, page: Page, hotel_domain: str, snapshot: Optional[PageSnapshot] = None
+    ) -> Tuple[str, str, Dict]:
         """Find booking button and get the booking URL."""
-        booking_page, booking_url, method, click_network_urls = await self.button_finder.click_and_navigate(context, page)
+        booking_page, booking_url, method, click_network_urls = await self.button_finder.click_and_navigate(
+            context, page, snapshot
+        )
 
         if click_network_urls:
             self._log(f"  [WIDGET] Captured {len(click_network_urls)} network requests from click")
@@ -1438,11 +1817,14 @@ class HotelProcessor:
         return booking_url, method, click_network_urls
 
     async def _analyze_booking_page(self, context: BrowserContext, booking_url: str, hotel_domain: str,
-                                     click_method: str, result: DetectionResult) -> Tuple[str, str, DetectionResult]:
+                                     click_method: str, result: DetectionResult,
+                                     budget: Optional[HotelBudget] = None) -> Tuple[str, str, DetectionResult]:
         """Navigate to booking URL, sniff network, detect engine."""
+        budget = budget or HotelBudget(0)
         self._log(f"  Booking URL: {booking_url[:80]}...")
 
         page = await context.new_page()
+        snapshot = PageSnapshot(page)
         network_urls: Dict[str, str] = {}
         engine_name = ""
         engine_domain = ""
@@ -1459,11 +1841,11 @@ class HotelProcessor:
         page.on("request", capture_request)
 
         try:
-            await page.goto(booking_url, timeout=self.config.timeout_page_load, wait_until="domcontentloaded")
-            await asyncio.sleep(1.0)  # Reduced from 3.0s
+            await page.goto(booking_url, timeout=budget.timeout_ms(self.config.timeout_page_load), wait_until="domcontentloaded")
+            await budget.sleep(1.0)  # Reduced from 3.0s
 
             # Find external booking URL
-            external_booking_url = await self._find_external_booking_url(page, hotel_domain)
+            external_booking_url = await self._find_external_booking_url(snapshot, hotel_domain)
             if external_booking_url:
                 self._log(f"  [BOOKING PAGE] Found external URL: {external_booking_url[:60]}...")
                 result.booking_url = external_booking_url
@@ -1482,7 +1864,7 @@ class HotelProcessor:
 
             # Scan iframes
             if self._needs_fallback(engine_name):
-                frame_engine, frame_domain, frame_url = await self._scan_frames(page)
+                frame_engine, frame_domain, frame_url = await self._scan_frames(snapshot)
                 if frame_engine:
                     engine_name = frame_engine
                     engine_domain = frame_domain
@@ -1492,18 +1874,22 @@ class HotelProcessor:
 
             # Scan HTML
             if self._needs_fallback(engine_name):
-                html_engine, html_domain = await self._scan_html_for_engines(page)
+                html_engine, html_domain = await self._scan_html_for_engines(snapshot)
                 if html_engine:
                     engine_name = html_engine
                     engine_domain = html_domain
                     net_method = "html_source_scan"
 
             # Multi-step: try second button click
-            if self._needs_fallback(engine_name):
+            if self._needs_fallback(engine_name) and \
+                    budget.can_afford("second_click", self.config.budget_reserve_click_ms):
                 try:
                     if not page.is_closed():
                         self._log("  [MULTI-STEP] Trying second button click...")
-                        second_page, second_url, second_method, second_network = await self.button_finder.click_and_navigate(context, page)
+                        second_page, second_url, second_method, second_network = await self.button_finder.click_and_navigate(
+                            context, page, snapshot
+                        )
+                        snapshot.invalidate()
 
                         if second_url and second_url != booking_url:
                             self._log(f"  [MULTI-STEP] Found deeper URL: {second_url[:60]}...")
@@ -1522,10 +1908,10 @@ class HotelProcessor:
                             if self._needs_fallback(engine_name):
                                 try:
                                     if not page.is_closed():
-                                        await page.goto(second_url, timeout=self.config.timeout_page_load, wait_until="domcontentloaded")
-                                        await asyncio.sleep(0.5)  # Reduced from 2.0s
+                                        await page.goto(second_url, timeout=budget.timeout_ms(self.config.timeout_page_load), wait_until="domcontentloaded")
+                                        await budget.sleep(0.5)  # Reduced from 2.0s
 
-                                        html_engine, html_domain = await self._scan_html_for_engines(page)
+                                        html_engine, html_domain = await self._scan_html_for_engines(snapshot)
                                         if html_engine:
                                             engine_name = html_engine
                                             engine_domain = html_domain
@@ -1560,190 +1946,580 @@ class HotelProcessor:
 
         return engine_name, engine_domain, result
 
-    async def _find_external_booking_url(self, page: Page, hotel_domain: str) -> str:
+    async def _find_external_booking_url(self, snapshot: PageSnapshot, hotel_domain: str) -> str:
         """Find external booking URLs on the current page."""
         try:
-            return await page.evaluate("""
-                (hotelDomain) => {
-                    const links = document.querySelectorAll('a[href]');
-                    const bookingText = ['book', 'reserve', 'availability', 'check avail', 'enquire', 'inquire'];
-                    const junk = ['terms', 'conditions', 'policy', 'privacy', 'faq', 'facebook', 'instagram', 'twitter', 'sevenrooms', 'opentable', 'resy.com'];
-
-                    for (const a of links) {
-                        const href = a.href;
-                        if (!href || !href.startsWith('http')) continue;
-
-                        const text = (a.innerText || a.textContent || '').toLowerCase().trim();
-                        const ariaLabel = (a.getAttribute('aria-label') || '').toLowerCase();
-                        const title = (a.getAttribute('title') || '').toLowerCase();
-                        const combinedText = text + ' ' + ariaLabel + ' ' + title;
-
-                        if (!bookingText.some(t => combinedText.includes(t))) continue;
-                        if (junk.some(j => href.toLowerCase().includes(j) || combinedText.includes(j))) continue;
-
-                        try {
-                            const linkDomain = new URL(href).hostname.replace('www.', '');
-                            if (linkDomain !== hotelDomain) {
-                                return href;
-                            }
-                        } catch(e) {}
-                    }
-                    return '';
-                }
-            """, hotel_domain)
+            links = (await snapshot.probe())["links"]
         except Exception as e:
             self._log(f"  [BOOKING PAGE] Error scanning: {e}")
             return ""
+        for link in links:
+            href, text = link["href"], link["text"]
+            if not any(t in text for t in EXTERNAL_BOOKING_TEXT):
+                continue
+            href_lower = href.lower()
+            if any(j in href_lower or j in text for j in EXTERNAL_BOOKING_JUNK):
+                continue
+            link_domain = extract_domain(href)
+            if link_domain and link_domain != hotel_domain:
+                return href
+        return ""
 
-    async def _scan_frames(self, page: Page) -> Tuple[str, str, str]:
-        """Scan iframes for booking engine patterns."""
-        for frame in page.frames:
+    async def _scan_frames(self, snapshot: PageSnapshot) -> Tuple[str, str, str]:
+        """Scan iframes for booking engine patterns.
+
+        Loaded frames come from Playwright's frame tree (no round trip);
+        iframe srcs from the probe add lazy frames that haven't loaded yet.
+        """
+        frame_urls = []
+        for frame in snapshot.page.frames:
             try:
-                frame_url = frame.url
+                frame_urls.append(frame.url)
             except Exception:
                 continue
 
+        matcher = get_engine_matcher()
+        for frame_url in frame_urls:
             if not frame_url or frame_url.startswith("about:"):
                 continue
+            hit = matcher.search(frame_url)
+            if hit:
+                pat, engine_name = hit
+                return (engine_name, pat, frame_url)
 
-            for engine_name, patterns in get_engine_patterns().items():
-                for pat in patterns:
-                    if pat in frame_url.lower():
-                        return (engine_name, pat, frame_url)
+        try:
+            iframe_srcs = (await snapshot.probe())["iframes"]
+        except Exception:
+            return ("", "", "")
+        for src in iframe_srcs:
+            hit = matcher.search(src)
+            if hit:
+                pat, engine_name = hit
+                return (engine_name, pat, src)
 
         return ("", "", "")
 
 
+# =============================================================================
+# STATIC DETECTOR - HTTP-only first tier, no browser
+# =============================================================================
+
+_TEL_HREF_RE = re.compile(r'href\s*=\s*["\']tel:([^"\']+)["\']', re.IGNORECASE)
+_MAILTO_HREF_RE = re.compile(r'href\s*=\s*["\']mailto:([^"\'?]+)', re.IGNORECASE)
+
+# Don't scan absurdly large responses (file downloads, endless pages)
+STATIC_MAX_HTML_BYTES = 3_000_000
+
+
+class StaticDetector:
+    """Detects booking engines from the raw homepage HTML fetched with httpx.
+
+    A result is conclusive when the HTML names a known engine and links to a
+    booking URL - the same point at which the browser path stops after its
+    homepage HTML scan. Everything else is escalated to the browser.
+    """
+
+    def __init__(self, config: DetectionConfig):
+        self.config = config
+        self.timings: Dict[int, Dict[str, int]] = {}
+
+    def _log(self, msg: str) -> None:
+        """Log message if debug is enabled."""
+        if self.config.debug:
+            logger.debug(msg)
+
+    async def fetch(self, client: httpx.AsyncClient, website: str) -> Tuple[str, str]:
+        """GET the homepage. Returns (final_url, html); empty html on failure."""
+        try:
+            resp = await client.get(website, timeout=self.config.timeout_static_fetch)
+        except Exception as e:
+            self._log(f"  [STATIC] fetch failed for {website}: {str(e)[:60]}")
+            return ("", "")
+        content_type = resp.headers.get("content-type", "")
+        if resp.status_code >= 400 or (content_type and "html" not in content_type.lower()):
+            return ("", "")
+        if len(resp.content) > STATIC_MAX_HTML_BYTES:
+            return ("", "")
+        return (str(resp.url), resp.text)
+
+    def detect_from_html(
+        self,
+        hotel_id: int,
+        final_url: str,
+        html: str,
+        expected_city: str = "",
+    ) -> Tuple[DetectionResult, bool]:
+        """Run engine, contact and booking-link extraction on static HTML.
+
+        Returns (result, conclusive).
+        """
+        result = DetectionResult(hotel_id=hotel_id)
+        if not html:
+            return (result, False)
+
+        hotel_domain = extract_domain(final_url)
+        text = html_to_text(html)
+        html_lower = html.lower()
+
+        contacts = ContactExtractor.extract_all(text, html_lower=html_lower)
+        phones, emails = contacts.phones, contacts.emails
+        if phones:
+            result.phone_website = phones[0]
+        else:
+            tel_links = [re.sub(r'[^0-9+()-]', '', t) for t in _TEL_HREF_RE.findall(html)]
+            tel_links = [t for t in tel_links if len(t) >= 10]
+            if tel_links:
+                result.phone_website = tel_links[0]
+        if emails:
+            result.email = emails[0]
+        else:
+            mailto_links = [unescape(m).strip() for m in _MAILTO_HREF_RE.findall(html) if "@" in m]
+            if mailto_links:
+                result.email = mailto_links[0]
+        result.room_count = contacts.room_count
+        result.detected_location = contacts.location
+
+        if expected_city and result.detected_location:
+            if not LocationExtractor.location_matches(result.detected_location, expected_city):
+                self._log(f"  [STATIC] Location mismatch: '{result.detected_location}' != '{expected_city}'")
+                result.error = "location_mismatch"
+                return (result, True)
+
+        engine_name, engine_domain = match_html_engines(extract_html_domains(html), html_lower)
+        if not engine_name:
+            return (result, False)
+
+        booking_url = pick_booking_url(extract_booking_links(html, final_url, hotel_domain))
+        if not booking_url or is_junk_booking_url(booking_url):
+            return (result, False)
+
+        result.booking_engine = engine_name
+        result.booking_engine_domain = engine_domain
+        result.booking_url = booking_url
+        result.detection_method = "static_html_scan"
+        self._log(f"  [STATIC] ✓ {engine_name} ({engine_domain}) -> {booking_url[:60]}")
+        return (result, True)
+
+    async def detect_batch(self, hotels: List[Dict]) -> Tuple[List[DetectionResult], List[Dict]]:
+        """Run the static tier over hotels.
+
+        Returns (conclusive_results, hotels_to_escalate). Per-hotel stage
+        timings for every hotel, escalated or not, are left in self.timings.
+        """
+        semaphore = asyncio.Semaphore(self.config.static_concurrency)
+        self.timings: Dict[int, Dict[str, int]] = {}
+
+        async def detect_one(client: httpx.AsyncClient, h: Dict) -> Tuple[DetectionResult, bool]:
+            timings = self.timings.setdefault(h['id'], {})
+            async with semaphore:
+                t0 = time.perf_counter()
+                final_url, html = await self.fetch(client, normalize_url(h.get('website', '')))
+                timings["static_fetch"] = int((time.perf_counter() - t0) * 1000)
+            t0 = time.perf_counter()
+            result, conclusive = self.detect_from_html(h['id'], final_url, html, h.get('city', '') or '')
+            timings["static_analyze"] = int((time.perf_counter() - t0) * 1000)
+            result.stage_timings.update(timings)
+            return (result, conclusive)
+
+        async with create_pooled_client(
+            max_connections=self.config.static_concurrency, headers=HTTP_HEADERS,
+        ) as client:
+            outcomes = await asyncio.gather(
+                *(detect_one(client, h) for h in hotels), return_exceptions=True
+            )
+
+        conclusive: List[DetectionResult] = []
+        escalate: List[Dict] = []
+        for h, outcome in zip(hotels, outcomes):
+            if isinstance(outcome, Exception) or not outcome[1]:
+                escalate.append(h)
+            else:
+                conclusive.append(outcome[0])
+        return (conclusive, escalate)
+
+
 # =============================================================================
 # BATCH DETECTOR - Runs detection on multiple hotels
 # =============================================================================
 
+def add_stage_timings(totals: Dict[str, Dict[str, int]], timings: Dict[str, int]) -> None:
+    """Fold one hotel's stage timings into per-stage count/total_ms/max_ms totals."""
+    for stage, ms in timings.items():
+        entry = totals.setdefault(stage, {"count": 0, "total_ms": 0, "max_ms": 0})
+        entry["count"] += 1
+        entry["total_ms"] += ms
+        entry["max_ms"] = max(entry["max_ms"], ms)
+
+
+def merge_stage_stats(totals: Dict[str, Dict[str, int]], stats: Dict[str, Dict[str, int]]) -> None:
+    """Merge per-stage totals (e.g. one batch's) into running totals."""
+    for stage, entry in stats.items():
+        total = totals.setdefault(stage, {"count": 0, "total_ms": 0, "max_ms": 0})
+        total["count"] += entry["count"]
+        total["total_ms"] += entry["total_ms"]
+        total["max_ms"] = max(total["max_ms"], entry["max_ms"])
+
+
+def format_stage_stats(stats: Dict[str, Dict[str, int]], top: int = 6) -> str:
+    """One-line summary of the stages with the most total wall-clock time."""
+    ranked = sorted(stats.items(), key=lambda kv: kv[1]["total_ms"], reverse=True)[:top]
+    return ", ".join(
+        f"{stage} {e['total_ms'] / 1000:.1f}s (avg {e['total_ms'] / e['count']:.0f}ms, max {e['max_ms']}ms)"
+        for stage, e in ranked if e["count"]
+    )
+
+
 class BatchDetector:
-    """Runs detection on multiple hotels concurrently with browser reuse."""
+    """Runs detection on multiple hotels concurrently with browser reuse.
 
-    def __init__(self, config: Optional[DetectionConfig] = None):
-        self.config = config or DetectionConfig()
+    Pass a started BrowserPool to reuse one browser across batches; otherwise
+    a pool is launched and closed for each detect_batch()/detect_stream() call.
+    Pass an AdaptiveLimiter shared by the batches on that pool to let browser
+    concurrency follow load instead of config.concurrency.
+    """
 
-    async def detect_batch(self, hotels: List[Dict]) -> List[DetectionResult]:
+    def __init__(
+        self,
+        config: Optional[DetectionConfig] = None,
+        pool: Optional[BrowserPool] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+    ):
+        self.config = config or DetectionConfig()
+        self.pool = pool
+        # Shared browser-tier limiter (e.g. one per pool); default is a fixed
+        # semaphore of config.concurrency per batch
+        self.limiter = limiter
+        # Per-tier counters for the last detect_batch()/detect_stream() call
+        self.tier_stats: Dict[str, int] = {}
+        # Wall-clock ms per tier, and per-stage totals over all hotels
+        self.tier_ms: Dict[str, int] = {}
+        self.stage_stats: Dict[str, Dict[str, int]] = {}
+
+    async def detect_batch(
+        self,
+        hotels: List[Dict],
+        domain_cache: Optional[Dict[str, DetectionResult]] = None,
+        dead_domains: Optional[Dict[str, str]] = None,
+    ) -> List[DetectionResult]:
         """Detect booking engines for a batch of hotels.
 
-        Args:
-            hotels: List of dicts with 'id', 'name', 'website', 'city' keys
+        Collects detect_stream(); see there for the arguments.
 
         Returns:
             List of DetectionResult objects
         """
-        if not hotels:
-            return []
+        return [
+            result
+            async for result in self.detect_stream(hotels, domain_cache=domain_cache, dead_domains=dead_domains)
+        ]
 
-        results: List[DetectionResult] = []
+    async def detect_stream(
+        self,
+        hotels: List[Dict],
+        domain_cache: Optional[Dict[str, DetectionResult]] = None,
+        dead_domains: Optional[Dict[str, str]] = None,
+    ) -> AsyncIterator[DetectionResult]:
+        """Detect booking engines for a batch of hotels, yielding each result as it finishes.
 
-        # OPTIMIZATION: Filter non-hotels before expensive operations
-        filtered_hotels = []
-        for h in hotels:
+        Filtered and cached hotels come first, then precheck failures and
+        static-tier results, then browser results in completion order, so a
+        slow site only delays its own result. tier_stats, tier_ms and
+        stage_stats are complete once the stream is exhausted.
+
+        Args:
+            hotels: List of dicts with 'id', 'name', 'website', 'city' keys
+            domain_cache: Cached results keyed by extract_domain(website).
+                Hotels on a cached domain reuse that result without any
+                network access.
+            dead_domains: Domains known to be unreachable, mapped to their
+                last precheck error. Hotels on them are not prechecked and
+                get a "precheck_cached: <error>" result.
+
+        Yields:
+            DetectionResult objects, one per hotel
+        """
+        self.tier_stats = {
+            "total": len(hotels),
+            "filtered": 0,
+            "domain_cache": 0,
+            "domain_dedupe": 0,
+            "precheck_failed": 0,
+            "precheck_cached": 0,
+            "static_checked": 0,
+            "static_conclusive": 0,
+            "static_detected": 0,
+            "browser": 0,
+            "browser_detected": 0,
+            "budget_cutoff": 0,
+        }
+        self.tier_ms = {"precheck": 0, "static": 0, "browser": 0}
+        self.stage_stats = {}
+        if not hotels:
+            return
+
+        domain_cache = domain_cache or {}
+        dead_domains = dict(dead_domains or {})
+        domains = {h['id']: extract_domain(normalize_url(h.get('website', ''))) for h in hotels}
+
+        # OPTIMIZATION: Filter non-hotels and junk domains before expensive
+        # operations, and run one detection per domain. Cached domains are
+        # resolved immediately; repeats within the batch wait for the first hotel.
+        leaders: Dict[str, Dict] = {}
+        followers: Dict[str, List[Dict]] = {}
+        to_detect: List[Dict] = []
+        for h, match in zip(hotels, classify_hotels(hotels)):
             hotel_id = h['id']
-            name = h.get('name', '')
-            website = h.get('website', '')
 
-            # Skip non-hotels by name
-            if is_non_hotel_name(name):
-                logger.debug(f"Filtering non-hotel by name: {name}")
-                results.append(DetectionResult(hotel_id=hotel_id, error="non_hotel_name"))
+            # Skip non-hotels by name/domain and junk domains (social, OTAs)
+            if match is not None:
+                logger.debug(f"Filtering {match.category} ('{match.keyword}'): {h.get('name', '')} | {h.get('website', '')}")
+                self.tier_stats["filtered"] += 1
+                yield self._finish(DetectionResult(hotel_id=hotel_id, error=match.category), domains)
                 continue
 
-            # Skip non-hotels by domain
-            if is_non_hotel_domain(website):
-                logger.debug(f"Filtering non-hotel by domain: {website}")
-                results.append(DetectionResult(hotel_id=hotel_id, error="non_hotel_domain"))
-                continue
+            domain = domains[hotel_id]
+            if domain and domain in domain_cache:
+                self.tier_stats["domain_cache"] += 1
+                yield self._finish(self._reuse_domain_result(domain_cache[domain], h, "domain_cache"), domains)
+            elif domain and domain in leaders:
+                followers.setdefault(domain, []).append(h)
+            else:
+                if domain:
+                    leaders[domain] = h
+                to_detect.append(h)
+
+        if self.tier_stats["filtered"]:
+            logger.info(f"Filtered {self.tier_stats['filtered']} non-hotels/junk domains before processing")
+        follower_count = sum(len(hs) for hs in followers.values())
+        if self.tier_stats["domain_cache"] or follower_count:
+            logger.info(
+                f"Domain cache: {self.tier_stats['domain_cache']} cached, "
+                f"{follower_count} sharing a domain with another hotel in the batch"
+            )
+
+        # Hotels sharing a domain reuse the first hotel's clean result as soon
+        # as it arrives; if that one failed, detect them individually (unless
+        # its site is down, which would only fail the same way again)
+        retry: List[Dict] = []
+        stream = self._detect_hotels(to_detect, dead_domains, domains)
+        try:
+            async for result in stream:
+                yield self._finish(result, domains)
+                domain = domains.get(result.hotel_id, "")
+                if not domain or leaders.get(domain, {}).get('id') != result.hotel_id:
+                    continue
+                if result.error.startswith("precheck_failed: "):
+                    error = result.error[len("precheck_failed: "):]
+                    if is_dead_domain_error(error):
+                        dead_domains[domain] = error
+                for h in followers.pop(domain, []):
+                    if result.error:
+                        retry.append(h)
+                    else:
+                        self.tier_stats["domain_dedupe"] += 1
+                        yield self._finish(self._reuse_domain_result(result, h, "domain_dedupe"), domains)
+        finally:
+            await stream.aclose()
+
+        for hs in followers.values():
+            retry.extend(hs)
+        if retry:
+            stream = self._detect_hotels(retry, dead_domains, domains)
+            try:
+                async for result in stream:
+                    yield self._finish(result, domains)
+            finally:
+                await stream.aclose()
+
+        self._log_tier_stats()
+
+    def _finish(self, result: DetectionResult, domains: Dict[int, str]) -> DetectionResult:
+        """Fill in the result's domain and add its stage timings to stage_stats."""
+        if not result.domain:
+            result.domain = domains.get(result.hotel_id, "")
+        add_stage_timings(self.stage_stats, result.stage_timings)
+        return result
+
+    def _reuse_domain_result(self, source: DetectionResult, hotel: Dict, method: str) -> DetectionResult:
+        """Copy a domain's result onto another hotel, re-applying its location filter."""
+        result = source.model_copy(update={
+            "hotel_id": hotel['id'],
+            "error": "",
+            "detection_method": f"{method}+{source.detection_method}" if source.detection_method else method,
+            "stage_timings": {},
+        })
+        expected_city = hotel.get('city', '') or ''
+        if expected_city and result.detected_location:
+            if not LocationExtractor.location_matches(result.detected_location, expected_city):
+                return DetectionResult(
+                    hotel_id=hotel['id'],
+                    phone_website=result.phone_website,
+                    email=result.email,
+                    detected_location=result.detected_location,
+                    error="location_mismatch",
+                )
+        return result
 
-            filtered_hotels.append(h)
+    async def _detect_hotels(
+        self,
+        hotels: List[Dict],
+        dead_domains: Optional[Dict[str, str]] = None,
+        domains: Optional[Dict[int, str]] = None,
+    ) -> AsyncIterator[DetectionResult]:
+        """Run precheck, static tier and browser tier over hotels, yielding results as they finish.
 
-        if filtered_hotels:
-            non_hotel_count = len(hotels) - len(filtered_hotels)
-            if non_hotel_count > 0:
-                logger.info(f"Filtered {non_hotel_count} non-hotels before processing")
+        Hotels whose domain (from domains) is in dead_domains are not prechecked.
+        """
+        if not hotels:
+            return
+        dead_domains = dead_domains or {}
+        domains = domains or {}
+
+        # OPTIMIZATION: Known-dead domains skip the precheck (and its timeout)
+        live_hotels = []
+        for h in hotels:
+            dead_error = dead_domains.get(domains.get(h['id'], ""))
+            if dead_error and h.get('website') and not is_junk_domain(h['website']):
+                self.tier_stats["precheck_cached"] += 1
+                yield DetectionResult(hotel_id=h['id'], error=f"precheck_cached: {dead_error}")
+            else:
+                live_hotels.append(h)
+        hotels = live_hotels
+        if not hotels:
+            return
 
         # OPTIMIZATION: Batch precheck all URLs first (parallel HTTP checks)
         urls_to_check = []
-        for h in filtered_hotels:
+        for h in hotels:
             website = h.get('website', '')
             if website and not is_junk_domain(website):
                 urls_to_check.append((h['id'], normalize_url(website)))
 
         logger.info(f"Running batch precheck on {len(urls_to_check)} URLs...")
+        t0 = time.perf_counter()
         precheck_results = await batch_precheck(urls_to_check, concurrency=30)
+        self.tier_ms["precheck"] += int((time.perf_counter() - t0) * 1000)
 
         # Filter to only reachable hotels
         reachable_hotels = []
-        for h in filtered_hotels:
+        for h in hotels:
             hotel_id = h['id']
             website = h.get('website', '')
 
             # Check for junk domain
             if not website or is_junk_domain(website):
-                results.append(DetectionResult(hotel_id=hotel_id, error="junk_domain"))
+                self.tier_stats["filtered"] += 1
+                yield DetectionResult(hotel_id=hotel_id, error="junk_domain")
                 continue
 
             # Check precheck result
             if hotel_id in precheck_results:
                 reachable, error = precheck_results[hotel_id]
                 if not reachable:
-                    results.append(DetectionResult(hotel_id=hotel_id, error=f"precheck_failed: {error}"))
+                    self.tier_stats["precheck_failed"] += 1
+                    yield DetectionResult(hotel_id=hotel_id, error=f"precheck_failed: {error}")
                     continue
 
             reachable_hotels.append(h)
 
         logger.info(f"Precheck: {len(reachable_hotels)} reachable, {len(hotels) - len(reachable_hotels)} filtered")
 
+        # Static tier: raw HTML via httpx, escalate only inconclusive hotels
+        static_timings: Dict[int, Dict[str, int]] = {}
+        if reachable_hotels and self.config.static_tier:
+            t0 = time.perf_counter()
+            static = StaticDetector(self.config)
+            static_results, reachable_hotels = await static.detect_batch(reachable_hotels)
+            static_timings = static.timings
+            self.tier_ms["static"] += int((time.perf_counter() - t0) * 1000)
+            self.tier_stats["static_checked"] += len(static_results) + len(reachable_hotels)
+            self.tier_stats["static_conclusive"] += len(static_results)
+            self.tier_stats["static_detected"] += sum(1 for r in static_results if r.booking_engine)
+            for result in static_results:
+                yield result
+
+        self.tier_stats["browser"] += len(reachable_hotels)
+
         if not reachable_hotels:
-            return results
+            return
 
         # Now process only reachable hotels with Playwright
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=self.config.headless)
-            semaphore = asyncio.Semaphore(self.config.concurrency)
-
-            # Create reusable context queue
-            context_queue: asyncio.Queue = asyncio.Queue()
-            contexts = []
-            for _ in range(self.config.concurrency):
-                ctx = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-                    ignore_https_errors=True,
-                )
-                contexts.append(ctx)
-                await context_queue.put(ctx)
-
-            processor = HotelProcessor(self.config, browser, semaphore, context_queue)
+        pool = self.pool
+        owns_pool = pool is None
+        if owns_pool:
+            pool = BrowserPool(
+                size=self.config.concurrency,
+                headless=self.config.headless,
+                max_pages_per_context=self.config.context_max_pages,
+                block_resources=self.config.block_resources,
+            )
+            await pool.start()
+
+        t0 = time.perf_counter()
+        tasks: Dict[asyncio.Task, Dict] = {}
+        try:
+            semaphore = self.limiter if self.limiter is not None else asyncio.Semaphore(self.config.concurrency)
+            processor = HotelProcessor(self.config, pool, semaphore)
 
             # Process only reachable hotels (skip precheck in processor)
-            tasks = [
-                processor.process(
+            for h in reachable_hotels:
+                task = asyncio.create_task(processor.process(
                     hotel_id=h['id'],
                     name=h['name'],
                     website=h.get('website', ''),
                     expected_city=h.get('city', ''),
                     skip_precheck=True,  # Already done
-                )
-                for h in reachable_hotels
-            ]
-
-            task_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Convert exceptions to error results
-            for i, result in enumerate(task_results):
-                if isinstance(result, Exception):
-                    results.append(DetectionResult(
-                        hotel_id=reachable_hotels[i]['id'],
-                        error=f"exception: {str(result)[:100]}"
-                    ))
-                else:
-                    results.append(result)
-
-            # Clean up
-            for ctx in contexts:
-                await ctx.close()
-            await browser.close()
-
-        return results
+                ))
+                tasks[task] = h
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    hotel_id = tasks[task]['id']
+                    exc = task.exception()
+                    if exc is not None:
+                        # Convert exceptions to error results
+                        result = DetectionResult(hotel_id=hotel_id, error=f"exception: {str(exc)[:100]}")
+                    else:
+                        result = task.result()
+                        if result.booking_engine:
+                            self.tier_stats["browser_detected"] += 1
+                        if result.cutoff_stage:
+                            self.tier_stats["budget_cutoff"] += 1
+                    # Escalated hotels also spent time in the static tier
+                    if hotel_id in static_timings and "static_fetch" not in result.stage_timings:
+                        result.stage_timings.update(static_timings[hotel_id])
+                    yield result
+        finally:
+            # Stream closed early: stop the remaining hotels
+            unfinished = [task for task in tasks if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
+            if owns_pool:
+                await pool.close()
+            self.tier_ms["browser"] += int((time.perf_counter() - t0) * 1000)
+
+    def _log_tier_stats(self) -> None:
+        """Log how many hotels each tier resolved."""
+        st = self.tier_stats
+        checked = st["static_checked"]
+        static_rate = st["static_conclusive"] / checked * 100 if checked else 0.0
+        browser_rate = st["browser_detected"] / st["browser"] * 100 if st["browser"] else 0.0
+        logger.info(
+            f"Tiers: {st['total']} hotels | filtered {st['filtered']}, precheck_failed {st['precheck_failed']}, "
+            f"dead domain cache {st['precheck_cached']} | "
+            f"domain cache {st['domain_cache']}, dedupe {st['domain_dedupe']} | "
+            f"static {st['static_conclusive']}/{checked} conclusive ({static_rate:.0f}%), {st['static_detected']} engines | "
+            f"browser {st['browser']} ({st['browser_detected']} engines, {browser_rate:.0f}%), "
+            f"{st['budget_cutoff']} cut off by time budget"
+        )
+        tm = self.tier_ms
+        logger.info(
+            f"Tier time: precheck {tm['precheck'] / 1000:.1f}s, static {tm['static'] / 1000:.1f}s, "
+            f"browser {tm['browser'] / 1000:.1f}s"
+        )
+        if self.stage_stats:
+            logger.info(f"Slowest stages: {format_stage_stats(self.stage_stats)}")
@@ -4,17 +4,37 @@ These tests use real hotel websites to verify detection accuracy.
 Run with: uv run pytest services/leadgen/detector_test.py -v
 """
 
+import asyncio
+import re
+
 import pytest
-from typing import List, Dict
+from typing import List, Dict, Union
 
 from services.leadgen.detector import (
     BatchDetector,
     DetectionConfig,
     DetectionResult,
+    BudgetExhausted,
     EngineDetector,
+    EngineRequestWatcher,
+    HotelBudget,
+    HotelProcessor,
     ContactExtractor,
+    PAGE_PROBE_SCRIPT,
+    PageSnapshot,
+    StaticDetector,
+    add_stage_timings,
+    batch_precheck,
+    format_stage_stats,
+    get_engine_matcher,
+    get_engine_pattern_version,
+    merge_stage_stats,
     normalize_url,
     extract_domain,
+    extract_booking_links,
+    html_to_text,
+    pick_booking_url,
+    scan_html_for_engines,
     set_engine_patterns,
 )
 
@@ -106,6 +126,21 @@ class TestEngineDetector:
         assert method == "same_domain"
 
 
+class TestEnginePatternIndex:
+    """Versioned engine pattern swaps."""
+
+    def test_swap_is_versioned_and_recorded_on_results(self):
+        old_matcher = get_engine_matcher()
+        assert DetectionResult(hotel_id=1).pattern_version == 0
+
+        set_engine_patterns({**TEST_ENGINE_PATTERNS, "Newbook": ["newbook.cloud"]}, version=5)
+        assert get_engine_pattern_version() == 5
+        assert EngineDetector.from_domain("app.newbook.cloud") == ("Newbook", "newbook.cloud")
+        assert DetectionResult(hotel_id=2).pattern_version == 5
+        # The previous matcher is untouched (stages holding it keep working)
+        assert old_matcher.search("app.newbook.cloud") is None
+
+
 class TestContactExtractor:
     """Unit tests for ContactExtractor."""
 
@@ -140,6 +175,618 @@ class TestContactExtractor:
     def test_extract_room_count_no_match(self):
         assert ContactExtractor.extract_room_count("no rooms mentioned") == ""
 
+    def test_extract_room_count_skips_out_of_range(self):
+        assert ContactExtractor.extract_room_count("Since 2019. 12345 rooms booked. 80 rooms") == "80"
+
+    def test_extract_emails_dedupes_case_insensitively(self):
+        html = "Stay@Hotel.com, stay@hotel.com; a@b.co x@y.io z@w.net"
+        assert ContactExtractor.extract_emails(html) == ["Stay@Hotel.com", "a@b.co", "x@y.io"]
+
+    def test_extract_phones_order_and_limit(self):
+        text = "Tel: (305) 555-1234\nFax: 305.555.9999\nIntl +44 20 7946 0958\nAlt 786-555-0000"
+        assert ContactExtractor.extract_phones(text) == ["3055551234", "3055559999", "7865550000"]
+
+    def test_extract_all(self):
+        info = ContactExtractor.extract_all(
+            "Welcome to Miami! Call (305) 555-1234, email stay@hotel.com. 45 guest rooms.",
+            html="<title>Miami Beach Hotel</title>",
+        )
+        assert info.phones == ["3055551234"]
+        assert info.emails == ["stay@hotel.com"]
+        assert info.room_count == "45"
+        assert info.location == "Miami"
+
+
+STATIC_HOTEL_HTML = """
+<html><head>
+<script src="https://static.cloudbeds.com/widget.js"></script>
+<style>.a { color: red }</style>
+</head><body>
+<nav><a href="/about">About</a> <a href="/rooms">Rooms</a>
+<a href="https://hotels.cloudbeds.com/reservation/abc123">Book Now</a></nav>
+<p>Call us at (305) 555-1234 or email <a href="mailto:stay@hotelexample.com">us</a>.</p>
+<p>Our boutique hotel features 45 guest rooms.</p>
+</body></html>
+"""
+
+
+class TestStaticDetection:
+    """Unit tests for the HTTP-only static tier."""
+
+    def test_scan_html_finds_engine_domain(self):
+        assert scan_html_for_engines(STATIC_HOTEL_HTML) == ("Cloudbeds", "cloudbeds.com")
+
+    def test_scan_html_keyword_fallback(self):
+        html = '<script>window.cfg = {engine: "webrezpro.init"}</script>'
+        engine, domain = scan_html_for_engines(html)
+        assert engine == "WebRezPro"
+
+    def test_scan_html_no_engine(self):
+        assert scan_html_for_engines("<html><body>Hello</body></html>") == ("", "")
+        assert scan_html_for_engines("") == ("", "")
+
+    def test_html_to_text_strips_scripts_and_tags(self):
+        text = html_to_text(STATIC_HOTEL_HTML)
+        assert "45 guest rooms" in text
+        assert "widget.js" not in text
+        assert "color: red" not in text
+
+    def test_extract_booking_links_resolves_relative(self):
+        links = extract_booking_links(STATIC_HOTEL_HTML, "https://www.hotelexample.com/", "hotelexample.com")
+        hrefs = [item["href"] for item in links]
+        assert "https://www.hotelexample.com/rooms" in hrefs
+        assert "https://hotels.cloudbeds.com/reservation/abc123" in hrefs
+        assert not any("about" in h for h in hrefs)
+
+    def test_pick_booking_url_prefers_known_engine(self):
+        links = extract_booking_links(STATIC_HOTEL_HTML, "https://www.hotelexample.com/", "hotelexample.com")
+        assert pick_booking_url(links) == "https://hotels.cloudbeds.com/reservation/abc123"
+        assert pick_booking_url([]) == ""
+
+    def test_detect_from_html_conclusive(self):
+        detector = StaticDetector(DetectionConfig())
+        result, conclusive = detector.detect_from_html(
+            1, "https://www.hotelexample.com/", STATIC_HOTEL_HTML
+        )
+        assert conclusive
+        assert result.booking_engine == "Cloudbeds"
+        assert result.booking_url == "https://hotels.cloudbeds.com/reservation/abc123"
+        assert result.detection_method == "static_html_scan"
+        assert result.email == "stay@hotelexample.com"
+        assert "3055551234" in result.phone_website
+        assert result.room_count == "45"
+
+    def test_detect_from_html_without_booking_link_escalates(self):
+        detector = StaticDetector(DetectionConfig())
+        html = '<script src="https://static.cloudbeds.com/widget.js"></script><p>Welcome</p>'
+        result, conclusive = detector.detect_from_html(1, "https://hotelexample.com/", html)
+        assert not conclusive
+
+    def test_detect_from_html_empty_escalates(self):
+        detector = StaticDetector(DetectionConfig())
+        result, conclusive = detector.detect_from_html(1, "", "")
+        assert not conclusive
+        assert result.error == ""
+
+
+class TestBatchPrecheck:
+    """Unit tests for batch_precheck against a local server."""
+
+    async def test_head_get_fallback_and_errors(self):
+        async def handle(reader, writer):
+            while True:
+                try:
+                    request = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                method, path = request.split(b" ")[:2]
+                if path == b"/missing":
+                    status = b"404 Not Found"
+                elif method == b"HEAD":
+                    status = b"405 Method Not Allowed"
+                else:
+                    status = b"200 OK"
+                writer.write(b"HTTP/1.1 " + status + b"\r\nContent-Length: 0\r\n\r\n")
+                await writer.drain()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            results = await batch_precheck([
+                (1, f"http://127.0.0.1:{port}/"),
+                (2, f"http://127.0.0.1:{port}/missing"),
+                (3, "http://127.0.0.1:1/"),
+            ], concurrency=2)
+        finally:
+            server.close()
+
+        assert results[1] == (True, "")
+        assert results[2] == (False, "HTTP 404")
+        assert results[3] == (False, "connection_refused")
+
+
+class FakeLocator:
+    def __init__(self, selector: str):
+        self.selector = selector
+        self.first = self
+
+
+class FakeSnapshotPage:
+    """Minimal Page stand-in: counts DOM probes, fires framenavigated.
+
+    The probe payload is derived from the HTML (absolute hrefs become links);
+    `probe` overrides or adds payload keys.
+    """
+
+    def __init__(self, html: str, url: str = "https://www.hotelexample.com/", probe: Dict = None):
+        self.html = html
+        self.url = url
+        self.probe = probe or {}
+        self.main_frame = object()
+        self.frames = []
+        self.evaluations = 0
+        self._handlers = []
+        self._request_handlers = []
+
+    def on(self, event, handler):
+        if event == "framenavigated":
+            self._handlers.append(handler)
+        elif event == "request":
+            self._request_handlers.append(handler)
+
+    async def evaluate(self, script):
+        assert script == PAGE_PROBE_SCRIPT
+        self.evaluations += 1
+        return {
+            "url": self.url,
+            "html": self.html,
+            "text": "Call +1 305 555 1234",
+            "links": [{"href": h, "text": "book now"} for h in re.findall(r'href="(https?://[^"]+)"', self.html)],
+            **self.probe,
+        }
+
+    def locator(self, selector):
+        return FakeLocator(selector)
+
+    def navigate(self, url: str, html: str):
+        self.url = url
+        self.html = html
+        for handler in self._handlers:
+            handler(self.main_frame)
+
+
+class TestPageSnapshot:
+    """Unit tests for PageSnapshot."""
+
+    async def test_html_captured_once_per_page_state(self):
+        page = FakeSnapshotPage(STATIC_HOTEL_HTML)
+        snapshot = PageSnapshot(page)
+        assert await snapshot.scan_engines() == ("Cloudbeds", "cloudbeds.com")
+        await snapshot.html_lower()
+        await snapshot.domains()
+        assert await snapshot.html() == STATIC_HOTEL_HTML
+        assert snapshot.captures == 1
+        assert page.evaluations == 1
+
+    async def test_navigation_invalidates(self):
+        page = FakeSnapshotPage(STATIC_HOTEL_HTML)
+        snapshot = PageSnapshot(page)
+        await snapshot.html()
+        page.navigate("https://hotels.cloudbeds.com/reservation/abc123", "<html>Booking</html>")
+        assert await snapshot.html() == "<html>Booking</html>"
+        assert await snapshot.scan_engines() == ("", "")
+        assert snapshot.captures == 2
+
+    async def test_url_change_without_event_invalidates(self):
+        page = FakeSnapshotPage("<html>one</html>")
+        snapshot = PageSnapshot(page)
+        await snapshot.html()
+        page.url, page.html = "https://www.hotelexample.com/rooms", "<html>two</html>"
+        assert await snapshot.html() == "<html>two</html>"
+
+    async def test_explicit_invalidate(self):
+        page = FakeSnapshotPage("<html>before</html>")
+        snapshot = PageSnapshot(page)
+        await snapshot.html()
+        page.html = "<html>after click</html>"
+        assert await snapshot.html() == "<html>before</html>"
+        snapshot.invalidate()
+        assert await snapshot.html() == "<html>after click</html>"
+
+    async def test_stages_share_one_probe(self):
+        page = FakeSnapshotPage(STATIC_HOTEL_HTML, probe={
+            "tel": ["+13055550100"],
+            "mailto": ["info@hotelexample.com"],
+            "iframes": ["https://widget.siteminder.com/ibe/1"],
+            "forms": ["https://be.synxis.com/?chain=1"],
+            "candidates": [{"probeId": "3", "tag": "a", "text": "book now", "fullHref": "", "priority": 2}],
+            "links": [
+                {"href": "https://www.hotelexample.com/terms", "text": "book terms"},
+                {"href": "https://hotels.cloudbeds.com/reservation/abc", "text": "check availability"},
+            ],
+        })
+        snapshot = PageSnapshot(page)
+        processor = HotelProcessor(DetectionConfig(), pool=None, semaphore=None)
+
+        result = await processor._extract_contacts(snapshot, DetectionResult(hotel_id=1))
+        assert result.phone_website == "+13055551234"  # From text first, not the tel: link
+        assert result.email == "info@hotelexample.com"
+        assert await processor._find_external_booking_url(snapshot, "hotelexample.com") == \
+            "https://hotels.cloudbeds.com/reservation/abc"
+        assert await processor._scan_frames(snapshot) == (
+            "SiteMinder", "siteminder.com", "https://widget.siteminder.com/ibe/1"
+        )
+        candidates = await processor.button_finder.find_candidates(snapshot)
+        assert candidates[0]["locator"].selector == "[data-probe='3']"
+        assert page.evaluations == 1
+
+
+class TestHotelBudget:
+    """Unit tests for the per-hotel time budget."""
+
+    async def test_run_within_budget(self):
+        budget = HotelBudget(1000)
+        assert await budget.run("stage", asyncio.sleep(0, result="ok")) == "ok"
+        assert budget.cutoff_stage == ""
+
+    async def test_run_cut_off_at_deadline(self):
+        budget = HotelBudget(50)
+        with pytest.raises(BudgetExhausted) as exc:
+            await budget.run("slow_stage", asyncio.sleep(5))
+        assert exc.value.stage == "slow_stage"
+        assert budget.cutoff_stage == "slow_stage"
+        # Later stages are refused outright, first cutoff is kept
+        with pytest.raises(BudgetExhausted):
+            await budget.run("next_stage", asyncio.sleep(0))
+        assert budget.cutoff_stage == "slow_stage"
+
+    async def test_stage_timeout_is_not_a_cutoff(self):
+        budget = HotelBudget(5000)
+        with pytest.raises(asyncio.TimeoutError):
+            await budget.run("stage", asyncio.wait_for(asyncio.sleep(5), timeout=0.01))
+        assert budget.cutoff_stage == ""
+
+    async def test_can_afford_and_timeout_cap(self):
+        budget = HotelBudget(2000)
+        assert budget.timeout_ms(15000) <= 2000
+        assert budget.timeout_ms(500) == 500
+        assert budget.can_afford("click", 1000)
+        assert not budget.can_afford("booking_page", 10000)
+        assert budget.cutoff_stage == "booking_page"
+
+    async def test_unlimited(self):
+        budget = HotelBudget(0)
+        assert not budget.expired()
+        assert budget.timeout_ms(15000) == 15000
+        assert budget.can_afford("anything", 10**9)
+
+
+class FakeRequest:
+    def __init__(self, url: str, resource_type: str = "script"):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class FakeBrowserPage(FakeSnapshotPage):
+    """Page stand-in for HotelProcessor: goto fires requests and can be made to hang."""
+
+    def __init__(self, html: str, goto_delay: float = 0.0, requests: List[Union[str, FakeRequest]] = ()):
+        super().__init__(html)
+        self.goto_delay = goto_delay
+        self.requests = list(requests)
+        self.closed = False
+        self.stopped = False
+
+    async def goto(self, url, timeout=None, wait_until=None):
+        for request in [FakeRequest(url, "document")] + self.requests:
+            for handler in self._request_handlers:
+                handler(request if isinstance(request, FakeRequest) else FakeRequest(request))
+        await asyncio.sleep(self.goto_delay)
+
+    async def evaluate(self, script):
+        if script == "window.stop()":
+            self.stopped = True
+            return None
+        return await super().evaluate(script)
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowserContext:
+    def __init__(self, page):
+        self.page = page
+
+    async def new_page(self):
+        return self.page
+
+
+class TestProcessorBudget:
+    """HotelProcessor stages against the per-hotel budget (fake page)."""
+
+    async def test_homepage_load_over_budget_fails_hotel(self):
+        processor = HotelProcessor(DetectionConfig(hotel_budget_ms=50), pool=None, semaphore=None)
+        page = FakeBrowserPage(STATIC_HOTEL_HTML, goto_delay=5)
+        result = await processor._process_in_context(
+            FakeBrowserContext(page), "https://www.hotelexample.com/", DetectionResult(hotel_id=1)
+        )
+        assert result.error == "budget_exceeded: homepage_load"
+        assert result.cutoff_stage == "homepage_load"
+        assert page.closed
+
+    async def test_slow_click_keeps_homepage_engine(self, monkeypatch):
+        processor = HotelProcessor(
+            DetectionConfig(hotel_budget_ms=700, budget_reserve_click_ms=0), pool=None, semaphore=None
+        )
+
+        async def hanging_click(context, page, hotel_domain, snapshot=None):
+            await asyncio.sleep(5)
+
+        monkeypatch.setattr(processor, "_find_booking_url", hanging_click)
+        # Engine script on the page but no booking link -> click stage runs
+        html = '<script src="https://static.cloudbeds.com/widget.js"></script><p>Welcome</p>'
+        page = FakeBrowserPage(html)
+        result = await processor._process_in_context(
+            FakeBrowserContext(page), "https://www.hotelexample.com/", DetectionResult(hotel_id=1)
+        )
+        assert result.error == ""
+        assert result.booking_engine == "Cloudbeds"
+        assert result.cutoff_stage == "button_click"
+        assert "goto" in result.stage_timings
+        assert page.closed
+
+
+class TestNetworkEarlyExit:
+    """Engine requests seen during the homepage load short-circuit detection."""
+
+    ENGINE_PAGE = "https://hotels.cloudbeds.com/reservation/abc123"
+    ENGINE_REQUEST = FakeRequest(ENGINE_PAGE, "document")  # Booking iframe
+    ENGINE_ASSET = FakeRequest("https://hotels.cloudbeds.com/widget/load/abc123.js", "script")
+    # HTML alone would point at SynXis, so the result shows which stage won
+    HTML = '<a href="https://be.synxis.com/?hotel=1">Book now</a>'
+
+    async def test_engine_request_skips_engine_stages(self):
+        processor = HotelProcessor(DetectionConfig(), pool=None, semaphore=None)
+        page = FakeBrowserPage(self.HTML, requests=["https://cdn.example.net/app.js", self.ENGINE_REQUEST])
+        result = await processor._process_in_context(
+            FakeBrowserContext(page), "https://www.hotelexample.com/", DetectionResult(hotel_id=1)
+        )
+        assert result.booking_engine == "Cloudbeds"
+        assert result.booking_engine_domain == "hotels.cloudbeds.com"
+        assert result.booking_url == self.ENGINE_PAGE
+        assert result.detection_method == "network_early"
+        assert "homepage_html_scan" not in result.stage_timings
+        assert not page.stopped
+
+    async def test_abort_stops_homepage_load(self):
+        processor = HotelProcessor(DetectionConfig(network_early_abort=True), pool=None, semaphore=None)
+        page = FakeBrowserPage(self.HTML, goto_delay=5, requests=[self.ENGINE_REQUEST])
+        result = await asyncio.wait_for(processor._process_in_context(
+            FakeBrowserContext(page), "https://www.hotelexample.com/", DetectionResult(hotel_id=1)
+        ), timeout=2)
+        assert result.booking_engine == "Cloudbeds"
+        assert result.error == ""
+        assert page.stopped
+        assert page.closed
+
+    async def test_asset_request_is_not_conclusive(self):
+        processor = HotelProcessor(DetectionConfig(network_early_abort=True), pool=None, semaphore=None)
+        page = FakeBrowserPage(self.HTML, requests=[self.ENGINE_ASSET])
+        result = await processor._process_in_context(
+            FakeBrowserContext(page), "https://www.hotelexample.com/", DetectionResult(hotel_id=1)
+        )
+        assert result.booking_engine == "SynXis / TravelClick"
+        assert result.booking_url == "https://be.synxis.com/?hotel=1"
+        assert result.detection_method == "homepage_html_scan"
+        assert not page.stopped
+
+    async def test_definitive_engine_asset_keeps_asset_out_of_booking_url(self):
+        config = DetectionConfig(network_definitive_engines=("Cloudbeds",))
+        processor = HotelProcessor(config, pool=None, semaphore=None)
+        page = FakeBrowserPage(self.HTML, requests=[self.ENGINE_ASSET])
+        result = await processor._process_in_context(
+            FakeBrowserContext(page), "https://www.hotelexample.com/", DetectionResult(hotel_id=1)
+        )
+        assert result.booking_engine == "Cloudbeds"
+        assert result.detection_method.startswith("network_early")
+        assert result.booking_url != self.ENGINE_ASSET.url
+        assert "button_find" in result.stage_timings
+
+    async def test_navigation_upgrades_earlier_asset_match(self):
+        watcher = EngineRequestWatcher(FakeBrowserPage(""), definitive_engines=("Cloudbeds",))
+        watcher._on_request(self.ENGINE_ASSET)
+        assert watcher.engine == "Cloudbeds" and not watcher.navigation
+        watcher._on_request(self.ENGINE_REQUEST)
+        assert watcher.navigation
+        assert watcher.engine_url == self.ENGINE_PAGE
+
+    async def test_disabled_keeps_stage_order(self):
+        processor = HotelProcessor(DetectionConfig(network_early_exit=False), pool=None, semaphore=None)
+        page = FakeBrowserPage(self.HTML, requests=[self.ENGINE_REQUEST])
+        result = await processor._process_in_context(
+            FakeBrowserContext(page), "https://www.hotelexample.com/", DetectionResult(hotel_id=1)
+        )
+        assert result.booking_engine == "SynXis / TravelClick"
+        assert result.detection_method == "homepage_html_scan"
+
+
+@pytest.mark.no_db
+class TestLocationMismatch:
+    """A hotel outside the expected city stops before engine detection."""
+
+    async def test_mismatch_closes_page(self, monkeypatch):
+        async def miami(self, snapshot, result):
+            result.detected_location = "Miami, FL"
+            return result
+
+        monkeypatch.setattr(HotelProcessor, "_extract_contacts", miami)
+        # location_matches lets unknown pairs through, so force the mismatch
+        monkeypatch.setattr(
+            "services.leadgen.detector.LocationExtractor.location_matches", lambda detected, target: False
+        )
+        processor = HotelProcessor(DetectionConfig(), pool=None, semaphore=None)
+        page = FakeBrowserPage('<a href="https://be.synxis.com/?hotel=1">Book now</a>')
+        result = await processor._process_in_context(
+            FakeBrowserContext(page), "https://www.hotelexample.com/", DetectionResult(hotel_id=1),
+            expected_city="Gatlinburg",
+        )
+        assert result.error == "location_mismatch"
+        assert result.booking_engine == ""
+        assert page.closed
+
+
+@pytest.mark.no_db
+class TestStageTimings:
+    """Unit tests for per-stage timing aggregation."""
+
+    def test_add_and_merge(self):
+        batch = {}
+        add_stage_timings(batch, {"goto": 1200, "contacts": 30})
+        add_stage_timings(batch, {"goto": 800})
+        assert batch["goto"] == {"count": 2, "total_ms": 2000, "max_ms": 1200}
+
+        totals = {"goto": {"count": 1, "total_ms": 5000, "max_ms": 5000}}
+        merge_stage_stats(totals, batch)
+        assert totals["goto"] == {"count": 3, "total_ms": 7000, "max_ms": 5000}
+        assert totals["contacts"] == {"count": 1, "total_ms": 30, "max_ms": 30}
+
+    def test_format_ranks_by_total_time(self):
+        stats = {
+            "contacts": {"count": 4, "total_ms": 100, "max_ms": 40},
+            "goto": {"count": 2, "total_ms": 3000, "max_ms": 2000},
+        }
+        line = format_stage_stats(stats, top=1)
+        assert line.startswith("goto 3.0s")
+        assert "contacts" not in line
+
+
+class TestDomainCache:
+    """Unit tests for domain-level result reuse in BatchDetector."""
+
+    @pytest.fixture
+    def detector(self, monkeypatch):
+        detector = BatchDetector(DetectionConfig())
+        detector.visited = []
+
+        async def fake_detect(hotels, dead_domains=None, domains=None):
+            detector.visited.extend(h["id"] for h in hotels)
+            for h in hotels:
+                yield DetectionResult(
+                    hotel_id=h["id"],
+                    booking_engine="Cloudbeds",
+                    booking_url="https://hotels.cloudbeds.com/reservation/abc",
+                    detection_method="static_html_scan",
+                    detected_location="Miami, FL",
+                    error="timeout" if "broken" in h["website"] else "",
+                )
+
+        monkeypatch.setattr(detector, "_detect_hotels", fake_detect)
+        return detector
+
+    async def test_cached_domain_skips_detection(self, detector):
+        cached = DetectionResult(hotel_id=0, booking_engine="Mews", detection_method="network_sniff")
+        results = await detector.detect_batch(
+            [{"id": 7, "name": "Hotel A", "website": "https://www.hotel-a.com/rooms", "city": ""}],
+            domain_cache={"hotel-a.com": cached},
+        )
+        assert detector.visited == []
+        assert results[0].hotel_id == 7
+        assert results[0].booking_engine == "Mews"
+        assert results[0].detection_method == "domain_cache+network_sniff"
+        assert results[0].domain == "hotel-a.com"
+        assert detector.tier_stats["domain_cache"] == 1
+
+    async def test_same_domain_detected_once_per_batch(self, detector):
+        hotels = [
+            {"id": 1, "name": "Hotel A", "website": "https://hotel-a.com", "city": "Miami"},
+            {"id": 2, "name": "Hotel A Suites", "website": "http://www.hotel-a.com/suites", "city": "Miami"},
+            {"id": 3, "name": "Hotel B", "website": "https://hotel-b.com", "city": "Miami"},
+        ]
+        results = {r.hotel_id: r for r in await detector.detect_batch(hotels)}
+        assert detector.visited == [1, 3]
+        assert results[2].booking_engine == "Cloudbeds"
+        assert results[2].detection_method == "domain_dedupe+static_html_scan"
+        assert results[1].detection_method == "static_html_scan"
+        assert detector.tier_stats["domain_dedupe"] == 1
+
+    async def test_failed_leader_reruns_followers(self, detector):
+        hotels = [
+            {"id": 1, "name": "Hotel A", "website": "https://broken.com", "city": ""},
+            {"id": 2, "name": "Hotel A Annex", "website": "https://broken.com/annex", "city": ""},
+        ]
+        await detector.detect_batch(hotels)
+        assert detector.visited == [1, 2]
+
+
+@pytest.mark.no_db
+class TestDetectStream:
+    """Unit tests for BatchDetector.detect_stream (browser tier faked)."""
+
+    @pytest.fixture
+    def detector(self, monkeypatch):
+        from services.leadgen import detector as detector_module
+
+        async def all_reachable(urls, concurrency=30):
+            prechecked.extend(hotel_id for hotel_id, _ in urls)
+            return {hotel_id: (False, "connection_refused") if "down" in url else (True, "") for hotel_id, url in urls}
+
+        async def fake_process(self, hotel_id, name, website, expected_city="", skip_precheck=False):
+            await asyncio.sleep(1.0 if "slow" in website else 0.01)
+            started.append(hotel_id)
+            return DetectionResult(hotel_id=hotel_id, booking_engine="Cloudbeds", stage_timings={"goto": 5})
+
+        started: List[int] = []
+        prechecked: List[int] = []
+        monkeypatch.setattr(detector_module, "batch_precheck", all_reachable)
+        monkeypatch.setattr(HotelProcessor, "process", fake_process)
+        detector = BatchDetector(DetectionConfig(static_tier=False), pool=object())
+        detector.finished = started
+        detector.prechecked = prechecked
+        return detector
+
+    HOTELS = [
+        {"id": 1, "name": "Slow Hotel", "website": "https://slow-hotel.com", "city": ""},
+        {"id": 2, "name": "Fast Hotel", "website": "https://fast-hotel.com", "city": ""},
+        {"id": 3, "name": "Fast Hotel Annex", "website": "https://fast-hotel.com/annex", "city": ""},
+        {"id": 4, "name": "Walmart Supercenter", "website": "https://walmart.com", "city": ""},
+    ]
+
+    async def test_yields_in_completion_order(self, detector):
+        ids = [r.hotel_id async for r in detector.detect_stream(self.HOTELS)]
+        # Filtered first, then the fast site and its same-domain follower, slow site last
+        assert ids == [4, 2, 3, 1]
+        assert detector.tier_stats["browser_detected"] == 2
+        assert detector.tier_stats["domain_dedupe"] == 1
+        assert detector.stage_stats["goto"]["count"] == 2
+
+    async def test_closing_stream_cancels_remaining_hotels(self, detector):
+        stream = detector.detect_stream(self.HOTELS)
+        ids = [(await stream.__anext__()).hotel_id for _ in range(2)]
+        await stream.aclose()
+        assert ids == [4, 2]
+        await asyncio.sleep(1.1)
+        assert detector.finished == [2]
+
+    async def test_dead_domain_skips_precheck(self, detector):
+        results = await detector.detect_batch(self.HOTELS[:2], dead_domains={"slow-hotel.com": "HTTP 503"})
+        by_id = {r.hotel_id: r for r in results}
+        assert by_id[1].error == "precheck_cached: HTTP 503"
+        assert detector.prechecked == [2]
+        assert detector.tier_stats["precheck_cached"] == 1
+
+    async def test_dead_leader_marks_followers_without_reprobing(self, detector):
+        hotels = [
+            {"id": 5, "name": "Down Inn", "website": "https://down-inn.com", "city": ""},
+            {"id": 6, "name": "Down Inn East", "website": "https://down-inn.com/east", "city": ""},
+        ]
+        results = {r.hotel_id: r for r in await detector.detect_batch(hotels)}
+        assert results[5].error == "precheck_failed: connection_refused"
+        assert results[6].error == "precheck_cached: connection_refused"
+        assert detector.prechecked == [5]
+
 
 # =============================================================================
 # INTEGRATION TESTS - Real websites
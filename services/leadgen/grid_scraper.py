@@ -15,6 +15,14 @@ from pydantic import BaseModel
 from dotenv import load_dotenv
 from loguru import logger
 
+from services.leadgen.classifier import (  # noqa: F401 - rule lists re-exported
+    SKIP_CHAINS,
+    SKIP_DOMAINS,
+    SKIP_NON_HOTELS,
+    SCRAPER_DOMAIN_CLASSIFIER,
+    SCRAPER_NAME_CLASSIFIER,
+)
+
 load_dotenv()
 
 SERPER_MAPS_URL = "https://google.serper.dev/maps"
@@ -78,115 +86,6 @@ SEARCH_MODIFIERS = [
     "downtown",
 ]
 
-# Chain filter - names to skip
-SKIP_CHAINS = [
-    "marriott", "hilton", "hyatt", "sheraton", "westin", "w hotel",
-    "intercontinental", "holiday inn", "crowne plaza", "ihg",
-    "best western", "choice hotels", "comfort inn", "quality inn",
-    "radisson", "wyndham", "ramada", "days inn", "super 8", "motel 6",
-    "la quinta", "travelodge", "ibis", "novotel", "mercure", "accor",
-    "four seasons", "ritz-carlton", "st. regis", "fairmont",
-]
-
-# Non-hotel businesses to skip by name keywords
-SKIP_NON_HOTELS = [
-    # Healthcare - use "hospital " with space to avoid matching "hospitality"
-    "pharmacy", "hospital ", "clinic", "medical", "urgent care", "emergency",
-    "dental", "dentist", "doctor", "physician", "health center", "healthcare",
-    "veterinary", "vet clinic", "animal hospital", "laboratory",
-    # Retail
-    "publix", "walmart", "target", "costco", "kroger", "cvs", "walgreens",
-    "home depot", "lowe's", "menards", "staples", "office depot",
-    "dollar general", "dollar tree", "family dollar", "best buy", "apple store",
-    "warby parker", "eyewear", "optical", "mattress",
-    # Restaurants (generic food terms)
-    "restaurant", "grill", "sushi", "pizza", "taco", "burrito", "bbq", "barbecue",
-    "steakhouse", "seafood", "buffet", "diner", "bakery", "deli", "cafe",
-    "bistro", "eatery", "cantina", "brewery", "bar & grill",
-    "ramen", "noodle", "pho", "wings", "wingstop", "wing stop", "hot pot",
-    "korean bbq", "hibachi", "teriyaki", "shawarma", "falafel", "kebab",
-    # Restaurants (chains)
-    "mcdonald", "burger king", "wendy's", "taco bell", "chick-fil-a",
-    "starbucks", "dunkin", "subway", "pizza hut", "domino's", "papa john",
-    "chipotle", "panera", "olive garden", "applebee", "chili's", "ihop",
-    "denny's", "waffle house", "cracker barrel", "outback", "longhorn",
-    "red lobster", "texas roadhouse", "buffalo wild wings", "hooters",
-    "carrabba", "bonefish", "cheesecake factory", "pf chang", "benihana",
-    "sonic drive", "arby's", "popeyes", "five guys", "shake shack",
-    "in-n-out", "whataburger", "jack in the box", "hardee", "carl's jr",
-    "krispy kreme", "baskin", "cold stone", "dairy queen", "culver's",
-    # Banks/Finance
-    "bank of america", "chase bank", "wells fargo", "citibank", "td bank",
-    "credit union", "atm", "western union", "moneygram", "payday loan",
-    # Gas stations - use "shell gas" to avoid matching "Hotel Shelley"
-    "gas station", "shell gas", "chevron", "exxon", "bp ", "speedway", "wawa",
-    "sheetz", "racetrac", "quiktrip", "circle k", "7-eleven", "7 eleven",
-    # Religious/Education
-    "church", "temple", "mosque", "synagogue", "chapel",
-    "school", "university", "college", "library", "academy",
-    # Government/Services
-    "police", "fire station", "post office", "ups store", "fedex", "usps",
-    "dmv", "courthouse", "city hall",
-    # Storage/Moving
-    "storage", "self storage", "u-haul", "public storage", "extra space",
-    # Fitness
-    "gym", "fitness", "planet fitness", "la fitness", "ymca", "crossfit",
-    "anytime fitness", "orangetheory", "equinox",
-    # Personal services
-    "salon", "barber", "nail", "spa ", "tattoo", "piercing",
-    # Pet services
-    "pet", "grooming", "doggy", "veterinar", "animal clinic",
-    # Childcare
-    "daycare", "childcare", "preschool", "kindergarten", "learning center",
-    # Entertainment (not hotels)
-    "cinema", "theater", "theatre", "bowling", "arcade", "laser tag",
-    "escape room", "trampoline", "skating rink", "mini golf",
-    # Car rental
-    "sixt", "hertz", "avis", "enterprise rent", "budget car", "national car",
-    "rent a car", "car rental",
-    # Senior Living - removed "apartment" (apartment hotels are legit)
-    "senior living", "assisted living", "nursing home",
-    "retirement community", "memory care", "eldercare",
-    # Construction/Services
-    "exteriors", "roofing", "plumbing", "electric", "hvac", "landscaping",
-    "construction", "contractor", "remodeling", "renovation",
-    # Coffee/Food misc
-    "coffee", "bagel", "donut", "smoothie", "juice bar", "ice cream",
-    "frozen yogurt", "cupcake", "cookie",
-]
-
-# Website domains to skip (big chains, aggregators, social media, junk)
-SKIP_DOMAINS = [
-    # Big chains
-    "marriott.com", "hilton.com", "hyatt.com", "ihg.com",
-    "wyndham.com", "wyndhamhotels.com", "choicehotels.com", "bestwestern.com",
-    "radissonhotels.com", "accor.com", "fourseasons.com",
-    "ritzcarlton.com", "starwoodhotels.com",
-    # OTAs and aggregators
-    "booking.com", "expedia.com", "hotels.com", "trivago.com",
-    "tripadvisor.com", "kayak.com", "priceline.com", "agoda.com",
-    "airbnb.com", "vrbo.com",
-    # Social media
-    "facebook.com", "instagram.com", "twitter.com", "youtube.com",
-    "tiktok.com", "linkedin.com", "yelp.com",
-    # Other junk
-    "google.com",
-    # Non-hotels (retail, pharmacy, healthcare, restaurants, etc.)
-    "publix.com", "cvs.com", "walgreens.com", "walmart.com", "target.com",
-    "costco.com", "kroger.com", "albertsons.com", "safeway.com",
-    "mcdonalds.com", "starbucks.com", "dunkindonuts.com", "subway.com",
-    "chipotle.com", "tacobell.com", "wendys.com", "burgerking.com",
-    "chick-fil-a.com", "dominos.com", "pizzahut.com", "papajohns.com",
-    "bankofamerica.com", "chase.com", "wellsfargo.com", "citibank.com",
-    "ups.com", "fedex.com", "usps.com",
-    "homedepot.com", "lowes.com", "menards.com",
-    "staples.com", "officedepot.com",
-    # Government/education (not hotels)
-    ".gov", ".edu", ".mil",
-    "dnr.", "parks.", "recreation.",
-]
-
-
 def _distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """Calculate approximate distance in km between two points (Haversine simplified)."""
     avg_lat = (lat1 + lat2) / 2
@@ -823,27 +722,19 @@ class GridScraper:
                     logger.debug(f"SKIP out-of-bounds: {name} at ({lat:.4f}, {lng:.4f})")
                     return None
 
-        # Skip chains by name
-        for chain in SKIP_CHAINS:
-            if chain in name_lower:
-                self._stats.chains_skipped += 1
-                logger.debug(f"SKIP chain '{chain}': {name}")
-                return None
-
-        # Skip non-hotel businesses by name
-        for keyword in SKIP_NON_HOTELS:
-            if keyword in name_lower:
-                self._stats.chains_skipped += 1
-                logger.debug(f"SKIP non-hotel '{keyword}': {name}")
-                return None
+        # Skip chains and non-hotel businesses by name
+        match = SCRAPER_NAME_CLASSIFIER.classify(name_lower)
+        if match:
+            self._stats.chains_skipped += 1
+            logger.debug(f"SKIP {match.category} '{match.keyword}': {name}")
+            return None
 
         # Skip chains/aggregators by website domain
-        website_lower = website.lower()
-        for domain in SKIP_DOMAINS:
-            if domain in website_lower:
-                self._stats.chains_skipped += 1
-                logger.debug(f"SKIP domain '{domain}': {name} -> {website}")
-                return None
+        match = SCRAPER_DOMAIN_CLASSIFIER.classify(website)
+        if match:
+            self._stats.chains_skipped += 1
+            logger.debug(f"SKIP domain '{match.keyword}': {name} -> {website}")
+            return None
 
         # Parse city/state from address
         address = place.get("address", "")
@@ -39,13 +39,17 @@ class LocationExtractor:
 
         Returns the most likely city/location found, or empty string.
         """
-        text_lower = text.lower()
-        combined = (text_lower + " " + html.lower()) if html else text_lower
+        return cls.extract_location_lower(text.lower(), html.lower() if html else "")
 
+    @classmethod
+    def extract_location_lower(cls, text_lower: str, html_lower: str = "") -> str:
+        """extract_location() for already-lowercased text and HTML."""
         # Count occurrences of known cities
         city_counts = {}
         for city in cls.KNOWN_CITIES:
-            count = combined.count(city)
+            count = text_lower.count(city)
+            if html_lower:
+                count += html_lower.count(city)
             if count > 0:
                 city_counts[city] = count
 
@@ -56,7 +60,7 @@ class LocationExtractor:
 
         # Fallback: look for country mentions
         for country in cls.KNOWN_COUNTRIES:
-            if country in combined:
+            if country in text_lower or (html_lower and country in html_lower):
                 return country.title()
 
         return ""
@@ -0,0 +1,143 @@
+"""Compiled multi-pattern substring matcher.
+
+Replaces nested `for name, patterns in ...: for pat in patterns: if pat in s`
+loops with precompiled regexes. Patterns are merged into a prefix trie so a
+miss (the common case - most hosts on a page are not booking engines) is a
+single C-level scan; only strings that contain a pattern pay for the
+priority-ordered lookup.
+"""
+
+import re
+from typing import Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def _trie_regex(patterns: Iterable[str]) -> str:
+    """Build a regex matching any of patterns, with shared prefixes factored out.
+
+    Python's re tries each alternative of a flat `a|b|c` alternation at every
+    offset; a trie-shaped regex rejects a non-matching offset after one char.
+    """
+    trie: Dict[str, dict] = {}
+    for pattern in patterns:
+        node = trie
+        for ch in pattern:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # End-of-pattern marker
+
+    def build(node: Dict[str, dict]) -> str:
+        if list(node) == [""]:
+            return ""
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:
+            # Pattern ends here but longer ones continue
+            body = ("(?:" + body + ")?") if len(alts) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+class PatternMatcher(Generic[T]):
+    """Matches plain substrings against a priority-ordered list of patterns.
+
+    Semantics are identical to walking the patterns in order and returning
+    the first one that is a substring of the text: when several patterns
+    occur, the one listed first wins regardless of where it appears.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[Tuple[str, T]],
+        lowercase: bool = True,
+        suffix: str = "",
+    ):
+        """
+        Args:
+            entries: (pattern, value) pairs in priority order
+            lowercase: Match case-insensitively (patterns and text lowercased)
+            suffix: Optional regex that must follow the pattern, e.g. r"[./\-]"
+        """
+        self.lowercase = lowercase
+        self._priority: Dict[str, int] = {}
+        self._entries: List[Tuple[str, T]] = []
+
+        for pattern, value in entries:
+            if not pattern:
+                continue
+            key = pattern.lower() if lowercase else pattern
+            if key in self._priority:
+                continue  # First occurrence keeps its priority
+            self._priority[key] = len(self._entries)
+            self._entries.append((key, value))
+
+        if self._entries:
+            # Fast existence check used to reject misses
+            trie = _trie_regex(p for p, _ in self._entries)
+            self._prefilter: Optional[re.Pattern] = re.compile(f"(?:{trie}){suffix}")
+            # Zero-width lookahead finds a match at every offset (overlaps
+            # included). The trie captures the longest pattern starting there;
+            # shorter patterns at the same offset are its prefixes.
+            self._regex: Optional[re.Pattern] = re.compile(f"(?=({trie}){suffix})")
+            self._suffix: Optional[re.Pattern] = re.compile(suffix) if suffix else None
+        else:
+            self._prefilter = None
+            self._regex = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def search(self, text: str) -> Optional[Tuple[str, T]]:
+        """Return (pattern, value) for the highest-priority pattern in text."""
+        if not text or self._regex is None:
+            return None
+        if self.lowercase:
+            text = text.lower()
+        if not self._prefilter.search(text):
+            return None
+
+        best = -1
+        for m in self._regex.finditer(text):
+            found = m.group(1)
+            start = m.start()
+            for end in range(len(found), 0, -1):
+                idx = self._priority.get(found[:end])
+                if idx is None or (best != -1 and idx >= best):
+                    continue
+                if end < len(found) and self._suffix and not self._suffix.match(text, start + end):
+                    continue
+                best = idx
+            if best == 0:
+                break
+        if best == -1:
+            return None
+        return self._entries[best]
+
+    def contains(self, text: str) -> bool:
+        """Return True if any pattern occurs in text."""
+        if not text or self._regex is None:
+            return False
+        if self.lowercase:
+            text = text.lower()
+        return self._prefilter.search(text) is not None
+
+    def search_many(self, texts: Iterable[str]) -> List[Optional[Tuple[str, T]]]:
+        """Batch variant of search()."""
+        return [self.search(t) for t in texts]
+
+
+def build_engine_matcher(patterns: Dict[str, List[str]]) -> PatternMatcher[str]:
+    """Compile {engine_name: [domain patterns]} into a matcher keyed by pattern.
+
+    Priority follows dict order, then pattern order within each engine,
+    matching the original nested-loop lookup.
+    """
+    return PatternMatcher(
+        (pat, engine_name)
+        for engine_name, pats in patterns.items()
+        for pat in (pats or [])
+    )
@@ -0,0 +1,105 @@
+"""Unit tests for the compiled pattern matcher."""
+
+import pytest
+
+from services.leadgen.matcher import PatternMatcher, build_engine_matcher
+
+
+ENGINE_PATTERNS = {
+    "Cloudbeds": ["cloudbeds.com"],
+    "SynXis / TravelClick": ["synxis.com", "travelclick.com"],
+    "Mews": ["mews.com", "mews.li"],
+    "SiteMinder": ["siteminder.com", "thebookingbutton.com", "direct-book"],
+}
+
+
+def _nested_loop(patterns, text):
+    """Reference implementation: the original nested-loop lookup."""
+    for engine_name, pats in patterns.items():
+        for pat in pats:
+            if pat in text:
+                return (pat, engine_name)
+    return None
+
+
+@pytest.mark.no_db
+class TestPatternMatcher:
+    """Unit tests for PatternMatcher."""
+
+    def test_search_known_domain(self):
+        matcher = build_engine_matcher(ENGINE_PATTERNS)
+        assert matcher.search("hotels.cloudbeds.com") == ("cloudbeds.com", "Cloudbeds")
+
+    def test_search_no_match(self):
+        matcher = build_engine_matcher(ENGINE_PATTERNS)
+        assert matcher.search("unknown-domain.com") is None
+        assert matcher.search("") is None
+
+    def test_priority_beats_position(self):
+        # Mews appears first in the text but Cloudbeds is listed first
+        matcher = build_engine_matcher(ENGINE_PATTERNS)
+        text = "mews.com\ncloudbeds.com"
+        assert matcher.search(text) == ("cloudbeds.com", "Cloudbeds")
+
+    def test_overlapping_patterns(self):
+        # Higher-priority pattern starts inside a lower-priority match
+        matcher = PatternMatcher([("bookingbutton", "B"), ("thebooking", "A")])
+        assert matcher.search("thebookingbutton.com") == ("bookingbutton", "B")
+
+    def test_case_insensitive(self):
+        matcher = build_engine_matcher(ENGINE_PATTERNS)
+        assert matcher.search("HTTPS://BE.SYNXIS.COM/?hotel=1") == ("synxis.com", "SynXis / TravelClick")
+
+    def test_duplicate_pattern_keeps_first_engine(self):
+        matcher = build_engine_matcher({"A": ["shared.com"], "B": ["shared.com"]})
+        assert matcher.search("shared.com") == ("shared.com", "A")
+
+    def test_suffix(self):
+        matcher = PatternMatcher([("kube", "Seekda")], suffix=r"[./\-]")
+        assert matcher.search("cdn.kube.io") == ("kube", "Seekda")
+        assert matcher.search("kubernetes") is None
+
+    def test_contains(self):
+        matcher = build_engine_matcher(ENGINE_PATTERNS)
+        assert matcher.contains("app.mews.li")
+        assert not matcher.contains("example.com")
+
+    def test_empty_matcher(self):
+        matcher = build_engine_matcher({})
+        assert not matcher
+        assert matcher.search("cloudbeds.com") is None
+        assert not matcher.contains("cloudbeds.com")
+
+    def test_matches_nested_loop(self):
+        matcher = build_engine_matcher(ENGINE_PATTERNS)
+        samples = [
+            "www.thebookingbutton.com.au",
+            "res.travelclick.com/synxis.com",
+            "direct-book.mews.com",
+            "fonts.googleapis.com",
+        ]
+        for text in samples:
+            assert matcher.search(text) == _nested_loop(ENGINE_PATTERNS, text)
+
+    def test_search_many(self):
+        matcher = build_engine_matcher(ENGINE_PATTERNS)
+        results = matcher.search_many(["cloudbeds.com", "example.com"])
+        assert results == [("cloudbeds.com", "Cloudbeds"), None]
+
+    def test_prefix_patterns(self):
+        # One pattern is a prefix of another; shorter one listed second
+        matcher = PatternMatcher([("mews.com.au", "AU"), ("mews.com", "Mews"), ("mews.li", "Li")])
+        assert matcher.search("app.mews.com/x") == ("mews.com", "Mews")
+        assert matcher.search("app.mews.com.au") == ("mews.com.au", "AU")
+        assert matcher.search("mews.li") == ("mews.li", "Li")
+        assert matcher.search("mews.co") is None
+
+    def test_shorter_prefix_listed_first(self):
+        # Both patterns start at the same offset; priority, not length, decides
+        matcher = PatternMatcher([("pizza", "generic"), ("pizza hut", "chain")])
+        assert matcher.search("Pizza Hut Express") == ("pizza", "generic")
+
+    def test_prefix_patterns_with_suffix(self):
+        matcher = PatternMatcher([("kube", "A"), ("kubes", "B")], suffix=r"[./\-]")
+        assert matcher.search("cdn.kubes.io") == ("kubes", "B")
+        assert matcher.search("cdn.kubes.io/kube.js") == ("kube", "A")
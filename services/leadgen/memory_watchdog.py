@@ -0,0 +1,208 @@
+"""Memory watchdog for a BrowserPool.
+
+The consumer's RAM presets size the browser pool up front, but Chromium's
+footprint depends on the sites visited, and long-lived contexts accumulate
+cookies, service workers and leaked pages. The watchdog samples the RSS of
+this process and its Chromium children (infra.memory) plus the memory still
+available to the instance, and reacts before the OOM killer does:
+
+- high:     recycle every context (idle now, in-use on release) and take
+            one slot out of circulation (at most once per ACTION_COOLDOWN)
+- critical: recycle and halve the pool's capacity, on every check
+- ok:       after RECOVER_CHECKS calm checks in a row, give one slot back
+
+Recycle and capacity counts are logged every REPORT_INTERVAL seconds.
+
+Usage:
+    watchdog = MemoryWatchdog(pool, limit_mb=6000)
+    watchdog.start()
+    ...
+    await watchdog.stop()
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+from infra.memory import MemorySnapshot, read_memory
+from services.leadgen.browser_pool import BrowserPool
+
+
+# Process tree RSS as a fraction of limit_mb
+HIGH_RSS_FRACTION = 0.85
+CRITICAL_RSS_FRACTION = 0.95
+# Memory still available to the instance, % of host/cgroup total
+HIGH_AVAILABLE_PCT = 15.0
+CRITICAL_AVAILABLE_PCT = 7.0
+# Hysteresis: capacity is only given back below/above these
+OK_RSS_FRACTION = 0.75
+OK_AVAILABLE_PCT = 20.0
+# Seconds between actions on high pressure (recycling is not free)
+ACTION_COOLDOWN = 30.0
+# Consecutive ok checks before one slot is given back
+RECOVER_CHECKS = 6
+# Seconds between metric log lines
+REPORT_INTERVAL = 300.0
+
+
+class MemoryWatchdog:
+    """Recycles contexts and sheds pool capacity under memory pressure."""
+
+    def __init__(
+        self,
+        pool: BrowserPool,
+        limit_mb: int = 0,
+        interval: float = 5.0,
+        min_capacity: int = 1,
+        reader: Callable[[], MemorySnapshot] = read_memory,
+    ):
+        """
+        Args:
+            pool: Pool to recycle and resize
+            limit_mb: RSS budget for this process and its children (0 = only
+                watch the memory available to the instance)
+            interval: Seconds between checks
+            min_capacity: Never shrink the pool below this many slots
+            reader: Memory probe (injectable for tests)
+        """
+        self.pool = pool
+        self.limit_mb = limit_mb
+        self.interval = interval
+        self.min_capacity = min_capacity
+        self.reader = reader
+
+        self._task: Optional[asyncio.Task] = None
+        self._calm = 0
+        self._last_action = float("-inf")
+        self._started_at = time.monotonic()
+        self._last_report = self._started_at
+
+        self.stats = {
+            "checks": 0,
+            "high": 0,
+            "critical": 0,
+            "capacity_lowered": 0,
+            "capacity_raised": 0,
+            "peak_python_mb": 0,
+            "peak_children_mb": 0,
+            "min_available_mb": 0,
+        }
+
+    def level(self, snap: MemorySnapshot) -> str:
+        """Classify a reading as "critical", "high", "steady" or "ok"."""
+        rss = snap.tree_mb / self.limit_mb if self.limit_mb else 0.0
+        available = snap.available_pct if snap.total_mb else 100.0
+        if rss >= CRITICAL_RSS_FRACTION or available < CRITICAL_AVAILABLE_PCT:
+            return "critical"
+        if rss >= HIGH_RSS_FRACTION or available < HIGH_AVAILABLE_PCT:
+            return "high"
+        if rss < OK_RSS_FRACTION and available >= OK_AVAILABLE_PCT:
+            return "ok"
+        return "steady"
+
+    async def check(self) -> str:
+        """Take one reading and act on it. Returns the pressure level."""
+        snap = self.reader()
+        self._record(snap)
+        level = self.level(snap)
+        pool = self.pool
+
+        if level == "critical":
+            self.stats["critical"] += 1
+            self._calm = 0
+            recycled = await pool.recycle()
+            before = pool.capacity
+            after = await pool.set_capacity(max(self.min_capacity, before // 2))
+            if after < before:
+                self.stats["capacity_lowered"] += 1
+            self._last_action = time.monotonic()
+            logger.warning(
+                f"Memory critical ({self._describe(snap)}): recycled {recycled} contexts, "
+                f"capacity {before} -> {after}"
+            )
+        elif level == "high":
+            self.stats["high"] += 1
+            self._calm = 0
+            if time.monotonic() - self._last_action >= ACTION_COOLDOWN:
+                recycled = await pool.recycle()
+                before = pool.capacity
+                after = await pool.set_capacity(max(self.min_capacity, before - 1))
+                if after < before:
+                    self.stats["capacity_lowered"] += 1
+                self._last_action = time.monotonic()
+                logger.warning(
+                    f"Memory high ({self._describe(snap)}): recycled {recycled} contexts, "
+                    f"capacity {before} -> {after}"
+                )
+        elif level == "ok":
+            self._calm += 1
+            if self._calm >= RECOVER_CHECKS and pool.capacity < pool.size:
+                self._calm = 0
+                before = pool.capacity
+                await pool.set_capacity(before + 1)
+                self.stats["capacity_raised"] += 1
+                logger.info(f"Memory ok ({self._describe(snap)}): capacity {before} -> {pool.capacity}")
+        else:
+            self._calm = 0
+
+        now = time.monotonic()
+        if now - self._last_report >= REPORT_INTERVAL:
+            self._last_report = now
+            logger.info(f"Memory watchdog: {self.metrics()}")
+        return level
+
+    def metrics(self) -> Dict[str, float]:
+        """Watchdog counters plus recycle frequency since start."""
+        hours = max((time.monotonic() - self._started_at) / 3600, 1e-9)
+        pool_stats = self.pool.stats
+        return {
+            **self.stats,
+            "capacity": self.pool.capacity,
+            "recycled_pages_per_hour": round(pool_stats["contexts_recycled"] / hours, 1),
+            "recycled_memory_per_hour": round(pool_stats["contexts_recycled_memory"] / hours, 1),
+            "pages_leaked": pool_stats["pages_leaked"],
+        }
+
+    def start(self) -> None:
+        """Start checking in the background."""
+        if self._task is None:
+            self._started_at = self._last_report = time.monotonic()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop checking and log the final metrics."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info(f"Memory watchdog stopped: {self.metrics()}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Memory watchdog check failed: {e}")
+
+    def _record(self, snap: MemorySnapshot) -> None:
+        st = self.stats
+        st["checks"] += 1
+        st["peak_python_mb"] = max(st["peak_python_mb"], int(snap.python_mb))
+        st["peak_children_mb"] = max(st["peak_children_mb"], int(snap.children_mb))
+        if snap.total_mb:
+            available = int(snap.available_mb)
+            st["min_available_mb"] = min(st["min_available_mb"], available) if st["min_available_mb"] else available
+
+    def _describe(self, snap: MemorySnapshot) -> str:
+        limit = f"/{self.limit_mb}" if self.limit_mb else ""
+        return (
+            f"python {snap.python_mb:.0f}MB + browser {snap.children_mb:.0f}MB = {snap.tree_mb:.0f}{limit}MB, "
+            f"{snap.available_mb:.0f}MB ({snap.available_pct:.0f}%) available"
+        )
@@ -0,0 +1,82 @@
+"""Unit tests for MemoryWatchdog (fake pool and memory readings)."""
+
+import pytest
+
+from infra.memory import MemorySnapshot
+from services.leadgen import memory_watchdog
+from services.leadgen.memory_watchdog import MemoryWatchdog
+
+
+class FakePool:
+    def __init__(self, size):
+        self.size = size
+        self.capacity = size
+        self.recycles = 0
+        self.stats = {"contexts_recycled": 0, "contexts_recycled_memory": 0, "pages_leaked": 0}
+
+    async def recycle(self):
+        self.recycles += 1
+        self.stats["contexts_recycled_memory"] += self.capacity
+        return self.capacity
+
+    async def set_capacity(self, capacity):
+        self.capacity = max(1, min(self.size, capacity))
+        return self.capacity
+
+
+def _reader(readings):
+    """Memory probe returning the given (tree_mb, available_pct) readings in turn."""
+    readings = iter(readings)
+
+    def read():
+        tree_mb, available_pct = next(readings)
+        return MemorySnapshot(python_mb=200, children_mb=tree_mb - 200, available_mb=available_pct * 100, total_mb=10000)
+    return read
+
+
+@pytest.mark.no_db
+class TestMemoryWatchdog:
+    """Unit tests for MemoryWatchdog."""
+
+    def test_levels(self):
+        watchdog = MemoryWatchdog(FakePool(8), limit_mb=1000)
+        assert watchdog.level(MemorySnapshot(500, 460, 5000, 10000)) == "critical"
+        assert watchdog.level(MemorySnapshot(500, 360, 5000, 10000)) == "high"
+        assert watchdog.level(MemorySnapshot(500, 300, 5000, 10000)) == "steady"
+        assert watchdog.level(MemorySnapshot(500, 100, 5000, 10000)) == "ok"
+        # Instance running out regardless of our own RSS
+        assert watchdog.level(MemorySnapshot(100, 100, 500, 10000)) == "critical"
+        assert watchdog.level(MemorySnapshot(100, 100, 1000, 10000)) == "high"
+        # No /proc: never pressure
+        assert MemoryWatchdog(FakePool(8)).level(MemorySnapshot()) == "ok"
+
+    async def test_critical_recycles_and_halves(self):
+        pool = FakePool(8)
+        watchdog = MemoryWatchdog(pool, limit_mb=1000, min_capacity=3, reader=_reader([(990, 50), (990, 50)]))
+        assert await watchdog.check() == "critical"
+        assert pool.capacity == 4 and pool.recycles == 1
+        await watchdog.check()
+        assert pool.capacity == 3
+        assert watchdog.stats["capacity_lowered"] == 2
+
+    async def test_high_respects_cooldown(self):
+        pool = FakePool(8)
+        watchdog = MemoryWatchdog(pool, limit_mb=1000, reader=_reader([(900, 50)] * 3))
+        for _ in range(3):
+            assert await watchdog.check() == "high"
+        assert pool.capacity == 7 and pool.recycles == 1
+        assert watchdog.stats["high"] == 3
+
+    async def test_recovers_one_slot_after_calm_checks(self, monkeypatch):
+        monkeypatch.setattr(memory_watchdog, "RECOVER_CHECKS", 2)
+        pool = FakePool(8)
+        readings = [(990, 50), (500, 50), (800, 50), (500, 50), (500, 50), (500, 50), (500, 50)]
+        watchdog = MemoryWatchdog(pool, limit_mb=1000, reader=_reader(readings))
+        for _ in readings:
+            await watchdog.check()
+        # 8 -> 4, steady reading resets the calm streak, then +1 per 2 ok checks
+        assert pool.capacity == 6
+        metrics = watchdog.metrics()
+        assert metrics["capacity_raised"] == 2
+        assert metrics["peak_children_mb"] == 790
+        assert metrics["min_available_mb"] == 5000
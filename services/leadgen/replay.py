@@ -0,0 +1,225 @@
+"""Offline record/replay of detector traffic.
+
+Detector benchmarks against live hotel sites are not comparable run to run
+(sites change, CDNs vary, hosts go down). A recording captures everything a
+detection run fetched so later runs can be served locally:
+
+- Browser traffic: BrowserPool(record_har_dir=...) writes one HAR per
+  context; merge_hars() joins them into one archive, and
+  BrowserPool(replay_har=...) serves it with Playwright's route_from_har
+  (requests not in the archive are aborted)
+- httpx traffic (precheck, static tier): HarRecorder wraps the pooled client
+  transport and appends to a HAR, HarReplayTransport serves it back,
+  including recorded timeouts and connection errors
+
+Usage:
+    entries = []
+    with recording_http(entries):
+        ...  # run the detector against live sites
+    save_har(entries, "http.har")
+
+    archive = HarArchive.load("http.har", "browser.har")
+    with replaying_http(archive):
+        ...  # run the detector offline
+"""
+
+import base64
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import httpx
+
+from infra.http_client import set_transport_wrapper
+
+
+# Body is stored decoded, so framing/encoding headers no longer apply
+_SKIP_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection"})
+
+# HAR "_error" value -> exception raised on replay
+_ERRORS = {
+    "timeout": httpx.ConnectTimeout,
+    "connect": httpx.ConnectError,
+}
+
+
+def load_har(path: str) -> List[Dict]:
+    """Return the entries of a HAR file."""
+    with open(path) as f:
+        return json.load(f)["log"]["entries"]
+
+
+def save_har(entries: List[Dict], path: str) -> None:
+    """Write entries as a HAR 1.2 file."""
+    har = {"log": {"version": "1.2", "creator": {"name": "sadie-gtm", "version": "1"}, "entries": entries}}
+    with open(path, "w") as f:
+        json.dump(har, f)
+
+
+def merge_hars(paths: Iterable[str], out_path: str) -> int:
+    """Merge HAR files into one, earlier files first. Returns the entry count."""
+    entries: List[Dict] = []
+    for path in paths:
+        entries.extend(load_har(path))
+    save_har(entries, out_path)
+    return len(entries)
+
+
+class HarArchive:
+    """Recorded responses indexed by (method, url); the first recording of a request wins."""
+
+    def __init__(self, entries: Iterable[Dict]):
+        self._index: Dict[Tuple[str, str], Dict] = {}
+        for entry in entries:
+            request = entry["request"]
+            self._index.setdefault((request["method"].upper(), _strip_fragment(request["url"])), entry)
+
+    @classmethod
+    def load(cls, *paths: str) -> "HarArchive":
+        """Load HAR files; earlier files take precedence for duplicate requests."""
+        entries: List[Dict] = []
+        for path in paths:
+            entries.extend(load_har(path))
+        return cls(entries)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def lookup(self, method: str, url: str) -> Optional[Dict]:
+        """Return the recorded entry for a request. HEAD falls back to a recorded GET."""
+        url = _strip_fragment(url)
+        entry = self._index.get((method.upper(), url))
+        if entry is None and method.upper() == "HEAD":
+            entry = self._index.get(("GET", url))
+        return entry
+
+
+def _strip_fragment(url: str) -> str:
+    return url.split("#", 1)[0]
+
+
+def _headers(har_headers: List[Dict]) -> List[Tuple[str, str]]:
+    return [
+        (h["name"], h["value"])
+        for h in har_headers
+        if not h["name"].startswith(":") and h["name"].lower() not in _SKIP_HEADERS
+    ]
+
+
+def _har_headers(headers: httpx.Headers) -> List[Dict]:
+    return [{"name": k, "value": v} for k, v in headers.multi_items()]
+
+
+class HarReplayTransport(httpx.AsyncBaseTransport):
+    """httpx transport answering from a HarArchive; unknown requests fail to connect."""
+
+    def __init__(self, archive: HarArchive):
+        self.archive = archive
+        self.hits = 0
+        self.misses = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        entry = self.archive.lookup(request.method, str(request.url))
+        if entry is None:
+            self.misses += 1
+            raise httpx.ConnectError(f"Not in archive: {request.method} {request.url}", request=request)
+        self.hits += 1
+
+        response = entry["response"]
+        error = response.get("_error")
+        if error or response.get("status", 0) <= 0:
+            raise _ERRORS.get(error, httpx.ConnectError)(f"Recorded {error or 'failure'}", request=request)
+
+        content = response.get("content", {})
+        body = content.get("text", "") or ""
+        if content.get("encoding") == "base64":
+            data = base64.b64decode(body)
+        else:
+            data = body.encode("utf-8")
+        if request.method.upper() == "HEAD":
+            data = b""
+        return httpx.Response(
+            response["status"], headers=_headers(response.get("headers", [])), content=data, request=request,
+        )
+
+
+class HarRecorder(httpx.AsyncBaseTransport):
+    """httpx transport wrapper that appends every exchange to a list of HAR entries."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, entries: List[Dict]):
+        self._transport = transport
+        self.entries = entries
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = datetime.now(timezone.utc).isoformat()
+        t0 = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+            try:
+                raw = b"".join([chunk async for chunk in response.stream])
+            finally:
+                await response.aclose()
+        except httpx.TimeoutException:
+            self._record(request, started, t0, {"status": 0, "headers": [], "_error": "timeout"})
+            raise
+        except httpx.TransportError:
+            self._record(request, started, t0, {"status": 0, "headers": [], "_error": "connect"})
+            raise
+
+        # Decode (gzip/br) once for the archive; the caller gets the raw bytes back
+        body = httpx.Response(response.status_code, headers=response.headers, content=raw).read()
+        content: Dict = {"size": len(body), "mimeType": response.headers.get("content-type", "")}
+        try:
+            content["text"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            content["text"] = base64.b64encode(body).decode("ascii")
+            content["encoding"] = "base64"
+        self._record(request, started, t0, {
+            "status": response.status_code,
+            "statusText": response.reason_phrase,
+            "headers": _har_headers(response.headers),
+            "content": content,
+            "redirectURL": response.headers.get("location", ""),
+        })
+        return httpx.Response(
+            response.status_code, headers=response.headers, content=raw,
+            request=request, extensions=response.extensions,
+        )
+
+    def _record(self, request: httpx.Request, started: str, t0: float, response: Dict) -> None:
+        self.entries.append({
+            "startedDateTime": started,
+            "time": int((time.perf_counter() - t0) * 1000),
+            "request": {
+                "method": request.method,
+                "url": str(request.url),
+                "headers": _har_headers(request.headers),
+            },
+            "response": response,
+        })
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+@contextmanager
+def recording_http(entries: List[Dict]) -> Iterator[None]:
+    """Record the traffic of pooled httpx clients created inside the block."""
+    set_transport_wrapper(lambda transport: HarRecorder(transport, entries))
+    try:
+        yield
+    finally:
+        set_transport_wrapper(None)
+
+
+@contextmanager
+def replaying_http(archive: HarArchive) -> Iterator[HarReplayTransport]:
+    """Serve pooled httpx clients created inside the block from archive."""
+    transport = HarReplayTransport(archive)
+    set_transport_wrapper(lambda _transport: transport)
+    try:
+        yield transport
+    finally:
+        set_transport_wrapper(None)
@@ -0,0 +1,103 @@
+"""Unit tests for offline HAR record/replay (no network)."""
+
+import gzip
+
+import httpx
+import pytest
+
+from infra.http_client import create_pooled_client
+from services.leadgen.detector import batch_precheck
+from services.leadgen.replay import (
+    HarArchive,
+    load_har,
+    merge_hars,
+    recording_http,
+    replaying_http,
+    save_har,
+)
+
+
+def _live(request: httpx.Request) -> httpx.Response:
+    """Stand-in for the internet."""
+    if request.url.host == "slow.com":
+        raise httpx.ConnectTimeout("timed out", request=request)
+    if request.url.host == "gzip.com":
+        return httpx.Response(200, headers={"content-encoding": "gzip"}, content=gzip.compress(b"<html>gz</html>"))
+    if request.method == "HEAD" and request.url.host == "nohead.com":
+        return httpx.Response(405)
+    return httpx.Response(200, headers={"content-type": "text/html"}, text=f"<html>{request.url.host}</html>")
+
+
+async def _record(urls):
+    entries = []
+    with recording_http(entries):
+        async with create_pooled_client() as client:
+            for method, url in urls:
+                try:
+                    await client.request(method, url)
+                except httpx.TimeoutException:
+                    pass
+    return entries
+
+
+@pytest.fixture
+def live(monkeypatch):
+    monkeypatch.setattr(
+        "infra.http_client.CachingDNSTransport", lambda *args, **kwargs: httpx.MockTransport(_live)
+    )
+
+
+@pytest.mark.no_db
+class TestHarReplay:
+
+    async def test_record_then_replay(self, live, tmp_path):
+        entries = await _record([("GET", "https://a.com/"), ("GET", "https://gzip.com/"), ("GET", "https://slow.com/")])
+        save_har(entries, str(tmp_path / "http.har"))
+        archive = HarArchive.load(str(tmp_path / "http.har"))
+        assert len(archive) == 3
+
+        with replaying_http(archive) as transport:
+            async with create_pooled_client() as client:
+                assert (await client.get("https://a.com/#top")).text == "<html>a.com</html>"
+                assert (await client.get("https://gzip.com/")).text == "<html>gz</html>"
+                head = await client.head("https://a.com/")
+                assert head.status_code == 200 and head.content == b""
+                with pytest.raises(httpx.ConnectTimeout):
+                    await client.get("https://slow.com/")
+                with pytest.raises(httpx.ConnectError):
+                    await client.get("https://unknown.com/")
+        assert transport.misses == 1
+
+    async def test_recorder_returns_live_response(self, live):
+        entries = []
+        with recording_http(entries):
+            async with create_pooled_client() as client:
+                response = await client.get("https://gzip.com/")
+        assert response.text == "<html>gz</html>"
+        assert entries[0]["response"]["content"]["text"] == "<html>gz</html>"
+
+    async def test_precheck_is_deterministic_offline(self, live, tmp_path):
+        urls = [(1, "https://a.com/"), (2, "https://nohead.com/"), (3, "https://slow.com/")]
+        entries = []
+        with recording_http(entries):
+            recorded = await batch_precheck(urls)
+        archive = HarArchive(entries)
+        with replaying_http(archive):
+            replayed = await batch_precheck(urls + [(4, "https://gone.com/")])
+        assert {k: replayed[k] for k in recorded} == recorded
+        assert recorded[3] == (False, "timeout")
+        assert replayed[4] == (False, "connection_refused")
+
+    def test_merge_hars_first_file_wins(self, tmp_path):
+        def entry(url, status):
+            return {"request": {"method": "GET", "url": url}, "response": {"status": status, "headers": []}}
+
+        save_har([entry("https://a.com/", 200)], str(tmp_path / "1.har"))
+        save_har([entry("https://a.com/", 500), entry("https://b.com/", 200)], str(tmp_path / "2.har"))
+        out = str(tmp_path / "merged.har")
+        assert merge_hars([str(tmp_path / "1.har"), str(tmp_path / "2.har")], out) == 3
+        assert len(load_har(out)) == 3
+        archive = HarArchive.load(out)
+        assert archive.lookup("GET", "https://a.com/")["response"]["status"] == 200
+        assert archive.lookup("HEAD", "https://b.com/")["response"]["status"] == 200
+        assert archive.lookup("POST", "https://b.com/") is None
@@ -1,13 +1,23 @@
 """Repository for leadgen service database operations."""
 
-from typing import Optional, List
-from db.client import queries, get_conn
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, List
+from db.client import queries, get_conn, get_transaction
 from db.models.hotel import Hotel
 from db.models.booking_engine import BookingEngine
+from db.models.detection_domain_cache import DetectionDomainCache
+from db.models.detection_dead_domain import DetectionDeadDomain
+from db.models.detection_queue_message import DetectionQueueMessage
 
 BATCH_SIZE = 50
 
 
+def transaction():
+    """Run the repo calls in an `async with` block in one transaction (same task, one at a time)."""
+    return get_transaction()
+
+
 async def get_hotel_by_id(hotel_id: int) -> Optional[Hotel]:
     """Get hotel by ID with location coordinates."""
     async with get_conn() as conn:
@@ -134,6 +144,13 @@ async def get_all_booking_engines() -> List[BookingEngine]:
         return [BookingEngine.model_validate(dict(row)) for row in results]
 
 
+async def get_engine_pattern_version() -> int:
+    """Get the current booking engine pattern version."""
+    async with get_conn() as conn:
+        result = await queries.get_booking_engine_pattern_version(conn)
+        return result or 0
+
+
 async def insert_booking_engine(
     name: str,
     domains: Optional[List[str]] = None,
@@ -159,10 +176,12 @@ async def insert_hotel_booking_engine(
     booking_url: Optional[str] = None,
     detection_method: Optional[str] = None,
     status: int = 1,
+    pattern_version: Optional[int] = None,
 ) -> None:
     """Link hotel to detected booking engine.
 
     status: -1=failed (non-retriable), 1=success (default)
+    pattern_version: Engine pattern version the detection ran with
     """
     async with get_conn() as conn:
         await queries.insert_hotel_booking_engine(
@@ -172,6 +191,17 @@ async def insert_hotel_booking_engine(
             booking_url=booking_url,
             detection_method=detection_method,
             status=status,
+            pattern_version=pattern_version,
+        )
+
+
+async def insert_hotel_booking_engine_dead_letter(hotel_id: int, detection_method: str) -> None:
+    """Mark a hotel as failed (status=-1) unless it already has a successful detection."""
+    async with get_conn() as conn:
+        await queries.insert_hotel_booking_engine_dead_letter(
+            conn,
+            hotel_id=hotel_id,
+            detection_method=detection_method,
         )
 
 
@@ -263,6 +293,181 @@ async def insert_detection_error(
         )
 
 
+# =============================================================================
+# DETECTION DOMAIN CACHE
+# =============================================================================
+
+async def get_detection_domain_cache(domains: List[str]) -> List[DetectionDomainCache]:
+    """Get unexpired cached detection results for the given domains."""
+    if not domains:
+        return []
+    async with get_conn() as conn:
+        results = await queries.get_detection_domain_cache(conn, domains=domains)
+        return [DetectionDomainCache.model_validate(dict(row)) for row in results]
+
+
+async def upsert_detection_domain_cache(
+    domain: str,
+    booking_engine: str = "",
+    booking_engine_domain: Optional[str] = None,
+    booking_url: Optional[str] = None,
+    detection_method: Optional[str] = None,
+    phone_website: Optional[str] = None,
+    email: Optional[str] = None,
+    room_count: Optional[str] = None,
+    detected_location: Optional[str] = None,
+    pattern_version: Optional[int] = None,
+    source_hotel_id: Optional[int] = None,
+    ttl_days: int = 30,
+) -> None:
+    """Insert or refresh a domain's cached detection result."""
+    async with get_conn() as conn:
+        await queries.upsert_detection_domain_cache(
+            conn,
+            domain=domain,
+            booking_engine=booking_engine,
+            booking_engine_domain=booking_engine_domain,
+            booking_url=booking_url,
+            detection_method=detection_method,
+            phone_website=phone_website,
+            email=email,
+            room_count=room_count,
+            detected_location=detected_location,
+            pattern_version=pattern_version,
+            source_hotel_id=source_hotel_id,
+            ttl_days=ttl_days,
+        )
+
+
+async def delete_expired_detection_domain_cache() -> None:
+    """Remove expired domain cache entries."""
+    async with get_conn() as conn:
+        await queries.delete_expired_detection_domain_cache(conn)
+
+
+# =============================================================================
+# DETECTION DEAD DOMAINS
+# =============================================================================
+
+async def get_detection_dead_domains(domains: List[str]) -> List[DetectionDeadDomain]:
+    """Get domains among the given ones that are dead and not yet due for a re-check."""
+    if not domains:
+        return []
+    async with get_conn() as conn:
+        results = await queries.get_detection_dead_domains(conn, domains=domains)
+        return [DetectionDeadDomain.model_validate(dict(row)) for row in results]
+
+
+async def record_detection_dead_domain(
+    domain: str,
+    last_error: str,
+    base_hours: float = 24,
+    max_hours: float = 24 * 30,
+) -> None:
+    """Record a failed precheck; the re-check delay is base_hours * 2^(failures-1), capped at max_hours."""
+    async with get_conn() as conn:
+        await queries.record_detection_dead_domain(
+            conn,
+            domain=domain,
+            last_error=last_error,
+            base_hours=base_hours,
+            max_hours=max_hours,
+        )
+
+
+async def delete_detection_dead_domain(domain: str) -> None:
+    """Forget a dead domain (its site was reachable again)."""
+    async with get_conn() as conn:
+        await queries.delete_detection_dead_domain(conn, domain=domain)
+
+
+# =============================================================================
+# DETECTION QUEUE
+# =============================================================================
+
+async def enqueue_detection_messages(bodies: List[Dict[str, Any]]) -> int:
+    """Add messages to the Postgres detection queue. Returns count added."""
+    if not bodies:
+        return 0
+    async with get_conn() as conn:
+        return await queries.enqueue_detection_messages(conn, bodies=[json.dumps(b) for b in bodies])
+
+
+async def claim_detection_messages(limit: int, visibility_timeout: int) -> List[DetectionQueueMessage]:
+    """Claim up to limit visible messages, hiding them for visibility_timeout seconds."""
+    async with get_conn() as conn:
+        results = await queries.claim_detection_messages(conn, limit=limit, visibility_timeout=visibility_timeout)
+        return [
+            DetectionQueueMessage.model_validate({**dict(row), "body": json.loads(row["body"])})
+            for row in results
+        ]
+
+
+async def extend_detection_message(message_id: int, claim_token: str, visibility_timeout: int) -> bool:
+    """Move a claimed message's lease. Returns False if the claim was lost."""
+    async with get_conn() as conn:
+        return await queries.extend_detection_message(
+            conn, message_id=message_id, claim_token=claim_token, visibility_timeout=visibility_timeout,
+        )
+
+
+async def delete_detection_message(message_id: int, claim_token: str) -> bool:
+    """Acknowledge a claimed message. Returns False if the claim was lost."""
+    async with get_conn() as conn:
+        return await queries.delete_detection_message(conn, message_id=message_id, claim_token=claim_token)
+
+
+async def get_detection_queue_counts() -> Dict[str, int]:
+    """Pending (visible) and in-flight (claimed) message counts."""
+    async with get_conn() as conn:
+        result = await queries.get_detection_queue_counts(conn)
+        return {"pending": result["pending"], "in_flight": result["in_flight"]} if result else {"pending": 0, "in_flight": 0}
+
+
+# =============================================================================
+# JOBS
+# =============================================================================
+
+async def insert_job(
+    job_type: str,
+    started_at: datetime,
+    completed_at: datetime,
+    duration_ms: int,
+    status: int,
+    queue_name: Optional[str] = None,
+    message_id: Optional[str] = None,
+    attempt_number: int = 1,
+    worker_id: Optional[str] = None,
+    error_message: Optional[str] = None,
+    input_params: Optional[Dict[str, Any]] = None,
+    output_data: Optional[Dict[str, Any]] = None,
+) -> int:
+    """Record a finished job execution. Returns the job ID."""
+    async with get_conn() as conn:
+        return await queries.insert_job(
+            conn,
+            job_type=job_type,
+            queue_name=queue_name,
+            message_id=message_id,
+            attempt_number=attempt_number,
+            worker_id=worker_id,
+            started_at=started_at,
+            completed_at=completed_at,
+            duration_ms=duration_ms,
+            status=status,
+            error_message=error_message,
+            input_params=json.dumps(input_params) if input_params is not None else None,
+            output_data=json.dumps(output_data) if output_data is not None else None,
+        )
+
+
+async def get_job_stage_summary(job_type: str, since: datetime) -> List[Dict[str, Any]]:
+    """Per-stage timing totals across jobs of a type since a time, slowest first."""
+    async with get_conn() as conn:
+        results = await queries.get_job_stage_summary(conn, job_type=job_type, since=since)
+        return [dict(row) for row in results]
+
+
 # =============================================================================
 # SCRAPE TARGET CITIES
 # =============================================================================
@@ -12,6 +12,29 @@ from services.leadgen.repo import (
     insert_target_city,
     delete_target_city,
     count_target_cities_by_state,
+    # Booking engines
+    get_all_booking_engines,
+    get_engine_pattern_version,
+    insert_booking_engine,
+    insert_hotel_booking_engine,
+    insert_hotel_booking_engine_dead_letter,
+    transaction,
+    # Detection domain cache
+    get_detection_domain_cache,
+    upsert_detection_domain_cache,
+    # Detection dead domains
+    get_detection_dead_domains,
+    record_detection_dead_domain,
+    delete_detection_dead_domain,
+    # Detection queue
+    enqueue_detection_messages,
+    claim_detection_messages,
+    extend_detection_message,
+    delete_detection_message,
+    get_detection_queue_counts,
+    # Jobs
+    insert_job,
+    get_job_stage_summary,
 )
 
 
@@ -245,3 +268,179 @@ async def test_get_target_city_case_insensitive():
 
     # Cleanup
     await delete_target_city("Case Test", "UU")
+
+
+@pytest.mark.asyncio
+async def test_upsert_detection_domain_cache():
+    """Test caching a domain's detection result and reading it back."""
+    domain = "test-domain-cache-hotels.com"
+    await upsert_detection_domain_cache(
+        domain=domain,
+        booking_engine="Cloudbeds",
+        booking_engine_domain="cloudbeds.com",
+        booking_url="https://hotels.cloudbeds.com/reservation/abc",
+        detection_method="homepage_html_scan",
+        email="info@test-domain-cache-hotels.com",
+        pattern_version=3,
+    )
+
+    entries = await get_detection_domain_cache([domain])
+    assert len(entries) == 1
+    assert entries[0].booking_engine == "Cloudbeds"
+    assert entries[0].booking_url == "https://hotels.cloudbeds.com/reservation/abc"
+    assert entries[0].pattern_version == 3
+
+    # Upsert refreshes the entry
+    await upsert_detection_domain_cache(domain=domain, booking_engine="")
+    entries = await get_detection_domain_cache([domain])
+    assert entries[0].booking_engine == ""
+
+    # Expired entries are not returned
+    await upsert_detection_domain_cache(domain=domain, booking_engine="Mews", ttl_days=0)
+    assert await get_detection_domain_cache([domain]) == []
+
+
+@pytest.mark.asyncio
+async def test_engine_pattern_version_ignores_unchanged_upsert():
+    """Test re-inserting an existing engine unchanged does not bump the pattern version."""
+    version = await get_engine_pattern_version()
+    assert version >= 1
+
+    engine = (await get_all_booking_engines())[0]
+    await insert_booking_engine(name=engine.name, domains=None, tier=engine.tier)
+    assert await get_engine_pattern_version() == version
+
+
+@pytest.mark.asyncio
+async def test_get_detection_domain_cache_empty():
+    """Test empty domain list returns no entries."""
+    assert await get_detection_domain_cache([]) == []
+
+
+@pytest.mark.asyncio
+async def test_record_detection_dead_domain_backoff():
+    """Test dead domains back off exponentially and are forgotten on delete."""
+    domain = "test-dead-domain-hotels.com"
+    await delete_detection_dead_domain(domain)
+
+    await record_detection_dead_domain(domain, "connection_refused", base_hours=1, max_hours=3)
+    first = (await get_detection_dead_domains([domain]))[0]
+    assert first.failure_count == 1
+    assert first.last_error == "connection_refused"
+
+    await record_detection_dead_domain(domain, "HTTP 503", base_hours=1, max_hours=3)
+    await record_detection_dead_domain(domain, "HTTP 503", base_hours=1, max_hours=3)
+    third = (await get_detection_dead_domains([domain]))[0]
+    assert third.failure_count == 3
+    assert third.last_error == "HTTP 503"
+    # 1h, then 2h, then capped at 3h instead of 4h
+    delay_hours = (third.next_check_at - third.last_failed_at).total_seconds() / 3600
+    assert 2.9 < delay_hours < 3.1
+
+    await delete_detection_dead_domain(domain)
+    assert await get_detection_dead_domains([domain]) == []
+
+
+@pytest.mark.asyncio
+async def test_dead_letter_never_downgrades_success():
+    """Test dead-lettering marks a hotel failed but leaves a successful detection alone."""
+    from db.client import get_conn
+
+    async def link_status(hotel_id):
+        async with get_conn() as conn:
+            return await conn.fetchval(
+                "SELECT status FROM sadie_gtm.hotel_booking_engines WHERE hotel_id = $1", hotel_id
+            )
+
+    detected = await insert_hotel(name="Test Dead Letter Detected", website="https://dl-detected.test", source="test")
+    failing = await insert_hotel(name="Test Dead Letter Failing", website="https://dl-failing.test", source="test")
+    try:
+        await insert_hotel_booking_engine(hotel_id=detected, detection_method="homepage_html_scan", status=1)
+        await insert_hotel_booking_engine_dead_letter(detected, "error:dead_letter: 3 attempts")
+        await insert_hotel_booking_engine_dead_letter(failing, "error:dead_letter: 3 attempts")
+
+        assert await link_status(detected) == 1
+        assert await link_status(failing) == -1
+    finally:
+        async with get_conn() as conn:
+            await conn.execute(
+                "DELETE FROM sadie_gtm.hotel_booking_engines WHERE hotel_id = ANY($1::int[])", [detected, failing]
+            )
+        await delete_hotel(detected)
+        await delete_hotel(failing)
+
+
+@pytest.mark.asyncio
+async def test_transaction_rolls_back_every_call():
+    """Test repo calls inside transaction() are all undone when the block raises."""
+    from db.client import get_conn
+
+    hotel_id = await insert_hotel(name="Test Transaction Rollback", website="https://tx-rollback.test", source="test")
+    try:
+        with pytest.raises(RuntimeError):
+            async with transaction():
+                await insert_hotel_booking_engine(hotel_id=hotel_id, detection_method="homepage_html_scan", status=1)
+                raise RuntimeError("contact update failed")
+
+        async with get_conn() as conn:
+            assert await conn.fetchval(
+                "SELECT COUNT(*) FROM sadie_gtm.hotel_booking_engines WHERE hotel_id = $1", hotel_id
+            ) == 0
+    finally:
+        await delete_hotel(hotel_id)
+
+
+@pytest.mark.asyncio
+async def test_detection_queue_claim_lease_and_ack():
+    """Test claiming, lease extension/expiry and claim-token checks on the detection queue."""
+    import uuid
+
+    tag = uuid.uuid4().hex
+    assert await enqueue_detection_messages([{"hotel_ids": [1, 2], "tag": tag}, {"hotel_ids": [3], "tag": tag}]) == 2
+    assert (await get_detection_queue_counts())["pending"] >= 2
+
+    claimed = [m for m in await claim_detection_messages(limit=1000, visibility_timeout=60) if m.body.get("tag") == tag]
+    assert sorted(m.body["hotel_ids"][0] for m in claimed) == [1, 3]
+    assert all(m.receive_count == 1 and m.claim_token for m in claimed)
+
+    # Hidden while leased
+    again = await claim_detection_messages(limit=1000, visibility_timeout=60)
+    assert not [m for m in again if m.body.get("tag") == tag]
+
+    # Only the claimant can extend; releasing (0s) makes it claimable again
+    first = claimed[0]
+    assert await extend_detection_message(first.id, "not-the-token", 60) is False
+    assert await extend_detection_message(first.id, first.claim_token, 0) is True
+    reclaimed = [m for m in await claim_detection_messages(limit=1000, visibility_timeout=60) if m.id == first.id]
+    assert reclaimed[0].receive_count == 2
+
+    # The stale claim can no longer acknowledge it
+    assert await delete_detection_message(first.id, first.claim_token) is False
+    assert await delete_detection_message(first.id, reclaimed[0].claim_token) is True
+    assert await delete_detection_message(claimed[1].id, claimed[1].claim_token) is True
+
+
+@pytest.mark.asyncio
+async def test_insert_job_and_stage_summary():
+    """Test recording jobs with stage timings and summarising them."""
+    from datetime import datetime, timedelta
+
+    job_type = "test-detect-stages"
+    now = datetime.utcnow()
+    for total_ms, max_ms in ((3000, 2000), (1000, 1000)):
+        job_id = await insert_job(
+            job_type=job_type,
+            started_at=now,
+            completed_at=now,
+            duration_ms=total_ms,
+            status=2,
+            input_params={"hotel_ids": [1, 2]},
+            output_data={"stages": {"goto": {"count": 2, "total_ms": total_ms, "max_ms": max_ms}}},
+        )
+        assert job_id > 0
+
+    summary = await get_job_stage_summary(job_type, since=now - timedelta(minutes=1))
+    goto = next(row for row in summary if row["stage"] == "goto")
+    assert goto["samples"] >= 4
+    assert goto["total_ms"] >= 4000
+    assert goto["max_ms"] >= 2000
@@ -1,24 +1,36 @@
 """LeadGen Service - Scraping and detection pipeline."""
 
 import math
+import socket
 from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
 from optparse import Option
-from typing import Dict, List, Tuple, Optional
+from typing import AsyncIterator, Dict, List, Tuple, Optional, Union
 
 from loguru import logger
 
 from services.leadgen import repo
 from services.leadgen.constants import HotelStatus
-from services.leadgen.detector import BatchDetector, DetectionConfig, DetectionResult
+from services.leadgen.detector import (
+    BatchDetector, DetectionConfig, DetectionResult, extract_domain, get_engine_pattern_version,
+    is_dead_domain_error, normalize_url, set_engine_patterns,
+)
 from services.leadgen.geocoding import CityLocation, geocode_city, fetch_city_boundary
 from pydantic import BaseModel
 import json
 from db.models.hotel import Hotel
+from db.models.detection_queue_message import DetectionQueueMessage
 from services.leadgen.grid_scraper import GridScraper, ScrapedHotel, ScrapeEstimate, DEFAULT_CELL_SIZE_KM
 
 # Re-export for public API
 __all__ = ["IService", "Service", "ScrapeEstimate", "CityLocation", "ScrapeRegion"]
 
+# How long a domain's detection result is reused before the site is re-visited
+DOMAIN_CACHE_TTL_DAYS = 30
+# Dead domains are re-checked after 1 day, then 2, 4, 8... up to 30 days
+DEAD_DOMAIN_RECHECK_HOURS = 24
+DEAD_DOMAIN_RECHECK_MAX_HOURS = 24 * 30
+
 
 class ScrapeRegion(BaseModel):
     """A polygon region for targeted scraping."""
@@ -125,13 +137,85 @@ class IService(ABC):
         pass
 
     @abstractmethod
-    async def save_detection_results(self, results: List[DetectionResult]) -> Tuple[int, int]:
+    async def refresh_engine_patterns(self) -> bool:
+        """
+        Reload the detector's engine patterns if the DB pattern version moved.
+        Returns True if new patterns were loaded.
+        """
+        pass
+
+    @abstractmethod
+    async def save_detection_results(
+        self,
+        results: Union[List[DetectionResult], AsyncIterator[DetectionResult]],
+    ) -> Tuple[int, int]:
         """
         Save detection results to database.
+        Accepts a list or a stream (e.g. BatchDetector.detect_stream); streamed
+        results are saved as they arrive.
         Returns (detected_count, error_count) tuple.
         """
         pass
 
+    @abstractmethod
+    async def save_detection_result(self, result: DetectionResult, raise_errors: bool = False) -> Tuple[int, int]:
+        """
+        Save one detection result to database.
+        Returns (detected_count, error_count) contribution, each 0 or 1.
+        With raise_errors, a failed save raises instead of counting as an error.
+        """
+        pass
+
+    @abstractmethod
+    async def dead_letter_hotel(self, hotel_id: int, attempts: int, error: str) -> None:
+        """
+        Give up on a hotel that failed detection/saving attempts times.
+        Recorded like a non-retriable detection error so it is not re-enqueued.
+        """
+        pass
+
+    @abstractmethod
+    async def get_cached_domain_results(self, hotels: List[Dict]) -> Dict[str, DetectionResult]:
+        """
+        Get cached detection results for the hotels' website domains.
+        Returns dict mapping domain to a DetectionResult template (hotel_id=0).
+        """
+        pass
+
+    @abstractmethod
+    async def get_dead_domains(self, hotels: List[Dict]) -> Dict[str, str]:
+        """
+        Get the hotels' website domains that recently failed precheck and
+        are not yet due for a re-check.
+        Returns dict mapping domain to its last precheck error.
+        """
+        pass
+
+    @abstractmethod
+    async def record_detection_job(
+        self,
+        started_at: datetime,
+        hotel_ids: List[int],
+        status: int,
+        output_data: Optional[Dict] = None,
+        error_message: Optional[str] = None,
+        queue_name: Optional[str] = None,
+        message_id: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Record one detection batch (e.g. an SQS message) in the jobs table.
+        output_data carries per-stage timings and tier counts.
+        Returns job ID, or None if it could not be recorded.
+        """
+        pass
+
+    @abstractmethod
+    async def get_detection_stage_summary(self, hours: int = 24) -> List[Dict]:
+        """
+        Per-stage detection timing totals over the last N hours, slowest first.
+        """
+        pass
+
     @abstractmethod
     async def get_hotels_by_ids(self, hotel_ids: List[int]) -> List[Hotel]:
         """
@@ -141,15 +225,54 @@ class IService(ABC):
         pass
 
     @abstractmethod
-    async def enqueue_hotels_for_detection(self, limit: int = 1000, batch_size: int = 20) -> int:
+    async def enqueue_hotels_for_detection(self, limit: int = 1000, batch_size: int = 20, backend: str = "sqs") -> int:
         """
-        Enqueue hotels for detection via SQS.
+        Enqueue hotels for detection via SQS (or the Postgres detection queue).
         Queries hotels with status=0 and no hotel_booking_engines record.
         Detection tracked by hotel_booking_engines presence, not status.
         Returns count of hotels enqueued.
         """
         pass
 
+    @abstractmethod
+    async def enqueue_detection_messages(self, bodies: List[Dict]) -> int:
+        """
+        Add messages to the Postgres detection queue.
+        Returns count added.
+        """
+        pass
+
+    @abstractmethod
+    async def claim_detection_messages(self, limit: int, visibility_timeout: int) -> List[DetectionQueueMessage]:
+        """
+        Claim up to limit messages from the Postgres detection queue (SKIP LOCKED).
+        Claimed messages stay hidden for visibility_timeout seconds.
+        """
+        pass
+
+    @abstractmethod
+    async def extend_detection_message(self, message_id: int, claim_token: str, visibility_timeout: int) -> bool:
+        """
+        Move a claimed message's lease (0 = release now).
+        Returns False if another worker has claimed it since.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_detection_message(self, message_id: int, claim_token: str) -> bool:
+        """
+        Acknowledge a claimed message.
+        Returns False if another worker has claimed it since.
+        """
+        pass
+
+    @abstractmethod
+    async def get_detection_queue_counts(self) -> Dict[str, int]:
+        """
+        Pending and in-flight message counts of the Postgres detection queue.
+        """
+        pass
+
 
 class Service(IService):
     def __init__(self, detection_config: DetectionConfig = None, api_key: Optional[str] = None) -> None:
@@ -246,6 +369,7 @@ class Service(IService):
         if not hotels:
             logger.info("No hotels pending detection")
             return []
+        await self.refresh_engine_patterns()
 
         logger.info(f"Processing {len(hotels)} hotels for detection")
 
@@ -255,13 +379,15 @@ class Service(IService):
             for h in hotels
         ]
 
-        # Run detection
+        # Run detection (hotels on cached or dead domains skip the website
+        # visit), saving each result as soon as its hotel finishes
+        domain_cache = await self.get_cached_domain_results(hotel_dicts)
+        dead_domains = await self.get_dead_domains(hotel_dicts)
         detector = BatchDetector(self.detection_config)
-        results = await detector.detect_batch(hotel_dicts)
-
-        # Update database with results
-        for result in results:
-            await self._save_detection_result(result)
+        results = []
+        async for result in detector.detect_stream(hotel_dicts, domain_cache=domain_cache, dead_domains=dead_domains):
+            results.append(result)
+            await self.save_detection_result(result)
 
         # Log summary
         detected = sum(1 for r in results if r.booking_engine and r.booking_engine not in ("", "unknown", "unknown_third_party"))
@@ -271,8 +397,13 @@ class Service(IService):
         return results
 
     async def _save_detection_result(self, result: DetectionResult) -> None:
-        """Save detection result to database."""
-        try:
+        """Save detection result to database in one transaction.
+
+        Raises if any write fails, and then nothing is written: a hotel that
+        is retried (and maybe dead-lettered) has no half-saved result, such
+        as a success row whose contact update failed, or an extra error row.
+        """
+        async with repo.transaction():
             # Log error to detection_errors table if there was one
             if result.error:
                 # Parse error type from error string (e.g., "precheck_failed: timeout" -> "precheck_failed")
@@ -284,6 +415,15 @@ class Service(IService):
                     detected_location=result.detected_location or None,
                 )
 
+            # Record stages skipped by the per-hotel time budget (result still saved below)
+            if result.cutoff_stage and not result.error:
+                await repo.insert_detection_error(
+                    hotel_id=result.hotel_id,
+                    error_type="budget_cutoff",
+                    error_message=f"budget_cutoff: {result.cutoff_stage}",
+                    detected_location=result.detected_location or None,
+                )
+
             # Handle location mismatch (detected in detector, skipped engine detection)
             if result.error == "location_mismatch":
                 await repo.update_hotel_status(
@@ -302,6 +442,7 @@ class Service(IService):
                     booking_engine_id=None,
                     detection_method=f"error:{result.error}",
                     status=-1,  # Failed, non-retriable
+                    pattern_version=result.pattern_version or None,
                 )
                 # Save contact info if we got any
                 if result.phone_website or result.email:
@@ -333,6 +474,7 @@ class Service(IService):
                     booking_url=result.booking_url or None,
                     detection_method=result.detection_method or None,
                     status=1,  # Success
+                    pattern_version=result.pattern_version or None,
                 )
 
                 # Save phone/email but don't change status - hotel stays at PENDING (0)
@@ -353,9 +495,6 @@ class Service(IService):
                     email=result.email or None,
                 )
 
-        except Exception as e:
-            logger.error(f"Error saving detection result for hotel {result.hotel_id}: {e}")
-
     async def get_hotels_pending_detection(self, limit: int = 100) -> List[Hotel]:
         """Get hotels that need booking engine detection."""
         return await repo.get_hotels_pending_detection(limit=limit)
@@ -374,46 +513,266 @@ class Service(IService):
         engines = await repo.get_all_booking_engines()
         return {engine.name: engine.domains for engine in engines if engine.domains}
 
-    async def save_detection_results(self, results: List[DetectionResult]) -> Tuple[int, int]:
+    async def refresh_engine_patterns(self) -> bool:
+        """Reload the detector's engine patterns if the DB pattern version moved.
+
+        Costs one single-row query when nothing changed. The version is read
+        before the patterns, so a change landing in between is picked up by
+        the next refresh rather than missed.
+
+        Returns True if new patterns were loaded.
+        """
+        version = await repo.get_engine_pattern_version()
+        current = get_engine_pattern_version()
+        if version == current:
+            return False
+        patterns = await self.get_engine_patterns()
+        set_engine_patterns(patterns, version=version)
+        if current:
+            logger.info(f"Engine patterns refreshed: version {current} -> {version}")
+        return True
+
+    async def save_detection_results(
+        self,
+        results: Union[List[DetectionResult], AsyncIterator[DetectionResult]],
+    ) -> Tuple[int, int]:
         """Save detection results to database.
 
+        Accepts a list or an async iterator such as BatchDetector.detect_stream();
+        streamed results are saved as they arrive, so a slow or crashing hotel
+        doesn't hold back the rest of the batch.
+
         Returns (detected_count, error_count) tuple.
         Note: Location mismatches are not counted as errors or detections.
         """
         detected = 0
         errors = 0
 
-        for result in results:
-            try:
-                await self._save_detection_result(result)
-
-                if result.error == "location_mismatch":
-                    # Don't count as detected or error
-                    pass
-                elif result.booking_engine and result.booking_engine not in ("", "unknown", "unknown_third_party", "unknown_booking_api"):
-                    detected += 1
-                elif result.error:
-                    errors += 1
-            except Exception as e:
-                logger.error(f"Error saving result for hotel {result.hotel_id}: {e}")
-                errors += 1
+        if isinstance(results, list):
+            for result in results:
+                d, e = await self.save_detection_result(result)
+                detected += d
+                errors += e
+        else:
+            async for result in results:
+                d, e = await self.save_detection_result(result)
+                detected += d
+                errors += e
 
         return (detected, errors)
 
+    async def save_detection_result(self, result: DetectionResult, raise_errors: bool = False) -> Tuple[int, int]:
+        """Save one detection result and update the domain caches.
+
+        Returns (detected_count, error_count) contribution, each 0 or 1.
+        With raise_errors, a failed save raises (so the caller can retry the
+        hotel) instead of counting as an error.
+        """
+        try:
+            await self._save_detection_result(result)
+            await self._cache_domain_result(result)
+            await self._track_dead_domain(result)
+        except Exception as e:
+            logger.error(f"Error saving result for hotel {result.hotel_id}: {e}")
+            if raise_errors:
+                raise
+            return (0, 1)
+
+        if result.error == "location_mismatch":
+            # Don't count as detected or error
+            return (0, 0)
+        if result.booking_engine and result.booking_engine not in ("", "unknown", "unknown_third_party", "unknown_booking_api"):
+            return (1, 0)
+        if result.error:
+            return (0, 1)
+        return (0, 0)
+
+    async def dead_letter_hotel(self, hotel_id: int, attempts: int, error: str) -> None:
+        """Give up on a hotel that kept failing.
+
+        Saved as a "dead_letter" detection error: logged in detection_errors
+        and given a status=-1 hotel_booking_engines record, so neither the
+        queue nor the next enqueue run picks it up again. A successful
+        (status=1) record is never downgraded.
+        """
+        message = f"dead_letter: {attempts} attempts: {error}"[:500]
+        async with repo.transaction():
+            await repo.insert_detection_error(
+                hotel_id=hotel_id,
+                error_type="dead_letter",
+                error_message=message,
+            )
+            await repo.insert_hotel_booking_engine_dead_letter(
+                hotel_id=hotel_id,
+                detection_method=f"error:{message}",
+            )
+
+    async def get_cached_domain_results(self, hotels: List[Dict]) -> Dict[str, DetectionResult]:
+        """Get cached detection results for the hotels' website domains.
+
+        Returns dict mapping domain to a DetectionResult template (hotel_id=0)
+        for BatchDetector.detect_batch(domain_cache=...). "No engine" entries
+        detected with older engine patterns are left out, since a pattern
+        added since then may match the site.
+        """
+        domains = {extract_domain(normalize_url(h.get("website") or "")) for h in hotels}
+        domains.discard("")
+        if not domains:
+            return {}
+
+        try:
+            rows = await repo.get_detection_domain_cache(domains=sorted(domains))
+        except Exception as e:
+            # Cache is an optimization; detect normally if it's unavailable
+            logger.warning(f"Domain cache lookup failed: {e}")
+            return {}
+
+        version = get_engine_pattern_version()
+        return {
+            row.domain: DetectionResult(
+                hotel_id=0,
+                booking_engine=row.booking_engine,
+                booking_engine_domain=row.booking_engine_domain or "",
+                booking_url=row.booking_url or "",
+                detection_method=row.detection_method or "",
+                phone_website=row.phone_website or "",
+                email=row.email or "",
+                room_count=row.room_count or "",
+                detected_location=row.detected_location or "",
+                domain=row.domain,
+                pattern_version=row.pattern_version or 0,
+            )
+            for row in rows
+            if row.booking_engine or not version or (row.pattern_version or 0) >= version
+        }
+
+    async def _cache_domain_result(self, result: DetectionResult) -> None:
+        """Store a freshly detected result under its website domain.
+
+        Only clean results from an actual website visit are cached; errors
+        (timeouts, location mismatches) and results copied from the cache
+        are not.
+        """
+        if result.error or not result.domain:
+            return
+        if result.detection_method.startswith(("domain_cache", "domain_dedupe")):
+            return
+        try:
+            await repo.upsert_detection_domain_cache(
+                domain=result.domain,
+                booking_engine=result.booking_engine,
+                booking_engine_domain=result.booking_engine_domain or None,
+                booking_url=result.booking_url or None,
+                detection_method=result.detection_method or None,
+                phone_website=result.phone_website or None,
+                email=result.email or None,
+                room_count=result.room_count or None,
+                detected_location=result.detected_location or None,
+                pattern_version=result.pattern_version or None,
+                source_hotel_id=result.hotel_id,
+                ttl_days=DOMAIN_CACHE_TTL_DAYS,
+            )
+        except Exception as e:
+            logger.error(f"Error caching detection result for {result.domain}: {e}")
+
+    async def get_dead_domains(self, hotels: List[Dict]) -> Dict[str, str]:
+        """Get the hotels' domains that are dead and not yet due for a re-check.
+
+        Returns dict mapping domain to its last precheck error, for
+        BatchDetector.detect_batch(dead_domains=...).
+        """
+        domains = {extract_domain(normalize_url(h.get("website") or "")) for h in hotels}
+        domains.discard("")
+        if not domains:
+            return {}
+
+        try:
+            rows = await repo.get_detection_dead_domains(domains=sorted(domains))
+        except Exception as e:
+            # Optimization only; precheck normally if it's unavailable
+            logger.warning(f"Dead domain lookup failed: {e}")
+            return {}
+        return {row.domain: row.last_error for row in rows}
+
+    async def _track_dead_domain(self, result: DetectionResult) -> None:
+        """Record a domain whose precheck failed as dead, or forget it once reachable.
+
+        Results that never reached the site (filtered, cached, reused from
+        another hotel) leave the entry alone.
+        """
+        if not result.domain:
+            return
+        try:
+            if result.error.startswith("precheck_failed: "):
+                error = result.error[len("precheck_failed: "):]
+                if is_dead_domain_error(error):
+                    await repo.record_detection_dead_domain(
+                        domain=result.domain,
+                        last_error=error,
+                        base_hours=DEAD_DOMAIN_RECHECK_HOURS,
+                        max_hours=DEAD_DOMAIN_RECHECK_MAX_HOURS,
+                    )
+                return
+            if result.error.startswith(("precheck_cached", "junk_domain", "non_hotel")):
+                return
+            if result.detection_method.startswith(("domain_cache", "domain_dedupe")):
+                return
+            await repo.delete_detection_dead_domain(domain=result.domain)
+        except Exception as e:
+            logger.error(f"Error tracking dead domain {result.domain}: {e}")
+
+    async def record_detection_job(
+        self,
+        started_at: datetime,
+        hotel_ids: List[int],
+        status: int,
+        output_data: Optional[Dict] = None,
+        error_message: Optional[str] = None,
+        queue_name: Optional[str] = None,
+        message_id: Optional[str] = None,
+    ) -> Optional[int]:
+        """Record one detection batch in the jobs table.
+
+        Telemetry only: failures are logged, never raised.
+        """
+        completed_at = datetime.utcnow()
+        try:
+            return await repo.insert_job(
+                job_type="detect",
+                queue_name=queue_name,
+                message_id=message_id,
+                worker_id=socket.gethostname(),
+                started_at=started_at,
+                completed_at=completed_at,
+                duration_ms=int((completed_at - started_at).total_seconds() * 1000),
+                status=status,
+                error_message=error_message,
+                input_params={"hotel_ids": hotel_ids},
+                output_data=output_data,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record detection job: {e}")
+            return None
+
+    async def get_detection_stage_summary(self, hours: int = 24) -> List[Dict]:
+        """Per-stage detection timing totals over the last N hours, slowest first."""
+        since = datetime.utcnow() - timedelta(hours=hours)
+        return await repo.get_job_stage_summary(job_type="detect", since=since)
+
     async def get_hotels_by_ids(self, hotel_ids: List[int]) -> List[Hotel]:
         """Get hotels by list of IDs."""
         return await repo.get_hotels_by_ids(hotel_ids=hotel_ids)
 
-    async def enqueue_hotels_for_detection(self, limit: int = 1000, batch_size: int = 20) -> int:
-        """Enqueue hotels for detection via SQS.
+    async def enqueue_hotels_for_detection(self, limit: int = 1000, batch_size: int = 20, backend: str = "sqs") -> int:
+        """Enqueue hotels for detection via SQS, or the Postgres queue with backend="postgres".
 
         Queries hotels with status=0 and no hotel_booking_engines record.
-        Sends to SQS in batches. Does NOT update status - detection is tracked
-        by presence of hotel_booking_engines record.
+        Sends to the queue in batches. Does NOT update status - detection is
+        tracked by presence of hotel_booking_engines record.
 
         Returns count of hotels enqueued.
         """
-        from infra.sqs import send_messages_batch, get_queue_url
+        from infra.sqs import send_messages_batch_async, get_queue_url
 
         # Get hotels pending detection (status=0, no booking engine record)
         hotels = await repo.get_hotels_pending_detection(limit=limit)
@@ -428,14 +787,41 @@ class Service(IService):
             batch_ids = hotel_ids[i:i + batch_size]
             messages.append({"hotel_ids": batch_ids})
 
+        if backend == "postgres":
+            sent = await repo.enqueue_detection_messages(messages)
+            logger.info(f"Added {sent} messages to the detection queue table ({len(hotel_ids)} hotels)")
+            return len(hotel_ids)
+
         # Send to SQS
         queue_url = get_queue_url()
-        sent = send_messages_batch(queue_url, messages)
+        sent = await send_messages_batch_async(queue_url, messages)
         logger.info(f"Sent {sent} messages to SQS ({len(hotel_ids)} hotels)")
 
         # No status update needed - detection is tracked by hotel_booking_engines record
         return len(hotel_ids)
 
+    async def enqueue_detection_messages(self, bodies: List[Dict]) -> int:
+        """Add messages to the Postgres detection queue."""
+        return await repo.enqueue_detection_messages(bodies)
+
+    async def claim_detection_messages(self, limit: int, visibility_timeout: int) -> List[DetectionQueueMessage]:
+        """Claim up to limit visible messages from the Postgres detection queue."""
+        return await repo.claim_detection_messages(limit=limit, visibility_timeout=visibility_timeout)
+
+    async def extend_detection_message(self, message_id: int, claim_token: str, visibility_timeout: int) -> bool:
+        """Move a claimed message's lease; False if the claim was lost."""
+        return await repo.extend_detection_message(
+            message_id=message_id, claim_token=claim_token, visibility_timeout=visibility_timeout,
+        )
+
+    async def delete_detection_message(self, message_id: int, claim_token: str) -> bool:
+        """Acknowledge a claimed message; False if the claim was lost."""
+        return await repo.delete_detection_message(message_id=message_id, claim_token=claim_token)
+
+    async def get_detection_queue_counts(self) -> Dict[str, int]:
+        """Pending and in-flight message counts of the Postgres detection queue."""
+        return await repo.get_detection_queue_counts()
+
     def estimate_region(
         self,
         center_lat: float,
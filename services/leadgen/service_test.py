@@ -11,6 +11,7 @@ Run all tests:
 """
 
 import pytest
+from contextlib import asynccontextmanager
 from unittest.mock import AsyncMock, patch, MagicMock
 
 from services.leadgen.service import Service, CityLocation
@@ -231,6 +232,192 @@ class TestCountTargetCities:
         assert count == 0
 
 
+# =============================================================================
+# DETECTION RESULTS UNIT TESTS
+# =============================================================================
+
+class FakeTransaction:
+    """Stands in for repo.transaction(); records whether each block committed."""
+
+    def __init__(self):
+        self.committed = 0
+        self.rolled_back = 0
+
+    @asynccontextmanager
+    async def __call__(self):
+        try:
+            yield
+        except BaseException:
+            self.rolled_back += 1
+            raise
+        self.committed += 1
+
+
+@pytest.fixture
+def transaction():
+    fake = FakeTransaction()
+    with patch.object(repo, "transaction", fake):
+        yield fake
+
+
+@pytest.mark.no_db
+@pytest.mark.usefixtures("transaction")
+class TestSaveDetectionResults:
+    """Tests for save_detection_results with lists and streams."""
+
+    @pytest.mark.asyncio
+    async def test_saves_stream_incrementally(self):
+        """Test that streamed results are saved as they arrive and counted."""
+        from services.leadgen.detector import DetectionResult
+
+        service = Service()
+        saved = []
+
+        async def stream():
+            for result in (
+                DetectionResult(hotel_id=1, booking_engine="Cloudbeds"),
+                DetectionResult(hotel_id=2, error="timeout"),
+                DetectionResult(hotel_id=3, error="location_mismatch"),
+            ):
+                yield result
+                # The previous result is saved before the next one is produced
+                assert saved[-1] == result.hotel_id
+
+        with patch.object(service, "_save_detection_result", new_callable=AsyncMock) as mock_save, \
+                patch.object(service, "_cache_domain_result", new_callable=AsyncMock), \
+                patch.object(service, "_track_dead_domain", new_callable=AsyncMock):
+            mock_save.side_effect = lambda r: saved.append(r.hotel_id)
+            assert await service.save_detection_results(stream()) == (1, 1)
+
+        assert saved == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_save_failure_counts_as_error(self):
+        """Test that a failed DB write counts as an error without stopping the batch."""
+        from services.leadgen.detector import DetectionResult
+
+        service = Service()
+        results = [
+            DetectionResult(hotel_id=1, booking_engine="Mews"),
+            DetectionResult(hotel_id=2, booking_engine="Cloudbeds"),
+        ]
+        engine = MagicMock(id=5)
+        with patch.object(repo, "get_booking_engine_by_name", new_callable=AsyncMock) as mock_engine, \
+                patch.object(repo, "insert_hotel_booking_engine", new_callable=AsyncMock) as mock_link, \
+                patch.object(service, "_cache_domain_result", new_callable=AsyncMock), \
+                patch.object(service, "_track_dead_domain", new_callable=AsyncMock):
+            mock_engine.side_effect = [RuntimeError("db down"), engine]
+            assert await service.save_detection_results(results) == (1, 1)
+
+        assert [c.kwargs["hotel_id"] for c in mock_link.call_args_list] == [2]
+
+    @pytest.mark.asyncio
+    async def test_save_failure_raises_when_asked(self):
+        """Test that a failed DB write raises with raise_errors, so the caller can retry the hotel."""
+        from services.leadgen.detector import DetectionResult
+
+        service = Service()
+        with patch.object(repo, "get_booking_engine_by_name", new_callable=AsyncMock) as mock_engine, \
+                patch.object(repo, "insert_hotel_booking_engine", new_callable=AsyncMock) as mock_link, \
+                patch.object(service, "_cache_domain_result", new_callable=AsyncMock) as mock_cache:
+            mock_engine.side_effect = RuntimeError("db down")
+            with pytest.raises(RuntimeError, match="db down"):
+                await service.save_detection_result(
+                    DetectionResult(hotel_id=1, booking_engine="Mews"), raise_errors=True,
+                )
+
+        mock_link.assert_not_called()
+        mock_cache.assert_not_called()  # Not cached as if it had been saved
+
+    @pytest.mark.asyncio
+    async def test_partial_save_is_rolled_back(self, transaction):
+        """Test that a write failing after the engine link rolls the whole save back."""
+        from services.leadgen.detector import DetectionResult
+
+        service = Service()
+        with patch.object(repo, "get_booking_engine_by_name", new_callable=AsyncMock, return_value=MagicMock(id=5)), \
+                patch.object(repo, "insert_hotel_booking_engine", new_callable=AsyncMock) as mock_link, \
+                patch.object(repo, "update_hotel_contact_info", new_callable=AsyncMock) as mock_contact:
+            mock_contact.side_effect = RuntimeError("db down")
+            with pytest.raises(RuntimeError, match="db down"):
+                await service.save_detection_result(
+                    DetectionResult(hotel_id=1, booking_engine="Mews", email="a@b.com"), raise_errors=True,
+                )
+
+        assert mock_link.called  # Written inside the transaction...
+        assert (transaction.committed, transaction.rolled_back) == (0, 1)  # ...and rolled back
+
+    @pytest.mark.asyncio
+    async def test_dead_letter_hotel(self, transaction):
+        """Test that a dead-lettered hotel is logged and marked non-retriable in one transaction."""
+        service = Service()
+        with patch.object(repo, "insert_detection_error", new_callable=AsyncMock) as mock_error, \
+                patch.object(repo, "insert_hotel_booking_engine_dead_letter", new_callable=AsyncMock) as mock_dead, \
+                patch.object(repo, "insert_hotel_booking_engine", new_callable=AsyncMock) as mock_engine:
+            await service.dead_letter_hotel(7, 3, "save failed: deadlock")
+
+        assert mock_error.call_args.kwargs["error_type"] == "dead_letter"
+        assert mock_error.call_args.kwargs["error_message"] == "dead_letter: 3 attempts: save failed: deadlock"
+        assert mock_dead.call_args.kwargs == {
+            "hotel_id": 7, "detection_method": "error:dead_letter: 3 attempts: save failed: deadlock",
+        }
+        mock_engine.assert_not_called()  # Its upsert would downgrade a status=1 row
+        assert transaction.committed == 1
+
+    @pytest.mark.asyncio
+    async def test_dead_letter_failure_raises(self):
+        """Test that a failed dead-letter write is reported to the caller, not swallowed."""
+        service = Service()
+        with patch.object(repo, "insert_detection_error", new_callable=AsyncMock) as mock_error:
+            mock_error.side_effect = RuntimeError("db down")
+            with pytest.raises(RuntimeError):
+                await service.dead_letter_hotel(7, 3, "save failed: deadlock")
+
+
+@pytest.mark.no_db
+class TestTrackDeadDomain:
+    """Tests for recording and clearing dead domains from detection results."""
+
+    @pytest.mark.asyncio
+    async def test_dead_precheck_error_is_recorded(self):
+        """Test that connection/5xx precheck failures mark the domain dead."""
+        from services.leadgen.detector import DetectionResult
+
+        service = Service()
+        with patch.object(repo, "record_detection_dead_domain", new_callable=AsyncMock) as mock_record, \
+                patch.object(repo, "delete_detection_dead_domain", new_callable=AsyncMock) as mock_delete:
+            await service._track_dead_domain(
+                DetectionResult(hotel_id=1, domain="down.com", error="precheck_failed: connection_refused")
+            )
+            await service._track_dead_domain(
+                DetectionResult(hotel_id=2, domain="blocked.com", error="precheck_failed: HTTP 403")
+            )
+            await service._track_dead_domain(
+                DetectionResult(hotel_id=3, domain="down.com", error="precheck_cached: connection_refused")
+            )
+
+        mock_record.assert_awaited_once()
+        assert mock_record.await_args.kwargs["domain"] == "down.com"
+        assert mock_record.await_args.kwargs["last_error"] == "connection_refused"
+        mock_delete.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_reachable_site_clears_domain(self):
+        """Test that a result from an actual visit forgets the dead entry."""
+        from services.leadgen.detector import DetectionResult
+
+        service = Service()
+        with patch.object(repo, "delete_detection_dead_domain", new_callable=AsyncMock) as mock_delete:
+            await service._track_dead_domain(
+                DetectionResult(hotel_id=1, domain="back.com", booking_engine="Mews", detection_method="static_html_scan")
+            )
+            await service._track_dead_domain(
+                DetectionResult(hotel_id=2, domain="back.com", detection_method="domain_dedupe+static_html_scan")
+            )
+
+        mock_delete.assert_awaited_once_with(domain="back.com")
+
+
 # =============================================================================
 # INTEGRATION TESTS - Hit real Nominatim API
 # =============================================================================
@@ -0,0 +1,370 @@
+"""Multi-process detection sharding.
+
+A single asyncio loop with one Chromium driver keeps HTML regex scanning,
+pydantic validation and CDP message handling on one Python core. DetectionShards
+spawns N worker processes, each with its own event loop and BrowserPool, and
+hands them hotel batches over multiprocessing queues:
+
+- Workers never touch the DB: engine patterns are sent at spawn time (and
+  again with the next batch after set_patterns() moves the version), and
+  domain-cache hits and known-dead domains with each batch
+- Results stream back one DetectionResult at a time as hotels finish, followed
+  by the batch's BatchDetector counters
+- Batches go to the shard with the fewest batches in flight
+- A worker that dies fails its in-flight batches (the caller leaves the SQS
+  message for retry) and is respawned
+
+Usage:
+    shards = DetectionShards(4, config, patterns, pool_size=10, pattern_version=version)
+    await shards.start()
+    detector = shards.detector()  # same interface as BatchDetector
+    async for result in detector.detect_stream(hotels, domain_cache=cache):
+        ...
+    shards.set_patterns(new_patterns, new_version)  # after a refresh
+    await shards.close()
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import signal
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from infra.concurrency import AdaptiveLimiter
+from services.leadgen.browser_pool import BrowserPool
+from services.leadgen.detector import BatchDetector, DetectionConfig, DetectionResult, set_engine_patterns
+from services.leadgen.memory_watchdog import MemoryWatchdog
+
+
+# Seconds to wait for a worker to finish its batches on close before killing it
+SHUTDOWN_TIMEOUT = 120
+# Seconds between liveness checks of worker processes
+WATCH_INTERVAL = 1.0
+
+
+class ShardCrashed(RuntimeError):
+    """A shard process exited while a batch was in flight."""
+
+
+DetectorFactory = Callable[[DetectionConfig, BrowserPool], BatchDetector]
+
+
+# =============================================================================
+# WORKER PROCESS
+# =============================================================================
+
+def _shard_main(
+    shard_id: int,
+    config: DetectionConfig,
+    patterns: Dict[str, List[str]],
+    pattern_version: int,
+    pool_size: int,
+    tasks: multiprocessing.Queue,
+    replies: multiprocessing.Queue,
+    detector_factory: DetectorFactory,
+) -> None:
+    """Process entry point. Shutdown is driven by the parent (sentinel on tasks)."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    asyncio.run(_shard_loop(
+        shard_id, config, patterns, pattern_version, pool_size, tasks, replies, detector_factory,
+    ))
+
+
+async def _shard_loop(
+    shard_id: int,
+    config: DetectionConfig,
+    patterns: Dict[str, List[str]],
+    pattern_version: int,
+    pool_size: int,
+    tasks: multiprocessing.Queue,
+    replies: multiprocessing.Queue,
+    detector_factory: DetectorFactory,
+) -> None:
+    set_engine_patterns(patterns, version=pattern_version)
+    # Chromium is launched on the first acquire
+    pool = BrowserPool(
+        size=pool_size,
+        headless=config.headless,
+        max_pages_per_context=config.context_max_pages,
+        block_resources=config.block_resources,
+    )
+    watchdog = MemoryWatchdog(pool, limit_mb=config.memory_limit_mb)
+    watchdog.start()
+    # Shared by every batch in this shard, like the pool. The pool is this
+    # shard's share of the preset, so the limiter starts at its ceiling and
+    # only backs off from there
+    limiter = (
+        AdaptiveLimiter(pool_size, min_limit=config.concurrency, max_limit=pool_size, name=f"shard {shard_id}")
+        if config.adaptive_concurrency else None
+    )
+    loop = asyncio.get_running_loop()
+    running = set()
+
+    async def handle(
+        task_id: int,
+        hotels: List[Dict],
+        domain_cache: Dict[str, DetectionResult],
+        dead_domains: Dict[str, str],
+    ) -> None:
+        detector = detector_factory(config, pool)
+        if limiter is not None:
+            detector.limiter = limiter
+        try:
+            async for result in detector.detect_stream(hotels, domain_cache=domain_cache, dead_domains=dead_domains):
+                replies.put((shard_id, task_id, "result", result))
+        except Exception as e:
+            logger.error(f"[shard {shard_id}] Batch failed: {e}")
+            replies.put((shard_id, task_id, "error", f"{type(e).__name__}: {e}"))
+            return
+        stats = {"tier_stats": detector.tier_stats, "tier_ms": detector.tier_ms, "stage_stats": detector.stage_stats}
+        replies.put((shard_id, task_id, "done", stats))
+
+    logger.info(f"[shard {shard_id}] Started (pool size {pool_size})")
+    try:
+        while True:
+            item = await loop.run_in_executor(None, tasks.get)
+            if item is None:
+                break
+            task_id, hotels, domain_cache, dead_domains, index = item
+            if index is not None:
+                # Swapped atomically; batches already running pick it up too
+                set_engine_patterns(index[1], version=index[0])
+            task = asyncio.create_task(handle(task_id, hotels, domain_cache, dead_domains))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        if running:
+            await asyncio.gather(*running)
+    finally:
+        await watchdog.stop()
+        await pool.close()
+    logger.info(f"[shard {shard_id}] Stopped")
+
+
+# =============================================================================
+# PARENT SIDE
+# =============================================================================
+
+class _Shard:
+    """Parent-side handle for one worker process."""
+
+    def __init__(self, shard_id: int):
+        self.shard_id = shard_id
+        self.process: Optional[multiprocessing.Process] = None
+        self.tasks: Optional[multiprocessing.Queue] = None
+        self.pattern_version = 0  # Last engine pattern version sent to the process
+        # Replies per in-flight batch, as (kind, payload)
+        self.inflight: Dict[int, asyncio.Queue] = {}
+
+
+class ShardDetector:
+    """BatchDetector stand-in that runs its batch in a shard process."""
+
+    def __init__(self, shards: "DetectionShards"):
+        self.shards = shards
+        self.tier_stats: Dict[str, int] = {}
+        self.tier_ms: Dict[str, int] = {}
+        self.stage_stats: Dict[str, Dict[str, int]] = {}
+
+    async def detect_batch(
+        self,
+        hotels: List[Dict],
+        domain_cache: Optional[Dict[str, DetectionResult]] = None,
+        dead_domains: Optional[Dict[str, str]] = None,
+    ) -> List[DetectionResult]:
+        return [
+            result
+            async for result in self.detect_stream(hotels, domain_cache=domain_cache, dead_domains=dead_domains)
+        ]
+
+    async def detect_stream(
+        self,
+        hotels: List[Dict],
+        domain_cache: Optional[Dict[str, DetectionResult]] = None,
+        dead_domains: Optional[Dict[str, str]] = None,
+    ) -> AsyncIterator[DetectionResult]:
+        """Yield the batch's results as the shard finishes each hotel.
+
+        Raises RuntimeError if the batch failed in the worker and ShardCrashed
+        if the worker died while running it.
+        """
+        replies = self.shards._submit(hotels, domain_cache or {}, dead_domains or {})
+        try:
+            async for kind, payload in replies:
+                if kind == "result":
+                    yield payload
+                elif kind == "done":
+                    self.tier_stats = payload["tier_stats"]
+                    self.tier_ms = payload["tier_ms"]
+                    self.stage_stats = payload["stage_stats"]
+        finally:
+            await replies.aclose()
+
+
+class DetectionShards:
+    """Pool of detection worker processes, each with its own browser pool."""
+
+    def __init__(
+        self,
+        shards: int,
+        config: DetectionConfig,
+        patterns: Dict[str, List[str]],
+        pool_size: int = 5,
+        detector_factory: DetectorFactory = BatchDetector,
+        pattern_version: int = 0,
+    ):
+        """
+        Args:
+            shards: Number of worker processes
+            config: Detection config used for every batch
+            patterns: Engine patterns (workers have no DB access)
+            pool_size: Browser context slots per worker
+            detector_factory: Module-level callable building a BatchDetector
+                from (config, pool) in a worker
+            pattern_version: DB version of patterns (recorded on results)
+        """
+        self.config = config
+        self.patterns = patterns
+        self.pattern_version = pattern_version
+        self.pool_size = pool_size
+        self.detector_factory = detector_factory
+
+        self._mp = multiprocessing.get_context("spawn")
+        self._replies: multiprocessing.Queue = self._mp.Queue()
+        self._shards = [_Shard(i) for i in range(shards)]
+        self._task_ids = itertools.count()
+        self._reader: Optional[asyncio.Task] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self.stats = {"batches": 0, "failed": 0, "crashes": 0}
+
+    @property
+    def size(self) -> int:
+        return len(self._shards)
+
+    async def start(self) -> None:
+        """Spawn the worker processes and start collecting replies."""
+        for shard in self._shards:
+            self._spawn(shard)
+        self._reader = asyncio.create_task(self._read_replies())
+        self._watcher = asyncio.create_task(self._watch())
+        logger.info(f"Detection shards started ({self.size} processes, pool size {self.pool_size} each)")
+
+    def detector(self) -> ShardDetector:
+        """A per-batch detector with the BatchDetector interface."""
+        return ShardDetector(self)
+
+    def set_patterns(self, patterns: Dict[str, List[str]], version: int) -> None:
+        """Use new engine patterns; each worker gets them with its next batch."""
+        self.patterns = patterns
+        self.pattern_version = version
+
+    async def _submit(
+        self,
+        hotels: List[Dict],
+        domain_cache: Dict[str, DetectionResult],
+        dead_domains: Dict[str, str],
+    ) -> AsyncIterator[tuple]:
+        """Send a batch to the least-busy shard and yield its replies until it is done."""
+        if self._closed:
+            raise RuntimeError("DetectionShards is closed")
+        shard = min(self._shards, key=lambda s: len(s.inflight))
+        task_id = next(self._task_ids)
+        replies: asyncio.Queue = asyncio.Queue()
+        shard.inflight[task_id] = replies
+        index = None
+        if shard.pattern_version != self.pattern_version:
+            index = (self.pattern_version, self.patterns)
+            shard.pattern_version = self.pattern_version
+        shard.tasks.put((task_id, hotels, domain_cache, dead_domains, index))
+        try:
+            while True:
+                kind, payload = await replies.get()
+                if kind == "error":
+                    raise payload
+                yield kind, payload
+                if kind == "done":
+                    return
+        finally:
+            shard.inflight.pop(task_id, None)
+
+    async def close(self) -> None:
+        """Let workers finish their batches, then stop them."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._watcher is not None:
+            self._watcher.cancel()
+
+        loop = asyncio.get_running_loop()
+        for shard in self._shards:
+            shard.tasks.put(None)
+        for shard in self._shards:
+            await loop.run_in_executor(None, shard.process.join, SHUTDOWN_TIMEOUT)
+            if shard.process.is_alive():
+                logger.warning(f"[shard {shard.shard_id}] Did not stop in {SHUTDOWN_TIMEOUT}s, killing")
+                shard.process.kill()
+                await loop.run_in_executor(None, shard.process.join)
+
+        self._replies.put(None)
+        if self._reader is not None:
+            await self._reader
+        for shard in self._shards:
+            self._fail_inflight(shard, ShardCrashed(f"shard {shard.shard_id} stopped"))
+        logger.info(f"Detection shards closed: {self.stats}")
+
+    def _spawn(self, shard: _Shard) -> None:
+        shard.tasks = self._mp.Queue()
+        shard.pattern_version = self.pattern_version
+        shard.process = self._mp.Process(
+            target=_shard_main,
+            args=(
+                shard.shard_id, self.config, self.patterns, self.pattern_version, self.pool_size,
+                shard.tasks, self._replies, self.detector_factory,
+            ),
+            name=f"detection-shard-{shard.shard_id}",
+            daemon=True,
+        )
+        shard.process.start()
+
+    async def _read_replies(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await loop.run_in_executor(None, self._replies.get)
+            if item is None:
+                return
+            shard_id, task_id, kind, payload = item
+            replies = self._shards[shard_id].inflight.get(task_id)
+            if replies is None:
+                # Caller stopped listening, or the batch was already failed
+                continue
+            if kind == "error":
+                self.stats["batches"] += 1
+                self.stats["failed"] += 1
+                payload = RuntimeError(f"shard {shard_id}: {payload}")
+            elif kind == "done":
+                self.stats["batches"] += 1
+            replies.put_nowait((kind, payload))
+
+    async def _watch(self) -> None:
+        """Fail the batches of dead workers and respawn them."""
+        while True:
+            await asyncio.sleep(WATCH_INTERVAL)
+            for shard in self._shards:
+                if shard.process.is_alive():
+                    continue
+                self.stats["crashes"] += 1
+                logger.error(
+                    f"[shard {shard.shard_id}] Exited with code {shard.process.exitcode} "
+                    f"({len(shard.inflight)} batches in flight), respawning"
+                )
+                self._fail_inflight(shard, ShardCrashed(f"shard {shard.shard_id} exited"))
+                self._spawn(shard)
+
+    def _fail_inflight(self, shard: _Shard, exc: Exception) -> None:
+        for replies in shard.inflight.values():
+            replies.put_nowait(("error", exc))
+        shard.inflight.clear()
@@ -0,0 +1,92 @@
+"""Unit tests for DetectionShards (fake detectors, no real browser)."""
+
+import asyncio
+import os
+
+import pytest
+
+from services.leadgen.detector import DetectionConfig, DetectionResult
+from services.leadgen.shards import DetectionShards, ShardCrashed
+
+
+class FakeDetector:
+    """Echo hotels back as results tagged with the worker pid, one at a time."""
+
+    def __init__(self, config, pool):
+        self.tier_stats = {}
+        self.tier_ms = {}
+        self.stage_stats = {}
+
+    async def detect_stream(self, hotels, domain_cache=None, dead_domains=None):
+        for h in hotels:
+            if h["website"] == "crash":
+                os._exit(1)
+            if h["website"] == "fail":
+                raise ValueError("bad batch")
+            await asyncio.sleep(0.2)
+            cached = domain_cache.get(h["website"])
+            yield DetectionResult(
+                hotel_id=h["id"],
+                booking_engine=cached.booking_engine if cached else "",
+                detection_method=str(os.getpid()),
+            )
+        self.tier_stats = {"hotels": len(hotels)}
+
+
+@pytest.fixture
+async def shards():
+    shards = DetectionShards(
+        2, DetectionConfig(), {"Cloudbeds": ["cloudbeds.com"]}, pool_size=2, detector_factory=FakeDetector
+    )
+    await shards.start()
+    yield shards
+    await shards.close()
+
+
+@pytest.mark.no_db
+class TestDetectionShards:
+
+    async def test_batches_spread_over_processes(self, shards):
+        cache = {"a.com": DetectionResult(hotel_id=0, booking_engine="Cloudbeds")}
+        detectors = [shards.detector() for _ in range(4)]
+        batches = await asyncio.gather(*(
+            d.detect_batch([{"id": i, "website": "a.com" if i == 0 else f"{i}.com"}], domain_cache=cache)
+            for i, d in enumerate(detectors)
+        ))
+        assert [b[0].hotel_id for b in batches] == [0, 1, 2, 3]
+        assert batches[0][0].booking_engine == "Cloudbeds"
+        assert detectors[0].tier_stats == {"hotels": 1}
+        pids = {b[0].detection_method for b in batches}
+        assert len(pids) == 2
+        assert str(os.getpid()) not in pids
+
+    async def test_results_stream_before_batch_finishes(self, shards):
+        hotels = [{"id": 1, "website": "a.com"}, {"id": 2, "website": "fail"}]
+        received = []
+        with pytest.raises(RuntimeError, match="bad batch"):
+            async for result in shards.detector().detect_stream(hotels):
+                received.append(result.hotel_id)
+        assert received == [1]
+        batch = await shards.detector().detect_batch([{"id": 3, "website": "ok.com"}])
+        assert batch[0].hotel_id == 3
+
+    async def test_crashed_shard_fails_batch_and_respawns(self, shards):
+        with pytest.raises(ShardCrashed):
+            await asyncio.wait_for(shards.detector().detect_batch([{"id": 1, "website": "crash"}]), timeout=30)
+        assert shards.stats["crashes"] == 1
+        # Both shards usable again
+        batches = await asyncio.gather(*(
+            shards.detector().detect_batch([{"id": i, "website": "ok.com"}]) for i in range(2)
+        ))
+        assert len({b[0].detection_method for b in batches}) == 2
+
+    async def test_new_patterns_sent_with_next_batch(self, shards):
+        batch = await shards.detector().detect_batch([{"id": 1, "website": "a.com"}])
+        assert batch[0].pattern_version == 0
+
+        shards.set_patterns({"Cloudbeds": ["cloudbeds.com"], "Mews": ["mews.com"]}, 7)
+        batches = await asyncio.gather(*(
+            shards.detector().detect_batch([{"id": i, "website": "ok.com"}]) for i in range(2)
+        ))
+        assert len({b[0].detection_method for b in batches}) == 2
+        assert [b[0].pattern_version for b in batches] == [7, 7]
@@ -8,112 +8,55 @@ restaurants, stores, and other non-hotel businesses that slipped through.
 
 import asyncio
 import argparse
+from collections import Counter
 from loguru import logger
 
 from db.client import init_db
+from services.leadgen.classifier import CLEANUP_NAME_CLASSIFIER
 from services.leadgen.constants import HotelStatus
 
-# Non-hotel name keywords (same as detector.py)
-NON_HOTEL_KEYWORDS = [
-    # Restaurants (generic)
-    "restaurant", "grill", "sushi", "pizza", "taco", "burrito", "bbq", "barbecue",
-    "steakhouse", "seafood", "buffet", "diner", "bakery", "deli", "cafe",
-    "bistro", "eatery", "cantina", "brewery", "bar & grill",
-    "ramen", "noodle", "pho", "wings", "wingstop", "hot pot",
-    "korean bbq", "hibachi", "teriyaki", "shawarma", "falafel", "kebab",
-    # Restaurant chains
-    "mcdonald", "burger king", "wendy", "taco bell", "chick-fil-a",
-    "starbucks", "dunkin", "subway", "pizza hut", "domino", "papa john",
-    "olive garden", "applebee", "chili", "ihop", "denny", "waffle house",
-    "cracker barrel", "outback", "longhorn", "red lobster", "texas roadhouse",
-    "buffalo wild wings", "hooters", "carrabba", "bonefish", "cheesecake factory",
-    "pf chang", "benihana", "shake shack", "in-n-out", "whataburger",
-    "jack in the box", "hardee", "carl's jr", "krispy kreme", "baskin",
-    "cold stone", "dairy queen", "culver", "popeyes", "five guys", "arby",
-    # Medical - use "hospital " with space to avoid matching "hospitality"
-    "pharmacy", "hospital ", "clinic", "medical center", "dental", "urgent care",
-    "doctor", "physician", "healthcare", "laboratory",
-    # Retail
-    "publix", "walmart", "target", "cvs", "walgreens", "kroger", "whole foods",
-    "costco", "safeway", "dollar general", "dollar tree", "best buy",
-    "warby parker", "eyewear", "optical", "mattress",
-    # Banks
-    "bank of america", "chase bank", "wells fargo", "citibank",
-    "credit union", "western union", "moneygram",
-    # Gas stations - use "shell gas" to avoid matching "Hotel Shelley"
-    "gas station", "chevron", "exxon", "shell gas", "speedway",
-    "wawa", "sheetz", "racetrac", "quiktrip", "circle k", "7-eleven",
-    # Auto
-    "autozone", "o'reilly auto", "jiffy lube", "valvoline", "car wash",
-    # Religious/Education
-    "church", "temple", "mosque", "synagogue", "chapel",
-    "school", "university", "college", "academy",
-    # Fitness
-    "gym", "fitness", "planet fitness", "la fitness", "ymca", "crossfit",
-    # Personal services
-    "salon", "nail", "tattoo", "barbershop",
-    # Pet
-    "pet", "grooming", "doggy", "veterinar",
-    # Childcare
-    "daycare", "childcare", "preschool", "kindergarten",
-    # Entertainment
-    "cinema", "theater", "theatre", "bowling", "arcade", "escape room",
-    "trampoline", "skating rink", "mini golf", "laser tag",
-    # Storage
-    "storage", "self storage", "u-haul",
-    # Car rental
-    "sixt", "hertz", "avis", "enterprise rent", "budget car", "national car",
-    "rent a car", "car rental",
-    # Senior Living - removed "apartment" (apartment hotels are legit)
-    "senior living", "assisted living", "nursing home",
-    "retirement community", "memory care", "eldercare",
-    # Construction/Services
-    "exteriors", "roofing", "plumbing", "electric", "hvac", "landscaping",
-    "construction", "contractor", "remodeling", "renovation",
-    # Coffee/Bagel/Food that slipped through
-    "coffee", "bagel", "donut", "smoothie", "juice bar", "ice cream",
-    "frozen yogurt", "cupcake", "cookie",
-]
-
-
 async def mark_non_hotels(dry_run: bool = True, batch_size: int = 1000) -> int:
     """Mark non-hotel businesses with status=-4."""
     pool = await init_db()
-    
-    # Build LIKE conditions for each keyword (escape apostrophes for SQL)
-    like_conditions = " OR ".join([f"LOWER(name) LIKE '%{kw.replace(chr(39), chr(39)+chr(39))}%'" for kw in NON_HOTEL_KEYWORDS])
-    
+
     async with pool.acquire() as conn:
+        rows = await conn.fetch("""
+            SELECT id, name FROM sadie_gtm.hotels
+            WHERE status >= 0
+        """)
+
+        # Classify in Python with the shared compiled classifier
+        matches = CLEANUP_NAME_CLASSIFIER.classify_many([r["name"] or "" for r in rows])
+        flagged = [(r, m) for r, m in zip(rows, matches) if m]
+        count = len(flagged)
+
+        # Per-keyword counts so the rule list can be audited
+        by_keyword = Counter(m.keyword for _, m in flagged)
+        logger.info(f"Matched {count} of {len(rows)} hotels")
+        for keyword, cnt in by_keyword.most_common(20):
+            logger.info(f"  {keyword!r}: {cnt}")
+
         if dry_run:
-            # Count how many would be affected
-            count = await conn.fetchval(f"""
-                SELECT COUNT(*) FROM sadie_gtm.hotels 
-                WHERE status >= 0 AND ({like_conditions})
-            """)
             logger.info(f"Would mark {count} non-hotels with status={HotelStatus.NON_HOTEL}")
-            
+
             # Show sample
-            samples = await conn.fetch(f"""
-                SELECT name FROM sadie_gtm.hotels 
-                WHERE status >= 0 AND ({like_conditions})
-                LIMIT 20
-            """)
             logger.info("Sample non-hotels:")
-            for s in samples:
-                logger.info(f"  - {s['name']}")
-            
+            for r, m in flagged[:20]:
+                logger.info(f"  - {r['name']} ({m.keyword!r})")
+
             return count
-        else:
-            # Actually update
-            result = await conn.execute(f"""
-                UPDATE sadie_gtm.hotels 
+
+        # Actually update
+        ids = [r["id"] for r, _ in flagged]
+        for i in range(0, len(ids), batch_size):
+            await conn.execute("""
+                UPDATE sadie_gtm.hotels
                 SET status = $1, updated_at = NOW()
-                WHERE status >= 0 AND ({like_conditions})
-            """, HotelStatus.NON_HOTEL)
-            
-            count = int(result.split()[-1])
-            logger.info(f"Marked {count} non-hotels with status={HotelStatus.NON_HOTEL}")
-            return count
+                WHERE id = ANY($2)
+            """, HotelStatus.NON_HOTEL, ids[i:i + batch_size])
+
+        logger.info(f"Marked {count} non-hotels with status={HotelStatus.NON_HOTEL}")
+        return count
 
 
 async def get_stats() -> None:
@@ -5,11 +5,66 @@ Run continuously on EC2 instances to process detection jobs from SQS.
 Usage:
     uv run python workflows/detection_worker.py --concurrency 6
     uv run python workflows/detection_worker.py --concurrency 6 --preset medium
+    uv run python workflows/detection_worker.py --preset large --shards 4
+    uv run python workflows/detection_worker.py --backend postgres
 
 RAM Presets:
     --preset small   8GB RAM  (concurrency 5, batch concurrency 3)
     --preset medium  12GB RAM (concurrency 6, batch concurrency 5)
-    --preset large   16GB RAM (concurrency 8, batch concurrency 5)
+    --preset large   16GB RAM (concurrency 8, batch concurrency 5, 4 shards)
+
+Adaptive concurrency:
+    --adaptive replaces the fixed per-batch hotel concurrency with one AIMD
+    limiter per browser pool. It starts at the preset's total (concurrency x
+    batch concurrency, which is also the pool size and so the ceiling), backs
+    off towards batch concurrency on page latency, timeout rate or memory
+    pressure, and climbs back once healthy. Every change is logged with its
+    reason.
+
+Memory:
+    Presets are starting points. A watchdog on each browser pool tracks the
+    RSS of Python + Chromium (against the preset's memory limit, split over
+    shards) and the instance's available memory; under pressure it recycles
+    browser contexts and lowers in-flight concurrency, then restores it.
+
+Sharding:
+    --shards N spawns N detection processes, each with its own browser pool,
+    so HTML scanning and CDP handling use N cores instead of one. The parent
+    keeps SQS and the DB; shards only run BatchDetector.
+
+Pipeline:
+    A poller keeps a small prefetch queue (--prefetch, default half the
+    concurrency) filled from SQS, and --concurrency workers each take the
+    next message as soon as they finish one, so a slow message never holds
+    idle slots until the rest of its poll completes. Utilization (share of
+    worker time spent processing) is logged per message and in the summary.
+
+Queue backend:
+    --backend sqs (default) reads SQS_DETECTION_QUEUE_URL. --backend postgres
+    reads the detection_queue table instead (fill it with
+    enqueue_detection.py --backend postgres): batches are claimed with
+    FOR UPDATE SKIP LOCKED under the same lease/heartbeat rules, so the
+    whole pipeline runs locally against only the docker-compose database.
+
+Visibility:
+    Messages are received with a short visibility timeout (--visibility-timeout,
+    default 300s) and a heartbeat extends it while the batch is still being
+    processed. A crashed worker's messages reappear within one timeout
+    instead of after a fixed 2-hour lease; a batch is never held past 2 hours.
+
+Retries:
+    Results are saved per hotel. Hotels whose save failed or whose
+    detection never finished go back on the queue in a new message (with
+    their attempt counts) and the original message is deleted, so one bad
+    hotel doesn't re-crawl its whole batch. After --max-attempts (default 3)
+    a hotel is dead-lettered: recorded as a "dead_letter" detection error
+    with a failed hotel_booking_engines row, so it is not enqueued again.
+
+Engine patterns:
+    Every --pattern-refresh seconds (default 300) the consumer checks the
+    booking engine pattern version in the DB and, if it moved, rebuilds the
+    pattern index (shards get it with their next batch). Each result records
+    the pattern version it was detected with.
 """
 
 import sys
@@ -18,15 +73,25 @@ from pathlib import Path
 # Add project root to path for direct script execution
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import time
 import asyncio
 import signal
-from typing import Dict, Any
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
 from loguru import logger
 
 from db.client import init_db, close_db
 from services.leadgen.service import Service
-from services.leadgen.detector import DetectionConfig, BatchDetector, set_engine_patterns
-from infra.sqs import receive_messages, delete_message, get_queue_url, get_queue_attributes
+from services.leadgen.constants import JobStatus
+from services.leadgen.detector import (
+    DetectionConfig, BatchDetector, format_stage_stats, get_engine_pattern_version, get_engine_patterns,
+    merge_stage_stats,
+)
+from services.leadgen.browser_pool import BrowserPool
+from services.leadgen.memory_watchdog import MemoryWatchdog
+from services.leadgen.shards import DetectionShards
+from infra.concurrency import AdaptiveLimiter
+from services.leadgen.detection_queue import QUEUE_BACKENDS, DetectionQueue, get_detection_queue
 from infra import slack
 
 
@@ -35,20 +100,29 @@ PRESETS = {
     "small": {      # 8GB RAM
         "concurrency": 5,           # concurrent SQS messages
         "batch_concurrency": 3,     # concurrent hotels per batch
+        "shards": 1,                # detection processes
+        "memory_limit_mb": 6500,    # Python + Chromium RSS budget (watchdog)
         "description": "8GB RAM",
     },
     "medium": {     # 12GB RAM
         "concurrency": 6,
         "batch_concurrency": 5,
+        "shards": 1,
+        "memory_limit_mb": 10000,
         "description": "12GB RAM",
     },
     "large": {      # 16GB+ RAM
         "concurrency": 8,
         "batch_concurrency": 5,
+        "shards": 4,                # 8-core instance
+        "memory_limit_mb": 13500,
         "description": "16GB RAM",
     },
 }
 
+# A hotel that failed this many deliveries is dead-lettered instead of re-enqueued
+MAX_HOTEL_ATTEMPTS = 3
+
 # Global flag for graceful shutdown
 shutdown_requested = False
 
@@ -63,29 +137,51 @@ def handle_shutdown(signum, frame):
 async def process_message(
     service: Service,
     message: Dict[str, Any],
-    queue_url: str,
+    queue: DetectionQueue,
     batch_concurrency: int,
     debug: bool,
+    pool: BrowserPool = None,
+    block_resources: bool = False,
+    tier_totals: Dict[str, int] = None,
+    stage_totals: Dict[str, Dict[str, int]] = None,
+    shards: DetectionShards = None,
+    limiter: AdaptiveLimiter = None,
+    max_attempts: int = MAX_HOTEL_ATTEMPTS,
 ) -> tuple:
-    """Process a single SQS message containing hotel IDs.
+    """Process a single queue message containing hotel IDs.
 
     Returns (processed_count, detected_count, error_count).
-    On exception, does NOT delete message so SQS can retry.
+    Per-tier detection counts are added into tier_totals and per-stage
+    timings into stage_totals if given. Each message is recorded in the
+    jobs table with its timings. With shards, detection runs in a shard
+    process instead of on pool. A limiter shared across messages replaces
+    the per-batch concurrency.
+
+    Results are saved as each hotel finishes, so a slow site doesn't hold
+    back the others and a crash mid-batch keeps what was already detected.
+    Hotels whose save failed, or that never got a result because detection
+    raised mid-batch, are re-enqueued on their own (with their attempt
+    count) and the message is deleted, so the rest of the batch is not
+    re-crawled. A hotel that has failed max_attempts times is dead-lettered
+    instead. If the batch can't be started at all (e.g. DB down), the
+    message is NOT deleted so SQS can retry it.
     """
     receipt_handle = message["receipt_handle"]
     hotel_ids = message["body"].get("hotel_ids", [])
 
     if not hotel_ids:
         # Empty message, delete it
-        delete_message(queue_url, receipt_handle)
+        await queue.delete(receipt_handle)
         return (0, 0, 0)
 
+    started_at = datetime.utcnow()
+    queue_name = queue.name
     try:
         # Fetch hotels from DB
         hotels = await service.get_hotels_by_ids(hotel_ids)
         if not hotels:
             # Hotels not found (maybe deleted), delete message
-            delete_message(queue_url, receipt_handle)
+            await queue.delete(receipt_handle)
             return (0, 0, 0)
 
         # Convert to dicts for detector (include city for location filtering)
@@ -99,23 +195,295 @@ async def process_message(
             concurrency=batch_concurrency,
             headless=True,
             debug=debug,
+            block_resources=block_resources,
         )
-        detector = BatchDetector(config)
-        results = await detector.detect_batch(hotel_dicts)
-
-        # Save results
-        detected, errors = await service.save_detection_results(results)
-
-        # Delete message from SQS (successful processing)
-        delete_message(queue_url, receipt_handle)
-
-        return (len(results), detected, errors)
-
+        domain_cache = await service.get_cached_domain_results(hotel_dicts)
+        dead_domains = await service.get_dead_domains(hotel_dicts)
+        detector = shards.detector() if shards is not None else BatchDetector(config, pool=pool, limiter=limiter)
     except Exception as e:
         # Don't delete message - SQS will retry after visibility timeout
         logger.error(f"Error processing message (will retry): {e}")
+        await service.record_detection_job(
+            started_at=started_at,
+            hotel_ids=hotel_ids,
+            status=JobStatus.FAILED,
+            queue_name=queue_name,
+            message_id=message.get("message_id"),
+            error_message=str(e)[:500],
+        )
         raise  # Re-raise so worker_loop knows it failed
 
+    # Save each result as soon as its hotel finishes; failures are per hotel
+    results = []
+    failed: Dict[int, str] = {}
+    detected = errors = 0
+    try:
+        async for result in detector.detect_stream(hotel_dicts, domain_cache=domain_cache, dead_domains=dead_domains):
+            results.append(result)
+            try:
+                d, e = await service.save_detection_result(result, raise_errors=True)
+                detected += d
+                errors += e
+            except Exception as e:
+                failed[result.hotel_id] = f"save failed: {e}"
+    except Exception as e:
+        logger.error(f"Detection stopped mid-batch: {e}")
+        finished = {r.hotel_id for r in results}
+        for h in hotel_dicts:
+            if h["id"] not in finished:
+                failed[h["id"]] = f"detection failed: {e}"
+
+    if tier_totals is not None:
+        for key, count in detector.tier_stats.items():
+            tier_totals[key] = tier_totals.get(key, 0) + count
+    if stage_totals is not None:
+        merge_stage_stats(stage_totals, detector.stage_stats)
+
+    retried, dead_lettered = await retry_failed_hotels(service, message, queue, failed, max_attempts)
+    errors += len(failed)
+
+    # Everything is saved, re-enqueued or dead-lettered: acknowledge the message
+    await queue.delete(receipt_handle)
+
+    await service.record_detection_job(
+        started_at=started_at,
+        hotel_ids=hotel_ids,
+        status=JobStatus.COMPLETED if not failed else JobStatus.RETRYING,
+        queue_name=queue_name,
+        message_id=message.get("message_id"),
+        error_message="; ".join(f"{hid}: {err}" for hid, err in failed.items())[:500] or None,
+        output_data={
+            "processed": len(results),
+            "detected": detected,
+            "errors": errors,
+            "retried": retried,
+            "dead_lettered": dead_lettered,
+            "tiers": detector.tier_stats,
+            "tier_ms": detector.tier_ms,
+            "stages": detector.stage_stats,
+            "hotels": [
+                {
+                    "hotel_id": r.hotel_id,
+                    "engine": r.booking_engine,
+                    "error": r.error,
+                    "cutoff_stage": r.cutoff_stage,
+                    "stages": r.stage_timings,
+                    "pattern_version": r.pattern_version,
+                }
+                for r in results
+            ],
+        },
+    )
+
+    return (len(results), detected, errors)
+
+
+def hotel_attempts(message: Dict[str, Any]) -> Dict[int, int]:
+    """Attempts per hotel in a message, counting this delivery.
+
+    Re-enqueued messages carry earlier attempts per hotel in body["attempts"];
+    redeliveries of the same message add to receive_count.
+    """
+    body = message["body"]
+    earlier = {int(k): v for k, v in (body.get("attempts") or {}).items()}
+    delivered = message.get("receive_count", 1)
+    return {hid: earlier.get(hid, 0) + delivered for hid in body.get("hotel_ids", [])}
+
+
+async def retry_failed_hotels(
+    service: Service,
+    message: Dict[str, Any],
+    queue: DetectionQueue,
+    failed: Dict[int, str],
+    max_attempts: int = MAX_HOTEL_ATTEMPTS,
+) -> tuple:
+    """Re-enqueue failed hotels in one new message; dead-letter repeat offenders.
+
+    Returns (retried_ids, dead_lettered_ids). Raises if the re-enqueue fails,
+    leaving the original message to be redelivered.
+    """
+    if not failed:
+        return ([], [])
+    attempts = hotel_attempts(message)
+    retry = [hid for hid in failed if attempts.get(hid, 1) < max_attempts]
+    dead = [hid for hid in failed if hid not in retry]
+
+    if retry:
+        await queue.send({
+            "hotel_ids": retry,
+            "attempts": {str(hid): attempts.get(hid, 1) for hid in retry},
+        })
+        logger.warning(f"Re-enqueued {len(retry)} failed hotels: {retry}")
+    for hid in dead:
+        try:
+            await service.dead_letter_hotel(hid, attempts.get(hid, 1), failed[hid])
+            logger.warning(f"Dead-lettered hotel {hid} after {attempts.get(hid, 1)} attempts: {failed[hid]}")
+        except Exception as e:
+            # Acknowledged anyway; the next enqueue run picks it up again
+            logger.error(f"Could not dead-letter hotel {hid}: {e}")
+    return (retry, dead)
+
+
+class MessagePipeline:
+    """Queue poller feeding a fixed set of workers through a bounded prefetch queue.
+
+    The poller keeps the prefetch queue topped up (never leasing more than
+    it has free slots for), so a worker that finishes a message starts the
+    next one without waiting for a poll. Each prefetched message carries a
+    running lease heartbeat. On shutdown, or if the poller fails, messages
+    no worker has started are released straight back to the queue and the
+    workers only finish what they hold; after max_messages they drain it.
+    """
+
+    def __init__(
+        self,
+        queue: DetectionQueue,
+        handle: Callable[[Dict[str, Any]], Awaitable[tuple]],
+        workers: int,
+        prefetch: int = 0,
+        visibility_timeout: int = 300,
+        max_messages: int = 0,
+        wait_time_seconds: int = 20,
+        before_poll: Optional[Callable[[], Awaitable[None]]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        Args:
+            queue: Queue to receive from
+            handle: Processes one message, returns (processed, detected, errors)
+            workers: Messages processed concurrently
+            prefetch: Messages received ahead of the workers (0 = workers // 2)
+            visibility_timeout: Initial lease, extended by the heartbeat
+            max_messages: Stop receiving after this many (0 = unlimited)
+            wait_time_seconds: Long-poll wait per receive
+            before_poll: Called before every receive (e.g. pattern refresh)
+            should_stop: Shutdown check (default: the SIGTERM/SIGINT flag)
+        """
+        self.queue = queue
+        self.handle = handle
+        self.workers = workers
+        self.visibility_timeout = visibility_timeout
+        self.max_messages = max_messages
+        self.wait_time_seconds = wait_time_seconds
+        self.before_poll = before_poll
+        self.should_stop = should_stop or (lambda: shutdown_requested)
+        self.prefetched: asyncio.Queue = asyncio.Queue(maxsize=max(1, prefetch or workers // 2))
+        self.stats = {"messages": 0, "processed": 0, "detected": 0, "errors": 0, "released": 0}
+        self.busy_s = 0.0
+        self.starved_s = 0.0
+        self._slot_freed = asyncio.Event()
+        self._started = time.monotonic()
+
+    def utilization(self) -> float:
+        """Share of worker time spent processing messages, in percent."""
+        elapsed = (time.monotonic() - self._started) * self.workers
+        return self.busy_s / elapsed * 100 if elapsed > 0 else 0.0
+
+    async def run(self) -> None:
+        self._started = time.monotonic()
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        poller_done = False
+        try:
+            await self._poll()
+            poller_done = True
+        finally:
+            while (self.should_stop() or not poller_done) and not self.prefetched.empty():
+                msg, heartbeat = self.prefetched.get_nowait()
+                await heartbeat.stop()
+                await self._release(msg)
+            for _ in workers:
+                await self.prefetched.put(None)
+            await asyncio.gather(*workers)
+
+    async def _poll(self) -> None:
+        received = 0
+        while not self.should_stop():
+            # Check max messages limit
+            if self.max_messages > 0 and received >= self.max_messages:
+                logger.info(f"Reached max messages limit ({self.max_messages})")
+                return
+
+            if self.before_poll is not None:
+                await self.before_poll()
+
+            # Don't lease messages no slot can take yet; keep checking for shutdown
+            while self.prefetched.full() and not self.should_stop():
+                self._slot_freed.clear()
+                try:
+                    await asyncio.wait_for(self._slot_freed.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+            if self.should_stop():
+                return
+
+            # Ask for as many messages as there are free prefetch slots
+            wanted = max(1, self.prefetched.maxsize - self.prefetched.qsize())
+            if self.max_messages > 0:
+                wanted = min(wanted, self.max_messages - received)
+            messages = await self.queue.receive(
+                max_messages=wanted,
+                wait_time_seconds=self.wait_time_seconds,
+                visibility_timeout=self.visibility_timeout,  # Extended by the heartbeat
+            )
+
+            if not messages:
+                # No messages, check queue depth
+                counts = await self.queue.counts()
+                if counts["pending"] == 0 and counts["in_flight"] == 0:
+                    logger.info("Queue empty, waiting...")
+                continue
+
+            received += len(messages)
+            if self.should_stop():
+                # Shutdown arrived during the long poll: hand them straight back
+                for msg in messages:
+                    await self._release(msg)
+                return
+            for msg in messages:
+                heartbeat = self.queue.heartbeat(msg["receipt_handle"], self.visibility_timeout).start()
+                self.prefetched.put_nowait((msg, heartbeat))
+
+    async def _worker(self) -> None:
+        while True:
+            waited = time.monotonic()
+            item = await self.prefetched.get()
+            self._slot_freed.set()
+            if item is None:
+                return
+            msg, heartbeat = item
+            if self.should_stop():
+                # Shutting down: don't start anything new, hand it back
+                await heartbeat.stop()
+                await self._release(msg)
+                continue
+            started = time.monotonic()
+            self.starved_s += started - waited
+            try:
+                processed, detected, errors = await self.handle(msg)
+                self.stats["processed"] += processed
+                self.stats["detected"] += detected
+                self.stats["errors"] += errors
+            except Exception as e:
+                logger.error(f"Error processing message: {e}")
+                self.stats["errors"] += 1
+            finally:
+                await heartbeat.stop()
+                self.busy_s += time.monotonic() - started
+            self.stats["messages"] += 1
+            logger.info(
+                f"Processed message {msg.get('message_id')} | "
+                f"Total: {self.stats['messages']} messages, {self.stats['processed']} hotels, "
+                f"{self.stats['detected']} detected, {self.stats['errors']} errors | "
+                f"utilization {self.utilization():.0f}%, prefetched {self.prefetched.qsize()}"
+            )
+
+    async def _release(self, msg: Dict[str, Any]) -> None:
+        try:
+            await self.queue.release(msg["receipt_handle"])
+            self.stats["released"] += 1
+        except Exception as e:
+            logger.warning(f"Could not release prefetched message {msg.get('message_id')}: {e}")
+
 
 async def worker_loop(
     concurrency: int = 6,
@@ -123,6 +491,15 @@ async def worker_loop(
     debug: bool = False,
     max_messages: int = 0,
     notify: bool = True,
+    block_resources: bool = False,
+    shards: int = 1,
+    memory_limit_mb: int = 0,
+    adaptive: bool = False,
+    pattern_refresh: float = 300.0,
+    visibility_timeout: int = 300,
+    prefetch: int = 0,
+    max_attempts: int = MAX_HOTEL_ATTEMPTS,
+    backend: str = "sqs",
 ):
     """Main worker loop - poll SQS and process messages.
 
@@ -132,94 +509,154 @@ async def worker_loop(
         debug: Enable debug logging
         max_messages: Max messages to process (0 = unlimited)
         notify: Send Slack notification on completion
+        block_resources: Abort image/media/font/stylesheet requests in the browser
+        shards: Detection processes (1 = detect in this process)
+        memory_limit_mb: Python + Chromium RSS budget for the memory watchdog,
+            split evenly over shards (0 = watch available memory only)
+        adaptive: Let an AIMD limiter per browser pool lower hotel concurrency (from the preset) under load
+        pattern_refresh: Seconds between engine pattern version checks (0 = load once)
+        visibility_timeout: Initial SQS visibility, extended by a heartbeat while processing
+        prefetch: Messages received ahead of the workers (0 = concurrency // 2)
+        max_attempts: Failed deliveries after which a hotel is dead-lettered
+        backend: Queue to read from ("sqs" or "postgres")
     """
     global shutdown_requested
 
     await init_db()
+    pool = None
+    shard_pool = None
+    watchdog = None
+    limiter = None
     try:
         service = Service()
-        queue_url = get_queue_url()
-
-        # Load engine patterns (cached)
-        patterns = await service.get_engine_patterns()
-        set_engine_patterns(patterns)
-
-        logger.info(f"Consumer starting (concurrency={concurrency}, batch_concurrency={batch_concurrency})")
-        logger.info(f"Queue: {queue_url}")
-
-        total_processed = 0
-        total_detected = 0
-        total_errors = 0
-        message_count = 0
-
-        # Semaphore to limit concurrent message processing
-        semaphore = asyncio.Semaphore(concurrency)
-
-        async def process_with_semaphore(msg):
-            async with semaphore:
-                return await process_message(
-                    service=service,
-                    message=msg,
-                    queue_url=queue_url,
-                    batch_concurrency=batch_concurrency,
+        queue = get_detection_queue(backend, service)
+
+        # Load engine patterns (refreshed by version below)
+        await service.refresh_engine_patterns()
+        patterns_checked_at = time.monotonic()
+
+        if shards > 1:
+            # Messages spread over the shards; each has its own browser sized for its share
+            shard_pool = DetectionShards(
+                shards,
+                DetectionConfig(
+                    concurrency=batch_concurrency,
+                    headless=True,
                     debug=debug,
+                    block_resources=block_resources,
+                    memory_limit_mb=memory_limit_mb // shards,
+                    adaptive_concurrency=adaptive,
+                ),
+                get_engine_patterns(),
+                pool_size=-(-concurrency // shards) * batch_concurrency,
+                pattern_version=get_engine_pattern_version(),
+            )
+            await shard_pool.start()
+        else:
+            # One browser for the worker's lifetime, shared by all messages
+            pool = BrowserPool(
+                size=concurrency * batch_concurrency,
+                headless=True,
+                max_pages_per_context=DetectionConfig().context_max_pages,
+                block_resources=block_resources,
+            )
+            await pool.start()
+            watchdog = MemoryWatchdog(pool, limit_mb=memory_limit_mb)
+            watchdog.start()
+            if adaptive:
+                # Pages beyond the pool size would just queue for a context
+                limiter = AdaptiveLimiter(
+                    min(concurrency * batch_concurrency, pool.size),
+                    min_limit=batch_concurrency, max_limit=pool.size, name="detection",
                 )
 
-        while not shutdown_requested:
-            # Check max messages limit
-            if max_messages > 0 and message_count >= max_messages:
-                logger.info(f"Reached max messages limit ({max_messages})")
-                break
-
-            # Poll for messages
-            messages = receive_messages(
-                queue_url=queue_url,
-                max_messages=min(concurrency, 10),  # SQS max is 10
-                wait_time_seconds=20,
-                visibility_timeout=7200,  # 2 hours - safe buffer for retries
+        logger.info(
+            f"Consumer starting (concurrency={concurrency}, batch_concurrency={batch_concurrency}, shards={shards})"
+        )
+        logger.info(f"Queue: {queue.name} ({backend})")
+
+        tier_totals: Dict[str, int] = {}
+        stage_totals: Dict[str, Dict[str, int]] = {}
+
+        async def refresh_patterns():
+            # Pick up engines added since startup (one small query per interval)
+            nonlocal patterns_checked_at
+            if pattern_refresh > 0 and time.monotonic() - patterns_checked_at >= pattern_refresh:
+                patterns_checked_at = time.monotonic()
+                try:
+                    if await service.refresh_engine_patterns() and shard_pool is not None:
+                        shard_pool.set_patterns(get_engine_patterns(), get_engine_pattern_version())
+                except Exception as e:
+                    logger.warning(f"Engine pattern refresh failed (keeping version {get_engine_pattern_version()}): {e}")
+
+        async def handle(msg):
+            return await process_message(
+                service=service,
+                message=msg,
+                queue=queue,
+                batch_concurrency=batch_concurrency,
+                debug=debug,
+                pool=pool,
+                block_resources=block_resources,
+                tier_totals=tier_totals,
+                stage_totals=stage_totals,
+                shards=shard_pool,
+                limiter=limiter,
+                max_attempts=max_attempts,
             )
 
-            if not messages:
-                # No messages, check queue depth
-                attrs = get_queue_attributes(queue_url)
-                pending = int(attrs.get("ApproximateNumberOfMessages", 0))
-                in_flight = int(attrs.get("ApproximateNumberOfMessagesNotVisible", 0))
-
-                if pending == 0 and in_flight == 0:
-                    logger.info("Queue empty, waiting...")
-
-                continue
+        pipeline = MessagePipeline(
+            queue,
+            handle,
+            workers=concurrency,
+            prefetch=prefetch,
+            visibility_timeout=visibility_timeout,
+            max_messages=max_messages,
+            before_poll=refresh_patterns,
+        )
+        await pipeline.run()
 
-            # Process messages concurrently
-            tasks = [process_with_semaphore(msg) for msg in messages]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    logger.error(f"Error processing message: {result}")
-                    total_errors += 1
-                else:
-                    processed, detected, errors = result
-                    total_processed += processed
-                    total_detected += detected
-                    total_errors += errors
-
-            message_count += len(messages)
-            logger.info(
-                f"Processed {len(messages)} messages | "
-                f"Total: {total_processed} hotels, {total_detected} detected, {total_errors} errors"
-            )
+        stats = pipeline.stats
+        total_processed = stats["processed"]
+        total_detected = stats["detected"]
+        total_errors = stats["errors"]
+        message_count = stats["messages"]
 
         # Final summary
         logger.info("=" * 60)
         logger.info("CONSUMER COMPLETE")
         logger.info("=" * 60)
         logger.info(f"Messages processed: {message_count}")
+        logger.info(
+            f"Utilization:        {pipeline.utilization():.0f}% of {concurrency} workers busy, "
+            f"{pipeline.starved_s:.0f}s worker time waiting for messages"
+        )
         logger.info(f"Hotels processed:   {total_processed}")
         logger.info(f"Engines detected:   {total_detected}")
         logger.info(f"Errors:             {total_errors}")
         if total_processed > 0:
             logger.info(f"Hit rate:           {total_detected / total_processed * 100:.1f}%")
+        if tier_totals.get("domain_cache") or tier_totals.get("domain_dedupe"):
+            logger.info(
+                f"Domain cache:       {tier_totals['domain_cache']} cached, "
+                f"{tier_totals['domain_dedupe']} shared in-batch - site visits avoided"
+            )
+        if tier_totals.get("static_checked"):
+            logger.info(
+                f"Static tier:        {tier_totals['static_conclusive']}/{tier_totals['static_checked']} resolved "
+                f"({tier_totals['static_detected']} engines) - browser sessions avoided"
+            )
+            logger.info(
+                f"Browser tier:       {tier_totals['browser']} hotels ({tier_totals['browser_detected']} engines)"
+            )
+        if tier_totals.get("precheck_cached"):
+            logger.info(f"Dead domains:       {tier_totals['precheck_cached']} hotels skipped (precheck_cached)")
+        if tier_totals.get("budget_cutoff"):
+            logger.info(f"Budget cutoffs:     {tier_totals['budget_cutoff']} hotels hit the per-hotel time budget")
+        if stage_totals:
+            logger.info(f"Slowest stages:     {format_stage_stats(stage_totals)}")
+        if limiter is not None:
+            logger.info(f"Concurrency:        final {limiter.limit}, {limiter.stats}")
         logger.info("=" * 60)
 
         # Send Slack notification
@@ -238,6 +675,35 @@ async def worker_loop(
         if notify:
             slack.send_error("Detection Consumer", str(e))
         raise
+    finally:
+        if watchdog is not None:
+            await watchdog.stop()
+        if shard_pool is not None:
+            await shard_pool.close()
+        if pool is not None:
+            await pool.close()
+        await close_db()
+
+
+async def stage_report(hours: int) -> None:
+    """Print which detection stages dominated wall-clock time (from the jobs table)."""
+    await init_db()
+    try:
+        rows = await Service().get_detection_stage_summary(hours=hours)
+        logger.info("=" * 60)
+        logger.info(f"DETECTION STAGE TIMINGS (last {hours}h)")
+        logger.info("=" * 60)
+        if not rows:
+            logger.info("No detection jobs recorded")
+        grand_total = sum(row["total_ms"] for row in rows) or 1
+        for row in rows:
+            avg_ms = row["total_ms"] / row["samples"] if row["samples"] else 0
+            logger.info(
+                f"{row['stage']:20s} {row['total_ms'] / 1000:10.1f}s "
+                f"({row['total_ms'] / grand_total * 100:4.1f}%)  avg {avg_ms:6.0f}ms  "
+                f"max {row['max_ms']}ms  n={row['samples']}"
+            )
+        logger.info("=" * 60)
     finally:
         await close_db()
 
@@ -252,7 +718,7 @@ def main():
 RAM Presets:
   --preset small   8GB RAM  (5 concurrent messages, 3 concurrent hotels)
   --preset medium  12GB RAM (6 concurrent messages, 5 concurrent hotels)
-  --preset large   16GB RAM (8 concurrent messages, 5 concurrent hotels)
+  --preset large   16GB RAM (8 concurrent messages, 5 concurrent hotels, 4 shards)
 
 Examples:
   # Run with medium preset
@@ -261,12 +727,22 @@ Examples:
   # Run with custom concurrency
   uv run python workflows/detection_worker.py --concurrency 6 --batch-concurrency 5
 
+  # Spread detection over 4 processes (one browser each)
+  uv run python workflows/detection_worker.py --preset medium --shards 4
+
+  # Read batches from the detection_queue table instead of SQS
+  uv run python workflows/detection_worker.py --preset small --backend postgres
+
   # Process max 100 messages then exit (for testing)
   uv run python workflows/detection_worker.py --preset small --max-messages 100
 
+  # Show which stages dominated wall-clock time over the last day
+  uv run python workflows/detection_worker.py --stage-report 24
+
 Environment:
-  SQS_DETECTION_QUEUE_URL - Required. The SQS queue URL.
+  SQS_DETECTION_QUEUE_URL - Required for --backend sqs. The SQS queue URL.
   AWS_REGION - Optional. Defaults to us-east-1.
+  SQS_ENDPOINT_URL - Optional. SQS-compatible endpoint (e.g. local ElasticMQ).
         """
     )
 
@@ -275,6 +751,12 @@ Environment:
         choices=list(PRESETS.keys()),
         help="RAM preset (small=8GB, medium=12GB, large=16GB)"
     )
+    parser.add_argument(
+        "--backend",
+        choices=QUEUE_BACKENDS,
+        default="sqs",
+        help="Queue to read hotel batches from (default: sqs)"
+    )
     parser.add_argument(
         "--concurrency", "-c",
         type=int,
@@ -285,6 +767,48 @@ Environment:
         type=int,
         help="Concurrent hotels per batch (overrides preset)"
     )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        help="Detection processes, each with its own browser (overrides preset, default: 1)"
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        metavar="MB",
+        help="Python + Chromium RSS budget for the memory watchdog (overrides preset, 0 = available memory only)"
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Back off hotel concurrency below the preset on latency, timeouts and memory pressure (AIMD)"
+    )
+    parser.add_argument(
+        "--pattern-refresh",
+        type=float,
+        default=300.0,
+        metavar="SECONDS",
+        help="Seconds between engine pattern version checks, 0 = load once (default: 300)"
+    )
+    parser.add_argument(
+        "--visibility-timeout",
+        type=int,
+        default=300,
+        metavar="SECONDS",
+        help="Initial SQS visibility timeout, extended by a heartbeat while processing (default: 300)"
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        help="Messages received ahead of the workers, 0 = half the concurrency (default: 0)"
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=MAX_HOTEL_ATTEMPTS,
+        help=f"Failed deliveries before a hotel is dead-lettered (default: {MAX_HOTEL_ATTEMPTS})"
+    )
     parser.add_argument(
         "--max-messages",
         type=int,
@@ -296,29 +820,52 @@ Environment:
         action="store_true",
         help="Enable debug logging"
     )
+    parser.add_argument(
+        "--block-resources",
+        action="store_true",
+        help="Skip images, media, fonts and stylesheets when loading pages"
+    )
     parser.add_argument(
         "--no-notify",
         action="store_true",
         help="Disable Slack notification"
     )
+    parser.add_argument(
+        "--stage-report",
+        type=int,
+        metavar="HOURS",
+        help="Print per-stage timing totals from the jobs table for the last HOURS and exit"
+    )
 
     args = parser.parse_args()
 
+    if args.stage_report:
+        asyncio.run(stage_report(args.stage_report))
+        return
+
     # Apply preset defaults
     if args.preset:
         preset = PRESETS[args.preset]
         concurrency = preset["concurrency"]
         batch_concurrency = preset["batch_concurrency"]
+        shards = preset["shards"]
+        memory_limit_mb = preset["memory_limit_mb"]
         logger.info(f"Using preset '{args.preset}': {preset['description']}")
     else:
         concurrency = 6
         batch_concurrency = 5
+        shards = 1
+        memory_limit_mb = 0
 
     # Override with explicit args
     if args.concurrency:
         concurrency = args.concurrency
     if args.batch_concurrency:
         batch_concurrency = args.batch_concurrency
+    if args.shards:
+        shards = args.shards
+    if args.memory_limit is not None:
+        memory_limit_mb = args.memory_limit
 
     # Set up signal handlers for graceful shutdown
     signal.signal(signal.SIGINT, handle_shutdown)
@@ -332,6 +879,15 @@ Environment:
         debug=args.debug,
         max_messages=args.max_messages,
         notify=not args.no_notify,
+        block_resources=args.block_resources,
+        shards=shards,
+        memory_limit_mb=memory_limit_mb,
+        adaptive=args.adaptive,
+        pattern_refresh=args.pattern_refresh,
+        visibility_timeout=args.visibility_timeout,
+        prefetch=args.prefetch,
+        max_attempts=args.max_attempts,
+        backend=args.backend,
     ))
 
 
@@ -0,0 +1,284 @@
+"""Unit tests for the detection consumer (fake queue, service and detector; no SQS or DB)."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.leadgen import repo
+from services.leadgen.detection_queue import DetectionQueue
+from services.leadgen.detector import DetectionResult
+from services.leadgen.service import Service
+from workflows import detection_consumer
+from workflows.detection_consumer import MessagePipeline, hotel_attempts, process_message
+
+
+class FakeQueue(DetectionQueue):
+    """In-memory queue recording what the consumer sends, deletes and releases."""
+
+    name = "fake-queue"
+
+    def __init__(self, messages=None):
+        self.pending = list(messages or [])
+        self.sent = []
+        self.deleted = []
+        self.released = []
+        self.receives = 0
+
+    async def receive(self, max_messages=1, wait_time_seconds=20, visibility_timeout=300):
+        self.receives += 1
+        batch, self.pending = self.pending[:max_messages], self.pending[max_messages:]
+        return batch
+
+    async def extend(self, receipt_handle, visibility_timeout):
+        if visibility_timeout == 0:
+            self.released.append(receipt_handle)
+
+    async def delete(self, receipt_handle):
+        self.deleted.append(receipt_handle)
+
+    async def send(self, body):
+        self.sent.append(body)
+
+    async def counts(self):
+        return {"pending": len(self.pending), "in_flight": 0}
+
+
+class FakeDetector:
+    """Yields one result per hotel (engine from `engines`), optionally raising after `crash_after`."""
+
+    tier_stats = {}
+    tier_ms = {}
+    stage_stats = {}
+
+    def __init__(self, engines, crash_after=None):
+        self.engines = engines
+        self.crash_after = crash_after
+
+    async def detect_stream(self, hotels, **kwargs):
+        for i, hotel in enumerate(hotels):
+            if self.crash_after is not None and i >= self.crash_after:
+                raise RuntimeError("browser died")
+            yield DetectionResult(hotel_id=hotel["id"], booking_engine=self.engines.get(hotel["id"], ""))
+
+
+class ConsumerService(Service):
+    """Real save/dead-letter path; hotel lookups and job recording stubbed."""
+
+    def __init__(self):
+        super().__init__()
+        self.jobs = []
+
+    async def get_hotels_by_ids(self, hotel_ids):
+        return [SimpleNamespace(id=i, name=f"Hotel {i}", website=f"https://h{i}.com", city="") for i in hotel_ids]
+
+    async def get_cached_domain_results(self, hotels):
+        return {}
+
+    async def get_dead_domains(self, hotels):
+        return {}
+
+    async def record_detection_job(self, **kwargs):
+        self.jobs.append(kwargs)
+
+
+def queued(n):
+    return [{"body": {"hotel_ids": [i]}, "receipt_handle": f"rh-{i}", "message_id": f"m-{i}"} for i in range(n)]
+
+
+def message(hotel_ids, attempts=None, receive_count=1):
+    body = {"hotel_ids": hotel_ids}
+    if attempts:
+        body["attempts"] = attempts
+    return {"body": body, "receipt_handle": "rh-1", "message_id": "m-1", "receive_count": receive_count}
+
+
+@asynccontextmanager
+async def no_transaction():
+    yield
+
+
+@pytest.fixture
+def db():
+    """Patch the repo writes; booking engine "Broken" fails like a DB error."""
+
+    async def engine_by_name(name):
+        if name == "Broken":
+            raise RuntimeError("db down")
+        return MagicMock(id=1)
+
+    with patch.object(repo, "transaction", no_transaction), \
+            patch.object(repo, "get_booking_engine_by_name", side_effect=engine_by_name), \
+            patch.object(repo, "insert_hotel_booking_engine", new_callable=AsyncMock) as link, \
+            patch.object(repo, "insert_hotel_booking_engine_dead_letter", new_callable=AsyncMock), \
+            patch.object(repo, "insert_detection_error", new_callable=AsyncMock) as error, \
+            patch.object(repo, "update_hotel_status", new_callable=AsyncMock), \
+            patch.object(repo, "update_hotel_contact_info", new_callable=AsyncMock), \
+            patch.object(repo, "upsert_detection_domain_cache", new_callable=AsyncMock), \
+            patch.object(repo, "delete_detection_dead_domain", new_callable=AsyncMock):
+        yield SimpleNamespace(link=link, error=error)
+
+
+async def run(service, msg, queue, detector, max_attempts=3):
+    return await process_message(
+        service=service,
+        message=msg,
+        queue=queue,
+        batch_concurrency=2,
+        debug=False,
+        shards=SimpleNamespace(detector=lambda: detector),
+        max_attempts=max_attempts,
+    )
+
+
+@pytest.mark.no_db
+class TestHotelAttempts:
+    """Unit tests for per-hotel attempt counting."""
+
+    def test_first_delivery(self):
+        assert hotel_attempts(message([1, 2])) == {1: 1, 2: 1}
+
+    def test_earlier_attempts_and_redelivery(self):
+        msg = message([1, 2], attempts={"2": 2}, receive_count=2)
+        assert hotel_attempts(msg) == {1: 2, 2: 4}
+
+
+@pytest.mark.no_db
+class TestProcessMessage:
+    """Per-hotel acknowledgement, re-enqueue and dead-lettering."""
+
+    @pytest.mark.asyncio
+    async def test_failed_save_is_retried_alone(self, db):
+        queue = FakeQueue()
+        service = ConsumerService()
+        detector = FakeDetector({1: "Mews", 2: "Broken", 3: "Cloudbeds"})
+
+        processed, detected, errors = await run(service, message([1, 2, 3]), queue, detector)
+
+        assert (processed, detected, errors) == (3, 2, 1)
+        assert [c.kwargs["hotel_id"] for c in db.link.call_args_list] == [1, 3]
+        assert queue.sent == [{"hotel_ids": [2], "attempts": {"2": 1}}]
+        assert queue.deleted == ["rh-1"]
+        assert service.jobs[0]["output_data"]["retried"] == [2]
+
+    @pytest.mark.asyncio
+    async def test_detection_crash_retries_unfinished_hotels(self, db):
+        queue = FakeQueue()
+        detector = FakeDetector({1: "Mews", 2: "Mews", 3: "Mews"}, crash_after=1)
+
+        await run(ConsumerService(), message([1, 2, 3]), queue, detector)
+
+        assert queue.sent == [{"hotel_ids": [2, 3], "attempts": {"2": 1, "3": 1}}]
+        assert queue.deleted == ["rh-1"]
+
+    @pytest.mark.asyncio
+    async def test_repeat_offender_is_dead_lettered(self, db):
+        queue = FakeQueue()
+        service = ConsumerService()
+        detector = FakeDetector({1: "Mews", 2: "Broken"})
+
+        await run(service, message([1, 2], attempts={"2": 2}), queue, detector)
+
+        assert queue.sent == []
+        assert queue.deleted == ["rh-1"]
+        dead = [c.kwargs for c in db.error.call_args_list if c.kwargs["error_type"] == "dead_letter"]
+        assert [d["hotel_id"] for d in dead] == [2]
+        assert dead[0]["error_message"].startswith("dead_letter: 3 attempts: save failed: db down")
+        assert service.jobs[0]["output_data"]["dead_lettered"] == [2]
+
+    @pytest.mark.asyncio
+    async def test_failed_dead_letter_is_logged_not_raised(self, db):
+        queue = FakeQueue()
+        db.error.side_effect = RuntimeError("db down")
+        detector = FakeDetector({2: "Broken"})
+
+        await run(ConsumerService(), message([2], attempts={"2": 2}), queue, detector)
+
+        assert db.error.called
+        assert queue.deleted == ["rh-1"]
+
+    @pytest.mark.asyncio
+    async def test_failed_re_enqueue_keeps_message(self, db):
+        queue = FakeQueue()
+        queue.send = AsyncMock(side_effect=RuntimeError("queue down"))
+        detector = FakeDetector({1: "Broken"})
+
+        with pytest.raises(RuntimeError):
+            await run(ConsumerService(), message([1]), queue, detector)
+        assert queue.deleted == []  # Redelivered as a whole
+
+
+@pytest.mark.no_db
+class TestMessagePipeline:
+    """Poller/worker pipeline over a fake queue."""
+
+    @pytest.mark.asyncio
+    async def test_processes_every_message_within_prefetch(self):
+        queue = FakeQueue(queued(6))
+        handled = []
+        peak = 0
+
+        async def handle(msg):
+            nonlocal peak
+            peak = max(peak, pipeline.prefetched.qsize())
+            await asyncio.sleep(0.01)
+            handled.append(msg["message_id"])
+            return 1, 1, 0
+
+        pipeline = MessagePipeline(queue, handle, workers=2, prefetch=1, max_messages=6)
+        await pipeline.run()
+
+        assert sorted(handled) == [f"m-{i}" for i in range(6)]
+        assert pipeline.stats["messages"] == 6
+        assert pipeline.stats["processed"] == 6
+        assert peak <= 1
+        assert queue.released == []
+
+    @pytest.mark.asyncio
+    async def test_shutdown_during_slot_wait_leases_nothing_more(self, monkeypatch):
+        monkeypatch.setattr(detection_consumer, "shutdown_requested", False)
+        queue = FakeQueue(queued(10))
+        gate = asyncio.Event()
+        handled = []
+
+        async def handle(msg):
+            handled.append(msg["message_id"])
+            await gate.wait()
+            return 1, 0, 0
+
+        pipeline = MessagePipeline(queue, handle, workers=1, prefetch=1)
+        run = asyncio.create_task(pipeline.run())
+        # One message in the worker, one prefetched, poller waiting for a slot
+        while not (handled and pipeline.prefetched.full()):
+            await asyncio.sleep(0.01)
+        receives = queue.receives
+
+        monkeypatch.setattr(detection_consumer, "shutdown_requested", True)
+        gate.set()
+        await asyncio.wait_for(run, timeout=5)
+
+        assert queue.receives == receives
+        assert handled == ["m-0"]
+        assert queue.released == ["rh-1"]
+        assert len(queue.pending) == 8
+
+    @pytest.mark.asyncio
+    async def test_shutdown_during_receive_releases_batch(self, monkeypatch):
+        monkeypatch.setattr(detection_consumer, "shutdown_requested", False)
+        queue = FakeQueue(queued(3))
+        receive = queue.receive
+
+        async def receive_then_shutdown(**kwargs):
+            batch = await receive(**kwargs)
+            detection_consumer.shutdown_requested = True
+            return batch
+
+        queue.receive = receive_then_shutdown
+        handle = AsyncMock(return_value=(1, 0, 0))
+
+        await MessagePipeline(queue, handle, workers=4, prefetch=2).run()
+
+        assert not handle.called
+        assert queue.released == ["rh-0", "rh-1"]
@@ -1,10 +1,11 @@
-"""Enqueue hotels for detection via SQS.
+"""Enqueue hotels for detection via SQS (or the Postgres detection queue).
 
 Run this after scraping or on a schedule to queue hotels for detection workers.
 
 Usage:
     uv run python workflows/enqueue_detection.py --limit 1000
     uv run python workflows/enqueue_detection.py --limit 5000 --batch-size 20
+    uv run python workflows/enqueue_detection.py --limit 1000 --backend postgres
 """
 
 import sys
@@ -18,15 +19,16 @@ from loguru import logger
 
 from db.client import init_db, close_db
 from services.leadgen.service import Service
+from services.leadgen.detection_queue import QUEUE_BACKENDS
 from infra import slack
 
 
-async def run(limit: int = 1000, batch_size: int = 20, notify: bool = True):
+async def run(limit: int = 1000, batch_size: int = 20, notify: bool = True, backend: str = "sqs"):
     """Enqueue hotels for detection."""
     await init_db()
     try:
         service = Service()
-        count = await service.enqueue_hotels_for_detection(limit=limit, batch_size=batch_size)
+        count = await service.enqueue_hotels_for_detection(limit=limit, batch_size=batch_size, backend=backend)
         logger.info(f"Enqueued {count} hotels for detection")
 
         if notify and count > 0:
@@ -58,8 +60,11 @@ Examples:
     # Enqueue 5000 hotels with 20 per message
     uv run python workflows/enqueue_detection.py --limit 5000 --batch-size 20
 
+    # Enqueue into the detection_queue table (detection_consumer.py --backend postgres)
+    uv run python workflows/enqueue_detection.py --limit 1000 --backend postgres
+
 Environment:
-    SQS_DETECTION_QUEUE_URL - Required. The SQS queue URL.
+    SQS_DETECTION_QUEUE_URL - Required for --backend sqs. The SQS queue URL.
     AWS_REGION - Optional. Defaults to us-east-1.
         """
     )
@@ -74,7 +79,13 @@ Environment:
         "--batch-size", "-b",
         type=int,
         default=20,
-        help="Hotels per SQS message (default: 20)"
+        help="Hotels per queue message (default: 20)"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=QUEUE_BACKENDS,
+        default="sqs",
+        help="Queue to enqueue into: SQS or the detection_queue table (default: sqs)"
     )
     parser.add_argument(
         "--no-notify",
@@ -85,7 +96,7 @@ Environment:
     args = parser.parse_args()
 
     logger.info(f"Enqueuing up to {args.limit} hotels (batch_size={args.batch_size})")
-    asyncio.run(run(limit=args.limit, batch_size=args.batch_size, notify=not args.no_notify))
+    asyncio.run(run(limit=args.limit, batch_size=args.batch_size, notify=not args.no_notify, backend=args.backend))
 
 
 if __name__ == "__main__":
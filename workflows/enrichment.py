@@ -18,6 +18,7 @@ NOTES:
 - Room count enrichment uses Groq API (requires ROOM_COUNT_ENRICHER_AGENT_GROQ_KEY in .env)
 - Default mode uses paid tier rate limits (1000 RPM, 15 concurrent requests)
 - Use --free-tier for slow sequential mode (30 RPM)
+- Use --adaptive to let concurrency follow latency/timeouts (logged per change)
 - Customer proximity uses PostGIS for efficient spatial queries
 - Both operations are idempotent (can be re-run safely)
 """
@@ -37,7 +38,14 @@ from services.enrichment.service import Service
 from infra import slack
 
 
-async def run_room_counts(limit: int, free_tier: bool = False, concurrency: int = 15, tier: int = None, notify: bool = True) -> None:
+async def run_room_counts(
+    limit: int,
+    free_tier: bool = False,
+    concurrency: int = 15,
+    tier: int = None,
+    notify: bool = True,
+    adaptive: bool = False,
+) -> None:
     """Run room count enrichment."""
     await init_db()
     try:
@@ -59,6 +67,7 @@ async def run_room_counts(limit: int, free_tier: bool = False, concurrency: int
             free_tier=free_tier,
             concurrency=concurrency,
             tier=tier,
+            adaptive=adaptive,
         )
 
         logger.info("=" * 60)
@@ -186,6 +195,11 @@ Examples:
         default=15,
         help="Max concurrent requests in paid tier mode (default: 15)"
     )
+    room_parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Lower concurrency on timeouts, rate limits and latency instead of keeping it fixed"
+    )
     room_parser.add_argument(
         "--tier", "-t",
         type=int,
@@ -237,6 +251,7 @@ Examples:
             concurrency=args.concurrency,
             tier=args.tier,
             notify=not args.no_notify,
+            adaptive=args.adaptive,
         ))
     elif args.command == "proximity":
         logger.info(f"Running proximity calculation (limit={args.limit}, max_distance={args.max_distance}km)")